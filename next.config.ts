@@ -1,5 +1,11 @@
 import type { NextConfig } from "next";
 
+// Files the headless-Chromium carousel renderer reads at runtime
+const carouselRendererFiles = [
+  "./node_modules/@sparticuz/chromium/bin/**",
+  "./node_modules/@tailwindcss/browser/dist/**",
+];
+
 const nextConfig: NextConfig = {
   images: {
     remotePatterns: [
@@ -13,6 +19,12 @@ const nextConfig: NextConfig = {
       }
     ],
   },
+  // Headless Chromium for carousel export and previews can't be bundled
+  serverExternalPackages: ["puppeteer-core", "@sparticuz/chromium"],
+  outputFileTracingIncludes: {
+    "/api/posts/[id]/export": carouselRendererFiles,
+    "/api/carousels/previews": carouselRendererFiles,
+  },
 };
 
 export default nextConfig;
@@ -1,8 +1,55 @@
+/**
+ * Brand palette from an uploaded logo
+ * Extracted locally (src/lib/palette.ts) in milliseconds. When two swatches
+ * are a close call for primary and PALETTE_LLM_TIEBREAK is set, the AI
+ * provider picks between them; it never invents colours.
+ */
+
 import { NextRequest, NextResponse } from 'next/server';
-import { getProvider } from '@/lib/ai/providers';
+import { getActiveProvider, getProvider } from '@/lib/ai/providers';
+import { PaletteError, PaletteResult, pickPalette, samplePalette } from '@/lib/palette';
 
 export const runtime = 'nodejs';
 
+const MAX_IMAGE_BYTES = 10 * 1024 * 1024;
+const TIEBREAK_TIMEOUT_MS = 4000;
+
+/** Ask the AI provider which candidate is the brand colour. Null on any doubt. */
+async function breakPrimaryTie(imageBase64: string, candidates: string[]): Promise<string | null> {
+    if (process.env.PALETTE_LLM_TIEBREAK !== 'true' || getActiveProvider() === 'mock') return null;
+
+    try {
+        const provider = await getProvider();
+        const response = await Promise.race([
+            provider.complete({
+                messages: [
+                    {
+                        role: 'system',
+                        content: `You are a professional brand designer. Pick the logo's main brand color from this list: ${candidates.join(', ')}.
+Return ONLY a JSON object: {"primary": "<one hex from the list>"}`,
+                    },
+                    {
+                        role: 'user',
+                        content: [
+                            { type: 'text', text: 'Which of these is the primary brand color?' },
+                            { type: 'image', image: imageBase64 }
+                        ]
+                    }
+                ],
+                temperature: 0,
+                maxTokens: 50,
+                responseFormat: { type: 'json_object' }
+            }),
+            new Promise<null>(resolve => setTimeout(() => resolve(null), TIEBREAK_TIMEOUT_MS)),
+        ]);
+        const choice = response?.content.match(/#[0-9a-f]{6}/i)?.[0].toUpperCase();
+        return choice && candidates.includes(choice) ? choice : null;
+    } catch (error) {
+        console.warn('[Extract Colors] Tie-break failed, keeping local pick:', error);
+        return null;
+    }
+}
+
 export async function POST(request: NextRequest) {
     try {
         const { imageBase64 } = await request.json();
@@ -11,46 +58,27 @@ export async function POST(request: NextRequest) {
             return NextResponse.json({ error: 'No image provided' }, { status: 400 });
         }
 
-        const provider = await getProvider();
+        const image = Buffer.from(String(imageBase64).replace(/^data:image\/[\w.+-]+;base64,/, ''), 'base64');
+        if (image.length > MAX_IMAGE_BYTES) {
+            return NextResponse.json({ error: 'Image is too large. Max 10MB.' }, { status: 413 });
+        }
+
+        const startedAt = Date.now();
+        const sample = await samplePalette(image);
+        let result: PaletteResult = pickPalette(sample);
 
-        const systemPrompt = `You are a professional brand designer. Analyze the provided image and extract a premium 3-color brand palette.
-        
-Return ONLY a JSON object with these keys:
-- primary: The most vibrant or representative color (hex).
-- background: A clean, neutral color suitable for a canvas background (hex).
-- accent: A high-contrast color that pops against the primary (hex).
-
-The palette should feel cohesive, professional, and established.`;
-
-        const response = await provider.complete({
-            messages: [
-                { role: 'system', content: systemPrompt },
-                {
-                    role: 'user',
-                    content: [
-                        { type: 'text', text: 'Extract a brand palette from this image.' },
-                        { type: 'image', image: imageBase64 }
-                    ] as any
-                }
-            ],
-            temperature: 0.2,
-            responseFormat: { type: 'json_object' }
-        });
-
-        const content = response.content;
-        let palette;
-        try {
-            const jsonMatch = content.match(/\{[\s\S]*\}/);
-            const jsonStr = jsonMatch ? jsonMatch[0] : content;
-            palette = JSON.parse(jsonStr);
-        } catch (e) {
-            console.error('[Extract Colors] Parse Error:', e, content);
-            return NextResponse.json({ error: 'Failed to parse extracted colors' }, { status: 500 });
+        if (result.primaryCandidates.length > 1) {
+            const choice = await breakPrimaryTie(imageBase64, result.primaryCandidates);
+            if (choice && choice !== result.palette.primary) result = pickPalette(sample, choice);
         }
 
-        return NextResponse.json(palette);
+        console.log(`[Extract Colors] ${result.palette.primary} / ${result.palette.background} / ${result.palette.accent} in ${Date.now() - startedAt}ms`);
+        return NextResponse.json(result.palette);
 
     } catch (error) {
+        if (error instanceof PaletteError) {
+            return NextResponse.json({ error: error.message }, { status: error.status });
+        }
         console.error('[Extract Colors] Error:', error);
         return NextResponse.json({ error: 'Failed to extract colors' }, { status: 500 });
     }
@@ -2,7 +2,10 @@ import { NextRequest, NextResponse } from 'next/server';
 import { getProvider } from '@/lib/ai/providers';
 import { createServerClient } from '@supabase/ssr';
 import { cookies } from 'next/headers';
-import { parseTier, getTierLimits, canGenerateIdea } from '@/lib/subscription';
+import { getAuthUser } from '@/utils/supabase/server';
+import { canGenerateIdea } from '@/lib/subscription';
+import { getEntitlements } from '@/lib/entitlements';
+import { getUsage } from '@/lib/usage';
 
 export const runtime = 'nodejs';
 
@@ -58,7 +61,7 @@ export async function POST(request: NextRequest) {
         }
     );
 
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
     if (!user) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
@@ -66,33 +69,25 @@ export async function POST(request: NextRequest) {
     try {
         const body: GenerateIdeaRequest = await request.json();
 
-        // Get user profile to check tier
-        const { data: profile } = await supabase
-            .from('founder_profiles')
-            .select('id, subscription_tier')
-            .eq('account_id', user.id)
-            .single();
+        // Get user profile and tier
+        const [{ data: profile }, { tier, limits }] = await Promise.all([
+            supabase
+                .from('founder_profiles')
+                .select('id')
+                .eq('account_id', user.id)
+                .single(),
+            getEntitlements(user.id),
+        ]);
 
         if (!profile) {
             return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
         }
 
-        const tier = parseTier(profile.subscription_tier);
-        const limits = getTierLimits(tier);
-
         // Check ideation limit for Starter tier
         if (tier === 'starter') {
-            const startOfMonth = new Date();
-            startOfMonth.setDate(1);
-            startOfMonth.setHours(0, 0, 0, 0);
-
-            const { count, error: countError } = await supabase
-                .from('spontaneous_ideas')
-                .select('*', { count: 'exact', head: true })
-                .eq('profile_id', profile.id)
-                .gte('created_at', startOfMonth.toISOString());
+            const count = await getUsage(supabase, user.id, 'ideas').catch(() => 0);
 
-            if (!canGenerateIdea(tier, count || 0).allowed) {
+            if (!canGenerateIdea(tier, count).allowed) {
                 return NextResponse.json(
                     { 
                         error: 'Monthly ideation limit reached', 
@@ -5,25 +5,17 @@
 
 import { NextResponse } from 'next/server';
 import { generateCarouselSlides } from '@/lib/ai/carousel-generator';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { requireFeature } from '@/lib/entitlements';
 
 export async function POST(req: Request) {
   try {
     const supabase = await createClient();
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
     if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
 
-    const { data: profile } = await supabase
-      .from('founder_profiles')
-      .select('subscription_tier')
-      .eq('account_id', user.id)
-      .single();
-
-    if (profile?.subscription_tier !== 'authority') {
-      return NextResponse.json({ 
-        error: 'On-demand carousels are only available on the Authority plan.' 
-      }, { status: 403 });
-    }
+    const denied = await requireFeature(user.id, 'onDemandCarousels');
+    if (denied) return denied;
 
     const body = await req.json();
     console.log("API: Request received", body);
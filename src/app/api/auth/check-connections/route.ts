@@ -4,13 +4,14 @@
  */
 
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { classifyConnections } from '@/lib/dashboard';
 
 export const runtime = 'nodejs';
 
 export async function GET(request: NextRequest) {
     const supabase = await createClient();
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
 
     if (!user) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -28,53 +29,7 @@ export async function GET(request: NextRequest) {
             return NextResponse.json({ error: 'Failed to check connections' }, { status: 500 });
         }
 
-        const now = new Date();
-        const expired: { platform: string; expired_at?: string }[] = [];
-        const active: string[] = [];
-
-        for (const conn of connections || []) {
-            // Check if explicitly expired
-            if (conn.connection_status === 'expired' || conn.connection_status === 'revoked') {
-                expired.push({
-                    platform: conn.platform,
-                    expired_at: conn.token_expires_at
-                });
-                continue;
-            }
-
-            // Check if token has expired based on expiry time
-            if (conn.token_expires_at) {
-                const expiryDate = new Date(conn.token_expires_at);
-                if (expiryDate < now) {
-                    expired.push({
-                        platform: conn.platform,
-                        expired_at: conn.token_expires_at
-                    });
-                    continue;
-                }
-            }
-
-            // Check if last validation was too long ago (> 7 days)
-            // This catches cases where we don't have explicit expiry
-            if (conn.last_validated_at) {
-                const lastValidated = new Date(conn.last_validated_at);
-                const daysSinceValidation = (now.getTime() - lastValidated.getTime()) / (1000 * 60 * 60 * 24);
-
-                if (daysSinceValidation > 7) {
-                    // Mark as potentially expired - should revalidate
-                    expired.push({ platform: conn.platform });
-                    continue;
-                }
-            }
-
-            active.push(conn.platform);
-        }
-
-        return NextResponse.json({
-            expired,
-            active,
-            total: connections?.length || 0
-        });
+        return NextResponse.json(classifyConnections(connections || []));
 
     } catch (error) {
         console.error('Connection check error:', error);
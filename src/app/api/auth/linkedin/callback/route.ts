@@ -1,5 +1,5 @@
 import { NextResponse, NextRequest } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 
 export const dynamic = 'force-dynamic';
 
@@ -67,7 +67,7 @@ export async function GET(request: NextRequest) {
 
         // 3. Save to Supabase
         const supabase = await createClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (user) {
             await supabase.from('social_connections').upsert({
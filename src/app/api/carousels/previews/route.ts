@@ -0,0 +1,60 @@
+/**
+ * POST /api/carousels/previews
+ * Thumbnail URLs for slide HTML that isn't saved to a post yet (Carousel Studio).
+ * Saved carousels use GET /api/posts/[id]/export?format=thumb instead.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient as createSupabaseClient } from '@supabase/supabase-js';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { exportCarousel } from '@/lib/carousel-render';
+import { logger, startTimer } from '@/lib/logger';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+const MAX_SLIDES = 15;
+const MAX_SLIDE_LENGTH = 50_000;
+
+// Create admin client (bypasses RLS)
+function createAdminClient() {
+    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+    const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+    return createSupabaseClient(supabaseUrl, supabaseServiceKey);
+}
+
+export async function POST(request: NextRequest) {
+    const timer = startTimer();
+    const supabase = await createClient();
+    const { data: { user } } = await getAuthUser(supabase);
+
+    if (!user) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const body = await request.json().catch(() => null);
+    const slides = body?.slides;
+
+    if (
+        !Array.isArray(slides) ||
+        slides.length === 0 ||
+        slides.length > MAX_SLIDES ||
+        !slides.every((slide: unknown) => typeof slide === 'string' && slide.length <= MAX_SLIDE_LENGTH)
+    ) {
+        return NextResponse.json({ error: `Provide 1-${MAX_SLIDES} slides of HTML` }, { status: 400 });
+    }
+
+    try {
+        const result = await exportCarousel(createAdminClient(), user.id, slides, 'thumb', 'preview');
+        logger.info('Carousel previews', {
+            userId: user.id,
+            cached: result.cached,
+            slides: slides.length,
+            duration_ms: timer(),
+        });
+        return NextResponse.json({ urls: result.urls, hash: result.hash });
+    } catch (err) {
+        logger.exception('Carousel preview error', err, { userId: user.id });
+        return NextResponse.json({ error: 'Failed to render previews' }, { status: 500 });
+    }
+}
@@ -0,0 +1,31 @@
+/**
+ * News Ingestion Cron Job
+ * Runs every 2 hours: fetches feeds into news_vault and enriches new rows
+ * (see src/lib/news/ingest.ts)
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { ingestNews } from '@/lib/news/ingest';
+
+export const runtime = 'nodejs';
+export const maxDuration = 300;
+
+export async function GET(request: NextRequest) {
+    // Verify cron secret
+    const authHeader = request.headers.get('authorization');
+    if (authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+        console.warn('[News Ingest Cron] Unauthorized request');
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const skipEnrichment = request.nextUrl.searchParams.get('enrich') === 'false';
+    console.log(`[News Ingest Cron] Running at ${new Date().toISOString()}`);
+
+    try {
+        const report = await ingestNews({ skipEnrichment });
+        return NextResponse.json({ success: true, ...report });
+    } catch (error: any) {
+        console.error('[News Ingest Cron] Error:', error);
+        return NextResponse.json({ error: error.message || 'Ingestion failed' }, { status: 500 });
+    }
+}
@@ -0,0 +1,31 @@
+/**
+ * Media Variant Sweep Cron Job
+ * Runs every 15 minutes: builds WebP variants and blurhashes for uploads whose
+ * after() run crashed, timed out or failed. See src/lib/uploads.ts
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { sweepMediaAssets } from '@/lib/uploads';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+export async function GET(request: NextRequest) {
+    // Verify cron secret
+    const authHeader = request.headers.get('authorization');
+    if (authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+        console.warn('[Media Sweep Cron] Unauthorized request');
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        const { processed, ready, abandoned } = await sweepMediaAssets();
+        if (processed > 0 || abandoned > 0) {
+            console.log(`[Media Sweep Cron] Reprocessed ${processed} assets, ${ready} ready, ${abandoned} given up`);
+        }
+        return NextResponse.json({ success: true, processed, ready, abandoned });
+    } catch (error: any) {
+        console.error('[Media Sweep Cron] Error:', error);
+        return NextResponse.json({ error: error.message || 'Media sweep failed' }, { status: 500 });
+    }
+}
@@ -0,0 +1,30 @@
+/**
+ * Auto-Publish Cron Job
+ * Runs every 5 minutes: publishes due scheduled posts for profiles with
+ * auto_publish enabled (see src/lib/publisher.ts)
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { runPublisher } from '@/lib/publisher';
+
+export const runtime = 'nodejs';
+export const maxDuration = 300;
+
+export async function GET(request: NextRequest) {
+    // Verify cron secret
+    const authHeader = request.headers.get('authorization');
+    if (authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+        console.warn('[Publish Cron] Unauthorized request');
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    console.log(`[Publish Cron] Running at ${new Date().toISOString()}`);
+
+    try {
+        const report = await runPublisher();
+        return NextResponse.json({ success: true, ...report });
+    } catch (error: any) {
+        console.error('[Publish Cron] Error:', error);
+        return NextResponse.json({ error: error.message || 'Publishing run failed' }, { status: 500 });
+    }
+}
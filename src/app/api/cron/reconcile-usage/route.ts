@@ -0,0 +1,32 @@
+/**
+ * Usage Counter Reconciliation Cron Job
+ * Runs nightly: rebuilds usage_counters from spontaneous_ideas and
+ * content_generations so any drift from the triggers is corrected. See
+ * src/lib/usage.ts
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { reconcileUsageCounters } from '@/lib/usage';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+export async function GET(request: NextRequest) {
+    // Verify cron secret
+    const authHeader = request.headers.get('authorization');
+    if (authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+        console.warn('[Usage Reconcile Cron] Unauthorized request');
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        const corrected = await reconcileUsageCounters();
+        if (corrected > 0) {
+            console.log(`[Usage Reconcile Cron] Corrected ${corrected} counter rows`);
+        }
+        return NextResponse.json({ success: true, corrected });
+    } catch (error: any) {
+        console.error('[Usage Reconcile Cron] Error:', error);
+        return NextResponse.json({ error: error.message || 'Usage reconciliation failed' }, { status: 500 });
+    }
+}
@@ -0,0 +1,29 @@
+/**
+ * Stripe Event Queue Cron Job
+ * Runs every 5 minutes: applies webhook events that weren't processed right
+ * after delivery (retries with backoff, crashed drains). See
+ * src/lib/stripe-events.ts
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { processStripeEvents } from '@/lib/stripe-events';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+export async function GET(request: NextRequest) {
+    // Verify cron secret
+    const authHeader = request.headers.get('authorization');
+    if (authHeader !== `Bearer ${process.env.CRON_SECRET}`) {
+        console.warn('[Stripe Events Cron] Unauthorized request');
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    try {
+        const report = await processStripeEvents();
+        return NextResponse.json({ success: true, ...report });
+    } catch (error: any) {
+        console.error('[Stripe Events Cron] Error:', error);
+        return NextResponse.json({ error: error.message || 'Stripe event processing failed' }, { status: 500 });
+    }
+}
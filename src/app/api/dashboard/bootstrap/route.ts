@@ -0,0 +1,44 @@
+/**
+ * GET /api/dashboard/bootstrap
+ * One payload for the dashboard shell (src/lib/dashboard.ts): account,
+ * profiles, week number, posts, notifications, connections, subscription.
+ */
+
+import { NextResponse } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { loadDashboardBootstrap } from '@/lib/dashboard';
+import { logger, startTimer } from '@/lib/logger';
+
+export const runtime = 'nodejs';
+
+export async function GET() {
+    const timer = startTimer();
+
+    try {
+        const supabase = await createClient();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
+
+        if (authError || !user) {
+            return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+        }
+
+        const bootstrap = await loadDashboardBootstrap(supabase, user.id);
+
+        logger.info('Dashboard bootstrap', {
+            userId: user.id,
+            posts: bootstrap.posts.length,
+            duration_ms: timer()
+        });
+
+        return NextResponse.json(
+            { user: { id: user.id, email: user.email || '' }, ...bootstrap },
+            { headers: { 'Cache-Control': 'private, no-store' } }
+        );
+    } catch (error) {
+        logger.exception('Dashboard bootstrap error', error);
+        return NextResponse.json(
+            { error: error instanceof Error ? error.message : 'Failed to load dashboard' },
+            { status: 500 }
+        );
+    }
+}
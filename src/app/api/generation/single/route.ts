@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { generateSinglePost } from '@/lib/generation';
 
 export const runtime = 'nodejs';
@@ -8,7 +8,7 @@ export const maxDuration = 60; // Should be fast (3-5s)
 export async function POST(request: NextRequest) {
     const supabase = await createClient();
 
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
 
     if (!user) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
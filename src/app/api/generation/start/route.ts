@@ -4,7 +4,8 @@
  */
 
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { getEntitlements } from '@/lib/entitlements';
 import { generateWeeklyContent, getUserWeekNumber, UserProfile } from '@/lib/generation';
 import { sendWeekReadyEmail } from '@/lib/email/resend';
 import { checkRateLimit, rateLimitKey, RATE_LIMITS } from '@/lib/rate-limit';
@@ -25,7 +26,7 @@ export async function POST(request: NextRequest) {
     const supabase = await createClient();
 
     // Get authenticated user
-    const { data: { user }, error: authError } = await supabase.auth.getUser();
+    const { data: { user }, error: authError } = await getAuthUser(supabase);
 
     if (authError || !user) {
         logger.warn('Unauthorized generation attempt', { route: '/api/generation/start' });
@@ -119,46 +120,10 @@ export async function POST(request: NextRequest) {
         const weekNumber = await getUserWeekNumber(user.id);
 
         if (weekNumber > 1) {
-            // Check subscriptions table
-            const { data: subscription } = await supabase
-                .from('subscriptions')
-                .select('status, current_period_end, cancel_at_period_end')
-                .eq('account_id', user.id)
-                .single();
-
-            let hasAccess = false;
-
-            if (subscription) {
-                // Active or trialing = full access
-                if (['active', 'trialing'].includes(subscription.status)) {
-                    hasAccess = true;
-                }
-                // Canceled but period hasn't ended yet = still has access
-                else if (subscription.status === 'canceled' && subscription.current_period_end) {
-                    const periodEnd = new Date(subscription.current_period_end);
-                    if (periodEnd > new Date()) {
-                        hasAccess = true;
-                    }
-                }
-                // Cancel pending at period end = still active
-                else if (subscription.cancel_at_period_end && subscription.current_period_end) {
-                    const periodEnd = new Date(subscription.current_period_end);
-                    if (periodEnd > new Date()) {
-                        hasAccess = true;
-                    }
-                }
-            }
-
-            // Fallback: check founder_profiles.subscription_tier
-            if (!hasAccess) {
-                const profileTier = (profile as any).subscription_tier;
-                const hasPaidTier = profileTier && profileTier !== 'starter' && profileTier !== 'free';
-                if (hasPaidTier) {
-                    hasAccess = true;
-                }
-            }
+            // Active/trialing, still inside a canceled period, or a paid profile tier
+            const { hasPaidAccess } = await getEntitlements(user.id);
 
-            if (!hasAccess) {
+            if (!hasPaidAccess) {
                 return NextResponse.json({
                     error: 'Active subscription required for Week 2+',
                     weekNumber
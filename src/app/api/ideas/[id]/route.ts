@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { createClient as createServerClient } from '@/utils/supabase/server';
+import { createClient as createServerClient, getAuthUser } from '@/utils/supabase/server';
 import { createClient as createAdminClient } from '@supabase/supabase-js';
 
 export async function DELETE(
@@ -9,7 +9,7 @@ export async function DELETE(
     try {
         const { id } = await params;
         const supabase = await createServerClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (!user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -58,7 +58,7 @@ export async function PATCH(
     try {
         const { id } = await params;
         const supabase = await createServerClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (!user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -1,10 +1,11 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { getUsage } from '@/lib/usage';
 
 export async function GET(request: Request) {
     try {
         const supabase = await createClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (!user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -20,29 +21,22 @@ export async function GET(request: Request) {
             return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
         }
 
-        const { data: ideas, error } = await supabase
-            .from('spontaneous_ideas')
-            .select('*')
-            .eq('profile_id', profile.id)
-            .eq('saved', true)
-            .order('created_at', { ascending: false });
+        // Saved ideas plus this month's usage counter
+        const [{ data: ideas, error }, usage] = await Promise.all([
+            supabase
+                .from('spontaneous_ideas')
+                .select('*')
+                .eq('profile_id', profile.id)
+                .eq('saved', true)
+                .order('created_at', { ascending: false }),
+            getUsage(supabase, user.id, 'ideas').catch(() => 0),
+        ]);
 
         if (error) {
             console.error('Failed to fetch ideas:', error);
             // Return empty list but keep going for usage
         }
 
-        // Also get monthly usage count
-        const startOfMonth = new Date();
-        startOfMonth.setDate(1);
-        startOfMonth.setHours(0, 0, 0, 0);
-
-        const { count: usage } = await supabase
-            .from('spontaneous_ideas')
-            .select('*', { count: 'exact', head: true })
-            .eq('profile_id', profile.id)
-            .gte('created_at', startOfMonth.toISOString());
-
         return NextResponse.json({ 
             ideas: ideas || [],
             usage: usage || 0
@@ -56,7 +50,7 @@ export async function GET(request: Request) {
 export async function POST(request: Request) {
     try {
         const supabase = await createClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (!user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
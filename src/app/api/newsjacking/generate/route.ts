@@ -1,24 +1,18 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { getProvider } from '@/lib/ai/providers';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { requireFeature } from '@/lib/entitlements';
 
 export const runtime = 'nodejs';
 
 export async function POST(req: NextRequest) {
     try {
         const supabase = await createClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
         if (!user) return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
 
-        const { data: profile } = await supabase
-            .from('founder_profiles')
-            .select('subscription_tier')
-            .eq('account_id', user.id)
-            .single();
-
-        if (profile?.subscription_tier !== 'authority') {
-            return NextResponse.json({ error: 'Newsjacking is only available on the Authority plan.' }, { status: 403 });
-        }
+        const denied = await requireFeature(user.id, 'newsJacking');
+        if (denied) return denied;
 
         const body = await req.json();
         const { article, context } = body;
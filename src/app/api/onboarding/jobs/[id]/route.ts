@@ -0,0 +1,93 @@
+/**
+ * GET  /api/onboarding/jobs/[id] - Job progress (poll this)
+ * POST /api/onboarding/jobs/[id] - Resume a failed or stalled job from its last checkpoint
+ */
+
+import { NextRequest, NextResponse, after } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+import { isJobStalled, runOnboardingJob } from '@/lib/onboarding';
+
+export const runtime = 'nodejs';
+export const maxDuration = 300;
+
+const JOB_FIELDS = 'id, account_id, stage, status, result, error, attempts, lease_until, updated_at';
+
+async function loadJob(jobId: string) {
+    const supabase = await createClient();
+    const { data: { user } } = await getAuthUser(supabase);
+
+    if (!user) {
+        return { error: NextResponse.json({ error: 'Unauthorized' }, { status: 401 }) };
+    }
+
+    // RLS limits this to the caller's own jobs
+    const { data: job } = await supabase
+        .from('onboarding_jobs')
+        .select(JOB_FIELDS)
+        .eq('id', jobId)
+        .maybeSingle();
+
+    if (!job || job.account_id !== user.id) {
+        return { error: NextResponse.json({ error: 'Job not found' }, { status: 404 }) };
+    }
+    return { job };
+}
+
+function jobResponse(job: any) {
+    return {
+        jobId: job.id,
+        stage: job.stage,
+        status: job.status,
+        error: job.error,
+        attempts: job.attempts,
+        result: job.result,
+        stalled: isJobStalled(job),
+    };
+}
+
+export async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ id: string }> }
+) {
+    const { id } = await params;
+    const { job, error } = await loadJob(id);
+    if (error) return error;
+
+    return NextResponse.json(jobResponse(job));
+}
+
+export async function POST(
+    request: NextRequest,
+    { params }: { params: Promise<{ id: string }> }
+) {
+    const { id } = await params;
+    const { job, error } = await loadJob(id);
+    if (error) return error;
+
+    if (job.status === 'complete') {
+        return NextResponse.json(jobResponse(job));
+    }
+
+    if (job.status !== 'failed' && !isJobStalled(job)) {
+        // Still being worked on; nothing to resume
+        return NextResponse.json(jobResponse(job), { status: 202 });
+    }
+
+    console.log(`[Onboarding] Resuming job ${id} at ${job.stage}`);
+    const admin = createAdminSupabaseClient();
+
+    // Back to queued so pollers don't see the old failure while the runner starts
+    if (job.status === 'failed') {
+        await admin
+            .from('onboarding_jobs')
+            .update({ status: 'queued', error: null, updated_at: new Date().toISOString() })
+            .eq('id', id)
+            .eq('status', 'failed');
+    }
+
+    // The claim inside runOnboardingJob makes concurrent resumes a no-op
+    after(() => runOnboardingJob(id, admin).catch(err => console.error('[Onboarding] Job runner error:', err)));
+
+    return NextResponse.json({ ...jobResponse(job), status: 'queued', error: null, stalled: false }, { status: 202 });
+}
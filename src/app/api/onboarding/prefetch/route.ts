@@ -0,0 +1,72 @@
+/**
+ * POST /api/onboarding/prefetch
+ * Speculatively scrape context/competitor links and analyse voice samples
+ * while the wizard is still open (src/lib/onboarding-prefetch.ts).
+ *
+ * Body: { draftId, urls?: string[], voiceSamples?: {content, type}[] }
+ * Returns 202 immediately; the work finishes after the response.
+ */
+
+import { NextRequest, NextResponse, after } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+import { checkRateLimit, rateLimitKey, RATE_LIMITS } from '@/lib/rate-limit';
+import {
+    MAX_PREFETCH_URLS,
+    MAX_PREFETCH_VOICE_SAMPLES,
+    contextUrl,
+    prefetchOnboardingContext,
+} from '@/lib/onboarding-prefetch';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+const UUID_PATTERN = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+export async function POST(request: NextRequest) {
+    const supabase = await createClient();
+    const { data: { user } } = await getAuthUser(supabase);
+
+    if (!user) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const rateLimit = checkRateLimit(rateLimitKey(user.id, 'onboarding-prefetch'), RATE_LIMITS.default);
+    if (!rateLimit.allowed) {
+        return NextResponse.json({ error: 'Too many requests' }, { status: 429 });
+    }
+
+    const body = await request.json().catch(() => null);
+    const draftId = body?.draftId;
+    if (typeof draftId !== 'string' || !UUID_PATTERN.test(draftId)) {
+        return NextResponse.json({ error: 'A valid draftId is required' }, { status: 400 });
+    }
+
+    const urls = (Array.isArray(body.urls) ? body.urls : [])
+        .filter((value: unknown): value is string => typeof value === 'string')
+        .map((value: string) => contextUrl(value.trim()))
+        .filter((url: string | null): url is string => {
+            if (!url) return false;
+            try {
+                new URL(url);
+                return true;
+            } catch {
+                return false;
+            }
+        })
+        .slice(0, MAX_PREFETCH_URLS);
+
+    const voiceSamples = (Array.isArray(body.voiceSamples) ? body.voiceSamples : [])
+        .filter((sample: any) => typeof sample?.content === 'string' && sample.content.trim() !== '')
+        .slice(0, MAX_PREFETCH_VOICE_SAMPLES)
+        .map((sample: any) => ({ content: sample.content, type: String(sample.type || 'paste') }));
+
+    if (urls.length === 0 && voiceSamples.length === 0) {
+        return NextResponse.json({ queued: false });
+    }
+
+    after(() => prefetchOnboardingContext(createAdminSupabaseClient(), user.id, draftId, urls, voiceSamples)
+        .catch(err => console.error('[Onboarding Prefetch] Error:', err)));
+
+    return NextResponse.json({ queued: true }, { status: 202 });
+}
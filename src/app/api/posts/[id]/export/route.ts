@@ -0,0 +1,77 @@
+/**
+ * GET /api/posts/[id]/export?format=pdf|png|thumb[&cover=1]
+ * Render a carousel server-side and return signed download URL(s).
+ * `cover=1` renders only the first slide (gallery thumbnails).
+ * Repeat exports of unchanged slides are served from the Storage cache.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient as createSupabaseClient } from '@supabase/supabase-js';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { exportCarousel, CarouselExportFormat } from '@/lib/carousel-render';
+import { logger, startTimer } from '@/lib/logger';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+// Create admin client (bypasses RLS)
+function createAdminClient() {
+    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+    const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+    return createSupabaseClient(supabaseUrl, supabaseServiceKey);
+}
+
+export async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ id: string }> }
+) {
+    const timer = startTimer();
+    const { id: postId } = await params;
+    const requested = request.nextUrl.searchParams.get('format');
+    const format: CarouselExportFormat = requested === 'png' || requested === 'thumb' ? requested : 'pdf';
+
+    const supabase = await createClient();
+    const { data: { user } } = await getAuthUser(supabase);
+
+    if (!user) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const { data: post, error } = await supabase
+        .from('posts')
+        .select('id, topic, carousel_slides, founder_profiles!inner(account_id)')
+        .eq('id', postId)
+        .single();
+
+    if (error || !post) {
+        return NextResponse.json({ error: 'Post not found' }, { status: 404 });
+    }
+
+    // @ts-ignore
+    const profile = Array.isArray(post.founder_profiles) ? post.founder_profiles[0] : post.founder_profiles;
+    if (!profile || profile.account_id !== user.id) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 403 });
+    }
+
+    const allSlides: string[] = post.carousel_slides || [];
+    const slides = request.nextUrl.searchParams.get('cover') === '1' ? allSlides.slice(0, 1) : allSlides;
+    if (slides.length === 0) {
+        return NextResponse.json({ error: 'This carousel has no slides to export' }, { status: 400 });
+    }
+
+    try {
+        const result = await exportCarousel(createAdminClient(), user.id, slides, format, post.topic || 'carousel');
+        logger.info('Carousel exported', {
+            userId: user.id,
+            postId,
+            format,
+            cached: result.cached,
+            slides: slides.length,
+            duration_ms: timer(),
+        });
+        return NextResponse.json(result);
+    } catch (err) {
+        logger.exception('Carousel export error', err, { postId, format });
+        return NextResponse.json({ error: 'Failed to export carousel' }, { status: 500 });
+    }
+}
@@ -1,7 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
-import { fal } from '@fal-ai/client';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { requireFeature } from '@/lib/entitlements';
 import { getFacelessStyle, getFaceStyle, compileVisualPrompt } from '@/lib/ai/visual-styles';
+import { ImageJobRequest, imageJobResponse, submitImageJob } from '@/lib/image-jobs';
 
 export const runtime = 'nodejs'; // Fal client uses node events
 
@@ -12,7 +13,7 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
         const { mode = 'faceless', aspectRatio = '16:9' } = body;
 
         const supabase = await createClient();
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -36,21 +37,15 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
             return NextResponse.json({ error: 'Unauthorized access to post' }, { status: 403 });
         }
 
-        const tier = profile.subscription_tier || 'starter';
-        if (tier === 'starter') {
-            return NextResponse.json({ error: 'Upgrade to Creator or Authority to use AI Visuals Studio.' }, { status: 403 });
-        }
-
-        if (mode === 'digital_twin' && tier !== 'authority') {
-            return NextResponse.json({ error: 'Upgrade to Authority to use Digital Twin Face Clones.' }, { status: 403 });
-        }
+        const denied = await requireFeature(user.id, mode === 'digital_twin' ? 'faceClone' : 'facelessVisuals');
+        if (denied) return denied;
 
         const nanoAspectRatio = aspectRatio || '1:1';
 
         // Use the post content as the prompt context. Limit length to avoid massive prompts.
         const postContext = post.content.substring(0, 500);
 
-        let result: any;
+        let input: ImageJobRequest['input'];
 
         const brandColors = profile.brand_colors || {
             primary: '#10B981',
@@ -78,16 +73,13 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
             const style = getFaceStyle(styleId) || getFaceStyle('photorealistic')!;
             const styledPrompt = compileVisualPrompt(postContext, style, brandColors);
 
-            // Call Fal.ai Digital Twin Edit
-            result = await fal.subscribe("fal-ai/gemini-25-flash-image/edit", {
-                input: {
-                    prompt: styledPrompt,
-                    aspect_ratio: nanoAspectRatio,
-                    image_urls: referenceUrls,
-                    output_format: "png"
-                },
-                logs: true,
-            });
+            // Digital Twin Edit
+            input = {
+                prompt: styledPrompt,
+                aspect_ratio: nanoAspectRatio,
+                image_urls: referenceUrls,
+                output_format: "png"
+            };
 
         } else {
             // mode === 'faceless'
@@ -95,33 +87,24 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
             const style = getFacelessStyle(styleId) || getFacelessStyle('abstract')!;
             const styledPrompt = compileVisualPrompt(postContext, style, brandColors);
 
-            result = await fal.subscribe("fal-ai/gemini-25-flash-image", {
-                input: {
-                    prompt: styledPrompt,
-                    aspect_ratio: nanoAspectRatio,
-                    output_format: "png"
-                },
-                logs: true,
-            });
-        }
-
-        const outputPayload = result.data || result;
-        const generatedImageUrl = outputPayload?.images?.[0]?.url || outputPayload?.image?.url;
-
-        if (!generatedImageUrl) {
-            throw new Error("Failed to generate image.");
+            input = {
+                prompt: styledPrompt,
+                aspect_ratio: nanoAspectRatio,
+                output_format: "png"
+            };
         }
 
-        // Save generated image URL to the post
-        await supabase
-            .from('posts')
-            .update({
-                image_url: generatedImageUrl,
-                updated_at: new Date().toISOString()
-            })
-            .eq('id', postId);
-
-        return NextResponse.json({ success: true, imageUrl: generatedImageUrl });
+        // Rendered on fal's queue; the webhook stores the image and attaches
+        // it to the post. Poll /api/visuals/jobs/[jobId] for the result.
+        const { job, deduped } = await submitImageJob({
+            accountId: user.id,
+            profileId: profile.id,
+            postId,
+            mode: mode === 'digital_twin' ? 'digital_twin' : 'faceless',
+            input,
+        });
+
+        return NextResponse.json({ success: true, ...imageJobResponse(job), deduped }, { status: 202 });
 
     } catch (error: any) {
         console.error('Post Image generation error:', error);
@@ -4,7 +4,7 @@
  */
 
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { generateSinglePost } from '@/lib/generation';
 import { logger, startTimer } from '@/lib/logger';
 
@@ -19,7 +19,7 @@ export async function POST(
     const timer = startTimer();
     const supabase = await createClient();
 
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
 
     if (!user) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
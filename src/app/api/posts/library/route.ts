@@ -0,0 +1,93 @@
+/**
+ * GET /api/posts/library
+ * One page of the content library, filtered/sorted in Postgres.
+ *
+ * Query: platform, status, format, q, sort (newest|oldest|status), offset, limit
+ * Returns { posts, total, hasMore, counts } — counts only on the first page.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { logger, startTimer } from '@/lib/logger';
+
+export const runtime = 'nodejs';
+
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 100;
+const SORTS = ['newest', 'oldest', 'status'];
+
+// ILIKE treats % and _ as wildcards; search for them literally
+function escapeLike(value: string): string {
+    return value.replace(/[\\%_]/g, match => `\\${match}`);
+}
+
+export async function GET(request: NextRequest) {
+    const timer = startTimer();
+
+    try {
+        const supabase = await createClient();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
+        if (authError || !user) {
+            return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+        }
+
+        const { data: profile } = await supabase
+            .from('founder_profiles')
+            .select('id')
+            .eq('account_id', user.id)
+            .single();
+
+        if (!profile) {
+            return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
+        }
+
+        const { searchParams } = request.nextUrl;
+        const sort = searchParams.get('sort') || 'newest';
+        const offset = Math.max(0, parseInt(searchParams.get('offset') || '0', 10) || 0);
+        const limit = Math.min(MAX_PAGE_SIZE, Math.max(1, parseInt(searchParams.get('limit') || '', 10) || DEFAULT_PAGE_SIZE));
+        const query = searchParams.get('q')?.trim();
+
+        const [page, counts] = await Promise.all([
+            supabase.rpc('library_posts', {
+                p_profile_id: profile.id,
+                p_platform: searchParams.get('platform') || null,
+                p_status: searchParams.get('status') || null,
+                p_format: searchParams.get('format') || null,
+                p_query: query ? escapeLike(query) : null,
+                p_sort: SORTS.includes(sort) ? sort : 'newest',
+                p_limit: limit,
+                p_offset: offset,
+            }),
+            offset === 0
+                ? supabase.rpc('library_post_counts', { p_profile_id: profile.id }).single()
+                : Promise.resolve(null),
+        ]);
+
+        if (page.error) {
+            logger.exception('Failed to fetch library', page.error, { userId: user.id });
+            return NextResponse.json({ error: 'Failed to fetch library' }, { status: 500 });
+        }
+
+        const rows = (page.data || []) as Array<Record<string, unknown> & { total_count: number }>;
+        const total = rows.length > 0 ? Number(rows[0].total_count) : 0;
+        const posts = rows.map(({ total_count: _total, ...post }) => post);
+
+        logger.info('Library fetched', {
+            userId: user.id,
+            count: posts.length,
+            total,
+            offset,
+            duration_ms: timer(),
+        });
+
+        return NextResponse.json({
+            posts,
+            total,
+            hasMore: offset + posts.length < total,
+            counts: counts?.data ?? null,
+        });
+    } catch (error) {
+        logger.exception('Library API error', error);
+        return NextResponse.json({ error: 'Failed to fetch library' }, { status: 500 });
+    }
+}
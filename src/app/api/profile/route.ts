@@ -1,6 +1,7 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { getUserWeekNumber } from '@/lib/generation';
+import { invalidateEntitlements } from '@/lib/entitlements';
 
 export const runtime = 'nodejs';
 
@@ -11,7 +12,7 @@ export async function GET(req: Request) {
         const supabase = await createClient();
 
         // Get authenticated user
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json(
@@ -75,7 +76,7 @@ export async function PATCH(req: Request) {
 async function handleUpdate(req: Request) {
     try {
         const supabase = await createClient();
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -125,6 +126,7 @@ async function handleUpdate(req: Request) {
             .single();
 
         if (error) throw error;
+        if ('subscription_tier' in cleanUpdates) invalidateEntitlements(user.id);
 
         return NextResponse.json({ profile: data });
 
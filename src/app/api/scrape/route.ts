@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { scrapeWebsite, extractBusinessSummary } from '@/lib/scraper';
 
 export const runtime = 'nodejs';
@@ -9,7 +9,7 @@ export async function POST(request: NextRequest) {
     try {
         // Verify authentication
         const supabase = await createClient();
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json(
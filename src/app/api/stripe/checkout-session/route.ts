@@ -2,6 +2,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { stripe } from '@/lib/stripe';
 import { TIER_DB_FEATURES, createAdminSupabaseClient } from '@/lib/subscription';
+import { invalidateEntitlements } from '@/lib/entitlements';
 import Stripe from 'stripe';
 
 export const runtime = 'nodejs';
@@ -64,6 +65,7 @@ export async function GET(req: NextRequest) {
                 if (profileError) {
                     console.error('[Lazy Sync] Failed to update profile:', profileError);
                 }
+                invalidateEntitlements(userId);
 
                 console.log(`[Lazy Sync] Synced subscription for ${userId} to tier=${tier}`);
             }
@@ -1,7 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { stripe } from '@/lib/stripe';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { TIER_DB_FEATURES, createAdminSupabaseClient } from '@/lib/subscription';
+import { invalidateEntitlements } from '@/lib/entitlements';
 
 // Map internal tier IDs to your actual Stripe Price IDs
 const PRICE_IDS: Record<string, string | undefined> = {
@@ -29,7 +30,7 @@ export async function POST(req: NextRequest) {
         }
 
         const supabase = await createClient();
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
 
         if (!user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
@@ -100,6 +101,7 @@ export async function POST(req: NextRequest) {
                         })
                         .eq('account_id', user.id);
                 }
+                invalidateEntitlements(user.id);
 
                 return NextResponse.json({
                     success: true,
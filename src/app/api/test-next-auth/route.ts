@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 
 export async function GET(request: Request) {
     try {
@@ -7,7 +7,7 @@ export async function GET(request: Request) {
         const supabase = await createClient();
 
         // Let's manually trigger the same Supabase fetch as the frontend does
-        const { data: { user } } = await supabase.auth.getUser();
+        const { data: { user } } = await getAuthUser(supabase);
         console.log("User:", user?.id);
 
         if (!user) {
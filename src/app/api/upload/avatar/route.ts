@@ -1,86 +1,87 @@
 /**
  * Upload avatar/selfie images to Supabase Storage
  * Used by Face Clone feature (Authority tier)
+ *
+ * - `image/*` body: one file, streamed straight into Storage (`?name=` for the filename)
+ * - multipart (older clients): every file uploads concurrently
+ * Resized WebP variants and a blurhash are built after the response
+ * (src/lib/uploads.ts; /api/cron/process-media retries any that don't
+ * finish); `assets` carries their manifests.
  */
 
-import { NextRequest, NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
-import { randomUUID } from 'crypto';
+import { NextRequest, NextResponse, after } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { UploadError, UploadSource, processMediaAsset, uploadImageAsset } from '@/lib/uploads';
+import { MediaManifest } from '@/lib/media-variants';
 
 export const runtime = 'nodejs';
-// Max file size is handled in code (10MB limit per file)
+
+const BUCKET = 'avatars';
+const MAX_FILE_BYTES = 10 * 1024 * 1024;
 
 export async function POST(request: NextRequest) {
     const supabase = await createClient();
 
     // Auth check
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
     if (!user) {
         return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
     try {
-        const formData = await request.formData();
-        const uploadedUrls: string[] = [];
-
-        // Process each file
-        for (const [key, value] of formData.entries()) {
-            if (value instanceof File) {
-                const file = value;
-
-                // Validate file type
-                if (!file.type.startsWith('image/')) {
-                    continue; // Skip non-image files
-                }
+        const contentType = request.headers.get('content-type') || '';
+        let sources: UploadSource[];
 
-                // Validate file size (max 10MB)
-                if (file.size > 10 * 1024 * 1024) {
-                    return NextResponse.json(
-                        { error: `File ${file.name} is too large. Max 10MB.` },
-                        { status: 400 }
-                    );
+        if (contentType.startsWith('image/')) {
+            if (!request.body) {
+                return NextResponse.json({ error: 'No valid images were uploaded' }, { status: 400 });
+            }
+            const declaredSize = Number(request.headers.get('content-length'));
+            sources = [{
+                body: request.body,
+                contentType,
+                size: Number.isFinite(declaredSize) ? declaredSize : null,
+                filename: request.nextUrl.searchParams.get('name'),
+            }];
+        } else {
+            const formData = await request.formData();
+            sources = [];
+            for (const value of formData.values()) {
+                // Skip non-image files
+                if (value instanceof File && value.type.startsWith('image/')) {
+                    sources.push({ body: value.stream(), contentType: value.type, size: value.size, filename: value.name });
                 }
+            }
+        }
 
-                // Generate unique filename
-                const ext = file.name.split('.').pop() || 'jpg';
-                const filename = `${user.id}/${randomUUID()}.${ext}`;
-
-                // Convert File to ArrayBuffer then Buffer
-                const arrayBuffer = await file.arrayBuffer();
-                const buffer = Buffer.from(arrayBuffer);
-
-                // Upload to Supabase Storage
-                const { data: uploadData, error: uploadError } = await supabase.storage
-                    .from('avatars')
-                    .upload(filename, buffer, {
-                        contentType: file.type,
-                        upsert: false,
-                    });
+        // Validation and missing-bucket errors reject the request (as before);
+        // other storage failures skip that file
+        const results = await Promise.allSettled(
+            sources.map(source => uploadImageAsset(supabase, user.id, BUCKET, source, MAX_FILE_BYTES))
+        );
 
-                if (uploadError) {
-                    console.error('Upload error:', uploadError);
-                    // If bucket doesn't exist, provide helpful error
-                    if (uploadError.message.includes('does not exist')) {
-                        return NextResponse.json(
-                            { error: 'Storage bucket "avatars" not configured. Please create it in Supabase.' },
-                            { status: 500 }
-                        );
-                    }
-                    continue; // Skip this file but continue with others
-                }
+        const assets: MediaManifest[] = [];
+        let rejected: UploadError | null = null;
+        for (const result of results) {
+            if (result.status === 'fulfilled') {
+                assets.push(result.value);
+            } else if (result.reason instanceof UploadError) {
+                rejected ??= result.reason;
+            } else {
+                console.error('Upload error:', result.reason);
+            }
+        }
 
-                // Get public URL
-                const { data: urlData } = supabase.storage
-                    .from('avatars')
-                    .getPublicUrl(filename);
+        // Files that made it are stored either way; give them variants too
+        if (assets.length > 0) {
+            after(() => Promise.all(assets.map(asset => processMediaAsset(asset.id))));
+        }
 
-                if (urlData?.publicUrl) {
-                    uploadedUrls.push(urlData.publicUrl);
-                }
-            }
+        if (rejected) {
+            return NextResponse.json({ error: rejected.message }, { status: rejected.status });
         }
 
-        if (uploadedUrls.length === 0) {
+        if (assets.length === 0) {
             return NextResponse.json(
                 { error: 'No valid images were uploaded' },
                 { status: 400 }
@@ -89,8 +90,9 @@ export async function POST(request: NextRequest) {
 
         return NextResponse.json({
             success: true,
-            urls: uploadedUrls,
-            count: uploadedUrls.length
+            urls: assets.map(asset => asset.original),
+            count: assets.length,
+            assets,
         });
 
     } catch (error) {
@@ -1,26 +1,33 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { requireFeature } from '@/lib/entitlements';
 import { getFacelessStyle, getFaceStyle, compileVisualPrompt } from '@/lib/ai/visual-styles';
-import { fal } from '@fal-ai/client';
+import { ReferenceImageError, readReferenceUpload, storeReferenceImage } from '@/lib/reference-images';
+import { ImageJobRequest, imageJobResponse, submitImageJob } from '@/lib/image-jobs';
 
-export const runtime = 'nodejs'; // Fal client uses node events
+export const runtime = 'nodejs'; // sharp + fal storage
 
 export async function POST(req: Request) {
     try {
-        const body = await req.json();
-        const { prompt, mode = 'faceless', aspectRatio = '16:9', imageBase64 } = body;
-
-        if (!prompt) {
-            return NextResponse.json({ error: 'Prompt is required' }, { status: 400 });
-        }
-
+        // Authenticate before reading a potentially large body
         const supabase = await createClient();
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
         }
 
+        // JSON, multipart (`image` file + fields) or a raw image body with fields in the query
+        const { image, fields } = await readReferenceUpload(req);
+        const { prompt, mode = 'faceless', aspectRatio = '16:9' } = fields;
+
+        if (!prompt) {
+            return NextResponse.json({ error: 'Prompt is required' }, { status: 400 });
+        }
+
+        const denied = await requireFeature(user.id, mode === 'digital_twin' ? 'faceClone' : 'facelessVisuals');
+        if (denied) return denied;
+
         // Fetch user's active profile
         const { data: profiles } = await supabase
             .from('founder_profiles')
@@ -35,16 +42,6 @@ export async function POST(req: Request) {
             return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
         }
 
-        // Tier check mapping from internal canonical names
-        const tier = profile.subscription_tier || 'starter';
-        if (tier === 'starter') {
-            return NextResponse.json({ error: 'Upgrade to Creator or Authority to use AI Visuals Studio.' }, { status: 403 });
-        }
-
-        if (mode === 'digital_twin' && tier !== 'authority') {
-            return NextResponse.json({ error: 'Upgrade to Authority to use Digital Twin Face Clones.' }, { status: 403 });
-        }
-
         const brandColors = profile.brand_colors || {
             primary: '#10B981',
             background: '#09090B',
@@ -54,17 +51,14 @@ export async function POST(req: Request) {
         // Nano Banana / Gemini models accept standard aspect ratio formats (e.g., '16:9', '1:1')
         const nanoAspectRatio = aspectRatio || '16:9';
 
-        let result: any;
+        let input: ImageJobRequest['input'];
 
         if (mode === 'digital_twin') {
             let referenceUrl = profile.visual_lora_id;
 
-            // Use ad-hoc uploaded selfie if provided for testing
-            if (imageBase64) {
-                const base64Data = imageBase64.replace(/^data:image\/\w+;base64,/, "");
-                const imageBuffer = Buffer.from(base64Data, 'base64');
-                const blob = new Blob([imageBuffer]);
-                referenceUrl = await fal.storage.upload(blob);
+            // Use ad-hoc uploaded selfie if provided for testing (uploaded once per photo)
+            if (image) {
+                referenceUrl = await storeReferenceImage(user.id, image);
             }
 
             if (!referenceUrl) {
@@ -76,17 +70,13 @@ export async function POST(req: Request) {
             const style = getFaceStyle(styleId) || getFaceStyle('studio')!;
             const styledPrompt = compileVisualPrompt(prompt, style, brandColors);
 
-            // Call Fal.ai using the Gemini 2.5 Flash Image Edit model
-            // Pass the user's reference selfie URL in the image_urls array
-            result = await fal.subscribe("fal-ai/gemini-25-flash-image/edit", {
-                input: {
-                    prompt: styledPrompt,
-                    aspect_ratio: nanoAspectRatio,
-                    image_urls: [referenceUrl], // The uploaded selfie
-                    output_format: "png"
-                },
-                logs: true,
-            });
+            // Gemini 2.5 Flash Image Edit with the user's reference selfie
+            input = {
+                prompt: styledPrompt,
+                aspect_ratio: nanoAspectRatio,
+                image_urls: [referenceUrl], // The uploaded selfie
+                output_format: "png"
+            };
 
         } else {
             // mode === 'faceless'
@@ -95,28 +85,27 @@ export async function POST(req: Request) {
             const style = getFacelessStyle(styleId) || getFacelessStyle('abstract')!;
             const styledPrompt = compileVisualPrompt(prompt, style, brandColors);
 
-            result = await fal.subscribe("fal-ai/gemini-25-flash-image", {
-                input: {
-                    prompt: styledPrompt,
-                    aspect_ratio: nanoAspectRatio,
-                    output_format: "png"
-                },
-                logs: true,
-            });
+            input = {
+                prompt: styledPrompt,
+                aspect_ratio: nanoAspectRatio,
+                output_format: "png"
+            };
         }
 
-        // Depending on the exact Fal client version/model, the output might be wrapped in .data
-        const outputPayload = result.data || result;
-        const generatedImageUrl = outputPayload?.images?.[0]?.url || outputPayload?.image?.url;
-
-        if (!generatedImageUrl) {
-            console.error("Failed to generate image, result was:", result);
-            throw new Error("Failed to generate image. Please check terminal for details.");
-        }
+        // Rendered on fal's queue; poll /api/visuals/jobs/[jobId] for the image
+        const { job, deduped } = await submitImageJob({
+            accountId: user.id,
+            profileId: profile.id,
+            mode: mode === 'digital_twin' ? 'digital_twin' : 'faceless',
+            input,
+        });
 
-        return NextResponse.json({ imageUrl: generatedImageUrl });
+        return NextResponse.json({ ...imageJobResponse(job), deduped }, { status: 202 });
 
     } catch (error: any) {
+        if (error instanceof ReferenceImageError) {
+            return NextResponse.json({ error: error.message }, { status: error.status });
+        }
         console.error('Visuals generation error:', error);
         return NextResponse.json(
             { error: error.message || 'Internal server error during image generation' },
@@ -0,0 +1,34 @@
+/**
+ * GET /api/visuals/jobs/[id] - Image generation job status (poll this)
+ * Normally the fal webhook has already applied the result; if it is late,
+ * the job is checked against fal directly (src/lib/image-jobs.ts).
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { ImageJob, imageJobResponse, loadImageJob, refreshImageJob } from '@/lib/image-jobs';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60;
+
+export async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ id: string }> }
+) {
+    const { id } = await params;
+    const supabase = await createClient();
+    const { data: { user } } = await getAuthUser(supabase);
+
+    if (!user) {
+        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    // RLS limits this to the caller's own jobs
+    let job: ImageJob | null = await loadImageJob(id, supabase);
+    if (!job || job.account_id !== user.id) {
+        return NextResponse.json({ error: 'Job not found' }, { status: 404 });
+    }
+
+    job = await refreshImageJob(job);
+    return NextResponse.json(imageJobResponse(job), { headers: { 'Cache-Control': 'private, no-store' } });
+}
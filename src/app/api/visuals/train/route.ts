@@ -1,25 +1,31 @@
 import { NextResponse } from 'next/server';
-import { createClient } from '@/utils/supabase/server';
-import { fal } from '@fal-ai/client';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
+import { requireFeature } from '@/lib/entitlements';
+import { ReferenceImageError, readReferenceUpload, storeReferenceImage } from '@/lib/reference-images';
 
 export const runtime = 'nodejs';
 
 export async function POST(req: Request) {
     try {
-        const body = await req.json();
-        const { imageBase64, imageUrl } = body;
-
-        if (!imageBase64 && !imageUrl) {
-            return NextResponse.json({ error: 'A valid imageBase64 string or imageUrl is required.' }, { status: 400 });
-        }
-
+        // Authenticate before reading a potentially large body
         const supabase = await createClient();
-        const { data: { user }, error: authError } = await supabase.auth.getUser();
+        const { data: { user }, error: authError } = await getAuthUser(supabase);
 
         if (authError || !user) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
         }
 
+        // JSON ({ imageBase64 } or { imageUrl }), multipart `image` file, or a raw image body
+        const { image, fields } = await readReferenceUpload(req);
+        const { imageUrl } = fields;
+
+        if (!image && !imageUrl) {
+            return NextResponse.json({ error: 'An image upload or imageUrl is required.' }, { status: 400 });
+        }
+
+        const denied = await requireFeature(user.id, 'faceClone');
+        if (denied) return denied;
+
         // Fetch user's active profile
         const { data: profiles } = await supabase
             .from('founder_profiles')
@@ -34,23 +40,12 @@ export async function POST(req: Request) {
             return NextResponse.json({ error: 'Profile not found' }, { status: 404 });
         }
 
-        // Tier check
-        const tier = profile.subscription_tier || 'starter';
-        if (tier !== 'authority') {
-            return NextResponse.json({ error: 'Upgrade to Authority to use Digital Twin Face Clones.' }, { status: 403 });
-        }
-
         let fileUrl = imageUrl;
 
-        // If a new base64 image was uploaded, we need to store it in Fal's CDN
-        if (imageBase64) {
-            // Convert base64 Data URL to a Buffer then to a Blob
-            const base64Data = imageBase64.replace(/^data:image\/\w+;base64,/, "");
-            const imageBuffer = Buffer.from(base64Data, 'base64');
-            const blob = new Blob([imageBuffer]);
-
-            // Upload directly to Fal.ai's high speed storage for the Face Swap engine
-            fileUrl = await fal.storage.upload(blob);
+        // A new photo goes to Fal.ai's storage for the Face Swap engine,
+        // normalized and only once per photo
+        if (image) {
+            fileUrl = await storeReferenceImage(user.id, image);
         }
 
         // Save the reference image to the database
@@ -65,6 +60,9 @@ export async function POST(req: Request) {
         return NextResponse.json({ success: true, url: fileUrl });
 
     } catch (error: any) {
+        if (error instanceof ReferenceImageError) {
+            return NextResponse.json({ error: error.message }, { status: error.status });
+        }
         console.error('Visuals upload error:', error);
         return NextResponse.json(
             { error: error.message || 'Internal server error during image submission' },
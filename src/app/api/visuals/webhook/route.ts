@@ -0,0 +1,43 @@
+/**
+ * POST /api/visuals/webhook?job=<id>&token=<hmac>
+ * fal calls this when a queued render finishes. The token is an HMAC of the
+ * job id (src/lib/image-jobs.ts), so only the callback URL we handed fal for
+ * that job is accepted. Completion is idempotent; a 500 lets fal retry.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { completeImageJob, loadImageJob, verifyWebhookToken } from '@/lib/image-jobs';
+
+export const runtime = 'nodejs';
+export const maxDuration = 60; // Copies the render into storage before acknowledging
+
+export async function POST(req: NextRequest) {
+    const jobId = req.nextUrl.searchParams.get('job') || '';
+    const token = req.nextUrl.searchParams.get('token') || '';
+
+    if (!jobId || !token || !verifyWebhookToken(jobId, token)) {
+        console.warn('[Fal Webhook] Rejected callback with invalid token');
+        return NextResponse.json({ error: 'Invalid token' }, { status: 401 });
+    }
+
+    try {
+        const body = await req.json();
+        const job = await loadImageJob(jobId);
+
+        if (!job) {
+            return NextResponse.json({ error: 'Job not found' }, { status: 404 });
+        }
+        if (job.fal_request_id && body.request_id && body.request_id !== job.fal_request_id) {
+            return NextResponse.json({ error: 'Request id mismatch' }, { status: 400 });
+        }
+
+        const completed = await completeImageJob(job, body.status === 'OK'
+            ? { ok: true, payload: body.payload }
+            : { ok: false, error: typeof body.error === 'string' ? body.error : 'Image generation failed' });
+
+        return NextResponse.json({ received: true, status: completed.status });
+    } catch (error) {
+        console.error('[Fal Webhook] Handler failed:', error);
+        return NextResponse.json({ error: 'Webhook Handler Failed' }, { status: 500 });
+    }
+}
@@ -4,7 +4,8 @@ import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 
 import { motion, AnimatePresence } from 'framer-motion';
-import { generatePDFFromContainer } from '@/lib/pdf-export';
+import { downloadCarouselPDF } from '@/lib/pdf-export';
+import { SlideThumbnail, useSlideThumbnails } from '@/components/carousels/SlideThumbnail';
 
 interface CarouselPost {
     id: string;
@@ -25,6 +26,7 @@ export default function CarouselViewPage({ params }: { params: Promise<{ id: str
     const [isExporting, setIsExporting] = useState(false);
     const [isPublishing, setIsPublishing] = useState(false);
     const [publishStatus, setPublishStatus] = useState<'idle' | 'success' | 'error'>('idle');
+    const thumbnails = useSlideThumbnails(post?.carousel_slides?.length ? { postId: post.id } : null);
 
     useEffect(() => {
         params.then(p => setPostId(p.id));
@@ -50,7 +52,8 @@ export default function CarouselViewPage({ params }: { params: Promise<{ id: str
     const handleDownload = async () => {
         setIsExporting(true);
         try {
-            await generatePDFFromContainer('carousel-export-container', post?.topic || 'carousel');
+            if (!post) return;
+            await downloadCarouselPDF(post.id);
         } catch (e: any) {
             console.error('Export failed', e);
             alert(`Export failed: ${e.message || 'Unknown error'}`);
@@ -211,7 +214,7 @@ export default function CarouselViewPage({ params }: { params: Promise<{ id: str
                         All Slides
                     </div>
                     <div className="space-y-3 max-h-[600px] overflow-y-auto pr-2">
-                        {slides.map((slide, i) => (
+                        {slides.map((_, i) => (
                             <button
                                 key={i}
                                 onClick={() => setCurrentSlideIndex(i)}
@@ -220,36 +223,16 @@ export default function CarouselViewPage({ params }: { params: Promise<{ id: str
                                     : 'border-stone-200 hover:border-stone-300'
                                     }`}
                             >
-                                <div
-                                    dangerouslySetInnerHTML={{ __html: slide }}
-                                    className="w-full h-full pointer-events-none"
-                                    style={{
-                                        transform: 'scale(0.25)',
-                                        transformOrigin: 'top left',
-                                        width: '400%',
-                                        height: '400%'
-                                    }}
+                                <SlideThumbnail
+                                    url={thumbnails.urls[i]}
+                                    loading={thumbnails.loading}
+                                    alt={`Slide ${i + 1}`}
                                 />
                             </button>
                         ))}
                     </div>
                 </div>
             </div>
-
-            {/* Hidden Container for PDF Export */}
-            <div className="fixed top-0 left-[-9999px] pointer-events-none">
-                <div id="carousel-export-container">
-                    {slides.map((slide, i) => (
-                        <div key={i} className="bg-white" style={{ width: '1080px', height: '1350px' }}>
-                            <div
-                                dangerouslySetInnerHTML={{ __html: slide }}
-                                className="w-full h-full [&>*]:w-full [&>*]:h-full"
-                                style={{ transform: 'none' }}
-                            />
-                        </div>
-                    ))}
-                </div>
-            </div>
         </div>
     );
 }
@@ -1,10 +1,13 @@
 'use client';
 
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useRef, useCallback, useMemo } from 'react';
+import { useRouter } from 'next/navigation';
 import { motion, AnimatePresence } from 'framer-motion';
 
 import { CAROUSEL_STYLES, CarouselStyle } from '@/lib/ai/carousel-styles';
 import { FeatureLock } from '@/components/dashboard/FeatureLock';
+import { VirtualGrid } from '@/components/ui/virtual-list';
+import { SlideThumbnail, useSlideThumbnails } from '@/components/carousels/SlideThumbnail';
 
 type GenerationStage = 'idle' | 'thinking' | 'creating' | 'polishing' | 'done';
 
@@ -16,7 +19,44 @@ interface GeneratedCarousel {
     createdAt: Date;
 }
 
+// Carousel posts from the library; slide HTML stays server-side
+interface CarouselPostSummary {
+    id: string;
+    topic?: string;
+    slide_count: number;
+    created_at: string;
+}
+
+type GalleryItem =
+    | { kind: 'session'; carousel: GeneratedCarousel }
+    | { kind: 'post'; post: CarouselPostSummary };
+
+const GALLERY_PAGE_SIZE = 24;
+
+function GalleryCard({ item, onOpen }: { item: GalleryItem; onOpen: (item: GalleryItem) => void }) {
+    const source = item.kind === 'post'
+        ? { postId: item.post.id, cover: true }
+        : { slides: item.carousel.slides };
+    const { urls, loading } = useSlideThumbnails(source);
+    const topic = item.kind === 'post' ? item.post.topic || 'Untitled Carousel' : item.carousel.topic;
+    const slideCount = item.kind === 'post' ? item.post.slide_count : item.carousel.slides.length;
+
+    return (
+        <button
+            onClick={() => onOpen(item)}
+            className="group relative w-full aspect-[4/5] bg-[var(--card)] rounded-xl overflow-hidden shadow-sm hover:shadow-md transition-all border border-[var(--border)] cursor-pointer"
+        >
+            <SlideThumbnail url={urls[0]} loading={loading} alt={topic} />
+            <div className="absolute inset-x-0 bottom-0 p-4 bg-gradient-to-t from-black/60 to-transparent text-left">
+                <p className="text-white text-sm font-medium line-clamp-2">{topic}</p>
+                <p className="text-white/70 text-xs mt-1">{slideCount} slides</p>
+            </div>
+        </button>
+    );
+}
+
 export default function CarouselStudioPage() {
+    const router = useRouter();
     const [prompt, setPrompt] = useState('');
     const [selectedStyle, setSelectedStyle] = useState<CarouselStyle>(CAROUSEL_STYLES[0]);
     const [isGenerating, setIsGenerating] = useState(false);
@@ -25,7 +65,50 @@ export default function CarouselStudioPage() {
     const [currentSlideIndex, setCurrentSlideIndex] = useState(0);
     const [savedCarousels, setSavedCarousels] = useState<GeneratedCarousel[]>([]);
     const [showResult, setShowResult] = useState(false);
+    const [carouselPosts, setCarouselPosts] = useState<CarouselPostSummary[]>([]);
+    const [hasMorePosts, setHasMorePosts] = useState(false);
+    const loadingPosts = useRef(false);
     const slideContainerRef = useRef<HTMLDivElement>(null);
+    const filmstrip = useSlideThumbnails(showResult && currentSlides.length > 0 ? { slides: currentSlides } : null);
+
+    const fetchCarouselPosts = useCallback(async (offset: number) => {
+        if (loadingPosts.current) return;
+        loadingPosts.current = true;
+        try {
+            const params = new URLSearchParams({ format: 'carousel', offset: String(offset), limit: String(GALLERY_PAGE_SIZE) });
+            const res = await fetch(`/api/posts/library?${params}`);
+            if (!res.ok) throw new Error(`Library request failed (${res.status})`);
+            const data = await res.json();
+            setCarouselPosts(prev => offset === 0 ? data.posts : [...prev, ...data.posts]);
+            setHasMorePosts(data.hasMore);
+        } catch (error) {
+            console.error('Failed to load carousels:', error);
+        } finally {
+            loadingPosts.current = false;
+        }
+    }, []);
+
+    useEffect(() => {
+        fetchCarouselPosts(0);
+    }, [fetchCarouselPosts]);
+
+    const galleryItems = useMemo<GalleryItem[]>(() => [
+        ...savedCarousels.map(carousel => ({ kind: 'session' as const, carousel })),
+        ...carouselPosts.filter(post => post.slide_count > 0).map(post => ({ kind: 'post' as const, post })),
+    ], [savedCarousels, carouselPosts]);
+
+    const getGalleryKey = useCallback((item: GalleryItem) => item.kind === 'post' ? item.post.id : `session-${item.carousel.id}`, []);
+
+    const openGalleryItem = useCallback((item: GalleryItem) => {
+        if (item.kind === 'post') {
+            router.push(`/dashboard/carousels/${item.post.id}`);
+            return;
+        }
+        setCurrentSlides(item.carousel.slides);
+        setPrompt(item.carousel.topic);
+        setCurrentSlideIndex(0);
+        setShowResult(true);
+    }, [router]);
 
     // Generate carousel
     const handleGenerate = async () => {
@@ -320,7 +403,7 @@ export default function CarouselStudioPage() {
                                         All Slides
                                     </div>
                                     <div className="space-y-3 max-h-[600px] overflow-y-auto pr-2">
-                                        {currentSlides.map((slide, i) => (
+                                        {currentSlides.map((_, i) => (
                                             <button
                                                 key={i}
                                                 onClick={() => setCurrentSlideIndex(i)}
@@ -329,15 +412,10 @@ export default function CarouselStudioPage() {
                                                     : 'border-stone-200 hover:border-stone-300'
                                                     }`}
                                             >
-                                                <div
-                                                    dangerouslySetInnerHTML={{ __html: slide }}
-                                                    className="w-full h-full pointer-events-none"
-                                                    style={{
-                                                        transform: 'scale(0.25)',
-                                                        transformOrigin: 'top left',
-                                                        width: '400%',
-                                                        height: '400%'
-                                                    }}
+                                                <SlideThumbnail
+                                                    url={filmstrip.urls[i]}
+                                                    loading={filmstrip.loading}
+                                                    alt={`Slide ${i + 1}`}
                                                 />
                                             </button>
                                         ))}
@@ -348,43 +426,24 @@ export default function CarouselStudioPage() {
                     )}
                 </AnimatePresence>
 
-                {/* Saved Carousels Gallery */}
-                {savedCarousels.length > 0 && !showResult && (
+                {/* Carousels Gallery (windowed, cover thumbnails only) */}
+                {galleryItems.length > 0 && !showResult && (
                     <motion.div
                         initial={{ opacity: 0 }}
                         animate={{ opacity: 1 }}
                         className="mt-12"
                     >
                         <h3 className="text-xl font-semibold text-[var(--foreground)] mb-4">Your Carousels</h3>
-                        <div className="grid grid-cols-2 md:grid-cols-4 gap-4">
-                            {savedCarousels.map((carousel) => (
-                                <button
-                                    key={carousel.id}
-                                    onClick={() => {
-                                        setCurrentSlides(carousel.slides);
-                                        setPrompt(carousel.topic);
-                                        setCurrentSlideIndex(0);
-                                        setShowResult(true);
-                                    }}
-                                    className="group relative aspect-[4/5] bg-[var(--card)] rounded-xl overflow-hidden shadow-sm hover:shadow-md transition-all border border-[var(--border)] cursor-pointer"
-                                >
-                                    <div
-                                        dangerouslySetInnerHTML={{ __html: carousel.slides[0] }}
-                                        className="w-full h-full pointer-events-none"
-                                        style={{
-                                            transform: 'scale(0.2)',
-                                            transformOrigin: 'top left',
-                                            width: '500%',
-                                            height: '500%'
-                                        }}
-                                    />
-                                    <div className="absolute inset-x-0 bottom-0 p-4 bg-gradient-to-t from-black/60 to-transparent">
-                                        <p className="text-white text-sm font-medium line-clamp-2">{carousel.topic}</p>
-                                        <p className="text-white/70 text-xs mt-1">{carousel.slides.length} slides</p>
-                                    </div>
-                                </button>
-                            ))}
-                        </div>
+                        <VirtualGrid
+                            items={galleryItems}
+                            getKey={getGalleryKey}
+                            minColumnWidth={200}
+                            maxColumns={4}
+                            gap={16}
+                            estimateHeight={320}
+                            onEndReached={() => { if (hasMorePosts) fetchCarouselPosts(carouselPosts.length); }}
+                            renderItem={(item) => <GalleryCard item={item} onOpen={openGalleryItem} />}
+                        />
                     </motion.div>
                 )}
             </div>
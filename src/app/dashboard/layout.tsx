@@ -1,5 +1,5 @@
 import { redirect } from 'next/navigation';
-import { createClient } from '@/utils/supabase/server';
+import { createClient, getAuthUser } from '@/utils/supabase/server';
 import { Sidebar } from '@/components/layout/Sidebar';
 import DashboardClientWrapper from '@/components/dashboard/DashboardClientWrapper';
 
@@ -11,7 +11,7 @@ export default async function DashboardLayout({
     const supabase = await createClient();
 
     // 1. Check Auth
-    const { data: { user } } = await supabase.auth.getUser();
+    const { data: { user } } = await getAuthUser(supabase);
     if (!user) {
         redirect('/auth/signout');
     }
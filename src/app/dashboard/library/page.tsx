@@ -1,11 +1,11 @@
-
 'use client';
 
-import { useState, useEffect, useMemo } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
 import { useRouter } from 'next/navigation';
-import { createClient } from '@/utils/supabase/client';
+import { VirtualList } from '@/components/ui/virtual-list';
+import { SlideThumbnail, useSlideThumbnails } from '@/components/carousels/SlideThumbnail';
 
 interface Post {
     id: string;
@@ -18,107 +18,90 @@ interface Post {
     posted_at?: string;
     archived_at?: string;
     created_at: string;
+    slide_count: number;
+}
+
+interface LibraryCounts {
+    total: number;
+    posted: number;
+    scheduled: number;
+    archived: number;
 }
 
 type SortOption = 'newest' | 'oldest' | 'status';
 type StatusFilter = 'all' | 'posted' | 'scheduled' | 'archived' | 'skipped';
 
+const PAGE_SIZE = 50;
+const SEARCH_DEBOUNCE_MS = 300;
+
+function CarouselCover({ postId }: { postId: string }) {
+    const { urls, loading } = useSlideThumbnails({ postId, cover: true });
+    return (
+        <div className="w-12 aspect-[4/5] rounded-lg overflow-hidden border border-[var(--border)] shrink-0">
+            <SlideThumbnail url={urls[0]} loading={loading} alt="Carousel cover" />
+        </div>
+    );
+}
+
 export default function LibraryPage() {
     const router = useRouter();
     const [posts, setPosts] = useState<Post[]>([]);
+    const [counts, setCounts] = useState<LibraryCounts | null>(null);
+    const [hasMore, setHasMore] = useState(false);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [selectedPlatform, setSelectedPlatform] = useState<'all' | 'x' | 'linkedin'>('all');
     const [searchQuery, setSearchQuery] = useState('');
+    const [debouncedQuery, setDebouncedQuery] = useState('');
     const [sortBy, setSortBy] = useState<SortOption>('newest');
     const [statusFilter, setStatusFilter] = useState<StatusFilter>('all');
     const [expandedPostId, setExpandedPostId] = useState<string | null>(null);
+    // Ignore responses for filters that have since changed
+    const requestId = useRef(0);
 
     useEffect(() => {
-        fetchPosts();
-    }, []);
-
-    const fetchPosts = async () => {
-        try {
-            const supabase = createClient();
-            const { data: { user } } = await supabase.auth.getUser();
+        const timeout = setTimeout(() => setDebouncedQuery(searchQuery.trim()), SEARCH_DEBOUNCE_MS);
+        return () => clearTimeout(timeout);
+    }, [searchQuery]);
 
-            if (!user) {
-                setLoading(false);
-                return;
-            }
+    const fetchPage = useCallback(async (offset: number) => {
+        const id = ++requestId.current;
+        const params = new URLSearchParams({ sort: sortBy, offset: String(offset), limit: String(PAGE_SIZE) });
+        if (selectedPlatform !== 'all') params.set('platform', selectedPlatform);
+        if (statusFilter !== 'all') params.set('status', statusFilter);
+        if (debouncedQuery) params.set('q', debouncedQuery);
 
-            // Get profile first
-            const { data: profile } = await supabase
-                .from('founder_profiles')
-                .select('id')
-                .eq('account_id', user.id)
-                .single();
-
-            if (!profile) {
-                setLoading(false);
-                return;
-            }
-
-            // Get optimized posts list (limit 50, specific columns)
-            const { data: postsData, error } = await supabase
-                .from('posts')
-                .select('id, platform, content, topic, scheduled_date, status, format, posted_at, archived_at, created_at')
-                .eq('profile_id', profile.id)
-                .order('created_at', { ascending: false })
-                .limit(50);
-
-            if (!error && postsData) {
-                setPosts(postsData);
-            } else if (error) {
-                console.error('Fetch error:', error);
-            }
+        try {
+            const res = await fetch(`/api/posts/library?${params}`);
+            if (!res.ok) throw new Error(`Library request failed (${res.status})`);
+            const data = await res.json();
+            if (id !== requestId.current) return;
+
+            setPosts(prev => offset === 0 ? data.posts : [...prev, ...data.posts]);
+            setHasMore(data.hasMore);
+            if (data.counts) setCounts(data.counts);
         } catch (error) {
             console.error('Failed to fetch library:', error);
         } finally {
-            setLoading(false);
-        }
-    };
-
-    // Filter and sort posts
-    const filteredPosts = useMemo(() => {
-        let result = [...posts];
-
-        // Platform filter
-        if (selectedPlatform !== 'all') {
-            result = result.filter(post => post.platform === selectedPlatform);
-        }
-
-        // Status filter
-        if (statusFilter !== 'all') {
-            result = result.filter(post => post.status === statusFilter);
+            if (id === requestId.current) {
+                setLoading(false);
+                setLoadingMore(false);
+            }
         }
+    }, [selectedPlatform, statusFilter, debouncedQuery, sortBy]);
 
-        // Search filter
-        if (searchQuery.trim()) {
-            const query = searchQuery.toLowerCase();
-            result = result.filter(post => {
-                const contentMatch = post.content?.toLowerCase().includes(query);
-                const topicMatch = post.topic?.toLowerCase().includes(query);
-                return contentMatch || topicMatch;
-            });
-        }
+    // Filters changed: start again from the first page
+    useEffect(() => {
+        fetchPage(0);
+    }, [fetchPage]);
 
-        // Sort
-        result.sort((a, b) => {
-            switch (sortBy) {
-                case 'newest':
-                    return new Date(b.created_at).getTime() - new Date(a.created_at).getTime();
-                case 'oldest':
-                    return new Date(a.created_at).getTime() - new Date(b.created_at).getTime();
-                case 'status':
-                    return a.status.localeCompare(b.status);
-                default:
-                    return 0;
-            }
-        });
+    const loadMore = useCallback(() => {
+        if (!hasMore || loadingMore) return;
+        setLoadingMore(true);
+        fetchPage(posts.length);
+    }, [hasMore, loadingMore, fetchPage, posts.length]);
 
-        return result;
-    }, [posts, selectedPlatform, statusFilter, searchQuery, sortBy]);
+    const getPostKey = useCallback((post: Post) => post.id, []);
 
     const getStatusBadge = (status: Post['status']) => {
         const styles: Record<Post['status'], string> = {
@@ -152,14 +135,6 @@ export default function LibraryPage() {
             : <i className={`fi fi-brands-linkedin flex items-center justify-center ${"w-4 h-4"}`}  ></i>;
     };
 
-    // Stats
-    const stats = useMemo(() => ({
-        total: posts.length,
-        posted: posts.filter(p => p.status === 'posted').length,
-        scheduled: posts.filter(p => p.status === 'scheduled').length,
-        archived: posts.filter(p => p.status === 'archived').length,
-    }), [posts]);
-
     if (loading) {
         return (
             <div className="flex items-center justify-center min-h-[400px]">
@@ -177,7 +152,9 @@ export default function LibraryPage() {
                     Content Library
                 </h1>
                 <p className="text-gray-500 mt-1">
-                    Your recent 50 posts across all platforms
+                    {counts
+                        ? `${counts.total} posts · ${counts.posted} posted · ${counts.scheduled} scheduled · ${counts.archived} archived`
+                        : 'Your posts across all platforms'}
                 </p>
             </div>
 
@@ -236,118 +213,109 @@ export default function LibraryPage() {
                 </div>
             </div>
 
-            {/* Posts List */}
-            <div className="space-y-3">
-                <AnimatePresence>
-                    {filteredPosts.length === 0 ? (
-                        <motion.div
-                            initial={{ opacity: 0 }}
-                            animate={{ opacity: 1 }}
-                            className="text-center py-12 text-gray-400"
-                        >
-                            <i className={`fi fi-sr-box flex items-center justify-center ${"w-12 h-12 mx-auto mb-4 opacity-50"}`}  ></i>
-                            <p>No posts found matching your filters</p>
-                        </motion.div>
-                    ) : (
-                        filteredPosts.map((post, index) => {
-                            let displayContent = post.content;
-                            let isCarousel = post.format === 'carousel';
-
-                            if (isCarousel) {
-                                try {
-                                    // Try to parse just to verify it's valid JSON
-                                    JSON.parse(post.content);
-                                    displayContent = post.topic || "Untitled Carousel";
-                                } catch {
-                                    displayContent = "Carousel Data (Error Parsing)";
-                                }
-                            }
-
-                            return (
-                                <motion.div
-                                    key={post.id}
-                                    initial={{ opacity: 0, y: 10 }}
-                                    animate={{ opacity: 1, y: 0 }}
-                                    transition={{ delay: index * 0.03 }}
-                                    className="bg-[var(--card)] rounded-xl border border-[var(--border)] overflow-hidden hover:border-[var(--foreground)]/30 transition-all shadow-sm hover:shadow-md"
+            {/* Posts List (windowed: only rows near the viewport are mounted) */}
+            {posts.length === 0 ? (
+                <motion.div
+                    initial={{ opacity: 0 }}
+                    animate={{ opacity: 1 }}
+                    className="text-center py-12 text-gray-400"
+                >
+                    <i className={`fi fi-sr-box flex items-center justify-center ${"w-12 h-12 mx-auto mb-4 opacity-50"}`}  ></i>
+                    <p>No posts found matching your filters</p>
+                </motion.div>
+            ) : (
+                <VirtualList
+                    items={posts}
+                    getKey={getPostKey}
+                    estimateHeight={104}
+                    gap={12}
+                    onEndReached={loadMore}
+                    renderItem={(post) => {
+                        const isCarousel = post.format === 'carousel';
+
+                        return (
+                            <div className="bg-[var(--card)] rounded-xl border border-[var(--border)] overflow-hidden hover:border-[var(--foreground)]/30 transition-all shadow-sm hover:shadow-md">
+                                <div
+                                    className="p-4 cursor-pointer"
+                                    onClick={() => {
+                                        if (isCarousel) {
+                                            router.push(`/dashboard/carousels/${post.id}`);
+                                        } else {
+                                            setExpandedPostId(expandedPostId === post.id ? null : post.id);
+                                        }
+                                    }}
                                 >
-                                    <div
-                                        className="p-4 cursor-pointer"
-                                        onClick={() => {
-                                            if (isCarousel) {
-                                                router.push(`/dashboard/carousels/${post.id}`);
-                                            } else {
-                                                setExpandedPostId(expandedPostId === post.id ? null : post.id);
-                                            }
-                                        }}
-                                    >
-                                        <div className="flex items-start gap-4">
-                                            {/* Platform Icon */}
+                                    <div className="flex items-start gap-4">
+                                        {/* Platform Icon / Carousel Cover */}
+                                        {isCarousel && post.slide_count > 0 ? (
+                                            <CarouselCover postId={post.id} />
+                                        ) : (
                                             <div className={`p-2 rounded-lg shrink-0 ${post.platform === 'x'
                                                 ? 'bg-[var(--foreground)] text-[var(--background)]'
                                                 : 'bg-[#0077b5] text-white'
                                                 }`}>
                                                 {isCarousel ? <i className={`fi fi-sr-grid flex items-center justify-center ${"w-4 h-4"}`}  ></i> : getPlatformIcon(post.platform)}
                                             </div>
+                                        )}
 
-                                            {/* Content */}
-                                            <div className="flex-1 min-w-0">
-                                                <div className="flex items-center gap-2 mb-2">
-                                                    <span className="text-xs text-[var(--foreground-muted)] font-mono">
-                                                        {formatDate(post.scheduled_date)}
-                                                    </span>
-                                                    {getStatusBadge(post.status)}
-                                                    {isCarousel && (
-                                                        <span className="text-[10px] bg-purple-100 text-purple-700 px-2 py-0.5 rounded-full font-bold uppercase">
-                                                            Carousel
-                                                        </span>
-                                                    )}
-                                                </div>
-                                                <p className={`text-[var(--foreground)] font-medium ${expandedPostId === post.id ? '' : 'line-clamp-2'
-                                                    }`}>
-                                                    {isCarousel ? post.topic || "Carousel Post" : post.content}
-                                                </p>
+                                        {/* Content */}
+                                        <div className="flex-1 min-w-0">
+                                            <div className="flex items-center gap-2 mb-2">
+                                                <span className="text-xs text-[var(--foreground-muted)] font-mono">
+                                                    {formatDate(post.scheduled_date)}
+                                                </span>
+                                                {getStatusBadge(post.status)}
                                                 {isCarousel && (
-                                                    <p className="text-xs text-gray-400 mt-1 italic">
-                                                        Click to view slide data source
-                                                    </p>
+                                                    <span className="text-[10px] bg-purple-100 text-purple-700 px-2 py-0.5 rounded-full font-bold uppercase">
+                                                        Carousel{post.slide_count > 0 ? ` · ${post.slide_count} slides` : ''}
+                                                    </span>
                                                 )}
                                             </div>
-
-                                            {/* Expand Icon */}
-                                            <button className="p-2 text-gray-400 hover:text-black transition-colors">
-                                                {expandedPostId === post.id ? <i className={`fi fi-sr-angle-down flex items-center justify-center ${"w-4 h-4 rotate-180 transition-transform"}`}  ></i> : <i className={`fi fi-sr-angle-down flex items-center justify-center ${"w-4 h-4 transition-transform"}`}  ></i>}
-                                            </button>
+                                            <p className={`text-[var(--foreground)] font-medium ${expandedPostId === post.id ? '' : 'line-clamp-2'
+                                                }`}>
+                                                {isCarousel ? post.topic || "Carousel Post" : post.content}
+                                            </p>
                                         </div>
-                                    </div>
 
-                                    {/* Expanded Content */}
-                                    <AnimatePresence>
-                                        {expandedPostId === post.id && (
-                                            <motion.div
-                                                initial={{ height: 0, opacity: 0 }}
-                                                animate={{ height: 'auto', opacity: 1 }}
-                                                exit={{ height: 0, opacity: 0 }}
-                                                className="border-t border-[var(--border)] bg-[var(--background-secondary)]/30"
-                                            >
-                                                <div className="p-4">
-                                                    <div className="bg-[var(--card)] p-4 rounded-lg border border-[var(--border)] font-mono text-xs text-[var(--foreground-secondary)] overflow-x-auto max-h-[300px]">
-                                                        {post.content}
-                                                    </div>
-                                                    <div className="mt-4 pt-4 border-t border-[var(--border)] flex flex-wrap gap-4 text-xs text-[var(--foreground-muted)]">
-                                                        <span>Format: <strong>{post.format}</strong></span>
-                                                        <span>ID: {post.id}</span>
-                                                    </div>
+                                        {/* Expand Icon */}
+                                        <button className="p-2 text-gray-400 hover:text-black transition-colors">
+                                            {expandedPostId === post.id ? <i className={`fi fi-sr-angle-down flex items-center justify-center ${"w-4 h-4 rotate-180 transition-transform"}`}  ></i> : <i className={`fi fi-sr-angle-down flex items-center justify-center ${"w-4 h-4 transition-transform"}`}  ></i>}
+                                        </button>
+                                    </div>
+                                </div>
+
+                                {/* Expanded Content */}
+                                <AnimatePresence>
+                                    {expandedPostId === post.id && (
+                                        <motion.div
+                                            initial={{ height: 0, opacity: 0 }}
+                                            animate={{ height: 'auto', opacity: 1 }}
+                                            exit={{ height: 0, opacity: 0 }}
+                                            className="border-t border-[var(--border)] bg-[var(--background-secondary)]/30"
+                                        >
+                                            <div className="p-4">
+                                                <div className="bg-[var(--card)] p-4 rounded-lg border border-[var(--border)] font-mono text-xs text-[var(--foreground-secondary)] overflow-x-auto max-h-[300px]">
+                                                    {post.content}
                                                 </div>
-                                            </motion.div>
-                                        )}
-                                    </AnimatePresence>
-                                </motion.div>
-                            );
-                        })
-                    )}
-                </AnimatePresence>
-            </div>
+                                                <div className="mt-4 pt-4 border-t border-[var(--border)] flex flex-wrap gap-4 text-xs text-[var(--foreground-muted)]">
+                                                    <span>Format: <strong>{post.format}</strong></span>
+                                                    <span>ID: {post.id}</span>
+                                                </div>
+                                            </div>
+                                        </motion.div>
+                                    )}
+                                </AnimatePresence>
+                            </div>
+                        );
+                    }}
+                />
+            )}
+
+            {loadingMore && (
+                <div className="flex justify-center py-6">
+                    <div className="animate-spin rounded-full h-6 w-6 border-t-2 border-b-2 border-black"></div>
+                </div>
+            )}
         </div>
     );
 }
@@ -7,6 +7,27 @@ import { ArticleCard, NewsArticle } from '@/components/dashboard/newsjacking/Art
 import { NewsjackingGenerator } from '@/components/dashboard/newsjacking/NewsjackingGenerator';
 import { useAuth } from '@/contexts';
 import { FeatureLock } from '@/components/dashboard/FeatureLock';
+import { buildProfileNewsQuery } from '@/lib/news/topics';
+
+const LOCAL_CACHE_PREFIX = 'newsjacking:feed:';
+
+// Last results per topic, rendered immediately on the next visit while the API revalidates
+function readLocalFeed(topic: string): { results: NewsArticle[]; hasMore: boolean } | null {
+    try {
+        const raw = localStorage.getItem(LOCAL_CACHE_PREFIX + topic);
+        return raw ? JSON.parse(raw) : null;
+    } catch {
+        return null;
+    }
+}
+
+function writeLocalFeed(topic: string, results: NewsArticle[], hasMore: boolean) {
+    try {
+        localStorage.setItem(LOCAL_CACHE_PREFIX + topic, JSON.stringify({ results, hasMore }));
+    } catch {
+        // Quota exceeded / private mode — cache is best-effort
+    }
+}
 
 export default function NewsjackingPage() {
     const { activeProfile, isLoading: isAuthLoading, setActiveProfile } = useAuth();
@@ -17,6 +38,7 @@ export default function NewsjackingPage() {
     const [startIndex, setStartIndex] = useState(0);
     const [isSpinning, setIsSpinning] = useState(false);
     const [isLocalHealing, setIsLocalHealing] = useState(false);
+    const [nextPage, setNextPage] = useState<number | null>(null);
     const fetchIdRef = useRef(0);
     const lastFetchedTopicRef = useRef<string | null>(null);
 
@@ -68,44 +90,10 @@ export default function NewsjackingPage() {
             const currentFetchId = ++fetchIdRef.current;
             setIsLoading(true);
             setError(null);
+            let servedFromLocal = false;
 
             try {
-                let searchQuery = '';
-                const industry = activeProfile.industry || '';
-                const description = (activeProfile.business_description || activeProfile.context_data?.aboutYou || '').toLowerCase();
-                const topics = activeProfile.topics || [];
-
-                // 1. Start with the core industry
-                searchQuery = industry;
-
-                // 2. Smart Expansion: If industry is too broad (Agency/Services/Consulting) or generic,
-                // scan the context for high-signal keywords.
-                const needsExpansion = !industry || 
-                    industry.toLowerCase().includes('agency') || 
-                    industry.toLowerCase().includes('services') || 
-                    industry.toLowerCase().includes('consulting') ||
-                    industry === 'Modern Operator';
-
-                if (needsExpansion) {
-                    const signals = [];
-                    if (description.includes('saas')) signals.push('SaaS');
-                    if (description.includes(' ai ') || description.includes('artificial intelligence') || description.includes('generative ai')) signals.push('AI');
-                    if (description.includes('software')) signals.push('Software');
-                    if (description.includes('startup')) signals.push('Startup');
-                    if (description.includes('marketing')) signals.push('Marketing');
-
-                    if (signals.length > 0) {
-                        searchQuery = (searchQuery ? `${searchQuery} ` : '') + signals.join(' ');
-                    }
-                }
-
-                // 3. Fallback to first topic if still empty
-                if (!searchQuery && topics.length > 0) {
-                    searchQuery = topics[0];
-                }
-
-                // 4. Final Failsafe
-                if (!searchQuery) searchQuery = 'Tech';
+                const searchQuery = buildProfileNewsQuery(activeProfile);
 
                 console.log(`[Newsjacking] Engineered Smart Query: "${searchQuery}"`);
 
@@ -114,6 +102,15 @@ export default function NewsjackingPage() {
                     return;
                 }
 
+                // Stale-while-revalidate: paint the last known feed, then refresh it
+                const local = readLocalFeed(searchQuery);
+                if (local?.results?.length) {
+                    setArticles(local.results);
+                    setNextPage(local.hasMore ? 1 : null);
+                    setIsLoading(false);
+                    servedFromLocal = true;
+                }
+
                 const url = `/api/newsjacking/search?topic=${encodeURIComponent(searchQuery)}`;
                 const res = await fetch(url, { method: 'GET', cache: 'no-store' });
 
@@ -128,11 +125,20 @@ export default function NewsjackingPage() {
                 if (currentFetchId !== fetchIdRef.current) return;
 
                 if (data.results) {
-                    setArticles(data.results);
+                    writeLocalFeed(searchQuery, data.results, !!data.hasMore);
+                    // Don't yank the cards the user is already reading if nothing changed
+                    const unchanged = local?.results?.length === data.results.length &&
+                        local.results.every((a, i) => a.url === data.results[i].url);
+                    if (!unchanged) {
+                        setArticles(data.results);
+                        setStartIndex(0);
+                    }
+                    setNextPage(data.hasMore ? 1 : null);
                     lastFetchedTopicRef.current = searchQuery;
                 }
             } catch (err: any) {
-                if (currentFetchId === fetchIdRef.current) {
+                // Keep showing the cached feed if only the refresh failed
+                if (currentFetchId === fetchIdRef.current && !servedFromLocal) {
                     setError(err.message || "Failed to load news");
                 }
             } finally {
@@ -145,10 +151,30 @@ export default function NewsjackingPage() {
         fetchRecommendedNews();
     }, [activeProfile?.id, isAuthLoading]);
 
-    const handleSpin = () => {
+    const handleSpin = async () => {
         setIsSpinning(true);
+
+        // Reached the end of what's loaded: pull the next ranked page from the vault
+        let total = articles.length;
+        const topic = lastFetchedTopicRef.current;
+        if (startIndex + 6 > total && nextPage !== null && topic) {
+            try {
+                const res = await fetch(`/api/newsjacking/search?topic=${encodeURIComponent(topic)}&page=${nextPage}`, { cache: 'no-store' });
+                if (res.ok) {
+                    const data = await res.json();
+                    if (data.results?.length) {
+                        total += data.results.length;
+                        setArticles((prev) => [...prev, ...data.results]);
+                    }
+                    setNextPage(data.hasMore ? nextPage + 1 : null);
+                }
+            } catch (err) {
+                console.error('[Newsjacking] Failed to load next page', err);
+            }
+        }
+
         setTimeout(() => {
-            setStartIndex((prev) => (prev + 3) % articles.length);
+            setStartIndex((prev) => (prev + 3 >= total ? 0 : prev + 3));
             setIsSpinning(false);
         }, 500);
     };
@@ -256,7 +282,7 @@ export default function NewsjackingPage() {
                             <footer className="mt-12 flex items-center justify-center">
                                 <button
                                     onClick={handleSpin}
-                                    disabled={isSpinning || articles.length <= 3}
+                                    disabled={isSpinning || (articles.length <= 3 && nextPage === null)}
                                     className={`
                                         group relative flex items-center gap-4 px-8 py-3.5 rounded-full font-bold text-xs tracking-wide transition-all duration-300
                                         ${isSpinning ? 'opacity-50' : 'hover:bg-white hover:text-black'}
@@ -25,7 +25,7 @@ export default function DashboardPage() {
     };
 
     const router = useRouter();
-    const { getPostsForToday, getMetricCounts, loading, profile, refreshPosts, posts } = usePosts();
+    const { getPostsForToday, getMetricCounts, loading, profile, refreshPosts, updatePost, live, posts } = usePosts();
 
     // State for modals and actions
     const [previewPost, setPreviewPost] = useState<any>(null);
@@ -79,8 +79,8 @@ export default function DashboardPage() {
             }
         }
 
-        // Refresh posts after generation
-        await refreshPosts();
+        // Generated posts stream in over realtime; only refetch if it isn't connected
+        if (!live) await refreshPosts();
         setShowGoalModal(false);
     };
 
@@ -196,10 +196,10 @@ export default function DashboardPage() {
 
             if (!response.ok) throw new Error(data.error || 'Failed to publish');
 
-            // Refresh posts (would ideally come from context)
+            // The row update also arrives over realtime; mark it now so the list updates immediately
+            updatePost(previewPost.id, { status: 'posted' });
             alert('Post published successfully!');
             setPreviewPost(null);
-            window.location.reload(); // Simple refresh for MVP
         } catch (error) {
             alert(error instanceof Error ? error.message : 'Failed to publish');
         } finally {
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
 import { useRouter } from 'next/navigation';
@@ -182,6 +182,12 @@ const itemVariants = {
     show: { opacity: 1, y: 0 },
 };
 
+const ONBOARDING_JOB_KEY = 'onboarding_job_id';
+const ONBOARDING_DRAFT_KEY = 'onboarding_draft_id';
+const PREFETCH_DEBOUNCE_MS = 1200;
+const JOB_POLL_INTERVAL_MS = 2500;
+const MAX_AUTO_RESUMES = 3;
+
 export default function OnboardingPage() {
     const router = useRouter();
     const [currentStep, setCurrentStep] = useState(1);
@@ -189,6 +195,9 @@ export default function OnboardingPage() {
     const [isGenerating, setIsGenerating] = useState(false);
     const [isRestoringSession, setIsRestoringSession] = useState(true); // New loading state
     const [error, setError] = useState<string | null>(null);
+    const [generationStage, setGenerationStage] = useState<string | undefined>();
+    const [draftId, setDraftId] = useState<string | null>(null);
+    const lastPrefetch = useRef('');
 
     // Initial Load & URL Params Check
     useEffect(() => {
@@ -359,6 +368,44 @@ export default function OnboardingPage() {
         save();
     }, [data]);
 
+    // Draft id the server keys prefetched scrapes / voice analysis to
+    useEffect(() => {
+        let id = localStorage.getItem(ONBOARDING_DRAFT_KEY);
+        if (!id) {
+            id = crypto.randomUUID();
+            localStorage.setItem(ONBOARDING_DRAFT_KEY, id);
+        }
+        setDraftId(id);
+    }, []);
+
+    // Speculative pre-processing: start scraping links and analysing voice
+    // samples as soon as they're entered, so submit only assembles results
+    useEffect(() => {
+        if (!draftId || isRestoringSession) return;
+
+        const urls = [
+            ...data.personalContext.map(item => item.value),
+            ...data.productContext.map(item => item.value),
+            ...data.competitors,
+        ]
+            .map(value => value.trim())
+            .filter(value => value.includes('.') && (value.startsWith('http') || value.startsWith('www')));
+        const voiceSamples = data.voiceSamples.filter(sample => sample.content.trim() !== '');
+
+        const signature = JSON.stringify([urls, voiceSamples.map(sample => sample.content)]);
+        if (signature === lastPrefetch.current || (urls.length === 0 && voiceSamples.length === 0)) return;
+
+        const timeout = setTimeout(() => {
+            lastPrefetch.current = signature;
+            fetch('/api/onboarding/prefetch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ draftId, urls, voiceSamples }),
+            }).catch(e => console.warn('[Onboarding] Prefetch failed:', e));
+        }, PREFETCH_DEBOUNCE_MS);
+        return () => clearTimeout(timeout);
+    }, [draftId, isRestoringSession, data.personalContext, data.productContext, data.competitors, data.voiceSamples]);
+
     // Save current step to database for persistence across refreshes/redirects
     useEffect(() => {
         const saveStep = async () => {
@@ -468,35 +515,82 @@ export default function OnboardingPage() {
         }
     };
 
+    // Follow the onboarding job until it completes. Stalled runs (function
+    // timeout) are resumed from their last checkpoint; failures are thrown so
+    // the next "Generate" resumes the same job instead of starting over.
+    const waitForJob = async (jobId: string) => {
+        let autoResumes = 0;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+            const res = await fetch(`/api/onboarding/jobs/${jobId}`);
+            if (!res.ok) {
+                const errorData = await res.json().catch(() => ({}));
+                throw new Error(errorData.error || 'Lost track of your generation job');
+            }
+
+            const job = await res.json();
+            setGenerationStage(job.stage);
+
+            if (job.status === 'complete') return job;
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Generation failed. Please try again.');
+            }
+            if (job.stalled && autoResumes < MAX_AUTO_RESUMES) {
+                autoResumes++;
+                console.log(`[Onboarding] Job stalled at ${job.stage}, resuming...`);
+                await fetch(`/api/onboarding/jobs/${jobId}`, { method: 'POST' });
+            }
+        }
+    };
+
     const handleGenerate = async () => {
         if (isGenerating) return;
         setIsGenerating(true);
         setError(null);
 
         try {
-            // Get stripe session id if it exists
-            const params = new URLSearchParams(window.location.search);
-            const sessionId = params.get('session_id');
+            let jobId = sessionStorage.getItem(ONBOARDING_JOB_KEY);
 
-            // Save the onboarding profile data and redirect to dashboard
-            const profileResponse = await fetch('/api/onboarding/complete', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    ...data,
-                    stripeSessionId: sessionId
-                }),
-            });
+            if (jobId) {
+                // Resume the previous attempt from its last completed stage
+                const resumeResponse = await fetch(`/api/onboarding/jobs/${jobId}`, { method: 'POST' });
+                if (!resumeResponse.ok) jobId = null;
+            }
+
+            if (!jobId) {
+                // Get stripe session id if it exists
+                const params = new URLSearchParams(window.location.search);
+                const sessionId = params.get('session_id');
+
+                const profileResponse = await fetch('/api/onboarding/complete', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        ...data,
+                        stripeSessionId: sessionId,
+                        draftId
+                    }),
+                });
 
-            if (!profileResponse.ok) {
-                const errorData = await profileResponse.json();
-                throw new Error(errorData.error || 'Failed to save profile');
+                if (!profileResponse.ok) {
+                    const errorData = await profileResponse.json();
+                    throw new Error(errorData.error || 'Failed to save profile');
+                }
+
+                const started = await profileResponse.json();
+                jobId = started.jobId as string | null;
+                // Mock mode answers synchronously, without a job
+                if (jobId) sessionStorage.setItem(ONBOARDING_JOB_KEY, jobId);
             }
 
-            const profileResult = await profileResponse.json();
-            console.log('[Onboarding] Profile saved:', profileResult);
+            if (jobId) {
+                const job = await waitForJob(jobId);
+                console.log('[Onboarding] Profile saved:', job.result);
+                sessionStorage.removeItem(ONBOARDING_JOB_KEY);
+                localStorage.removeItem(ONBOARDING_DRAFT_KEY);
+            }
 
             // Redirect to dashboard
             router.push('/dashboard');
@@ -504,6 +598,7 @@ export default function OnboardingPage() {
             console.error('[Onboarding] Error:', err);
             setError(err instanceof Error ? err.message : 'Something went wrong. Please try again.');
             setIsGenerating(false);
+            setGenerationStage(undefined);
         }
     };
 
@@ -541,7 +636,7 @@ export default function OnboardingPage() {
     return (
         <div className="h-screen overflow-hidden bg-[var(--background)] flex">
             <AnimatePresence>
-                {isGenerating && <MindBlowingLoader />}
+                {isGenerating && <MindBlowingLoader stage={generationStage} />}
             </AnimatePresence>
             {/* Left side - Progress */}
             <motion.div
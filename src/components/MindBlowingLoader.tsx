@@ -38,7 +38,17 @@ const LOGS = [
     "Packaging content for delivery...",
 ];
 
-export default function MindBlowingLoader() {
+// Real onboarding job stages (src/lib/onboarding.ts) -> loader phase / minimum progress
+const STAGE_PHASE: Record<string, { phase: number; progress: number }> = {
+    scrape: { phase: 0, progress: 0 },
+    strategy: { phase: 1, progress: 20 },
+    brief: { phase: 1, progress: 55 },
+    posts: { phase: 2, progress: 60 },
+    save: { phase: 2, progress: 90 },
+    done: { phase: 2, progress: 97 },
+};
+
+export default function MindBlowingLoader({ stage }: { stage?: string } = {}) {
     const [phase, setPhase] = useState(0); // 0: Analyze, 1: Strategy, 2: Draft
     const [progress, setProgress] = useState(0);
     const [activeTip, setActiveTip] = useState(0);
@@ -71,6 +81,14 @@ export default function MindBlowingLoader() {
         return () => clearInterval(interval);
     }, []);
 
+    // Jump ahead when the job reports a later stage than the simulation shows
+    useEffect(() => {
+        const target = stage ? STAGE_PHASE[stage] : undefined;
+        if (!target) return;
+        setPhase(prev => Math.max(prev, target.phase));
+        setProgress(prev => Math.max(prev, target.progress));
+    }, [stage]);
+
     // Phase Switching
     useEffect(() => {
         if (progress > 25 && phase === 0) setPhase(1);
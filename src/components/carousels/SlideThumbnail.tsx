@@ -0,0 +1,112 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+
+/**
+ * Slide previews for list views.
+ *
+ * Thumbnails are small PNGs rendered and cached server-side (see
+ * lib/carousel-render.ts), so filmstrips and galleries show plain <img>s
+ * instead of mounting each slide's HTML. Requests are shared per carousel
+ * for the lifetime of the page.
+ */
+
+// Signed URLs are valid for an hour; drop cached lookups well before that
+const CACHE_TTL_MS = 45 * 60 * 1000;
+
+type ThumbnailSource =
+    | { postId: string; cover?: boolean }
+    | { slides: string[] };
+
+const postCache = new Map<string, { urls: Promise<string[]>; at: number }>();
+const slideCache = new WeakMap<string[], Promise<string[]>>();
+
+async function fetchUrls(input: RequestInfo, init?: RequestInit): Promise<string[]> {
+    const res = await fetch(input, init);
+    if (!res.ok) throw new Error(`Thumbnail request failed (${res.status})`);
+    const data = await res.json();
+    return data.urls || [];
+}
+
+function loadThumbnails(source: ThumbnailSource): Promise<string[]> {
+    if ('slides' in source) {
+        let urls = slideCache.get(source.slides);
+        if (!urls) {
+            urls = fetchUrls('/api/carousels/previews', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ slides: source.slides }),
+            });
+            urls.catch(() => slideCache.delete(source.slides));
+            slideCache.set(source.slides, urls);
+        }
+        return urls;
+    }
+
+    const key = `${source.postId}:${source.cover ? 'cover' : 'all'}`;
+    const cached = postCache.get(key);
+    if (cached && Date.now() - cached.at < CACHE_TTL_MS) return cached.urls;
+
+    const urls = fetchUrls(`/api/posts/${source.postId}/export?format=thumb${source.cover ? '&cover=1' : ''}`);
+    urls.catch(() => postCache.delete(key));
+    postCache.set(key, { urls, at: Date.now() });
+    return urls;
+}
+
+/** Thumbnail URLs for a saved carousel (`postId`) or unsaved slide HTML (`slides`). */
+export function useSlideThumbnails(source: ThumbnailSource | null): { urls: string[]; loading: boolean; failed: boolean } {
+    const [state, setState] = useState<{ urls: string[]; loading: boolean; failed: boolean }>({ urls: [], loading: !!source, failed: false });
+    const sourceKey = !source ? null : 'slides' in source ? source.slides : `${source.postId}:${!!source.cover}`;
+
+    useEffect(() => {
+        if (!source) {
+            setState({ urls: [], loading: false, failed: false });
+            return;
+        }
+        let cancelled = false;
+        setState(prev => ({ ...prev, loading: true, failed: false }));
+        loadThumbnails(source)
+            .then(urls => { if (!cancelled) setState({ urls, loading: false, failed: false }); })
+            .catch(error => {
+                console.error('Failed to load slide thumbnails:', error);
+                if (!cancelled) setState({ urls: [], loading: false, failed: true });
+            });
+        return () => { cancelled = true; };
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [sourceKey]);
+
+    return state;
+}
+
+interface SlideThumbnailProps {
+    url?: string;
+    loading?: boolean;
+    alt: string;
+    className?: string;
+}
+
+export function SlideThumbnail({ url, loading, alt, className = '' }: SlideThumbnailProps) {
+    const [loadedUrl, setLoadedUrl] = useState<string | null>(null);
+    const loaded = !!url && loadedUrl === url;
+
+    if (!url) {
+        return (
+            <div className={`w-full h-full flex items-center justify-center bg-[var(--background-secondary)] ${loading ? 'animate-pulse' : ''} ${className}`}>
+                {!loading && <i className="fi fi-sr-picture flex items-center justify-center w-6 h-6 text-[var(--foreground-muted)]"></i>}
+            </div>
+        );
+    }
+
+    return (
+        <div className={`w-full h-full relative bg-[var(--background-secondary)] ${loaded ? '' : 'animate-pulse'} ${className}`}>
+            <img
+                src={url}
+                alt={alt}
+                loading="lazy"
+                decoding="async"
+                onLoad={() => setLoadedUrl(url)}
+                className={`w-full h-full object-cover pointer-events-none transition-opacity ${loaded ? 'opacity-100' : 'opacity-0'}`}
+            />
+        </div>
+    );
+}
@@ -2,6 +2,7 @@
 
 import { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
+import { loadDashboardBootstrap } from '@/lib/dashboard-client';
 
 
 interface ExpiredConnection {
@@ -21,10 +22,10 @@ export default function ConnectionStatusBanner() {
     const checkConnections = async () => {
         setChecking(true);
         try {
-            const response = await fetch('/api/auth/check-connections');
-            if (response.ok) {
-                const data = await response.json();
-                setExpiredConnections(data.expired || []);
+            // Connection status arrives with the dashboard bootstrap
+            const bootstrap = await loadDashboardBootstrap();
+            if (bootstrap) {
+                setExpiredConnections(bootstrap.connections.expired as ExpiredConnection[]);
             }
         } catch (error) {
             console.error('Failed to check connections:', error);
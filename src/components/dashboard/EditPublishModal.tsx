@@ -8,6 +8,7 @@ import { format, parseISO } from 'date-fns';
 import Image from 'next/image';
 import { usePosts } from '@/contexts';
 import { parseTier, getTierLimits } from '@/lib/subscription';
+import { waitForImageJob } from '@/lib/image-jobs-client';
 
 interface Post {
     id: string;
@@ -228,10 +229,12 @@ export default function EditPublishModal({
                 throw new Error(data.error || 'Failed to generate image');
             }
 
-            setImageUrl(data.imageUrl);
+            // Rendered on a queue: wait for the job to finish
+            const generatedUrl = await waitForImageJob(data);
+            setImageUrl(generatedUrl);
             setShowImageOptions(false);
             if (onImageUpdate) {
-                onImageUpdate(post.id, data.imageUrl);
+                onImageUpdate(post.id, generatedUrl);
             }
         } catch (err) {
             setError(err instanceof Error ? err.message : 'Failed to generate image');
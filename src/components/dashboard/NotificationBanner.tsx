@@ -1,64 +1,21 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
 import Link from 'next/link';
-import { createClient } from '@/utils/supabase/client';
-
-interface Notification {
-    id: string;
-    type: 'week_ready' | 'subscription_expired' | 'trial_ending' | 'post_failed' | 'general';
-    title: string;
-    message: string;
-    action_url?: string;
-    created_at: string;
-    read_at?: string;
-    dismissed_at?: string;
-}
+import { usePosts } from '@/contexts';
 
 export function NotificationBanner() {
-    const [notifications, setNotifications] = useState<Notification[]>([]);
+    // Kept current by PostContext's realtime subscription
+    const { notifications, dismissNotification } = usePosts();
     const [currentIndex, setCurrentIndex] = useState(0);
 
-    useEffect(() => {
-        fetchNotifications();
-    }, []);
-
-    const fetchNotifications = async () => {
-        const supabase = createClient();
-        const { data: { user } } = await supabase.auth.getUser();
-
-        if (!user) return;
-
-        // Get unread/undismissed notifications
-        const { data, error } = await supabase
-            .from('notifications')
-            .select('*')
-            .eq('account_id', user.id)
-            .is('dismissed_at', null)
-            .order('created_at', { ascending: false })
-            .limit(5);
-
-        if (!error && data) {
-            setNotifications(data);
-        }
-    };
-
-    const dismissNotification = async (id: string) => {
-        const supabase = createClient();
-
-        await supabase
-            .from('notifications')
-            .update({ dismissed_at: new Date().toISOString() })
-            .eq('id', id);
-
-        setNotifications(prev => prev.filter(n => n.id !== id));
-    };
-
     if (notifications.length === 0) return null;
 
-    const current = notifications[currentIndex];
+    // Realtime can remove notifications from under the current index
+    const index = Math.min(currentIndex, notifications.length - 1);
+    const current = notifications[index];
     if (!current) return null;
 
     const getIcon = () => {
@@ -137,7 +94,7 @@ export function NotificationBanner() {
                     <div className="flex items-center gap-2">
                         {notifications.length > 1 && (
                             <span className="text-xs text-[var(--muted-foreground)]">
-                                {currentIndex + 1} / {notifications.length}
+                                {index + 1} / {notifications.length}
                             </span>
                         )}
 
@@ -157,7 +114,7 @@ export function NotificationBanner() {
                             <button
                                 key={idx}
                                 onClick={() => setCurrentIndex(idx)}
-                                className={`w-2 h-2 rounded-full transition-colors ${idx === currentIndex
+                                className={`w-2 h-2 rounded-full transition-colors ${idx === index
                                         ? 'bg-[var(--primary)]'
                                         : 'bg-[var(--muted-foreground)]/30 hover:bg-[var(--muted-foreground)]/50'
                                     }`}
@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
 import Image from 'next/image';
+import { waitForImageJob } from '@/lib/image-jobs-client';
 
 interface QuickPostModalProps {
     isOpen: boolean;
@@ -81,7 +82,9 @@ export function QuickPostModal({ isOpen, onClose, onSuccess }: QuickPostModalPro
                 throw new Error(data.error || 'Failed to generate image');
             }
 
-            setImageUrl(data.imageUrl);
+            // Rendered on a queue: wait for the job to finish
+            const generatedUrl = await waitForImageJob(data);
+            setImageUrl(generatedUrl);
             setShowImageOptions(false);
         } catch (error: any) {
             console.error('Image Generation Error:', error);
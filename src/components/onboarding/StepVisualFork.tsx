@@ -12,6 +12,7 @@ interface StepVisualForkProps {
 
 // Style options
 import { CAROUSEL_STYLES } from '@/lib/ai/carousel-styles';
+import { mediaVariantUrl } from '@/lib/media-variants';
 
 // --- Mini Slide Preview Component ---
 const facelessStyles = [
@@ -125,26 +126,42 @@ export default function StepVisualFork({ data, updateData, onComplete }: StepVis
         setUploadError(null);
 
         try {
-            const formData = new FormData();
-            Array.from(files).forEach((file, index) => {
-                formData.append(`file_${index}`, file);
+            // One raw-body request per photo, in parallel: each streams straight
+            // into Storage instead of the whole batch going through formData()
+            const selected = Array.from(files).filter(file => file.type.startsWith('image/'));
+            const results = await Promise.allSettled(selected.map(async file => {
+                const response = await fetch(`/api/upload/avatar?name=${encodeURIComponent(file.name)}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': file.type },
+                    body: file,
+                });
+
+                const result = await response.json();
+
+                if (!response.ok) {
+                    throw new Error(result.error || 'Upload failed');
+                }
+                return result.urls[0] as string;
+            }));
+
+            const uploadedUrls: string[] = [];
+            const uploaded: File[] = [];
+            results.forEach((result, i) => {
+                if (result.status === 'fulfilled') {
+                    uploadedUrls.push(result.value);
+                    uploaded.push(selected[i]);
+                }
             });
 
-            const response = await fetch('/api/upload/avatar', {
-                method: 'POST',
-                body: formData,
-            });
-
-            const result = await response.json();
-
-            if (!response.ok) {
-                throw new Error(result.error || 'Upload failed');
+            // Update data with real URLs
+            if (uploadedUrls.length > 0) {
+                const existingUrls = data.avatar_urls || [];
+                updateData({ avatar_urls: [...existingUrls, ...uploadedUrls] });
+                setUploadedFiles(prev => [...prev, ...uploaded]);
             }
 
-            // Update data with real URLs
-            const existingUrls = data.avatar_urls || [];
-            updateData({ avatar_urls: [...existingUrls, ...result.urls] });
-            setUploadedFiles(prev => [...prev, ...Array.from(files)]);
+            const failed = results.find((result): result is PromiseRejectedResult => result.status === 'rejected');
+            if (failed) throw failed.reason;
 
         } catch (err) {
             console.error('Photo upload error:', err);
@@ -266,7 +283,13 @@ export default function StepVisualFork({ data, updateData, onComplete }: StepVis
                                 <div key={idx} className="relative aspect-square rounded-xl overflow-hidden bg-[var(--background-secondary)]">
                                     {/* If it's a blob URL, show the file, otherwise show placeholder */}
                                     {url.startsWith('blob:') || url.startsWith('http') ? (
-                                        <img src={url} alt={`Photo ${idx + 1}`} className="w-full h-full object-cover" />
+                                        <img
+                                            src={mediaVariantUrl(url, 256)}
+                                            alt={`Photo ${idx + 1}`}
+                                            className="w-full h-full object-cover"
+                                            // Variants are built just after upload; show the original until then
+                                            onError={(e) => { if (e.currentTarget.src !== url) e.currentTarget.src = url; }}
+                                        />
                                     ) : (
                                         <div className="w-full h-full flex items-center justify-center text-[var(--foreground-muted)]">
                                             <i className={`fi fi-sr-camera flex items-center justify-center ${"w-6 h-6"}`}  ></i>
@@ -0,0 +1,234 @@
+'use client';
+
+import * as React from "react"
+import { cn } from "@/lib/utils"
+
+/**
+ * Windowed list: only rows near the viewport are mounted.
+ *
+ * Scrolls with its nearest scrollable ancestor (the dashboard's <main>), so it
+ * drops into an existing page without needing a fixed-height container. Row
+ * heights are measured as they render; unmeasured rows use `estimateHeight`.
+ */
+
+interface VirtualListProps<T> {
+    items: T[];
+    getKey: (item: T, index: number) => string;
+    renderItem: (item: T, index: number) => React.ReactNode;
+    /** Height (px) assumed for rows that haven't been measured yet */
+    estimateHeight: number;
+    /** Space (px) between rows */
+    gap?: number;
+    /** Extra distance (px) above and below the viewport to keep rendered */
+    overscan?: number;
+    /** Called when the last row comes into range (infinite loading) */
+    onEndReached?: () => void;
+    className?: string;
+}
+
+function findScrollParent(element: HTMLElement | null): HTMLElement | null {
+    let node = element?.parentElement ?? null;
+    while (node) {
+        const { overflowY } = getComputedStyle(node);
+        if (overflowY === 'auto' || overflowY === 'scroll') return node;
+        node = node.parentElement;
+    }
+    return null;
+}
+
+/** First index whose row ends below `position` */
+function findIndex(offsets: number[], heights: number[], position: number): number {
+    let low = 0;
+    let high = offsets.length - 1;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (offsets[mid] + heights[mid] < position) low = mid + 1;
+        else high = mid;
+    }
+    return low;
+}
+
+function VirtualList<T>({
+    items,
+    getKey,
+    renderItem,
+    estimateHeight,
+    gap = 0,
+    overscan = 600,
+    onEndReached,
+    className,
+}: VirtualListProps<T>) {
+    const containerRef = React.useRef<HTMLDivElement>(null);
+    const measured = React.useRef(new Map<string, number>());
+    const [measureVersion, setMeasureVersion] = React.useState(0);
+    const [viewport, setViewport] = React.useState({ start: 0, end: 0 });
+
+    // Track which slice of the list is on screen
+    React.useEffect(() => {
+        const container = containerRef.current;
+        if (!container) return;
+        const scrollParent = findScrollParent(container);
+        const target: HTMLElement | Window = scrollParent ?? window;
+        let frame = 0;
+
+        const update = () => {
+            frame = 0;
+            const top = container.getBoundingClientRect().top;
+            const parentTop = scrollParent ? scrollParent.getBoundingClientRect().top : 0;
+            const height = scrollParent ? scrollParent.clientHeight : window.innerHeight;
+            const start = parentTop - top;
+            setViewport(prev => (prev.start === start && prev.end === start + height) ? prev : { start, end: start + height });
+        };
+        const schedule = () => {
+            if (!frame) frame = requestAnimationFrame(update);
+        };
+
+        update();
+        target.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', schedule);
+        return () => {
+            if (frame) cancelAnimationFrame(frame);
+            target.removeEventListener('scroll', schedule);
+            window.removeEventListener('resize', schedule);
+        };
+    }, []);
+
+    // One observer for every mounted row; rows report their key via data-key
+    const observer = React.useMemo(() => {
+        if (typeof ResizeObserver === 'undefined') return null;
+        return new ResizeObserver(entries => {
+            let changed = false;
+            for (const entry of entries) {
+                const key = (entry.target as HTMLElement).dataset.key;
+                const height = Math.round(entry.borderBoxSize?.[0]?.blockSize ?? entry.contentRect.height);
+                if (key && measured.current.get(key) !== height) {
+                    measured.current.set(key, height);
+                    changed = true;
+                }
+            }
+            if (changed) setMeasureVersion(v => v + 1);
+        });
+    }, []);
+
+    React.useEffect(() => () => observer?.disconnect(), [observer]);
+
+    const rowRef = React.useCallback((element: HTMLDivElement) => {
+        observer?.observe(element);
+        return () => observer?.unobserve(element);
+    }, [observer]);
+
+    const layout = React.useMemo(() => {
+        const heights = items.map((item, i) => measured.current.get(getKey(item, i)) ?? estimateHeight);
+        const offsets: number[] = new Array(items.length);
+        let total = 0;
+        for (let i = 0; i < items.length; i++) {
+            offsets[i] = total;
+            total += heights[i] + (i < items.length - 1 ? gap : 0);
+        }
+        return { heights, offsets, total };
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [items, getKey, estimateHeight, gap, measureVersion]);
+
+    const first = items.length ? findIndex(layout.offsets, layout.heights, viewport.start - overscan) : 0;
+    const last = items.length ? findIndex(layout.offsets, layout.heights, viewport.end + overscan) : -1;
+
+    const reachedEnd = items.length > 0 && last >= items.length - 1;
+    React.useEffect(() => {
+        if (reachedEnd) onEndReached?.();
+        // Re-arm whenever more items arrive
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [reachedEnd, items.length]);
+
+    const rows: React.ReactNode[] = [];
+    for (let i = first; i <= last; i++) {
+        const key = getKey(items[i], i);
+        rows.push(
+            <div
+                key={key}
+                ref={rowRef}
+                data-key={key}
+                style={{ position: 'absolute', top: layout.offsets[i], left: 0, right: 0 }}
+            >
+                {renderItem(items[i], i)}
+            </div>
+        );
+    }
+
+    return (
+        <div ref={containerRef} className={cn("relative", className)} style={{ height: layout.total }}>
+            {rows}
+        </div>
+    );
+}
+
+interface VirtualGridProps<T> extends Omit<VirtualListProps<T[]>, 'items' | 'getKey' | 'renderItem'> {
+    items: T[];
+    getKey: (item: T) => string;
+    renderItem: (item: T, index: number) => React.ReactNode;
+    /** Columns shrink to fit, but never below this width (px) */
+    minColumnWidth: number;
+    maxColumns?: number;
+}
+
+/** Responsive grid on top of VirtualList: items are chunked into windowed rows. */
+function VirtualGrid<T>({
+    items,
+    getKey,
+    renderItem,
+    minColumnWidth,
+    maxColumns = 4,
+    gap = 0,
+    className,
+    ...listProps
+}: VirtualGridProps<T>) {
+    const wrapperRef = React.useRef<HTMLDivElement>(null);
+    const [columns, setColumns] = React.useState(1);
+
+    React.useEffect(() => {
+        const wrapper = wrapperRef.current;
+        if (!wrapper) return;
+        const update = () => {
+            const fit = Math.floor((wrapper.clientWidth + gap) / (minColumnWidth + gap));
+            setColumns(Math.max(1, Math.min(maxColumns, fit)));
+        };
+        update();
+        if (typeof ResizeObserver === 'undefined') return;
+        const observer = new ResizeObserver(update);
+        observer.observe(wrapper);
+        return () => observer.disconnect();
+    }, [gap, minColumnWidth, maxColumns]);
+
+    const rows = React.useMemo(() => {
+        const chunks: T[][] = [];
+        for (let i = 0; i < items.length; i += columns) chunks.push(items.slice(i, i + columns));
+        return chunks;
+    }, [items, columns]);
+
+    const getRowKey = React.useCallback((row: T[]) => `${columns}:${getKey(row[0])}`, [columns, getKey]);
+
+    return (
+        <div ref={wrapperRef} className={className}>
+            <VirtualList
+                {...listProps}
+                items={rows}
+                gap={gap}
+                getKey={getRowKey}
+                renderItem={(row, rowIndex) => (
+                    <div
+                        className="grid"
+                        style={{ gridTemplateColumns: `repeat(${columns}, minmax(0, 1fr))`, gap }}
+                    >
+                        {row.map((item, i) => (
+                            <React.Fragment key={getKey(item)}>
+                                {renderItem(item, rowIndex * columns + i)}
+                            </React.Fragment>
+                        ))}
+                    </div>
+                )}
+            />
+        </div>
+    );
+}
+
+export { VirtualList, VirtualGrid }
+export type { VirtualListProps, VirtualGridProps }
@@ -4,6 +4,7 @@ import { createContext, useContext, useEffect, useState, ReactNode, useRef } fro
 import { createClient } from '@/utils/supabase/client';
 import { useRouter } from 'next/navigation';
 import { Account, FounderProfile } from '@/lib/supabase'; // Keep types from lib
+import { loadDashboardBootstrap, resetDashboardBootstrap } from '@/lib/dashboard-client';
 
 interface User {
     id: string;
@@ -35,30 +36,24 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     // Create the Supabase client for Client Components
     const supabase = createClient();
 
-    // Fetch user's account and profiles
-    const fetchUserData = async (userId: string) => {
+    // Fetch user's account and profiles (shared dashboard bootstrap request)
+    const fetchUserData = async (userId: string, force = false) => {
         try {
-            // Fetch account
-            const { data: accountData } = await supabase
-                .from('accounts')
-                .select('*')
-                .eq('id', userId)
-                .single();
-
-            if (accountData) {
-                setAccount(accountData as Account);
+            let bootstrap = await loadDashboardBootstrap({ force });
+            // A response cached for a previous session doesn't count
+            if (bootstrap && bootstrap.user.id !== userId) {
+                bootstrap = await loadDashboardBootstrap({ force: true });
             }
+            if (!bootstrap) return;
 
-            // Fetch profiles
-            const { data: profilesData } = await supabase
-                .from('founder_profiles')
-                .select('*')
-                .eq('account_id', userId)
-                .order('created_at', { ascending: true });
+            if (bootstrap.account) {
+                setAccount(bootstrap.account as Account);
+            }
 
-            if (profilesData && profilesData.length > 0) {
+            const profilesData = bootstrap.profiles as FounderProfile[];
+            if (profilesData.length > 0) {
                 console.log(`[Auth] found ${profilesData.length} profiles for user ${userId}`);
-                setProfiles(profilesData as FounderProfile[]);
+                setProfiles(profilesData);
 
                 // Set first profile as active if none selected
                 const savedProfileId = localStorage.getItem('influuc-active-profile');
@@ -72,7 +67,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
 
     const refreshProfiles = async () => {
         if (user) {
-            await fetchUserData(user.id);
+            await fetchUserData(user.id, true);
         }
     };
 
@@ -94,6 +89,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
             });
 
             // 2. Clear React state
+            resetDashboardBootstrap();
             setUser(null);
             setAccount(null);
             setProfiles([]);
@@ -1,7 +1,9 @@
 'use client';
 
-import React, { createContext, useContext, useState, useEffect, ReactNode } from 'react';
+import React, { createContext, useContext, useState, useEffect, useMemo, useReducer, useRef, ReactNode } from 'react';
 import { isToday, parseISO, startOfWeek, endOfWeek, isWithinInterval } from 'date-fns';
+import { createClient } from '@/utils/supabase/client';
+import { loadDashboardBootstrap } from '@/lib/dashboard-client';
 
 // --- Types ---
 export type Platform = 'LinkedIn' | 'X';
@@ -49,10 +51,24 @@ interface UserProfile {
     subscriptionTier?: string;
 }
 
+export interface DashboardNotification {
+    id: string;
+    type: 'week_ready' | 'subscription_expired' | 'trial_ending' | 'post_failed' | 'general';
+    title: string;
+    message: string;
+    action_url?: string;
+    created_at: string;
+    read_at?: string;
+    dismissed_at?: string;
+}
+
 interface PostContextType {
     posts: Post[];
     loading: boolean;
     profile: UserProfile | null;
+    notifications: DashboardNotification[];
+    /** True while the realtime channel is connected; changes arrive without refetching */
+    live: boolean;
     getPostsForToday: () => Post[];
     getMetricCounts: () => {
         totalScheduled: number;
@@ -61,6 +77,8 @@ interface PostContextType {
     };
     addPost: (post: Omit<Post, 'id'>) => void;
     deletePost: (id: string) => void;
+    updatePost: (id: string, patch: Partial<Post>, commit?: () => Promise<unknown>) => Promise<void>;
+    dismissNotification: (id: string) => Promise<void>;
     refreshPosts: () => Promise<void>;
     updateProfile: (data: Partial<UserProfile>) => Promise<void>;
 }
@@ -104,54 +122,98 @@ function convertDbPost(dbPost: {
     };
 }
 
+// Helper to convert a founder_profiles row to UserProfile
+function convertDbProfile(dbProfile: Record<string, any>, weekNumber: number): UserProfile {
+    return {
+        id: dbProfile.id,
+        name: dbProfile.name,
+        role: dbProfile.role,
+        companyName: dbProfile.company_name,
+        companyWebsite: dbProfile.company_website,
+        businessDescription: dbProfile.business_description,
+        targetAudience: dbProfile.target_audience,
+        industry: dbProfile.industry,
+        contentGoal: dbProfile.weekly_goal, // mapping weekly_goal to contentGoal
+        platforms: {
+            x: dbProfile.platforms?.x || false,
+            linkedin: dbProfile.platforms?.linkedin || false,
+        },
+        connections: dbProfile.connections || { x: false, linkedin: false },
+        autoPublish: dbProfile.auto_publish || false,
+        nextGenerationDate: dbProfile.next_generation_date ? parseISO(dbProfile.next_generation_date) : undefined,
+        contextData: dbProfile.context_data || { aboutYou: '', personalContext: [], productContext: [] },
+        awaitingGoalInput: dbProfile.awaiting_goal_input || false,
+        weekNumber: weekNumber || 1,
+        subscriptionTier: dbProfile.subscription_tier || 'starter',
+    };
+}
+
+// --- Normalized post cache ---
+// Posts are keyed by id so realtime events and optimistic edits touch one
+// entry instead of replacing the list.
+type PostsById = Record<string, Post>;
+
+type PostAction =
+    | { type: 'replace'; posts: Post[] }
+    | { type: 'upsert'; post: Post }
+    | { type: 'patch'; id: string; patch: Partial<Post> }
+    | { type: 'remove'; id: string };
+
+function postsReducer(state: PostsById, action: PostAction): PostsById {
+    switch (action.type) {
+        case 'replace':
+            return Object.fromEntries(action.posts.map(post => [post.id, post]));
+        case 'upsert':
+            return { ...state, [action.post.id]: action.post };
+        case 'patch': {
+            const current = state[action.id];
+            return current ? { ...state, [action.id]: { ...current, ...action.patch } } : state;
+        }
+        case 'remove': {
+            if (!state[action.id]) return state;
+            const { [action.id]: _removed, ...rest } = state;
+            return rest;
+        }
+    }
+}
+
 const PostContext = createContext<PostContextType | undefined>(undefined);
 
 export function PostProvider({ children }: { children: ReactNode }) {
-    const [posts, setPosts] = useState<Post[]>([]);
+    const [postsById, dispatch] = useReducer(postsReducer, {});
     const [profile, setProfile] = useState<UserProfile | null>(null);
+    const [notifications, setNotifications] = useState<DashboardNotification[]>([]);
     const [loading, setLoading] = useState(true);
+    const [live, setLive] = useState(false);
+    // Who to subscribe for: the account and its profiles' ids (posts have no account_id)
+    const [scope, setScope] = useState<{ accountId: string; profileIds: string[] } | null>(null);
+    const postsRef = useRef(postsById);
+    postsRef.current = postsById;
+
+    const posts = useMemo(
+        () => Object.values(postsById).sort((a, b) => a.scheduledTime.getTime() - b.scheduledTime.getTime()),
+        [postsById]
+    );
 
-    const refreshPosts = async () => {
+    // Profile, week number, posts and notifications come from the shared dashboard bootstrap
+    const loadPosts = async (force: boolean) => {
         try {
-            // Fetch profile first
-            const profileRes = await fetch('/api/profile');
-            if (profileRes.ok) {
-                const data = await profileRes.json();
-                const dbProfile = data.profile;
-
-                if (dbProfile) {
-                    setProfile({
-                        id: dbProfile.id,
-                        name: dbProfile.name,
-                        role: dbProfile.role,
-                        companyName: dbProfile.company_name,
-                        companyWebsite: dbProfile.company_website,
-                        businessDescription: dbProfile.business_description,
-                        targetAudience: dbProfile.target_audience,
-                        industry: dbProfile.industry,
-                        contentGoal: dbProfile.weekly_goal, // mapping weekly_goal to contentGoal
-                        platforms: {
-                            x: dbProfile.platforms?.x || false,
-                            linkedin: dbProfile.platforms?.linkedin || false,
-                        },
-                        connections: dbProfile.connections || { x: false, linkedin: false },
-                        autoPublish: dbProfile.auto_publish || false,
-                        nextGenerationDate: dbProfile.next_generation_date ? parseISO(dbProfile.next_generation_date) : undefined,
-                        contextData: dbProfile.context_data || { aboutYou: '', personalContext: [], productContext: [] },
-                        awaitingGoalInput: dbProfile.awaiting_goal_input || false,
-                        weekNumber: dbProfile.week_number || 1,
-                        subscriptionTier: dbProfile.subscription_tier || 'starter',
-                    });
-                }
-            }
+            const bootstrap = await loadDashboardBootstrap({ force });
+            if (!bootstrap) return;
 
-            // Then fetch posts
-            const postsRes = await fetch('/api/posts');
-            if (postsRes.ok) {
-                const postsData = await postsRes.json();
-                const convertedPosts = (postsData.posts || []).map(convertDbPost);
-                setPosts(convertedPosts);
+            // Newest profile, as /api/profile returns
+            const dbProfile = bootstrap.profiles[bootstrap.profiles.length - 1];
+            if (dbProfile) {
+                setProfile(convertDbProfile(dbProfile, bootstrap.weekNumber));
             }
+
+            dispatch({ type: 'replace', posts: (bootstrap.posts as any[]).map(convertDbPost) });
+            setNotifications(bootstrap.notifications as DashboardNotification[]);
+
+            const profileIds = bootstrap.profiles.map(p => p.id as string);
+            setScope(prev => prev && prev.accountId === bootstrap.user.id && prev.profileIds.join() === profileIds.join()
+                ? prev
+                : { accountId: bootstrap.user.id, profileIds });
         } catch (err) {
             console.error('Failed to fetch posts:', err);
         } finally {
@@ -159,6 +221,8 @@ export function PostProvider({ children }: { children: ReactNode }) {
         }
     };
 
+    const refreshPosts = () => loadPosts(true);
+
     const updateProfile = async (data: Partial<UserProfile>) => {
         try {
             const res = await fetch('/api/profile', {
@@ -171,11 +235,10 @@ export function PostProvider({ children }: { children: ReactNode }) {
 
             const result = await res.json();
 
-            // Optimistically update local state or use returned data
-            setProfile(prev => prev ? { ...prev, ...data } : null);
-
-            // Refresh to ensure sync
-            await refreshPosts();
+            // The response carries the saved row; no need to reload posts for a profile edit
+            setProfile(prev => result.profile
+                ? convertDbProfile(result.profile, prev?.weekNumber || 1)
+                : prev ? { ...prev, ...data } : null);
         } catch (err) {
             console.error('Failed to update profile:', err);
             throw err;
@@ -183,19 +246,116 @@ export function PostProvider({ children }: { children: ReactNode }) {
     };
 
     useEffect(() => {
-        refreshPosts();
+        loadPosts(false);
     }, []);
 
+    // Row-level updates from Supabase Realtime
+    useEffect(() => {
+        if (!scope || scope.profileIds.length === 0) return;
+
+        const supabase = createClient();
+        let connectedBefore = false;
+
+        const channel = supabase
+            .channel(`dashboard:${scope.accountId}`)
+            .on('postgres_changes', {
+                event: '*',
+                schema: 'public',
+                table: 'posts',
+                filter: `profile_id=in.(${scope.profileIds.join(',')})`,
+            }, (payload: any) => {
+                if (payload.eventType === 'DELETE') {
+                    if (payload.old?.id) dispatch({ type: 'remove', id: payload.old.id });
+                } else if (payload.new?.id) {
+                    dispatch({ type: 'upsert', post: convertDbPost(payload.new) });
+                }
+            })
+            .on('postgres_changes', {
+                event: '*',
+                schema: 'public',
+                table: 'notifications',
+                filter: `account_id=eq.${scope.accountId}`,
+            }, (payload: any) => {
+                const row = payload.new as DashboardNotification | undefined;
+                const id = row?.id || payload.old?.id;
+                setNotifications(prev => {
+                    const rest = prev.filter(n => n.id !== id);
+                    if (payload.eventType === 'DELETE' || !row || row.dismissed_at) return rest;
+                    return [row, ...rest].sort((a, b) => b.created_at.localeCompare(a.created_at));
+                });
+            })
+            .on('postgres_changes', {
+                event: '*',
+                schema: 'public',
+                table: 'content_generations',
+                filter: `account_id=eq.${scope.accountId}`,
+            }, (payload: any) => {
+                // A completed week moves the user on to the next one
+                const row = payload.new;
+                if (row?.status === 'completed' && row.week_number) {
+                    setProfile(prev => prev && (prev.weekNumber || 1) <= row.week_number
+                        ? { ...prev, weekNumber: row.week_number + 1 }
+                        : prev);
+                }
+            })
+            .subscribe((status: string) => {
+                if (status === 'SUBSCRIBED') {
+                    setLive(true);
+                    // Changes made while disconnected were missed; resync once
+                    if (connectedBefore) loadPosts(true);
+                    connectedBefore = true;
+                } else {
+                    setLive(false);
+                }
+            });
+
+        return () => {
+            setLive(false);
+            supabase.removeChannel(channel);
+        };
+    }, [scope]);
+
     const addPost = (newPostData: Omit<Post, 'id'>) => {
         const newPost: Post = {
             ...newPostData,
             id: Math.random().toString(36).substr(2, 9),
         };
-        setPosts((prev) => [...prev, newPost]);
+        dispatch({ type: 'upsert', post: newPost });
     };
 
     const deletePost = (id: string) => {
-        setPosts((prev) => prev.filter((post) => post.id !== id));
+        dispatch({ type: 'remove', id });
+    };
+
+    /**
+     * Optimistic edit: apply `patch` now, run `commit` (the API call), and
+     * restore the previous entry if it fails. Realtime confirms the result.
+     */
+    const updatePost = async (id: string, patch: Partial<Post>, commit?: () => Promise<unknown>) => {
+        const previous = postsRef.current[id];
+        dispatch({ type: 'patch', id, patch });
+        if (!commit) return;
+        try {
+            await commit();
+        } catch (err) {
+            if (previous) dispatch({ type: 'upsert', post: previous });
+            throw err;
+        }
+    };
+
+    const dismissNotification = async (id: string) => {
+        const previous = notifications;
+        setNotifications(prev => prev.filter(n => n.id !== id));
+
+        const { error } = await createClient()
+            .from('notifications')
+            .update({ dismissed_at: new Date().toISOString() })
+            .eq('id', id);
+
+        if (error) {
+            console.error('Failed to dismiss notification:', error);
+            setNotifications(previous);
+        }
     };
 
     const getPostsForToday = () => {
@@ -239,10 +399,14 @@ export function PostProvider({ children }: { children: ReactNode }) {
             posts,
             loading,
             profile,
+            notifications,
+            live,
             getPostsForToday,
             getMetricCounts,
             addPost,
             deletePost,
+            updatePost,
+            dismissNotification,
             refreshPosts,
             updateProfile
         }}>
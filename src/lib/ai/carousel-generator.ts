@@ -1,12 +1,32 @@
 /**
  * Shared Carousel Generator
- * Used by both the Carousel Studio page and the weekly generation pipeline.
+ * Used by the Carousel Studio page, single-post regeneration, onboarding and
+ * the weekly generation pipeline.
+ *
+ * - Each carousel is its own completion; several run concurrently
+ * - Slides are validated as they stream in, and only the failed ones are
+ *   re-requested (in parallel)
+ * - A carousel that breaks off mid-stream is returned partial instead of
+ *   throwing, with per-slide latency for the caller to persist
  */
 
 import { AnthropicProvider } from '@/lib/ai/providers/anthropic';
-import { getDefaultStyle, getCarouselStyle } from '@/lib/ai/carousel-styles';
+import { AIMessage, AIProviderInterface, getActiveProvider, getProvider } from '@/lib/ai/providers';
+import { detectSlideCount } from '@/lib/ai/carousel-styles';
+import { BrandColors, compileCarouselPrompt, getCompiledStyle } from '@/lib/ai/carousel-prompts';
+import { robustJsonParse } from '@/lib/ai/json';
 
-const ai = new AnthropicProvider();
+export type { BrandColors };
+
+const CAROUSEL_CONCURRENCY = 3;
+const MAX_SLIDE_REGENS = 4;
+
+// Carousels go to Claude unless the caller passes a provider (the weekly batch
+// uses the active one), or in replay mode where E2E runs need determinism
+async function getCarouselProvider(): Promise<AIProviderInterface> {
+    if (getActiveProvider() === 'replay') return getProvider();
+    return new AnthropicProvider();
+}
 
 // Visual validation: check if slide has substantial visual elements
 function validateSlideVisual(slideHtml: string): { valid: boolean; reason: string } {
@@ -43,6 +63,12 @@ function validateSlideVisual(slideHtml: string): { valid: boolean; reason: strin
 export interface CarouselGenerationOptions {
     topic: string;
     styleId?: string;
+    brandColors?: BrandColors;
+    strategyBrief?: string;
+    /** Previously liked carousels, shown to the model as style references */
+    examples?: string[];
+    /** Defaults to Claude; streamed only if the provider implements stream() */
+    provider?: AIProviderInterface;
     userContext?: {
         industry?: string;
         targetAudience?: string;
@@ -51,137 +77,299 @@ export interface CarouselGenerationOptions {
     };
 }
 
+/** Stored on the post as `carousel_meta` */
+export interface CarouselMetrics {
+    prompt_hash: string;
+    requested_slides: number;
+    received_slides: number;
+    invalid_slides: number[];
+    regenerated: number[];
+    slide_latency_ms: number[];
+    regen_latency_ms: Record<string, number>;
+    total_ms: number;
+}
+
+export interface CarouselResult {
+    slides: string[];
+    styleId: string;
+    /** false when the model stopped before the requested slide count */
+    complete: boolean;
+    metrics: CarouselMetrics;
+}
+
+// ============================================
+// STREAMING SLIDE PARSER
+// ============================================
+
+/** Index of the closing quote of the JSON string starting at `start`, or -1 if incomplete. */
+function findStringEnd(text: string, start: number): number {
+    for (let i = start + 1; i < text.length; i++) {
+        if (text[i] === '\\') i++;
+        else if (text[i] === '"') return i;
+    }
+    return -1;
+}
+
+function decodeJsonString(literal: string): string {
+    try {
+        return JSON.parse(literal);
+    } catch {
+        // Models sometimes emit raw newlines/tabs inside strings
+        try {
+            return JSON.parse(literal.replace(/\n/g, '\\n').replace(/\t/g, '\\t'));
+        } catch {
+            return literal.slice(1, -1);
+        }
+    }
+}
+
 /**
- * Generate carousel HTML slides for a given topic and style.
- * Returns an array of HTML strings (one per slide).
+ * Pulls complete slide strings out of a partially streamed
+ * {"slides": ["<div>...</div>", ...]} response as soon as each one closes.
  */
-export async function generateCarouselSlides(
-    options: CarouselGenerationOptions
-): Promise<{ slides: string[]; styleId: string }> {
-    const { topic, styleId, userContext } = options;
+export class SlideStreamParser {
+    private buffer = '';
+    private cursor = -1;
+    private finished = false;
 
-    // Get the carousel style (default to minimal-stone)
-    const style = styleId ? getCarouselStyle(styleId) : getDefaultStyle();
-    if (!style || !style.prompt) {
-        throw new Error('Invalid or unavailable carousel style');
-    }
+    push(chunk: string): string[] {
+        this.buffer += chunk;
+        const slides: string[] = [];
+
+        if (this.cursor === -1) {
+            const key = this.buffer.search(/"slides"\s*:\s*\[/);
+            if (key === -1) return slides;
+            this.cursor = this.buffer.indexOf('[', key) + 1;
+        }
 
-    console.log(`[CarouselGen] Using style: ${style.name} for topic: "${topic}"`);
+        while (!this.finished) {
+            while (this.cursor < this.buffer.length && /[\s,]/.test(this.buffer[this.cursor])) this.cursor++;
+            if (this.cursor >= this.buffer.length) break;
 
-    // Detect slide count from topic
-    const numberMatch = topic.match(
-        /\b(top\s*)?(\d+)\s*(things?|tips?|ways?|habits?|books?|tools?|ideas?|steps?|reasons?|secrets?|hacks?|strategies?|mistakes?|rules?|principles?|lessons?|facts?|myths?)?/i
-    );
-    let requestedSlides = 6;
-    if (numberMatch && numberMatch[2]) {
-        const num = parseInt(numberMatch[2]);
-        if (num >= 3 && num <= 15) {
-            requestedSlides = num + 2; // +2 for hook + CTA slides
+            // Anything but a string here is either the end of the array or
+            // output we can't follow incrementally; the final parse takes over
+            if (this.buffer[this.cursor] !== '"') {
+                this.finished = true;
+                break;
+            }
+
+            const end = findStringEnd(this.buffer, this.cursor);
+            if (end === -1) break;
+            slides.push(decodeJsonString(this.buffer.slice(this.cursor, end + 1)));
+            this.cursor = end + 1;
         }
-    }
 
-    // Build system prompt from style
-    let systemPrompt = style.prompt.replace(
-        'OUTPUT: {"slides": ["<div>...</div>", ...]}',
-        `OUTPUT: {"slides": ["<div>...</div>", ...]}\n- Valid JSON only, ${requestedSlides} slides`
-    );
+        return slides;
+    }
 
-    // Inject user context if available
-    if (userContext) {
-        systemPrompt += `\n\nUSER CONTEXT:`;
-        if (userContext.industry) systemPrompt += `\n- Industry: ${userContext.industry}`;
-        if (userContext.role) systemPrompt += `\n- Role: ${userContext.role}`;
-        if (userContext.companyName) systemPrompt += `\n- Company: ${userContext.companyName}`;
-        if (userContext.targetAudience) systemPrompt += `\n- Audience: ${userContext.targetAudience}`;
+    get text(): string {
+        return this.buffer;
     }
+}
+
+// ============================================
+// GENERATION
+// ============================================
+
+async function regenerateSlide(
+    ai: AIProviderInterface,
+    topic: string,
+    index: number,
+    total: number,
+    original: string,
+    reason: string
+): Promise<string | null> {
+    const regeneratePrompt = `
+You previously generated a ${total}-slide carousel but slide ${index + 1} had weak/missing visuals (${reason}).
+
+REGENERATE ONLY THIS SLIDE with LARGE, SUBSTANTIAL visuals:
+- Use w-48/w-64/w-72 widths
+- Use h-32/h-40/h-48 heights
+- Use grids with 4+ items
+- Use solid fills (bg-stone-300, bg-emerald-600)
+- Keep the message and color palette of the original
+
+Original topic: "${topic}"
+Failed slide numbers: ${index + 1}
 
-    const userPrompt = `Create a carousel for: "${topic}"`;
-    console.log(`[CarouselGen] Calling AI — ${requestedSlides} slides requested...`);
+Original slide:
+${original}
 
-    const result = await ai.complete({
+Output format:
+{"fixed_slides": {"${index}": "<div>...</div>"}}
+
+The fixed slide MUST have a visual taking up at least 40% of the slide area.
+`;
+
+    const fixResult = await ai.complete({
         messages: [
-            { role: 'system', content: systemPrompt },
-            { role: 'user', content: userPrompt },
+            { role: 'system', content: 'You fix carousel slides that have weak visuals. Make visuals LARGE and SUBSTANTIAL. Output only JSON.' },
+            { role: 'user', content: regeneratePrompt },
         ],
     });
 
-    // Parse JSON output
-    let jsonStr = result.content.replace(/```json/g, '').replace(/```/g, '');
-    const firstOpen = jsonStr.indexOf('{');
-    const lastClose = jsonStr.lastIndexOf('}');
+    const fixData = robustJsonParse(fixResult.content);
+    const fixed = fixData.fixed_slides ? Object.values(fixData.fixed_slides)[0] : null;
+    return typeof fixed === 'string' && fixed.trim() ? fixed : null;
+}
 
-    if (firstOpen !== -1 && lastClose !== -1) {
-        jsonStr = jsonStr.substring(firstOpen, lastClose + 1);
+// Generations in progress on this instance, keyed by compiled prompt hash
+const inflight = new Map<string, Promise<CarouselResult>>();
+
+/**
+ * Generate one carousel. Throws only when no slide at all came back;
+ * a response cut short returns the slides received with `complete: false`.
+ */
+export async function generateCarouselSlides(
+    options: CarouselGenerationOptions
+): Promise<CarouselResult> {
+    const { topic, styleId, brandColors, strategyBrief, examples, userContext } = options;
+    const ai = options.provider ?? await getCarouselProvider();
+
+    // Get the compiled carousel style (default to minimal-stone)
+    const compiled = getCompiledStyle(styleId);
+    if (!compiled) {
+        throw new Error('Invalid or unavailable carousel style');
     }
 
-    const data = JSON.parse(jsonStr);
-    let slides: string[] = data.slides;
+    const requestedSlides = detectSlideCount(topic);
+    const prompt = compileCarouselPrompt(
+        compiled,
+        { slideCount: requestedSlides, brandColors, strategyBrief, examples, userContext },
+        `Create a carousel for: "${topic}"`
+    );
 
-    if (!slides || slides.length === 0) {
-        throw new Error('AI returned no slides');
+    // Identical requests already in flight (double submits, duplicate ideas) share one generation
+    const key = `${ai.name}:${prompt.cacheKey}`;
+    const pending = inflight.get(key);
+    if (pending) {
+        console.log(`[CarouselGen] Joining in-flight generation ${prompt.cacheKey.slice(0, 12)}`);
+        return pending;
     }
 
-    // Validation pass
-    const failedSlides: number[] = [];
-    slides.forEach((slide, index) => {
+    const generation = runCarouselGeneration(ai, topic, compiled.style.id, requestedSlides, prompt.messages, compiled.hash)
+        .finally(() => inflight.delete(key));
+    inflight.set(key, generation);
+    return generation;
+}
+
+async function runCarouselGeneration(
+    ai: AIProviderInterface,
+    topic: string,
+    styleId: string,
+    requestedSlides: number,
+    messages: AIMessage[],
+    promptHash: string
+): Promise<CarouselResult> {
+    console.log(`[CarouselGen] Using style: ${styleId} (${promptHash}) via ${ai.name} for topic: "${topic}" — ${requestedSlides} slides requested`);
+
+    const started = Date.now();
+    const slides: string[] = [];
+    const slideLatency: number[] = [];
+    const validations: { valid: boolean; reason: string }[] = [];
+
+    const accept = (slide: string) => {
         const validation = validateSlideVisual(slide);
         if (!validation.valid) {
-            console.log(`[CarouselGen] Slide ${index + 1} FAILED: ${validation.reason}`);
-            failedSlides.push(index);
+            console.log(`[CarouselGen] Slide ${slides.length + 1} FAILED: ${validation.reason}`);
         }
-    });
-
-    // Regeneration pass for failed slides (max 3)
-    if (failedSlides.length > 0 && failedSlides.length <= 3) {
-        console.log(`[CarouselGen] Regenerating ${failedSlides.length} failed slides...`);
+        slides.push(slide);
+        slideLatency.push(Date.now() - started);
+        validations.push(validation);
+    };
 
-        const regeneratePrompt = `
-You previously generated a carousel but slides ${failedSlides.map(i => i + 1).join(', ')} had weak/missing visuals.
+    let raw = '';
+    try {
+        if (ai.stream) {
+            const parser = new SlideStreamParser();
+            for await (const delta of ai.stream({ messages })) {
+                parser.push(delta).forEach(accept);
+            }
+            raw = parser.text;
+        } else {
+            raw = (await ai.complete({ messages })).content;
+        }
+    } catch (error) {
+        if (slides.length === 0) throw error;
+        console.warn(`[CarouselGen] Stream broke after ${slides.length} slides, keeping partial carousel:`, error);
+    }
 
-REGENERATE ONLY THESE SLIDES with LARGE, SUBSTANTIAL visuals:
-- Use w-48/w-64/w-72 widths
-- Use h-32/h-40/h-48 heights
-- Use grids with 4+ items
-- Use solid fills (bg-stone-300, bg-emerald-600)
+    // Non-streaming providers, or output the incremental parser couldn't follow
+    if (slides.length === 0 && raw) {
+        const data = robustJsonParse(raw);
+        (Array.isArray(data.slides) ? data.slides : []).filter((s: unknown) => typeof s === 'string').forEach(accept);
+    }
 
-Original topic: "${topic}"
-Failed slide numbers: ${failedSlides.map(i => i + 1).join(', ')}
+    if (slides.length === 0) {
+        throw new Error('AI returned no slides');
+    }
 
-Output format:
-{"fixed_slides": {"${failedSlides.join('": "<div>...</div>", "')}": "<div>...</div>"}}
+    // Targeted regeneration: one request per failed slide, all in parallel
+    const failedSlides = validations.map((v, i) => (v.valid ? -1 : i)).filter(i => i !== -1);
+    const regenerated: number[] = [];
+    const regenLatency: Record<string, number> = {};
 
-Each fixed slide MUST have a visual taking up at least 40% of the slide area.
-`;
+    if (failedSlides.length > 0) {
+        const toFix = failedSlides.slice(0, MAX_SLIDE_REGENS);
+        console.log(`[CarouselGen] Regenerating ${toFix.length} failed slides in parallel...`);
 
-        try {
-            const fixResult = await ai.complete({
-                messages: [
-                    { role: 'system', content: 'You fix carousel slides that have weak visuals. Make visuals LARGE and SUBSTANTIAL. Output only JSON.' },
-                    { role: 'user', content: regeneratePrompt },
-                ],
-            });
-
-            let fixJson = fixResult.content.replace(/```json/g, '').replace(/```/g, '');
-            const fo = fixJson.indexOf('{');
-            const lc = fixJson.lastIndexOf('}');
-            if (fo !== -1 && lc !== -1) {
-                fixJson = fixJson.substring(fo, lc + 1);
+        await Promise.all(toFix.map(async index => {
+            const fixStarted = Date.now();
+            try {
+                const fixed = await regenerateSlide(ai, topic, index, slides.length, slides[index], validations[index].reason);
+                regenLatency[index] = Date.now() - fixStarted;
+                if (fixed && validateSlideVisual(fixed).valid) {
+                    slides[index] = fixed;
+                    regenerated.push(index);
+                    console.log(`[CarouselGen] Slide ${index + 1} replaced`);
+                }
+            } catch {
+                console.log(`[CarouselGen] Could not fix slide ${index + 1}, using original`);
             }
-            const fixData = JSON.parse(fixJson);
-
-            if (fixData.fixed_slides) {
-                Object.entries(fixData.fixed_slides).forEach(([idx, html]) => {
-                    const i = parseInt(idx);
-                    if (!isNaN(i) && i < slides.length) {
-                        slides[i] = html as string;
-                        console.log(`[CarouselGen] Slide ${i + 1} replaced`);
-                    }
-                });
+        }));
+    }
+
+    const metrics: CarouselMetrics = {
+        prompt_hash: promptHash,
+        requested_slides: requestedSlides,
+        received_slides: slides.length,
+        invalid_slides: failedSlides.filter(i => !regenerated.includes(i)),
+        regenerated: regenerated.sort((a, b) => a - b),
+        slide_latency_ms: slideLatency,
+        regen_latency_ms: regenLatency,
+        total_ms: Date.now() - started,
+    };
+    console.log(`[CarouselGen] "${topic}": ${slides.length}/${requestedSlides} slides in ${metrics.total_ms}ms (${regenerated.length} regenerated)`);
+
+    return {
+        slides,
+        styleId,
+        complete: slides.length >= requestedSlides,
+        metrics,
+    };
+}
+
+/**
+ * Generate several carousels independently and concurrently. One carousel
+ * failing doesn't affect the others; its slot in the result is null.
+ */
+export async function generateCarousels(
+    requests: CarouselGenerationOptions[]
+): Promise<(CarouselResult | null)[]> {
+    const results: (CarouselResult | null)[] = new Array(requests.length).fill(null);
+    let next = 0;
+
+    const worker = async () => {
+        while (next < requests.length) {
+            const index = next++;
+            try {
+                results[index] = await generateCarouselSlides(requests[index]);
+            } catch (error) {
+                console.error(`[CarouselGen] Carousel "${requests[index].topic}" failed:`, error);
             }
-        } catch {
-            console.log('[CarouselGen] Could not apply slide fixes, using originals');
         }
-    }
+    };
 
-    return { slides, styleId: style.id };
+    await Promise.all(Array.from({ length: Math.min(CAROUSEL_CONCURRENCY, requests.length) }, worker));
+    return results;
 }
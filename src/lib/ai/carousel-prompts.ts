@@ -0,0 +1,147 @@
+/**
+ * Compiled Carousel Prompts (server-only)
+ *
+ * Each style's prompt is compiled once per instance into a static segment
+ * (identical for every user, so it's sent as a prompt-cache prefix) and
+ * hashed. Everything request-specific — slide count, brand colors, strategy,
+ * examples, user context — goes in a separate dynamic segment after it.
+ */
+
+import { createHash } from 'crypto';
+import { AIMessage } from '@/lib/ai/providers';
+import { CarouselStyle, getCarouselStyle, getDefaultStyle } from '@/lib/ai/carousel-styles';
+
+// Bump when the compile step changes so hashes don't collide with old prompts
+const PROMPT_VERSION = 1;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface BrandColors {
+    primary: string;
+    background: string;
+    accent: string;
+}
+
+export interface CompiledCarouselStyle {
+    style: CarouselStyle;
+    staticPrompt: string;
+    /** Stable hash of the static segment */
+    hash: string;
+}
+
+export interface CarouselPromptContext {
+    slideCount: number;
+    brandColors?: BrandColors;
+    strategyBrief?: string;
+    /** Previously liked carousels, shown to the model as style references */
+    examples?: string[];
+    userContext?: {
+        industry?: string;
+        targetAudience?: string;
+        role?: string;
+        companyName?: string;
+    };
+}
+
+export interface CarouselPrompt {
+    messages: AIMessage[];
+    /** Hash of the static segment (same for every request using this style) */
+    staticHash: string;
+    /** Hash of the full request — identical requests share it */
+    cacheKey: string;
+}
+
+function sha256(value: string): string {
+    return createHash('sha256').update(value).digest('hex');
+}
+
+// ============================================
+// STATIC SEGMENT
+// ============================================
+
+const compiledStyles = new Map<string, CompiledCarouselStyle>();
+
+function compileStyle(style: CarouselStyle): CompiledCarouselStyle {
+    // Brand colors moved to the dynamic segment, so the placeholder goes
+    const staticPrompt = style.prompt.replace('[BRAND_COLORS_INSTRUCTION]', '').trim();
+    return {
+        style,
+        staticPrompt,
+        hash: sha256(`v${PROMPT_VERSION}\n${staticPrompt}`).slice(0, 16),
+    };
+}
+
+/** Compiled style for `styleId` (default style when omitted); null for unknown/empty styles. */
+export function getCompiledStyle(styleId?: string): CompiledCarouselStyle | null {
+    const style = styleId ? getCarouselStyle(styleId) : getDefaultStyle();
+    if (!style || !style.prompt) return null;
+
+    let compiled = compiledStyles.get(style.id);
+    if (!compiled) {
+        compiled = compileStyle(style);
+        compiledStyles.set(style.id, compiled);
+    }
+    return compiled;
+}
+
+// ============================================
+// DYNAMIC SEGMENT
+// ============================================
+
+function brandColorsInstruction(brandColors: BrandColors): string {
+    return `BRAND COLORS (CRITICAL):
+Primary Color: ${brandColors.primary} (Use for buttons, main icons, key highlights)
+Background Color: ${brandColors.background} (Use for the main slide canvas background)
+Accent Color: ${brandColors.accent} (Use for secondary highlights, checks, small pops of color)
+
+When generating the HTML/Tailwind:
+1. Always set the main container's background to ${brandColors.background} using inline style: style="background-color: ${brandColors.background}"
+2. Use ${brandColors.primary} for the most important visual elements.
+3. Use ${brandColors.accent} for decoration.
+4. Ensure text remains readable (use white or black text depending on ${brandColors.background} brightness).`;
+}
+
+export function buildDynamicSegment(context: CarouselPromptContext): string {
+    const { slideCount, brandColors, strategyBrief, examples, userContext } = context;
+    const sections = [`THIS CAROUSEL:\n- Valid JSON only, ${slideCount} slides`];
+
+    if (brandColors) sections.push(brandColorsInstruction(brandColors));
+    if (strategyBrief) sections.push(`STRATEGIC CONTEXT:\n${strategyBrief}`);
+    if (examples && examples.length > 0) {
+        sections.push(`PAST SUCCESSFUL CONTENT:\n${examples.map((ex, i) => `EXAMPLE ${i + 1}:\n"${ex}"`).join('\n\n')}`);
+    }
+
+    if (userContext) {
+        let block = 'USER CONTEXT:';
+        if (userContext.industry) block += `\n- Industry: ${userContext.industry}`;
+        if (userContext.role) block += `\n- Role: ${userContext.role}`;
+        if (userContext.companyName) block += `\n- Company: ${userContext.companyName}`;
+        if (userContext.targetAudience) block += `\n- Audience: ${userContext.targetAudience}`;
+        sections.push(block);
+    }
+
+    return sections.join('\n\n');
+}
+
+/**
+ * System messages for a carousel request: the compiled static prefix (marked
+ * for prompt caching) followed by the dynamic segment.
+ */
+export function compileCarouselPrompt(
+    compiled: CompiledCarouselStyle,
+    context: CarouselPromptContext,
+    userPrompt: string
+): CarouselPrompt {
+    const dynamic = buildDynamicSegment(context);
+    return {
+        messages: [
+            { role: 'system', content: compiled.staticPrompt, cache_control: { type: 'ephemeral' } },
+            { role: 'system', content: dynamic },
+            { role: 'user', content: userPrompt },
+        ],
+        staticHash: compiled.hash,
+        cacheKey: sha256(`${compiled.hash}\n${dynamic}\n${userPrompt}`).slice(0, 32),
+    };
+}
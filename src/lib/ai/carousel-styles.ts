@@ -407,9 +407,12 @@ export const CAROUSEL_STYLES: CarouselStyle[] = [
   STYLE_BOLD_EDITORIAL,
 ];
 
+// Styles indexed by id (the list above stays the display order)
+const STYLES_BY_ID = new Map(CAROUSEL_STYLES.map(s => [s.id, s]));
+
 // Get style by ID
 export function getCarouselStyle(styleId: string): CarouselStyle | undefined {
-  return CAROUSEL_STYLES.find(s => s.id === styleId);
+  return STYLES_BY_ID.get(styleId);
 }
 
 // Get default style
@@ -421,3 +424,19 @@ export function getDefaultStyle(): CarouselStyle {
 export function getActiveStyles(): CarouselStyle[] {
   return CAROUSEL_STYLES.filter(s => s.prompt !== '');
 }
+
+// Slide count implied by a list-style topic ("7 habits of...", "Top 5 tools")
+const LIST_TOPIC_PATTERN = /\b(top\s*)?(\d+)\s*(things?|tips?|ways?|habits?|books?|tools?|ideas?|steps?|reasons?|secrets?|hacks?|strategies?|mistakes?|rules?|principles?|lessons?|facts?|myths?)?/i;
+export const DEFAULT_SLIDE_COUNT = 6;
+
+// Number of slides to request for a topic: list items + hook + CTA, else the default
+export function detectSlideCount(topic: string): number {
+  const match = LIST_TOPIC_PATTERN.exec(topic);
+  if (match && match[2]) {
+    const num = parseInt(match[2]);
+    if (num >= 3 && num <= 15) {
+      return num + 2; // +2 for hook + CTA slides
+    }
+  }
+  return DEFAULT_SLIDE_COUNT;
+}
@@ -0,0 +1,57 @@
+/**
+ * JSON helpers for model output
+ */
+
+import dJSON from 'dirty-json';
+
+/**
+ * Robust JSON parser that tries native JSON.parse first,
+ * then dirty-json, then regex extraction as a last resort.
+ */
+export function robustJsonParse(raw: string): any {
+    // Step 1: Clean up common AI artifacts
+    let cleaned = raw
+        .replace(/```json\n?|\n?```/g, '')
+        .replace(/[\u201C\u201D]/g, '"')
+        .replace(/[\u2018\u2019]/g, "'")
+        .trim();
+
+    // Step 2: Extract the JSON object
+    const firstBrace = cleaned.indexOf('{');
+    const lastBrace = cleaned.lastIndexOf('}');
+    if (firstBrace !== -1 && lastBrace > firstBrace) {
+        cleaned = cleaned.substring(firstBrace, lastBrace + 1);
+    }
+
+    // Step 3: Fix trailing commas
+    cleaned = cleaned.replace(/,\s*([\]}])/g, '$1');
+
+    // Step 4: Fix double-double-quote keys like ""posts":
+    cleaned = cleaned.replace(/""(posts|carousels|content|hooks|cta|index|slides)":/g, '"$1":');
+
+    // Step 5: Try native JSON.parse
+    try {
+        return JSON.parse(cleaned);
+    } catch (nativeErr) {
+        console.warn('[robustJsonParse] Native JSON.parse failed, trying dirty-json...');
+    }
+
+    // Step 6: Try dirty-json
+    try {
+        return dJSON.parse(cleaned);
+    } catch (dirtyErr) {
+        console.warn('[robustJsonParse] dirty-json failed, trying newline escape repair...');
+    }
+
+    // Step 7: Try fixing unescaped newlines inside string values
+    try {
+        const repaired = cleaned.replace(
+            /"(?:[^"\\]|\\.)*"/g,
+            (match) => match.replace(/\n/g, '\\n').replace(/\t/g, '\\t')
+        );
+        return JSON.parse(repaired);
+    } catch (repairErr) {
+        console.error('[robustJsonParse] All parse attempts failed.');
+        throw repairErr;
+    }
+}
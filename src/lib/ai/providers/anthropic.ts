@@ -21,11 +21,7 @@ export class AnthropicProvider implements AIProviderInterface {
         return !!this.apiKey;
     }
 
-    async complete(options: AICompletionOptions): Promise<AICompletionResult> {
-        if (!this.isConfigured()) {
-            throw new Error('Anthropic API key is not configured. Set ANTHROPIC_API_KEY environment variable.');
-        }
-
+    private buildRequestBody(options: AICompletionOptions): Record<string, unknown> {
         // Extract system message if present
         const systemMessage = options.messages.find(m => m.role === 'system')?.content;
         const otherMessages = options.messages.filter(m => m.role !== 'system');
@@ -74,8 +70,16 @@ export class AnthropicProvider implements AIProviderInterface {
         };
 
         // Add system prompt if present
-        if (systemMessage) {
-            const systemMsgObj = options.messages.find(m => m.role === 'system');
+        const systemMessages = options.messages.filter(m => m.role === 'system');
+        if (systemMessages.length > 1) {
+            // Static prefix + dynamic tail: each block keeps its own cache_control
+            requestBody.system = systemMessages.map(m => ({
+                type: 'text',
+                text: typeof m.content === 'string' ? m.content : m.content.map(part => part.text || '').join(''),
+                ...(m.cache_control ? { cache_control: m.cache_control } : {}),
+            }));
+        } else if (systemMessage) {
+            const systemMsgObj = systemMessages[0];
             if (systemMsgObj?.cache_control) {
                 requestBody.system = [
                     { type: 'text', text: systemMessage, cache_control: systemMsgObj.cache_control }
@@ -90,6 +94,16 @@ export class AnthropicProvider implements AIProviderInterface {
             requestBody.temperature = options.temperature;
         }
 
+        return requestBody;
+    }
+
+    async complete(options: AICompletionOptions): Promise<AICompletionResult> {
+        if (!this.isConfigured()) {
+            throw new Error('Anthropic API key is not configured. Set ANTHROPIC_API_KEY environment variable.');
+        }
+
+        const requestBody = this.buildRequestBody(options);
+
         let lastError: Error | null = null;
         const maxRetries = 3;
 
@@ -143,4 +157,79 @@ export class AnthropicProvider implements AIProviderInterface {
 
         throw lastError;
     }
+
+    /**
+     * Streaming variant of complete(): yields text deltas from the SSE stream.
+     * Overload/5xx responses are retried before the first byte, like complete().
+     */
+    async *stream(options: AICompletionOptions): AsyncGenerator<string> {
+        if (!this.isConfigured()) {
+            throw new Error('Anthropic API key is not configured. Set ANTHROPIC_API_KEY environment variable.');
+        }
+
+        const requestBody = { ...this.buildRequestBody(options), stream: true };
+        const maxRetries = 3;
+        let response: Response | null = null;
+
+        for (let attempt = 0; attempt <= maxRetries; attempt++) {
+            if (attempt > 0) {
+                const delay = Math.pow(2, attempt) * 1000;
+                console.log(`[Anthropic] Stream overloaded/error. Retrying in ${delay}ms (Attempt ${attempt}/${maxRetries})...`);
+                await new Promise(resolve => setTimeout(resolve, delay));
+            }
+
+            response = await fetch('https://api.anthropic.com/v1/messages', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'x-api-key': this.apiKey,
+                    'anthropic-version': '2023-06-01',
+                    'anthropic-beta': 'prompt-caching-2024-07-31',
+                },
+                body: JSON.stringify(requestBody),
+                signal: AbortSignal.timeout(300000),
+                cache: 'no-store'
+            });
+
+            if (response.status === 529 || response.status >= 500) {
+                const errorText = await response.text();
+                if (attempt === maxRetries) {
+                    throw new Error(`Anthropic Server Error (${response.status}): ${errorText}`);
+                }
+                continue;
+            }
+            break;
+        }
+
+        if (!response || !response.ok || !response.body) {
+            const error = response ? await response.json().catch(() => ({})) : {};
+            throw new Error(`Anthropic API error: ${error.error?.message || JSON.stringify(error)}`);
+        }
+
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += value;
+
+            // SSE events are separated by a blank line
+            let boundary: number;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const event = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                const dataLine = event.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+
+                const data = JSON.parse(dataLine.slice(6));
+                if (data.type === 'content_block_delta' && data.delta?.type === 'text_delta') {
+                    yield data.delta.text;
+                } else if (data.type === 'error') {
+                    throw new Error(`Anthropic stream error: ${data.error?.message || 'unknown'}`);
+                }
+            }
+        }
+    }
 }
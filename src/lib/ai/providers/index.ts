@@ -1,9 +1,10 @@
 /**
  * AI Provider Abstraction Layer
  * Easy switch between Anthropic, OpenAI, and Gemini
+ * ('replay' serves recorded fixtures for deterministic E2E/load runs)
  */
 
-export type AIProvider = 'mock' | 'openai' | 'anthropic' | 'gemini';
+export type AIProvider = 'mock' | 'openai' | 'anthropic' | 'gemini' | 'replay';
 
 export interface AIMessage {
     role: 'system' | 'user' | 'assistant';
@@ -28,6 +29,8 @@ export interface AICompletionResult {
 export interface AIProviderInterface {
     name: AIProvider;
     complete(options: AICompletionOptions): Promise<AICompletionResult>;
+    /** Optional: yields text deltas as they arrive. Callers fall back to complete(). */
+    stream?(options: AICompletionOptions): AsyncGenerator<string>;
     isConfigured(): boolean;
 }
 
@@ -39,9 +42,12 @@ export function getActiveProvider(): AIProvider {
 
 // Factory function to get provider instance
 export async function getProvider(): Promise<AIProviderInterface> {
-    const activeProvider = getActiveProvider();
+    return createProvider(getActiveProvider());
+}
 
-    switch (activeProvider) {
+// Instantiate a specific provider (used directly by replay recording)
+export async function createProvider(name: AIProvider): Promise<AIProviderInterface> {
+    switch (name) {
         case 'openai':
             const { OpenAIProvider } = await import('./openai');
             return new OpenAIProvider();
@@ -51,6 +57,9 @@ export async function getProvider(): Promise<AIProviderInterface> {
         case 'gemini':
             const { GeminiProvider } = await import('./gemini');
             return new GeminiProvider();
+        case 'replay':
+            const { ReplayProvider } = await import('./replay');
+            return new ReplayProvider();
         case 'mock':
         default:
             const { MockProvider } = await import('./mock');
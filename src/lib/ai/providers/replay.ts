@@ -0,0 +1,352 @@
+/**
+ * Replay AI Provider
+ * Serves recorded, schema-correct responses keyed by prompt hash.
+ *
+ * Built for E2E and load runs: no network, no random sleeps, identical output
+ * for identical prompts. Enable with NEXT_PUBLIC_AI_PROVIDER=replay.
+ *
+ *   AI_REPLAY_DIR         Fixture directory (default: testsprite_tests/fixtures/ai)
+ *   AI_REPLAY_LATENCY_MS  Artificial latency per call (default: 0)
+ *   AI_REPLAY_RECORD      'true' → on a miss, call AI_REPLAY_UPSTREAM and save the fixture
+ *   AI_REPLAY_UPSTREAM    Provider used when recording (default: anthropic)
+ *
+ * On a miss without recording, a deterministic response is synthesized in the
+ * exact JSON shape the calling code parses (strategy calendar, {"posts": [...]},
+ * {"carousels": [...]}, single post, palette, voice analysis...).
+ */
+
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import path from 'path';
+import { AIProviderInterface, AICompletionOptions, AICompletionResult, AIMessage, AIProvider, createProvider } from './index';
+import { SeededRandom } from '@/lib/random';
+
+interface ReplayFixture {
+    key: string;
+    content: string;
+    provider: string;
+    recordedAt: string;
+    preview: string;
+}
+
+function getFixtureDir(): string {
+    return process.env.AI_REPLAY_DIR || path.join(process.cwd(), 'testsprite_tests', 'fixtures', 'ai');
+}
+
+function messageText(message: AIMessage): string {
+    if (typeof message.content === 'string') return message.content;
+    return message.content
+        .map(part => part.type === 'text' ? part.text || '' : `[image:${hashString(part.image || '').slice(0, 16)}]`)
+        .join('\n');
+}
+
+function hashString(value: string): string {
+    return createHash('sha256').update(value).digest('hex');
+}
+
+/**
+ * Stable key for a completion request. Images are reduced to their own hash so
+ * a fixture doesn't depend on how the base64 payload was chunked.
+ */
+export function hashPrompt(options: AICompletionOptions): string {
+    return hashString(JSON.stringify({
+        messages: options.messages.map(m => ({ role: m.role, content: messageText(m) })),
+        temperature: options.temperature ?? null,
+        maxTokens: options.maxTokens ?? null,
+        responseFormat: options.responseFormat?.type ?? null,
+    }));
+}
+
+export class ReplayProvider implements AIProviderInterface {
+    name = 'replay' as const;
+    private fixtureDir: string;
+    private latencyMs: number;
+    private record: boolean;
+
+    constructor() {
+        this.fixtureDir = getFixtureDir();
+        this.latencyMs = Math.max(0, Number(process.env.AI_REPLAY_LATENCY_MS) || 0);
+        this.record = process.env.AI_REPLAY_RECORD === 'true';
+    }
+
+    isConfigured(): boolean {
+        return true; // Fixtures or synthesis — never needs a key
+    }
+
+    async complete(options: AICompletionOptions): Promise<AICompletionResult> {
+        const key = hashPrompt(options);
+
+        let content = await this.readFixture(key);
+
+        if (content === null && this.record) {
+            content = await this.recordFixture(key, options);
+        }
+
+        if (content === null) {
+            content = synthesizeResponse(options, key);
+        }
+
+        if (this.latencyMs > 0) {
+            await new Promise(resolve => setTimeout(resolve, this.latencyMs));
+        }
+
+        return {
+            content,
+            provider: 'replay',
+            tokensUsed: Math.floor(content.length / 4),
+        };
+    }
+
+    private fixturePath(key: string): string {
+        return path.join(this.fixtureDir, `${key}.json`);
+    }
+
+    private async readFixture(key: string): Promise<string | null> {
+        try {
+            const raw = await fs.readFile(this.fixturePath(key), 'utf8');
+            const fixture: ReplayFixture = JSON.parse(raw);
+            return fixture.content;
+        } catch {
+            return null;
+        }
+    }
+
+    private async recordFixture(key: string, options: AICompletionOptions): Promise<string> {
+        const upstreamName = (process.env.AI_REPLAY_UPSTREAM || 'anthropic') as AIProvider;
+        if (upstreamName === 'replay') {
+            throw new Error('AI_REPLAY_UPSTREAM cannot be "replay"');
+        }
+
+        const upstream = await createProvider(upstreamName);
+        const result = await upstream.complete(options);
+
+        const fixture: ReplayFixture = {
+            key,
+            content: result.content,
+            provider: upstream.name,
+            recordedAt: new Date().toISOString(),
+            preview: messageText(options.messages[options.messages.length - 1]).slice(0, 200),
+        };
+
+        await fs.mkdir(this.fixtureDir, { recursive: true });
+        await fs.writeFile(this.fixturePath(key), JSON.stringify(fixture, null, 2));
+        console.log(`[Replay] Recorded fixture ${key.slice(0, 12)} from ${upstream.name}`);
+
+        return result.content;
+    }
+}
+
+// ============================================
+// SYNTHESIS (fixture misses)
+// ============================================
+
+const DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+
+const TOPICS = [
+    'Why most founders misread early traction',
+    'The hiring mistake that cost us a quarter',
+    'What customers actually pay for',
+    'The weekly ritual that keeps the team aligned',
+    'Pricing is a positioning decision',
+    'Shipping small beats shipping perfect',
+    'The metric we stopped tracking',
+];
+
+const POST_BODIES = [
+    'Most teams treat this as a tooling problem.\n\nIt is a clarity problem.\n\nWe fixed it by writing one page before every build and deleting half the roadmap.',
+    'We tried the playbook everyone recommends.\n\nIt failed for a simple reason: our buyers were never in the room.\n\nTalk to the person who signs, not the person who demos.',
+    'Three things I would tell myself on day one:\n\n1. Charge earlier.\n2. Say no faster.\n3. Write down why you said yes.',
+];
+
+function synthesizeResponse(options: AICompletionOptions, key: string): string {
+    const rng = new SeededRandom(key);
+    const system = options.messages.filter(m => m.role === 'system').map(messageText).join('\n');
+    const user = options.messages.filter(m => m.role === 'user').map(messageText).join('\n');
+    const prompt = `${system}\n${user}`;
+
+    // Onboarding master prompt → strategy + calendar
+    if (prompt.includes('"calendar": {') && prompt.includes('TOTAL ITEMS TO PLAN')) {
+        return JSON.stringify(synthesizeMasterStrategy(prompt, rng));
+    }
+
+    // Weekly strategy → {"posts": [...schedule], "carousels": [...]}
+    if (user.includes('Generate the weekly schedule')) {
+        return JSON.stringify(synthesizeWeeklySchedule(prompt, rng));
+    }
+
+    // Batched text posts → {"posts": [{index, content, hooks, cta}]}
+    const postsCount = prompt.match(/"posts" array must have exactly (\d+) items/);
+    if (postsCount) {
+        const count = parseInt(postsCount[1]);
+        return JSON.stringify({
+            posts: Array.from({ length: count }, (_, index) => ({
+                index,
+                content: rng.pick(POST_BODIES),
+                hooks: ['Nobody tells you this part.', 'I learned this the expensive way.'],
+                cta: index % 3 === 0 ? 'What would you add?' : null,
+            })),
+        });
+    }
+
+    // Single carousel → {"slides": [...]}
+    const singleCarousel = user.match(/Create a carousel for: "([^"]*)"/);
+    if (singleCarousel) {
+        const countMatch = system.match(/Valid JSON only, (\d+) slides/);
+        return JSON.stringify({ slides: synthesizeSlides(singleCarousel[1], countMatch ? parseInt(countMatch[1]) : 6) });
+    }
+
+    // Slide fixes → {"fixed_slides": {...}}
+    const fixMatch = user.match(/Failed slide numbers: ([\d, ]+)/);
+    if (fixMatch) {
+        const fixed: Record<string, string> = {};
+        fixMatch[1].split(',').map(n => parseInt(n.trim()) - 1).filter(n => !isNaN(n)).forEach(i => {
+            fixed[String(i)] = synthesizeSlides('Fixed slide', 1)[0];
+        });
+        return JSON.stringify({ fixed_slides: fixed });
+    }
+
+    // Single post regeneration → {"content", "hooks", "cta"}
+    if (system.includes('"content": "The post text"')) {
+        return JSON.stringify({
+            content: rng.pick(POST_BODIES),
+            hooks: ['Nobody tells you this part.', 'I learned this the expensive way.'],
+            cta: 'What would you add?',
+        });
+    }
+
+    // Palette extraction
+    if (system.includes('brand palette')) {
+        return JSON.stringify({ primary: '#10B981', background: '#09090B', accent: '#F59E0B' });
+    }
+
+    // News vault enrichment
+    if (system.startsWith('You are a news curator')) {
+        const title = user.match(/^Title: (.*)$/m)?.[1] || 'This story';
+        return JSON.stringify({
+            tldr: `${title}. It matters for founders shipping in this space.`,
+            spiky_take: 'Everyone will copy this within a quarter; distribution is the only moat left.',
+            category: [rng.pick(['AI', 'SaaS', 'Startup', 'Software Development'])],
+            relevance_score: 4 + Math.floor(rng.next() * 6),
+        });
+    }
+
+    // Voice analysis
+    if (prompt.toLowerCase().includes('voice') && options.responseFormat?.type === 'json_object') {
+        return JSON.stringify({
+            descriptors: ['direct', 'practical', 'dry'],
+            patterns: 'Short declarative sentences, one idea per line.',
+            vocabulary: ['ship', 'customers', 'clarity'],
+            never_says: ['synergy', 'game-changer', 'hustle'],
+            signature: 'Ends on a concrete lesson.',
+        });
+    }
+
+    // Free-text completions (ideas, newsjacking, legacy routes)
+    return rng.pick(POST_BODIES);
+}
+
+function synthesizeMasterStrategy(prompt: string, rng: SeededRandom) {
+    const postsMatch = prompt.match(/Posts: Exactly (\d+) planned/);
+    const carouselsMatch = prompt.match(/Carousels: Exactly (\d+) planned/);
+    const totalPosts = postsMatch ? parseInt(postsMatch[1]) : 7;
+    const totalCarousels = carouselsMatch ? parseInt(carouselsMatch[1]) : 0;
+
+    const starterPlatform = prompt.match(/Exactly ONE platform \((\w+)\)/);
+    const platforms = starterPlatform
+        ? [starterPlatform[1].toLowerCase()]
+        : ['x', 'linkedin'];
+
+    const pillars = ['authority', 'relatability', 'proof'];
+
+    return {
+        weekly_throughline: 'Clarity compounds faster than effort',
+        voice_analysis: {
+            descriptors: ['direct', 'practical', 'dry'],
+            patterns: 'Short declarative sentences, one idea per line.',
+            vocabulary: ['ship', 'customers', 'clarity'],
+            never_says: ['synergy', 'game-changer', 'hustle'],
+            signature: 'Ends on a concrete lesson.',
+        },
+        competitor_analysis: {
+            shared_patterns: 'Generic productivity advice',
+            whitespace: 'Operator-level specifics from a live product',
+            category_to_own: 'Founder-led clarity',
+        },
+        foundation: {
+            positioning_statement: 'I help early-stage founders ship what customers pay for without bloated roadmaps using weekly clarity reviews',
+            pov_statement: 'Most roadmaps are anxiety, not strategy.',
+            identity_gap: 'From busy builder to deliberate operator',
+            limiting_belief: 'More features mean more customers.',
+            content_pillars: pillars.map(job => ({
+                name: `${job[0].toUpperCase()}${job.slice(1)} pillar`,
+                description: `Posts that drive ${job}.`,
+                job,
+                metric: job === 'authority' ? 'Saves + Follows' : job === 'relatability' ? 'Shares + Reach' : 'DMs + Leads',
+            })),
+        },
+        calendar: {
+            posts: Array.from({ length: totalPosts }, (_, i) => ({
+                day: DAYS[i % 7],
+                platform: platforms[Math.floor(i / 7) % platforms.length],
+                format: i % 3 === 0 ? 'long' : 'short',
+                pillar: pillars[i % 3],
+                hook_type: 'contrarian',
+                topic: TOPICS[(i + Math.floor(rng.next() * TOPICS.length)) % TOPICS.length],
+                cta_type: 'save',
+                time: '9:00 AM',
+            })),
+            carousels: Array.from({ length: totalCarousels }, (_, i) => ({
+                day: i === 0 ? 'Wednesday' : 'Saturday',
+                platform: 'linkedin',
+                pillar: 'authority',
+                topic: `5 lessons on ${TOPICS[i % TOPICS.length].toLowerCase()}`,
+                hook_type: 'identity_challenge',
+                slide_count: 7,
+            })),
+        },
+    };
+}
+
+function synthesizeWeeklySchedule(prompt: string, rng: SeededRandom) {
+    const tierMatch = prompt.match(/CARDINALITY RULES \(TIER: (\w+)\)/);
+    const tier = tierMatch ? tierMatch[1] : 'starter';
+    const platformsMatch = prompt.match(/- Platforms: ([^\n]+)/);
+    const platforms = (platformsMatch ? platformsMatch[1] : 'linkedin')
+        .split(',')
+        .map(p => p.trim())
+        .filter(p => p === 'x' || p === 'linkedin');
+
+    const schedule: Array<{ platform: string; count: number }> = tier === 'starter'
+        ? [{ platform: platforms[0] || 'linkedin', count: 7 }]
+        : platforms.map(platform => ({ platform, count: platform === 'x' ? 7 : 5 }));
+
+    const posts = schedule.flatMap(({ platform, count }) =>
+        Array.from({ length: count }, (_, i) => ({
+            day: DAYS[i % 7],
+            platform,
+            format: tier !== 'starter' && platform === 'linkedin' && i < 3 ? 'long_form' : 'single',
+            topic: TOPICS[(i + Math.floor(rng.next() * TOPICS.length)) % TOPICS.length],
+            time: platform === 'x' ? '8:00 AM' : '10:00 AM',
+        }))
+    );
+
+    const carousels = tier === 'starter' ? [] : [
+        { day: 'Wednesday', topic: '5 frameworks every founder should know about pricing' },
+        { day: 'Saturday', topic: '7 mistakes founders make with their first hire' },
+    ];
+
+    return { posts, carousels };
+}
+
+function synthesizeSlides(topic: string, count: number): string[] {
+    return Array.from({ length: Math.max(1, count) }, (_, i) => {
+        if (i === 0) {
+            return `<div class="w-full h-full flex flex-col items-center justify-center p-8 bg-stone-100"><div class="text-6xl font-bold text-stone-900 text-center leading-tight">${escapeHtml(topic)}</div><div class="w-32 h-1.5 bg-emerald-600 rounded mt-10"></div></div>`;
+        }
+        return `<div class="w-full h-full flex flex-col items-center justify-center p-8 bg-stone-100"><div class="w-80 h-48 rounded-3xl bg-emerald-600 flex items-center justify-center text-7xl text-white">${i}</div><div class="text-5xl font-bold text-stone-900 mt-10">Point ${i}</div><div class="text-2xl text-stone-600 text-center mt-6">A concrete, specific lesson.</div></div>`;
+    });
+}
+
+function escapeHtml(value: string): string {
+    return value.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}
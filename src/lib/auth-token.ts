@@ -0,0 +1,205 @@
+/**
+ * Local Supabase access-token verification
+ * Used by src/middleware.ts so navigations and API calls don't each need an
+ * `auth.getUser()` round trip to Supabase Auth.
+ *
+ * - Asymmetric tokens (ES256 / RS256) are checked against the project's JWKS,
+ *   cached in memory and refetched when an unknown `kid` shows up (key
+ *   rotation)
+ * - Legacy HS256 tokens are checked with SUPABASE_JWT_SECRET when it is set
+ * - Tokens that can't be checked locally (HS256 without the secret, JWKS
+ *   unreachable) are reported as 'unsupported'; callers fall back to
+ *   `auth.getUser()`
+ * - exp / nbf / iat allow CLOCK_SKEW_SECONDS of drift between us and Auth
+ *
+ * Web Crypto only, so it runs in the middleware (edge) and Node runtimes.
+ */
+
+export const AUTH_USER_ID_HEADER = 'x-auth-user-id';
+export const AUTH_USER_EMAIL_HEADER = 'x-auth-user-email';
+
+const CLOCK_SKEW_SECONDS = 30;
+const JWKS_TTL_MS = 10 * 60 * 1000;
+// Don't hammer the JWKS endpoint with tokens carrying bogus key ids
+const JWKS_MIN_REFETCH_MS = 30 * 1000;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface TokenIdentity {
+    id: string;
+    email?: string;
+    /** Expiry, seconds since epoch */
+    exp: number;
+}
+
+export type TokenCheck =
+    | { valid: true; identity: TokenIdentity }
+    | { valid: false; reason: 'invalid' | 'expired' | 'unsupported' };
+
+interface Jwk extends JsonWebKey {
+    kid?: string;
+    alg?: string;
+}
+
+// ============================================
+// ENCODING
+// ============================================
+
+function base64UrlToBytes(value: string): Uint8Array<ArrayBuffer> {
+    const base64 = value.replace(/-/g, '+').replace(/_/g, '/').padEnd(Math.ceil(value.length / 4) * 4, '=');
+    const binary = atob(base64);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    return bytes;
+}
+
+function decodeSegment(value: string): any {
+    return JSON.parse(new TextDecoder().decode(base64UrlToBytes(value)));
+}
+
+// ============================================
+// KEYS
+// ============================================
+
+let jwks: { keys: Map<string, Jwk>; fetchedAt: number } | null = null;
+let jwksRequest: Promise<void> | null = null;
+const importedKeys = new Map<string, Promise<CryptoKey>>();
+
+function refreshJwks(): Promise<void> {
+    if (!jwksRequest) {
+        const url = `${process.env.NEXT_PUBLIC_SUPABASE_URL}/auth/v1/.well-known/jwks.json`;
+        jwksRequest = fetch(url)
+            .then(res => {
+                if (!res.ok) throw new Error(`JWKS request failed (${res.status})`);
+                return res.json();
+            })
+            .then((body: { keys?: Jwk[] }) => {
+                const keys = new Map<string, Jwk>();
+                for (const key of body.keys || []) {
+                    if (key.kid) keys.set(key.kid, key);
+                }
+                jwks = { keys, fetchedAt: Date.now() };
+            })
+            .finally(() => {
+                jwksRequest = null;
+            });
+    }
+    return jwksRequest;
+}
+
+async function findJwk(kid: string): Promise<Jwk | null> {
+    const age = jwks ? Date.now() - jwks.fetchedAt : Infinity;
+    const known = jwks?.keys.get(kid);
+    if (known && age < JWKS_TTL_MS) return known;
+
+    // Unknown kid (rotation) or stale cache
+    if (age >= JWKS_MIN_REFETCH_MS) {
+        try {
+            await refreshJwks();
+        } catch (error) {
+            // Keep trusting a key we already had if Auth is briefly unreachable
+            if (known) return known;
+            throw error;
+        }
+    }
+    return jwks?.keys.get(kid) || null;
+}
+
+function importJwk(jwk: Jwk, alg: string): Promise<CryptoKey> {
+    const cacheKey = `${jwk.kid}:${alg}`;
+    let key = importedKeys.get(cacheKey);
+    if (!key) {
+        const algorithm = alg === 'ES256'
+            ? { name: 'ECDSA', namedCurve: 'P-256' }
+            : { name: 'RSASSA-PKCS1-v1_5', hash: 'SHA-256' };
+        key = crypto.subtle.importKey('jwk', jwk, algorithm, false, ['verify']);
+        key.catch(() => importedKeys.delete(cacheKey));
+        importedKeys.set(cacheKey, key);
+    }
+    return key;
+}
+
+let hmacKey: Promise<CryptoKey> | null = null;
+
+function getHmacKey(secret: string): Promise<CryptoKey> {
+    if (!hmacKey) {
+        hmacKey = crypto.subtle.importKey(
+            'raw',
+            new TextEncoder().encode(secret),
+            { name: 'HMAC', hash: 'SHA-256' },
+            false,
+            ['verify']
+        );
+    }
+    return hmacKey;
+}
+
+// ============================================
+// VERIFICATION
+// ============================================
+
+async function verifySignature(header: { alg?: string; kid?: string }, signingInput: Uint8Array<ArrayBuffer>, signature: Uint8Array<ArrayBuffer>): Promise<boolean | null> {
+    switch (header.alg) {
+        case 'ES256':
+        case 'RS256': {
+            if (!header.kid) return false;
+            const jwk = await findJwk(header.kid);
+            if (!jwk) return false;
+            const key = await importJwk(jwk, header.alg);
+            const algorithm = header.alg === 'ES256' ? { name: 'ECDSA', hash: 'SHA-256' } : { name: 'RSASSA-PKCS1-v1_5' };
+            return crypto.subtle.verify(algorithm, key, signature, signingInput);
+        }
+        case 'HS256': {
+            const secret = process.env.SUPABASE_JWT_SECRET;
+            if (!secret) return null;
+            return crypto.subtle.verify('HMAC', await getHmacKey(secret), signature, signingInput);
+        }
+        default:
+            return false;
+    }
+}
+
+/** Verify a Supabase access token without calling Supabase Auth. */
+export async function verifyAccessToken(token: string): Promise<TokenCheck> {
+    const parts = token.split('.');
+    if (parts.length !== 3) return { valid: false, reason: 'invalid' };
+
+    let header: { alg?: string; kid?: string };
+    let claims: Record<string, any>;
+    try {
+        header = decodeSegment(parts[0]);
+        claims = decodeSegment(parts[1]);
+    } catch {
+        return { valid: false, reason: 'invalid' };
+    }
+
+    const signed = await verifySignature(
+        header,
+        new TextEncoder().encode(`${parts[0]}.${parts[1]}`),
+        base64UrlToBytes(parts[2])
+    ).catch(error => {
+        // Couldn't check (JWKS unreachable, key import failed): let the caller ask Auth
+        console.warn('[Auth Token] Signature check failed:', error);
+        return null;
+    });
+    if (signed === null) return { valid: false, reason: 'unsupported' };
+    if (!signed) return { valid: false, reason: 'invalid' };
+
+    const now = Math.floor(Date.now() / 1000);
+    if (typeof claims.exp !== 'number' || claims.exp + CLOCK_SKEW_SECONDS < now) {
+        return { valid: false, reason: 'expired' };
+    }
+    if ((typeof claims.nbf === 'number' && claims.nbf - CLOCK_SKEW_SECONDS > now) ||
+        (typeof claims.iat === 'number' && claims.iat - CLOCK_SKEW_SECONDS > now)) {
+        return { valid: false, reason: 'invalid' };
+    }
+
+    const audiences = Array.isArray(claims.aud) ? claims.aud : [claims.aud];
+    if (!claims.sub || claims.role !== 'authenticated' || !audiences.includes('authenticated')) {
+        return { valid: false, reason: 'invalid' };
+    }
+
+    return { valid: true, identity: { id: claims.sub, email: claims.email || undefined, exp: claims.exp } };
+}
@@ -0,0 +1,102 @@
+/**
+ * BlurHash encoder (https://blurha.sh)
+ * Encodes a small RGBA image into the compact placeholder string shown while
+ * the real image loads. Feed it a thumbnail (~32px); cost grows with pixels
+ * x components.
+ */
+
+const DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~';
+
+function encode83(value: number, length: number): string {
+    let result = '';
+    for (let i = 1; i <= length; i++) {
+        const digit = Math.floor(value / Math.pow(83, length - i)) % 83;
+        result += DIGITS[digit];
+    }
+    return result;
+}
+
+function sRGBToLinear(value: number): number {
+    const v = value / 255;
+    return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+}
+
+function linearTosRGB(value: number): number {
+    const v = Math.max(0, Math.min(1, value));
+    return v <= 0.0031308
+        ? Math.round(v * 12.92 * 255 + 0.5)
+        : Math.round((1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255 + 0.5);
+}
+
+function signPow(value: number, exp: number): number {
+    return Math.sign(value) * Math.pow(Math.abs(value), exp);
+}
+
+/**
+ * @param pixels RGBA, row-major, width * height * 4 bytes
+ * @param componentsX / componentsY detail level, 1-9 each
+ */
+export function encodeBlurhash(
+    pixels: Uint8Array | Uint8ClampedArray,
+    width: number,
+    height: number,
+    componentsX = 4,
+    componentsY = 3
+): string {
+    if (componentsX < 1 || componentsX > 9 || componentsY < 1 || componentsY > 9) {
+        throw new Error('BlurHash components must be between 1 and 9');
+    }
+    if (pixels.length < width * height * 4) {
+        throw new Error('Pixel buffer is smaller than width * height * 4');
+    }
+
+    // Linearize once instead of per component
+    const linear = new Float32Array(width * height * 3);
+    for (let p = 0, q = 0; p < width * height; p++, q += 3) {
+        linear[q] = sRGBToLinear(pixels[p * 4]);
+        linear[q + 1] = sRGBToLinear(pixels[p * 4 + 1]);
+        linear[q + 2] = sRGBToLinear(pixels[p * 4 + 2]);
+    }
+
+    const factors: [number, number, number][] = [];
+    for (let j = 0; j < componentsY; j++) {
+        for (let i = 0; i < componentsX; i++) {
+            const normalisation = i === 0 && j === 0 ? 1 : 2;
+            let r = 0, g = 0, b = 0;
+            for (let y = 0; y < height; y++) {
+                const basisY = Math.cos((Math.PI * j * y) / height);
+                for (let x = 0; x < width; x++) {
+                    const basis = normalisation * Math.cos((Math.PI * i * x) / width) * basisY;
+                    const q = (y * width + x) * 3;
+                    r += basis * linear[q];
+                    g += basis * linear[q + 1];
+                    b += basis * linear[q + 2];
+                }
+            }
+            const scale = 1 / (width * height);
+            factors.push([r * scale, g * scale, b * scale]);
+        }
+    }
+
+    const [dc, ...ac] = factors;
+    let hash = encode83(componentsX - 1 + (componentsY - 1) * 9, 1);
+
+    let maximumValue = 1;
+    if (ac.length > 0) {
+        const actualMax = Math.max(...ac.map(f => Math.max(Math.abs(f[0]), Math.abs(f[1]), Math.abs(f[2]))));
+        const quantisedMax = Math.floor(Math.max(0, Math.min(82, Math.floor(actualMax * 166 - 0.5))));
+        maximumValue = (quantisedMax + 1) / 166;
+        hash += encode83(quantisedMax, 1);
+    } else {
+        hash += encode83(0, 1);
+    }
+
+    hash += encode83((linearTosRGB(dc[0]) << 16) + (linearTosRGB(dc[1]) << 8) + linearTosRGB(dc[2]), 4);
+
+    for (const f of ac) {
+        const quant = (v: number) => Math.floor(Math.max(0, Math.min(18, Math.floor(signPow(v / maximumValue, 0.5) * 9 + 9.5))));
+        hash += encode83(quant(f[0]) * 19 * 19 + quant(f[1]) * 19 + quant(f[2]), 2);
+    }
+
+    return hash;
+}
@@ -0,0 +1,340 @@
+/**
+ * Server-side carousel rendering
+ * Turns `carousel_slides` HTML (Tailwind classes, see ai/carousel-styles.ts)
+ * into a PDF / slide PNGs in a headless Chromium.
+ *
+ * - One browser per warm instance, with a small pool of reusable pages
+ * - Slides rasterize in parallel across the pool
+ * - PDFs come straight from Chrome's print path, so text and shapes stay
+ *   vector instead of being 2x JPEG screenshots
+ * - Output is cached in Storage under a hash of the slide HTML, so the same
+ *   carousel is only ever rendered once
+ * - 'thumb' renders small slide previews for the dashboard, so list views
+ *   show images instead of mounting every slide's live HTML
+ *
+ * CHROME_EXECUTABLE_PATH points at a local Chrome for development; on Vercel
+ * the @sparticuz/chromium build is used.
+ */
+
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import path from 'path';
+import { SupabaseClient } from '@supabase/supabase-js';
+import type { Browser, Page } from 'puppeteer-core';
+
+export const CAROUSEL_EXPORT_BUCKET = 'carousel-exports';
+export const SLIDE_WIDTH = 1080;
+export const SLIDE_HEIGHT = 1350;
+
+// Bump when the document template changes so cached renders are rebuilt
+const RENDERER_VERSION = 1;
+const PAGE_POOL_SIZE = 4;
+const RENDER_TIMEOUT_MS = 20 * 1000;
+const SIGNED_URL_TTL_SECONDS = 60 * 60;
+// Thumbnails are shown at ~270px wide in the filmstrips and gallery
+const THUMB_SCALE = 0.25;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type CarouselExportFormat = 'pdf' | 'png' | 'thumb';
+
+export interface CarouselExport {
+    format: CarouselExportFormat;
+    hash: string;
+    cached: boolean;
+    /** Signed download URL(s): one PDF, or one PNG per slide (full size or thumbnail) */
+    urls: string[];
+}
+
+// ============================================
+// BROWSER POOL
+// ============================================
+
+let browserPromise: Promise<Browser> | null = null;
+const idlePages: Page[] = [];
+const pageWaiters: { resolve: (page: Page) => void; reject: (error: unknown) => void }[] = [];
+let openPages = 0;
+
+async function launchBrowser(): Promise<Browser> {
+    const puppeteer = (await import('puppeteer-core')).default;
+
+    if (process.env.CHROME_EXECUTABLE_PATH) {
+        return puppeteer.launch({
+            executablePath: process.env.CHROME_EXECUTABLE_PATH,
+            headless: true,
+            args: ['--no-sandbox', '--font-render-hinting=none'],
+        });
+    }
+
+    const chromium = (await import('@sparticuz/chromium')).default;
+    return puppeteer.launch({
+        executablePath: await chromium.executablePath(),
+        headless: true,
+        args: [...chromium.args, '--font-render-hinting=none'],
+    });
+}
+
+function getBrowser(): Promise<Browser> {
+    if (!browserPromise) {
+        browserPromise = launchBrowser().then(browser => {
+            browser.on('disconnected', () => {
+                browserPromise = null;
+                idlePages.length = 0;
+                openPages = 0;
+            });
+            return browser;
+        }).catch(error => {
+            browserPromise = null;
+            throw error;
+        });
+    }
+    return browserPromise;
+}
+
+async function createPage(): Promise<Page> {
+    const browser = await getBrowser();
+    const page = await browser.newPage();
+    await page.setViewport({ width: SLIDE_WIDTH, height: SLIDE_HEIGHT, deviceScaleFactor: 1 });
+
+    // Slide HTML is model output: no network access beyond images, fonts and stylesheets
+    await page.setRequestInterception(true);
+    page.on('request', request => {
+        const type = request.resourceType();
+        if (request.url().startsWith('data:') || (['image', 'font', 'stylesheet'].includes(type) && request.method() === 'GET')) {
+            request.continue();
+        } else {
+            request.abort();
+        }
+    });
+    return page;
+}
+
+async function openPage(): Promise<Page> {
+    openPages++;
+    try {
+        return await createPage();
+    } catch (error) {
+        openPages--;
+        throw error;
+    }
+}
+
+async function acquirePage(): Promise<Page> {
+    let idle = idlePages.pop();
+    while (idle && idle.isClosed()) {
+        openPages--;
+        idle = idlePages.pop();
+    }
+    if (idle) return idle;
+
+    if (openPages < PAGE_POOL_SIZE) return openPage();
+
+    return new Promise((resolve, reject) => pageWaiters.push({ resolve, reject }));
+}
+
+function releasePage(page: Page): void {
+    const waiter = pageWaiters.shift();
+
+    if (page.isClosed()) {
+        openPages = Math.max(0, openPages - 1);
+        // Hand the freed slot to whoever is waiting
+        if (waiter) openPage().then(waiter.resolve, waiter.reject);
+        return;
+    }
+
+    if (waiter) waiter.resolve(page);
+    else idlePages.push(page);
+}
+
+async function withPage<T>(task: (page: Page) => Promise<T>): Promise<T> {
+    const page = await acquirePage();
+    try {
+        return await task(page);
+    } catch (error) {
+        // A page that failed mid-render may be wedged; drop it rather than reuse it
+        await page.close().catch(() => {});
+        throw error;
+    } finally {
+        releasePage(page);
+    }
+}
+
+// ============================================
+// DOCUMENT
+// ============================================
+
+let tailwindRuntime: Promise<string> | null = null;
+
+/** Tailwind's browser build compiles whatever classes the slides use at render time. */
+function loadTailwindRuntime(): Promise<string> {
+    if (!tailwindRuntime) {
+        tailwindRuntime = fs.readFile(
+            path.join(process.cwd(), 'node_modules', '@tailwindcss', 'browser', 'dist', 'index.global.js'),
+            'utf8'
+        ).catch(error => {
+            tailwindRuntime = null;
+            throw error;
+        });
+    }
+    return tailwindRuntime;
+}
+
+export async function buildSlideDocument(slides: string[]): Promise<string> {
+    const runtime = await loadTailwindRuntime();
+    const sections = slides
+        .map((slide, i) => `<section class="slide" data-slide="${i}">${slide}</section>`)
+        .join('\n');
+
+    return `<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+    @page { size: ${SLIDE_WIDTH}px ${SLIDE_HEIGHT}px; margin: 0; }
+    html, body { margin: 0; padding: 0; background: #fff; }
+    .slide {
+        width: ${SLIDE_WIDTH}px;
+        height: ${SLIDE_HEIGHT}px;
+        overflow: hidden;
+        position: relative;
+        break-after: page;
+        -webkit-print-color-adjust: exact;
+        print-color-adjust: exact;
+    }
+    .slide:last-child { break-after: auto; }
+    .slide > * { width: 100%; height: 100%; }
+</style>
+<script>${runtime}</script>
+</head>
+<body>
+${sections}
+</body>
+</html>`;
+}
+
+async function loadSlides(page: Page, slides: string[]): Promise<void> {
+    await page.setContent(await buildSlideDocument(slides), {
+        waitUntil: 'networkidle0',
+        timeout: RENDER_TIMEOUT_MS,
+    });
+    // Tailwind's runtime injects its stylesheet asynchronously; let it land
+    await page.evaluate(() => document.fonts.ready.then(() => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))));
+}
+
+// ============================================
+// RENDERING
+// ============================================
+
+/** Render all slides into one vector PDF, one page per slide. */
+export async function renderCarouselPDF(slides: string[]): Promise<Buffer> {
+    return withPage(async page => {
+        await loadSlides(page, slides);
+        const pdf = await page.pdf({
+            width: `${SLIDE_WIDTH}px`,
+            height: `${SLIDE_HEIGHT}px`,
+            printBackground: true,
+            preferCSSPageSize: true,
+            timeout: RENDER_TIMEOUT_MS,
+        });
+        return Buffer.from(pdf);
+    });
+}
+
+/**
+ * Rasterize each slide to a PNG, spreading the slides across the page pool.
+ * `scale` < 1 produces downsampled previews.
+ */
+export async function renderSlideImages(slides: string[], scale = 1): Promise<Buffer[]> {
+    return Promise.all(slides.map(slide => withPage(async page => {
+        await loadSlides(page, [slide]);
+        const png = await page.screenshot({
+            type: 'png',
+            clip: { x: 0, y: 0, width: SLIDE_WIDTH, height: SLIDE_HEIGHT, scale },
+        });
+        return Buffer.from(png);
+    })));
+}
+
+// ============================================
+// CACHED EXPORT
+// ============================================
+
+export function carouselHash(slides: string[]): string {
+    return createHash('sha256')
+        .update(JSON.stringify({ v: RENDERER_VERSION, slides }))
+        .digest('hex')
+        .slice(0, 32);
+}
+
+function exportPaths(accountId: string, hash: string, format: CarouselExportFormat, slideCount: number): string[] {
+    if (format === 'pdf') return [`${accountId}/${hash}.pdf`];
+    const prefix = format === 'thumb' ? 'thumb' : 'slide';
+    return Array.from({ length: slideCount }, (_, i) => `${accountId}/${hash}/${prefix}-${String(i + 1).padStart(2, '0')}.png`);
+}
+
+function downloadName(filename: string, suffix: string): string {
+    return `${filename.replace(/[^a-z0-9]/gi, '_').toLowerCase() || 'carousel'}${suffix}`;
+}
+
+async function signPaths(
+    supabase: SupabaseClient,
+    paths: string[],
+    filename: string,
+    format: CarouselExportFormat
+): Promise<string[] | null> {
+    const urls: string[] = [];
+    for (let i = 0; i < paths.length; i++) {
+        const suffix = format === 'pdf' ? '.pdf' : `_${i + 1}.png`;
+        // Thumbnails are displayed inline, not downloaded
+        const options = format === 'thumb' ? undefined : { download: downloadName(filename, suffix) };
+        const { data, error } = await supabase.storage
+            .from(CAROUSEL_EXPORT_BUCKET)
+            .createSignedUrl(paths[i], SIGNED_URL_TTL_SECONDS, options);
+        // Signing fails for objects that don't exist yet -> cache miss
+        if (error || !data) return null;
+        urls.push(data.signedUrl);
+    }
+    return urls;
+}
+
+/**
+ * Export a carousel, rendering only when this exact slide HTML hasn't been
+ * rendered before. `supabase` must be able to write the export bucket.
+ */
+export async function exportCarousel(
+    supabase: SupabaseClient,
+    accountId: string,
+    slides: string[],
+    format: CarouselExportFormat,
+    filename: string
+): Promise<CarouselExport> {
+    const hash = carouselHash(slides);
+    const paths = exportPaths(accountId, hash, format, slides.length);
+
+    const cachedUrls = await signPaths(supabase, paths, filename, format);
+    if (cachedUrls) {
+        return { format, hash, cached: true, urls: cachedUrls };
+    }
+
+    const started = Date.now();
+    const files = format === 'pdf'
+        ? [await renderCarouselPDF(slides)]
+        : await renderSlideImages(slides, format === 'thumb' ? THUMB_SCALE : 1);
+    console.log(`[Carousel Render] ${format} ${hash} (${slides.length} slides) in ${Date.now() - started}ms`);
+
+    await Promise.all(files.map(async (file, i) => {
+        const { error } = await supabase.storage
+            .from(CAROUSEL_EXPORT_BUCKET)
+            .upload(paths[i], file, {
+                contentType: format === 'pdf' ? 'application/pdf' : 'image/png',
+                upsert: true,
+            });
+        if (error) throw new Error(`Failed to store carousel export: ${error.message}`);
+    }));
+
+    const urls = await signPaths(supabase, paths, filename, format);
+    if (!urls) throw new Error('Failed to sign carousel export URL');
+    return { format, hash, cached: false, urls };
+}
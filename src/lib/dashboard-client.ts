@@ -0,0 +1,42 @@
+/**
+ * Client side of /api/dashboard/bootstrap.
+ * The contexts and banners that used to fetch their own slices on mount all
+ * read from one shared request. Calls within DEDUPE_WINDOW_MS of each other
+ * share a response; pass `force` after a mutation to refetch.
+ */
+
+import type { DashboardBootstrap } from '@/lib/dashboard';
+
+export type DashboardBootstrapPayload = DashboardBootstrap & { user: { id: string; email: string } };
+
+const DEDUPE_WINDOW_MS = 5000;
+
+let pending: { promise: Promise<DashboardBootstrapPayload | null>; at: number } | null = null;
+
+async function fetchBootstrap(): Promise<DashboardBootstrapPayload | null> {
+    const res = await fetch('/api/dashboard/bootstrap', { cache: 'no-store' });
+    // Signed out / no dashboard yet: callers treat this as "nothing to show"
+    if (res.status === 401) return null;
+    if (!res.ok) throw new Error(`Dashboard bootstrap failed (${res.status})`);
+    return res.json();
+}
+
+export function loadDashboardBootstrap(options: { force?: boolean } = {}): Promise<DashboardBootstrapPayload | null> {
+    if (!options.force && pending && Date.now() - pending.at < DEDUPE_WINDOW_MS) {
+        return pending.promise;
+    }
+
+    const promise = fetchBootstrap();
+    const entry = { promise, at: Date.now() };
+    pending = entry;
+    // Don't hand a failed request to later callers
+    promise.catch(() => {
+        if (pending === entry) pending = null;
+    });
+    return promise;
+}
+
+/** Forget the shared response, e.g. on sign-out. */
+export function resetDashboardBootstrap(): void {
+    pending = null;
+}
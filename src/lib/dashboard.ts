@@ -0,0 +1,175 @@
+/**
+ * Dashboard Bootstrap
+ * Everything the dashboard shell needs on first paint, fetched in one round
+ * trip: account, profiles, week number, a page of posts, undismissed
+ * notifications, connection status and subscription.
+ *
+ * Previously AuthContext, PostContext (/api/profile then /api/posts),
+ * NotificationBanner and ConnectionStatusBanner each fetched on mount, partly
+ * in sequence. All queries here run in parallel with narrow projections.
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { getUserWeekNumber } from '@/lib/generation';
+import { resolveSubscription, SubscriptionSummary, SUBSCRIPTION_SUMMARY_COLUMNS } from '@/lib/subscription';
+
+// Most recent posts by scheduled date; covers today's queue and the upcoming weeks
+export const DASHBOARD_POSTS_PAGE_SIZE = 200;
+const NOTIFICATION_LIMIT = 5;
+// Connections not validated for this long are treated as needing a reconnect
+const CONNECTION_STALE_DAYS = 7;
+
+// Columns read by AuthContext (FounderProfile) and PostContext (UserProfile)
+const PROFILE_COLUMNS = [
+    'id', 'account_id', 'name', 'role', 'company_name', 'company_website', 'business_description',
+    'industry', 'target_audience', 'content_goal', 'weekly_goal', 'topics', 'cadence', 'tone',
+    'platforms', 'connections', 'auto_publish', 'context_data', 'awaiting_goal_input',
+    'next_generation_date', 'subscription_tier', 'voice_model_id', 'visual_lora_id',
+    'visual_training_status', 'avatar_urls', 'onboarding_status', 'onboarding_step', 'created_at',
+].join(', ');
+const POST_COLUMNS = 'id, profile_id, platform, content, format, status, scheduled_date, founder_profiles!inner(account_id)';
+const NOTIFICATION_COLUMNS = 'id, type, title, message, action_url, created_at, read_at';
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface ConnectionStatus {
+    expired: { platform: string; expired_at?: string }[];
+    active: string[];
+    total: number;
+}
+
+export interface DashboardBootstrap {
+    account: Record<string, any> | null;
+    profiles: Record<string, any>[];
+    weekNumber: number;
+    posts: Record<string, any>[];
+    hasMorePosts: boolean;
+    notifications: Record<string, any>[];
+    connections: ConnectionStatus;
+    subscription: SubscriptionSummary;
+}
+
+// ============================================
+// CONNECTIONS
+// ============================================
+
+/** Split social_connections rows into expired (needs reconnect) and active platforms. */
+export function classifyConnections(
+    connections: { platform: string; connection_status: string | null; token_expires_at: string | null; last_validated_at: string | null }[]
+): ConnectionStatus {
+    const now = new Date();
+    const expired: ConnectionStatus['expired'] = [];
+    const active: string[] = [];
+
+    for (const conn of connections) {
+        // Explicitly expired / revoked
+        if (conn.connection_status === 'expired' || conn.connection_status === 'revoked') {
+            expired.push({ platform: conn.platform, expired_at: conn.token_expires_at || undefined });
+            continue;
+        }
+
+        // Token past its expiry time
+        if (conn.token_expires_at && new Date(conn.token_expires_at) < now) {
+            expired.push({ platform: conn.platform, expired_at: conn.token_expires_at });
+            continue;
+        }
+
+        // Not validated for too long; catches tokens without an explicit expiry
+        if (conn.last_validated_at) {
+            const daysSinceValidation = (now.getTime() - new Date(conn.last_validated_at).getTime()) / (1000 * 60 * 60 * 24);
+            if (daysSinceValidation > CONNECTION_STALE_DAYS) {
+                expired.push({ platform: conn.platform });
+                continue;
+            }
+        }
+
+        active.push(conn.platform);
+    }
+
+    return { expired, active, total: connections.length };
+}
+
+// ============================================
+// LOADER
+// ============================================
+
+/**
+ * Load the bootstrap payload for `accountId`. `supabase` is the caller's
+ * RLS-scoped client; the week number uses the admin client internally.
+ */
+export async function loadDashboardBootstrap(supabase: SupabaseClient, accountId: string): Promise<DashboardBootstrap> {
+    const [
+        accountResult,
+        profilesResult,
+        weekNumber,
+        postsResult,
+        notificationsResult,
+        connectionsResult,
+        subscriptionResult,
+    ] = await Promise.all([
+        supabase
+            .from('accounts')
+            .select('id, email, plan_tier, created_at')
+            .eq('id', accountId)
+            .maybeSingle(),
+        supabase
+            .from('founder_profiles')
+            .select(PROFILE_COLUMNS)
+            .eq('account_id', accountId)
+            .order('created_at', { ascending: true }),
+        getUserWeekNumber(accountId).catch(() => 1),
+        supabase
+            .from('posts')
+            .select(POST_COLUMNS)
+            .eq('founder_profiles.account_id', accountId)
+            .order('scheduled_date', { ascending: false })
+            .limit(DASHBOARD_POSTS_PAGE_SIZE + 1),
+        supabase
+            .from('notifications')
+            .select(NOTIFICATION_COLUMNS)
+            .eq('account_id', accountId)
+            .is('dismissed_at', null)
+            .order('created_at', { ascending: false })
+            .limit(NOTIFICATION_LIMIT),
+        supabase
+            .from('social_connections')
+            .select('platform, connection_status, token_expires_at, last_validated_at')
+            .eq('user_id', accountId),
+        supabase
+            .from('subscriptions')
+            .select(SUBSCRIPTION_SUMMARY_COLUMNS)
+            .eq('account_id', accountId)
+            .maybeSingle(),
+    ]);
+
+    // Profiles and posts are the dashboard; the rest degrade to empty
+    if (profilesResult.error) {
+        throw new Error(`Failed to fetch profiles: ${profilesResult.error.message}`);
+    }
+    if (postsResult.error) {
+        throw new Error(`Failed to fetch posts: ${postsResult.error.message}`);
+    }
+
+    const profiles = (profilesResult.data || []) as Record<string, any>[];
+    const page = (postsResult.data || []) as Record<string, any>[];
+    const hasMorePosts = page.length > DASHBOARD_POSTS_PAGE_SIZE;
+    // Newest page, returned oldest-first like /api/posts
+    const posts = page
+        .slice(0, DASHBOARD_POSTS_PAGE_SIZE)
+        .reverse()
+        .map(({ founder_profiles, ...post }) => post);
+
+    return {
+        account: accountResult.data || null,
+        profiles,
+        weekNumber,
+        posts,
+        hasMorePosts,
+        notifications: notificationsResult.data || [],
+        connections: classifyConnections(connectionsResult.data || []),
+        // Same fallback as /api/subscription: newest profile's tier
+        subscription: resolveSubscription(subscriptionResult.data, profiles[profiles.length - 1]?.subscription_tier),
+    };
+}
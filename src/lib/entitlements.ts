@@ -0,0 +1,144 @@
+/**
+ * Entitlements
+ * One place that answers "what is this account allowed to do".
+ *
+ *   memory (per instance, 30s)  ->  get_entitlements() RPC
+ *
+ * The effective tier is the profile's subscription_tier: the Stripe queue
+ * applies upgrades there immediately and defers downgrades to the period
+ * end. Premium routes call requireFeature(); a cache hit costs nothing, a
+ * miss is a single RPC.
+ *
+ * Anything that changes a tier calls invalidateEntitlements(). Each account
+ * has a version counter, so a lookup that started before an invalidation
+ * can't write its stale result back into the cache. Other instances pick up
+ * the change when their entry expires.
+ */
+
+import { NextResponse } from 'next/server';
+import {
+    SubscriptionTier,
+    TierCheckResult,
+    canCreateCarousel,
+    canCreateOnDemandCarousel,
+    canUseFaceClone,
+    canUseFacelessVisuals,
+    canUseNewsJacking,
+    createAdminSupabaseClient,
+    getTierLimits,
+    parseTier,
+} from '@/lib/subscription';
+
+const MEMORY_TTL_MS = 30 * 1000;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type Feature = 'carousels' | 'onDemandCarousels' | 'facelessVisuals' | 'faceClone' | 'newsJacking';
+
+export interface Entitlements {
+    tier: SubscriptionTier;
+    limits: ReturnType<typeof getTierLimits>;
+    /** Paid access beyond the free first week (generation/start) */
+    hasPaidAccess: boolean;
+}
+
+const FEATURE_CHECKS: Record<Feature, (tier: SubscriptionTier) => TierCheckResult> = {
+    carousels: canCreateCarousel,
+    onDemandCarousels: canCreateOnDemandCarousel,
+    facelessVisuals: canUseFacelessVisuals,
+    faceClone: canUseFaceClone,
+    newsJacking: canUseNewsJacking,
+};
+
+// ============================================
+// CACHE
+// ============================================
+
+const cache = new Map<string, { value: Entitlements; expiresAt: number }>();
+const inflight = new Map<string, Promise<Entitlements>>();
+const versions = new Map<string, number>();
+
+/** Drop an account's cached entitlements after its tier or subscription changes. */
+export function invalidateEntitlements(accountId: string): void {
+    versions.set(accountId, (versions.get(accountId) || 0) + 1);
+    cache.delete(accountId);
+    inflight.delete(accountId);
+}
+
+function computeEntitlements(row: {
+    tier: string | null;
+    subscription_status: string | null;
+    current_period_end: string | null;
+    cancel_at_period_end: boolean;
+} | null): Entitlements {
+    const tier = parseTier(row?.tier);
+    const periodOpen = !!row?.current_period_end && new Date(row.current_period_end) > new Date();
+
+    // Active/trialing, or canceled / cancelling but still inside the paid period,
+    // or a paid tier on the profile (accounts set up outside Stripe)
+    const hasPaidAccess =
+        ['active', 'trialing'].includes(row?.subscription_status || '') ||
+        ((row?.subscription_status === 'canceled' || !!row?.cancel_at_period_end) && periodOpen) ||
+        tier !== 'starter';
+
+    return { tier, limits: getTierLimits(tier), hasPaidAccess };
+}
+
+async function loadEntitlements(accountId: string): Promise<Entitlements> {
+    const { data, error } = await createAdminSupabaseClient()
+        .rpc('get_entitlements', { p_account_id: accountId })
+        .maybeSingle();
+
+    if (error) throw new Error(`Failed to load entitlements: ${error.message}`);
+    return computeEntitlements(data);
+}
+
+export async function getEntitlements(accountId: string): Promise<Entitlements> {
+    const cached = cache.get(accountId);
+    if (cached && cached.expiresAt > Date.now()) return cached.value;
+
+    let pending = inflight.get(accountId);
+    if (!pending) {
+        const version = versions.get(accountId) || 0;
+        const request = loadEntitlements(accountId)
+            .then(value => {
+                // Only cache if nothing invalidated the account while we were loading
+                if ((versions.get(accountId) || 0) === version) {
+                    cache.set(accountId, { value, expiresAt: Date.now() + MEMORY_TTL_MS });
+                }
+                return value;
+            })
+            .finally(() => {
+                if (inflight.get(accountId) === request) inflight.delete(accountId);
+            });
+        pending = request;
+        inflight.set(accountId, request);
+    }
+    return pending;
+}
+
+// ============================================
+// GATE
+// ============================================
+
+/**
+ * Tier gate for route handlers. Returns null when allowed, otherwise the 403
+ * response to send:
+ *
+ *     const denied = await requireFeature(user.id, 'newsJacking');
+ *     if (denied) return denied;
+ */
+export async function requireFeature(accountId: string, feature: Feature): Promise<NextResponse | null> {
+    const { tier } = await getEntitlements(accountId);
+    const check = FEATURE_CHECKS[feature](tier);
+    if (check.allowed) return null;
+
+    return NextResponse.json({
+        error: check.reason,
+        code: 'UPGRADE_REQUIRED',
+        requiredTier: check.requiredTier,
+        upgradeUrl: check.upgradeUrl,
+    }, { status: 403 });
+}
@@ -4,67 +4,18 @@
  *
  * Flow:
  *   1. Strategy call (sync) — generates ideas for text posts + carousels
- *   2. Batch call — submits all text post + carousel requests to Anthropic Batch API
- *   3. Poll — waits for batch completion, then saves results to DB
+ *   2. Content calls — one request for all text posts, plus one streamed
+ *      request per carousel (see ai/carousel-generator.ts), all in parallel
+ *   3. Save results to DB
  */
 
 import { getProvider } from '@/lib/ai/providers';
 import { createClient } from '@supabase/supabase-js';
-import { generateCarouselSlides } from '@/lib/ai/carousel-generator';
-import { getCarouselStyle, getDefaultStyle } from '@/lib/ai/carousel-styles';
-import dJSON from 'dirty-json';
+import { CarouselMetrics, generateCarouselSlides, generateCarousels } from '@/lib/ai/carousel-generator';
+import { robustJsonParse } from '@/lib/ai/json';
+import { getUsage } from '@/lib/usage';
 
-/**
- * Robust JSON parser that tries native JSON.parse first,
- * then dirty-json, then regex extraction as a last resort.
- */
-export function robustJsonParse(raw: string): any {
-    // Step 1: Clean up common AI artifacts
-    let cleaned = raw
-        .replace(/```json\n?|\n?```/g, '')
-        .replace(/[\u201C\u201D]/g, '"')
-        .replace(/[\u2018\u2019]/g, "'")
-        .trim();
-
-    // Step 2: Extract the JSON object
-    const firstBrace = cleaned.indexOf('{');
-    const lastBrace = cleaned.lastIndexOf('}');
-    if (firstBrace !== -1 && lastBrace > firstBrace) {
-        cleaned = cleaned.substring(firstBrace, lastBrace + 1);
-    }
-
-    // Step 3: Fix trailing commas
-    cleaned = cleaned.replace(/,\s*([\]}])/g, '$1');
-
-    // Step 4: Fix double-double-quote keys like ""posts":
-    cleaned = cleaned.replace(/""(posts|carousels|content|hooks|cta|index|slides)":/g, '"$1":');
-
-    // Step 5: Try native JSON.parse
-    try {
-        return JSON.parse(cleaned);
-    } catch (nativeErr) {
-        console.warn('[robustJsonParse] Native JSON.parse failed, trying dirty-json...');
-    }
-
-    // Step 6: Try dirty-json
-    try {
-        return dJSON.parse(cleaned);
-    } catch (dirtyErr) {
-        console.warn('[robustJsonParse] dirty-json failed, trying newline escape repair...');
-    }
-
-    // Step 7: Try fixing unescaped newlines inside string values
-    try {
-        const repaired = cleaned.replace(
-            /"(?:[^"\\]|\\.)*"/g,
-            (match) => match.replace(/\n/g, '\\n').replace(/\t/g, '\\t')
-        );
-        return JSON.parse(repaired);
-    } catch (repairErr) {
-        console.error('[robustJsonParse] All parse attempts failed.');
-        throw repairErr;
-    }
-}
+export { robustJsonParse };
 
 // ============================================
 // TYPES
@@ -351,14 +302,29 @@ async function archiveOldPosts(supabase: any, profileId: string): Promise<number
 export interface GeneratedCarouselPost {
     day: string;
     topic: string;
-    slides: string[];
+    slides: string[];            // empty when generation failed outright
     styleId: string;
+    complete: boolean;
+    metrics: CarouselMetrics | null;
+}
+
+/** Post columns for a generated carousel; failed ones are saved empty so they can be regenerated. */
+export function carouselPostFields(carousel: GeneratedCarouselPost) {
+    const generated = carousel.slides.length > 0;
+    return {
+        content: generated
+            ? `📊 Carousel: ${carousel.topic} (${carousel.slides.length} slides)`
+            : `📊 Carousel: ${carousel.topic} (generation failed — regenerate to retry)`,
+        carousel_slides: generated ? carousel.slides : null,
+        carousel_style: carousel.styleId,
+        carousel_meta: carousel.metrics ? { ...carousel.metrics, complete: carousel.complete } : null,
+    };
 }
 
 /**
- * Generates ALL content with just 2 parallel API calls:
+ * Generates ALL content in parallel:
  *   Request 1 → all text posts (12) in a single prompt
- *   Request 2 → both carousels (2) in a single prompt
+ *   Requests 2+ → one streamed request per carousel, validated slide by slide
  *
  * Fired simultaneously via Promise.all for maximum speed.
  */
@@ -540,7 +506,7 @@ The "posts" array must have exactly ${textSchedule.length} items, one per post,
         }
     };
 
-    // ── REQUEST 2: Both carousels in one call ──
+    // ── REQUEST 2+: One streamed request per carousel, run concurrently ──
     const generateAllCarousels = async (): Promise<GeneratedCarouselPost[]> => {
         console.log(`[Generation] generateAllCarousels called with ${carouselIdeas.length} ideas:`, JSON.stringify(carouselIdeas));
         if (carouselIdeas.length === 0) {
@@ -549,120 +515,44 @@ The "posts" array must have exactly ${textSchedule.length} items, one per post,
         }
 
         const carouselStyleId = (profile as any).style_carousel || 'minimal-stone';
-        const style = carouselStyleId ? getCarouselStyle(carouselStyleId) : getDefaultStyle();
-
-        if (!style || !style.prompt) {
-            console.warn('[Generation] No carousel style found, skipping carousels');
-            return [];
-        }
-
-        // Build a combined prompt for ALL carousels
-        const carouselSpecs = carouselIdeas.map((c, i) => {
-            const numberMatch = c.topic.match(
-                /\b(top\s*)?(\d+)\s*(things?|tips?|ways?|habits?|books?|tools?|ideas?|steps?|reasons?|secrets?|hacks?|strategies?|mistakes?|rules?|principles?|lessons?|facts?|myths?)?/i
-            );
-            let slideCount = 6;
-            if (numberMatch && numberMatch[2]) {
-                const num = parseInt(numberMatch[2]);
-                if (num >= 3 && num <= 15) {
-                    slideCount = num + 2;
-                }
-            }
-            return { index: i, topic: c.topic, slideCount };
-        });
-
         const brandColors = profile.brand_colors || {
             primary: '#10B981',
             background: '#09090B',
             accent: '#F59E0B'
         };
-
-        const brandColorsInstruction = `BRAND COLORS (CRITICAL):
-Primary Color: ${brandColors.primary} (Use for buttons, main icons, key highlights)
-Background Color: ${brandColors.background} (Use for the main slide canvas background)
-Accent Color: ${brandColors.accent} (Use for secondary highlights, checks, small pops of color)
-
-When generating the HTML/Tailwind:
-1. Always set the main container's background to ${brandColors.background} using inline style: style="background-color: ${brandColors.background}"
-2. Use ${brandColors.primary} for the most important visual elements.
-3. Use ${brandColors.accent} for decoration.
-4. Ensure text remains readable (use white or black text depending on ${brandColors.background} brightness).`;
-
-        let systemPrompt = style.prompt.replace('[BRAND_COLORS_INSTRUCTION]', brandColorsInstruction);
-
-        // Add multi-carousel instructions
-        systemPrompt += `
-
-MULTI-CAROUSEL INSTRUCTIONS:
-You must generate ${carouselIdeas.length} separate carousels in one response.
-
-STRATEGIC CONTEXT:
-${profile.strategy_brief || 'No strategy brief provided.'}
-
-USER CONTEXT:
-${likedExamples.length > 0 ? `PAST SUCCESSFUL CONTENT:
-${likedExamples.filter(ex => ex.format === 'carousel').map((ex, i) => `EXAMPLE ${i + 1}:\n"${ex.content}"`).join('\n\n')}` : ''}`;
-
-        if (profile.industry) systemPrompt += `\n- Industry: ${profile.industry}`;
-        if (profile.role) systemPrompt += `\n- Role: ${profile.role}`;
-        if (profile.company_name) systemPrompt += `\n- Company: ${profile.company_name}`;
-        if (profile.target_audience) systemPrompt += `\n- Audience: ${profile.target_audience}`;
-
-        systemPrompt += `
-
-Return ONLY a valid JSON object:
-{
-    "carousels": [
-        {
-            "index": 0,
-            "slides": ["<div>...</div>", "<div>...</div>"]
-        }
-    ]
-}
-
-Each carousel must have exactly the specified number of slides.`;
-
-        const userMessage = carouselSpecs.map(c =>
-            `Carousel ${c.index}: "${c.topic}" — ${c.slideCount} slides`
-        ).join('\n');
-
-        try {
-            console.log(`[Generation] Generating ${carouselIdeas.length} carousels in a single request...`);
-            const result = await provider.complete({
-                messages: [
-                    { role: 'system', content: systemPrompt },
-                    { role: 'user', content: `Create these carousels:\n${userMessage}` }
-                ],
-                temperature: 0.7,
-                responseFormat: { type: 'json_object' },
-            });
-
-            // Parse response with robust parser
-            const data = robustJsonParse(result.content);
-
-            const carouselResults: GeneratedCarouselPost[] = [];
-            const generatedCarousels: Array<{ index: number; slides: string[] }> = data.carousels || [];
-
-            for (let i = 0; i < carouselIdeas.length; i++) {
-                const generated = generatedCarousels.find(c => c.index === i) || generatedCarousels[i];
-                if (generated?.slides && generated.slides.length > 0) {
-                    carouselResults.push({
-                        day: carouselIdeas[i].day,
-                        topic: carouselIdeas[i].topic,
-                        slides: generated.slides,
-                        styleId: carouselStyleId,
-                    });
-                    console.log(`[Generation] Carousel ${i} parsed: ${generated.slides.length} slides`);
-                } else {
-                    console.error(`[Generation] Carousel ${i} returned no slides`);
-                }
-            }
-
-            return carouselResults;
-        } catch (e) {
-            console.error('[Generation] Bulk carousel generation failed:', e);
-            return [];
-        }
+        const examples = likedExamples.filter(ex => ex.format === 'carousel').map(ex => ex.content);
+
+        console.log(`[Generation] Generating ${carouselIdeas.length} carousels concurrently...`);
+        const results = await generateCarousels(carouselIdeas.map(idea => ({
+            topic: idea.topic,
+            styleId: carouselStyleId,
+            brandColors,
+            strategyBrief: profile.strategy_brief || 'No strategy brief provided.',
+            examples,
+            userContext: {
+                industry: profile.industry,
+                targetAudience: profile.target_audience,
+                role: profile.role,
+                companyName: profile.company_name,
+            },
+            // Same provider as the text posts, as before carousels were split out
+            provider,
+        })));
+
+        // Failed and partial carousels are still returned so they get saved
+        // (and can be regenerated from the dashboard) instead of vanishing
+        return carouselIdeas.map((idea, i) => {
+            const result = results[i];
+            console.log(`[Generation] Carousel ${i}: ${result ? `${result.slides.length} slides${result.complete ? '' : ' (partial)'}` : 'failed'}`);
+            return {
+                day: idea.day,
+                topic: idea.topic,
+                slides: result?.slides || [],
+                styleId: result?.styleId || carouselStyleId,
+                complete: result?.complete ?? false,
+                metrics: result?.metrics ?? null,
+            };
+        });
     };
 
     // ── Fire both requests in parallel ──
@@ -962,15 +852,13 @@ async function saveCarouselsToDatabase(
             generation_id: generationId,
             platform: 'linkedin',
             scheduled_date: scheduledDate.toISOString(),
-            content: `📊 Carousel: ${carousel.topic} (${carousel.slides.length} slides)`,
             topic: carousel.topic,
             hooks: [],
             selected_hook: '',
             cta: null,
             format: 'carousel',
             status: 'scheduled',
-            carousel_slides: carousel.slides,
-            carousel_style: carousel.styleId,
+            ...carouselPostFields(carousel),
         };
     });
 
@@ -1061,21 +949,16 @@ export async function checkSubscriptionActive(accountId: string): Promise<boolea
 export async function getUserWeekNumber(accountId: string): Promise<number> {
     const supabase = createAdminClient();
 
-    // Source 1: Count completed content_generations rows
-    const { count, error } = await supabase
-        .from('content_generations')
-        .select('*', { count: 'exact', head: true })
-        .eq('account_id', accountId)
-        .eq('status', 'completed');
-
-    const generationsCount = error ? 0 : (count || 0);
-
-    // Source 2: Check profile's generation_count (set by onboarding flow)
-    const { data: profile } = await supabase
-        .from('founder_profiles')
-        .select('generation_count')
-        .eq('account_id', accountId)
-        .single();
+    // Source 1: completed content_generations (usage counter, kept by trigger)
+    // Source 2: profile's generation_count (set by onboarding flow)
+    const [generationsCount, { data: profile }] = await Promise.all([
+        getUsage(supabase, accountId, 'generations').catch(() => 0),
+        supabase
+            .from('founder_profiles')
+            .select('generation_count')
+            .eq('account_id', accountId)
+            .single(),
+    ]);
 
     const profileCount = (profile as any)?.generation_count || 0;
 
@@ -1133,7 +1016,7 @@ export async function generateSinglePost(postId: string): Promise<{ success: boo
     if (post.format === 'carousel') {
         try {
             console.log(`[SingleGen] Generating CAROUSEL for post ${postId}`);
-            const { slides, styleId } = await generateCarouselSlides({
+            const { slides, styleId, complete, metrics } = await generateCarouselSlides({
                 topic: post.topic || 'Industry insight',
                 styleId: profile.style_carousel || 'minimal-stone', // Use user's preferred style
                 userContext: {
@@ -1151,6 +1034,7 @@ export async function generateSinglePost(postId: string): Promise<{ success: boo
                     content: `📊 Carousel: ${post.topic || 'Industry Insight'} (${slides.length} slides)`,
                     carousel_slides: slides,
                     carousel_style: styleId,
+                    carousel_meta: { ...metrics, complete },
                     status: 'scheduled',
                     updated_at: new Date().toISOString(),
                 })
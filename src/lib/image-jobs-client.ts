@@ -0,0 +1,39 @@
+/**
+ * Client side of the image generation jobs (src/lib/image-jobs.ts).
+ * The generate routes answer with a job id straight away; this follows the
+ * job until fal's render has been applied.
+ */
+
+const POLL_INTERVAL_MS = 2000;
+// A little past the server-side job timeout, which fails the job itself
+const MAX_WAIT_MS = 11 * 60 * 1000;
+
+export interface ImageJobResult {
+    jobId: string;
+    status: 'queued' | 'completed' | 'failed';
+    imageUrl: string | null;
+    error: string | null;
+}
+
+/** Resolves with the image URL once the job completes; throws if it fails. */
+export async function waitForImageJob(job: ImageJobResult): Promise<string> {
+    const deadline = Date.now() + MAX_WAIT_MS;
+    let current = job;
+
+    while (current.status === 'queued') {
+        if (Date.now() > deadline) throw new Error('Image generation is taking too long. Please try again.');
+        await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+
+        const res = await fetch(`/api/visuals/jobs/${job.jobId}`, { cache: 'no-store' });
+        if (!res.ok) {
+            const errorData = await res.json().catch(() => ({}));
+            throw new Error(errorData.error || 'Lost track of your image');
+        }
+        current = await res.json();
+    }
+
+    if (current.status === 'failed' || !current.imageUrl) {
+        throw new Error(current.error || 'Failed to generate image');
+    }
+    return current.imageUrl;
+}
@@ -0,0 +1,311 @@
+/**
+ * Image Generation Jobs
+ * fal.ai renders go through fal's queue instead of holding the request open
+ * with fal.subscribe():
+ *
+ *   route -> submitImageJob() -> { jobId }           (returns immediately)
+ *   fal   -> /api/visuals/webhook -> completeImageJob()
+ *   client polls /api/visuals/jobs/[id]; refreshImageJob() asks fal directly
+ *   when the webhook is late or can't reach us (local dev)
+ *
+ * - the idempotency key (profile, post, model, styled prompt, aspect ratio,
+ *   references) is unique among queued jobs, so a double click joins the
+ *   render already in flight instead of paying for a second one
+ * - completion is compare-and-set on status, so a webhook retry racing the
+ *   polling fallback applies the result once
+ * - post renders are copied into our storage (persistPostImage) and written
+ *   to the post, which the dashboard picks up over realtime
+ *
+ * FAL_QUEUE_BASE_URL points the queue at the local stand-in
+ * (testsprite_tests/api_standins.py) for tests.
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { createHash, createHmac, timingSafeEqual } from 'crypto';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+import { persistPostImage } from '@/lib/media';
+
+const FAL_QUEUE_URL = 'https://queue.fal.run';
+// Webhooks normally land within seconds; only then ask fal ourselves
+const STATUS_CHECK_AFTER_MS = 15 * 1000;
+const JOB_TIMEOUT_MS = 10 * 60 * 1000;
+
+export const IMAGE_MODELS = {
+    faceless: 'fal-ai/gemini-25-flash-image',
+    digital_twin: 'fal-ai/gemini-25-flash-image/edit',
+} as const;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type ImageMode = keyof typeof IMAGE_MODELS;
+export type ImageJobStatus = 'queued' | 'completed' | 'failed';
+
+export interface ImageJob {
+    id: string;
+    account_id: string;
+    profile_id: string;
+    post_id: string | null;
+    mode: ImageMode;
+    model: string;
+    status: ImageJobStatus;
+    fal_request_id: string | null;
+    status_url: string | null;
+    response_url: string | null;
+    image_url: string | null;
+    error: string | null;
+    created_at: string;
+}
+
+export interface ImageJobRequest {
+    accountId: string;
+    profileId: string;
+    postId?: string | null;
+    mode: ImageMode;
+    input: {
+        prompt: string;
+        aspect_ratio: string;
+        image_urls?: string[];
+        output_format: 'png';
+    };
+}
+
+export type FalOutcome =
+    | { ok: true; payload: any }
+    | { ok: false; error: string };
+
+const JOB_FIELDS = 'id, account_id, profile_id, post_id, mode, model, status, fal_request_id, status_url, response_url, image_url, error, created_at';
+
+// ============================================
+// FAL QUEUE
+// ============================================
+
+function queueBase(): string {
+    return (process.env.FAL_QUEUE_BASE_URL || FAL_QUEUE_URL).replace(/\/$/, '');
+}
+
+function falHeaders(): Record<string, string> {
+    return {
+        Authorization: `Key ${process.env.FAL_KEY}`,
+        'Content-Type': 'application/json',
+    };
+}
+
+function webhookSecret(): string {
+    const secret = process.env.FAL_WEBHOOK_SECRET || process.env.CRON_SECRET;
+    if (!secret) throw new Error('FAL_WEBHOOK_SECRET is not configured');
+    return secret;
+}
+
+function webhookToken(jobId: string): string {
+    return createHmac('sha256', webhookSecret()).update(jobId).digest('hex');
+}
+
+/** The webhook URL carries the job id and an HMAC of it, so only fal's callback for this job is accepted. */
+export function verifyWebhookToken(jobId: string, token: string): boolean {
+    const expected = Buffer.from(webhookToken(jobId));
+    const given = Buffer.from(token);
+    return expected.length === given.length && timingSafeEqual(expected, given);
+}
+
+function webhookUrl(jobId: string): string {
+    const appUrl = process.env.NEXT_PUBLIC_APP_URL || 'http://localhost:3000';
+    return `${appUrl}/api/visuals/webhook?job=${jobId}&token=${webhookToken(jobId)}`;
+}
+
+function falError(body: any, status: number, fallback: string): string {
+    const detail = Array.isArray(body?.detail) ? body.detail[0]?.msg : body?.detail;
+    return typeof detail === 'string' && detail ? detail : `${fallback} (${status})`;
+}
+
+export function imageJobKey(request: ImageJobRequest): string {
+    const { prompt, aspect_ratio, image_urls = [] } = request.input;
+    return createHash('sha256')
+        .update(JSON.stringify([request.profileId, request.postId || null, IMAGE_MODELS[request.mode], prompt, aspect_ratio, image_urls]))
+        .digest('hex');
+}
+
+/** First image URL in a fal output payload (shape differs slightly across models). */
+export function extractImageUrl(payload: any): string | null {
+    const output = payload?.data || payload;
+    return output?.images?.[0]?.url || output?.image?.url || null;
+}
+
+// ============================================
+// SUBMISSION
+// ============================================
+
+/**
+ * Queue a render. Returns the existing job when one with the same
+ * idempotency key is already in flight.
+ */
+export async function submitImageJob(request: ImageJobRequest): Promise<{ job: ImageJob; deduped: boolean }> {
+    const supabase = createAdminSupabaseClient();
+    const model = IMAGE_MODELS[request.mode];
+    const idempotencyKey = imageJobKey(request);
+
+    const { data: created, error } = await supabase
+        .from('image_jobs')
+        .insert({
+            account_id: request.accountId,
+            profile_id: request.profileId,
+            post_id: request.postId || null,
+            mode: request.mode,
+            model,
+            input: request.input,
+            idempotency_key: idempotencyKey,
+        })
+        .select(JOB_FIELDS)
+        .single();
+
+    if (error) {
+        // Unique violation on idx_image_jobs_inflight: join the queued job
+        if (error.code === '23505') {
+            const { data: existing } = await supabase
+                .from('image_jobs')
+                .select(JOB_FIELDS)
+                .eq('idempotency_key', idempotencyKey)
+                .eq('status', 'queued')
+                .maybeSingle();
+            if (existing) return { job: existing as ImageJob, deduped: true };
+        }
+        throw new Error(`Failed to create image job: ${error.message}`);
+    }
+
+    const job = created as ImageJob;
+
+    try {
+        const response = await fetch(
+            `${queueBase()}/${model}?fal_webhook=${encodeURIComponent(webhookUrl(job.id))}`,
+            { method: 'POST', headers: falHeaders(), body: JSON.stringify(request.input) }
+        );
+        const body = await response.json().catch(() => ({}));
+        if (!response.ok || !body.request_id) {
+            throw new Error(falError(body, response.status, 'fal queue submit failed'));
+        }
+
+        const queued = {
+            fal_request_id: body.request_id as string,
+            status_url: (body.status_url as string) || null,
+            response_url: (body.response_url as string) || null,
+        };
+        await supabase.from('image_jobs').update(queued).eq('id', job.id);
+        return { job: { ...job, ...queued }, deduped: false };
+    } catch (submitError) {
+        const message = submitError instanceof Error ? submitError.message : String(submitError);
+        await supabase
+            .from('image_jobs')
+            .update({ status: 'failed', error: message, completed_at: new Date().toISOString() })
+            .eq('id', job.id);
+        throw submitError;
+    }
+}
+
+// ============================================
+// COMPLETION
+// ============================================
+
+/** Apply fal's result to a job (and its post). Safe to call more than once. */
+export async function completeImageJob(job: ImageJob, outcome: FalOutcome, supabase: SupabaseClient = createAdminSupabaseClient()): Promise<ImageJob> {
+    if (job.status !== 'queued') return job;
+
+    const generatedUrl = outcome.ok ? extractImageUrl(outcome.payload) : null;
+    if (!generatedUrl) {
+        const message = outcome.ok ? 'fal returned no image' : outcome.error;
+        console.warn(`[Image Jobs] ${job.id} failed: ${message}`);
+        const { data } = await supabase
+            .from('image_jobs')
+            .update({ status: 'failed', error: message, completed_at: new Date().toISOString() })
+            .eq('id', job.id)
+            .eq('status', 'queued')
+            .select(JOB_FIELDS)
+            .maybeSingle();
+        return (data as ImageJob) || job;
+    }
+
+    // Copy the image into our own storage once, so publishing and retries
+    // stream it from there instead of re-fetching fal's CDN URL
+    let imageUrl = generatedUrl;
+    let imageStoragePath: string | null = null;
+    if (job.post_id) {
+        try {
+            const stored = await persistPostImage(supabase, generatedUrl, job.account_id, job.post_id);
+            imageUrl = stored.publicUrl;
+            imageStoragePath = stored.path;
+        } catch (storeError) {
+            console.warn('[Image Jobs] Falling back to fal URL:', storeError);
+        }
+    }
+
+    const completedAt = new Date().toISOString();
+    const { data: won } = await supabase
+        .from('image_jobs')
+        .update({ status: 'completed', image_url: imageUrl, image_storage_path: imageStoragePath, completed_at: completedAt })
+        .eq('id', job.id)
+        .eq('status', 'queued')
+        .select(JOB_FIELDS)
+        .maybeSingle();
+
+    // Someone else (webhook retry / poll) already applied it
+    if (!won) {
+        const { data: current } = await supabase.from('image_jobs').select(JOB_FIELDS).eq('id', job.id).maybeSingle();
+        return (current as ImageJob) || job;
+    }
+
+    if (job.post_id) {
+        const { error } = await supabase
+            .from('posts')
+            .update({ image_url: imageUrl, image_storage_path: imageStoragePath, updated_at: completedAt })
+            .eq('id', job.post_id);
+        if (error) console.error(`[Image Jobs] Failed to attach image to post ${job.post_id}:`, error);
+    }
+
+    console.log(`[Image Jobs] ${job.id} completed${job.post_id ? ` for post ${job.post_id}` : ''}`);
+    return won as ImageJob;
+}
+
+export async function loadImageJob(jobId: string, supabase: SupabaseClient = createAdminSupabaseClient()): Promise<ImageJob | null> {
+    const { data } = await supabase.from('image_jobs').select(JOB_FIELDS).eq('id', jobId).maybeSingle();
+    return (data as ImageJob) || null;
+}
+
+/**
+ * Polling fallback for queued jobs whose webhook hasn't arrived: asks fal for
+ * the request status and applies the result, or fails jobs past the timeout.
+ */
+export async function refreshImageJob(job: ImageJob): Promise<ImageJob> {
+    if (job.status !== 'queued') return job;
+
+    const age = Date.now() - new Date(job.created_at).getTime();
+    if (age > JOB_TIMEOUT_MS) {
+        return completeImageJob(job, { ok: false, error: 'Image generation timed out. Please try again.' });
+    }
+    if (age < STATUS_CHECK_AFTER_MS || !job.status_url || !job.response_url) return job;
+
+    try {
+        const statusResponse = await fetch(job.status_url, { headers: falHeaders() });
+        if (!statusResponse.ok) return job;
+        const { status } = await statusResponse.json();
+        if (status !== 'COMPLETED') return job;
+
+        const resultResponse = await fetch(job.response_url, { headers: falHeaders() });
+        const payload = await resultResponse.json().catch(() => null);
+        const outcome: FalOutcome = resultResponse.ok
+            ? { ok: true, payload }
+            : { ok: false, error: falError(payload, resultResponse.status, 'fal request failed') };
+        return completeImageJob(job, outcome);
+    } catch (error) {
+        console.warn(`[Image Jobs] Status check for ${job.id} failed:`, error);
+        return job;
+    }
+}
+
+export function imageJobResponse(job: ImageJob) {
+    return {
+        jobId: job.id,
+        status: job.status,
+        imageUrl: job.image_url,
+        error: job.error,
+    };
+}
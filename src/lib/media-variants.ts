@@ -0,0 +1,47 @@
+/**
+ * Resized WebP variants of uploaded images (see src/lib/uploads.ts).
+ * Client-safe: only URL helpers, no image processing.
+ *
+ *   <account>/<asset>/original.<ext>   as uploaded
+ *   <account>/<asset>/w<width>.webp    for each of VARIANT_WIDTHS
+ */
+
+export const VARIANT_WIDTHS = [256, 640, 1280] as const;
+
+export type VariantWidth = typeof VARIANT_WIDTHS[number];
+
+export interface MediaVariant {
+    width: VariantWidth;
+    url: string;
+}
+
+export interface MediaManifest {
+    id: string;
+    status: 'processing' | 'ready' | 'failed';
+    original: string;
+    variants: MediaVariant[];
+    blurhash: string | null;
+    width: number | null;
+    height: number | null;
+}
+
+const ORIGINAL_PATTERN = /\/original\.[a-z0-9]+(\?.*)?$/i;
+
+/** True for uploads made through the variant pipeline (older uploads have no variants). */
+export function hasVariants(originalUrl: string): boolean {
+    return ORIGINAL_PATTERN.test(originalUrl);
+}
+
+export function variantPath(assetDir: string, width: VariantWidth): string {
+    return `${assetDir}/w${width}.webp`;
+}
+
+/**
+ * Smallest variant at least `minWidth` wide (the largest otherwise). Returns
+ * the original for uploads without variants.
+ */
+export function mediaVariantUrl(originalUrl: string, minWidth: number): string {
+    if (!hasVariants(originalUrl)) return originalUrl;
+    const width = VARIANT_WIDTHS.find(w => w >= minWidth) || VARIANT_WIDTHS[VARIANT_WIDTHS.length - 1];
+    return originalUrl.replace(ORIGINAL_PATTERN, `/w${width}.webp`);
+}
@@ -0,0 +1,177 @@
+/**
+ * Post media pipeline
+ *
+ * - Generated images are copied once into Supabase Storage (`post-media`)
+ *   instead of being re-downloaded from fal's CDN on every publish/retry
+ * - Publishing streams the image to X (chunked INIT/APPEND/FINALIZE) and to
+ *   LinkedIn (streamed PUT) without buffering the whole file
+ * - Uploaded X media ids / LinkedIn asset URNs are cached on the post
+ *   (posts.platform_media) so retries don't re-upload; so are the tweets of
+ *   a partly posted X thread, so retries don't re-post them
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { Readable } from 'stream';
+
+export const POST_MEDIA_BUCKET = 'post-media';
+
+// X media ids expire 24h after upload; stay safely inside that
+const X_MEDIA_TTL_MS = 23 * 60 * 60 * 1000;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface PlatformMediaEntry {
+    source: string;         // image_url the upload was made from — a new image invalidates it
+    id: string;             // X media_id_string or LinkedIn asset URN
+    expires_at?: string;
+}
+
+/** Tweets of an X thread already posted, in order; a retry continues after the last one */
+export interface XThreadProgress {
+    source: string;         // hash of the thread text — an edit invalidates it
+    ids: string[];
+}
+
+export interface PlatformMedia {
+    x?: PlatformMediaEntry;
+    linkedin?: PlatformMediaEntry;
+    x_thread?: XThreadProgress;
+}
+
+export interface ImageStream {
+    body: ReadableStream<Uint8Array>;
+    contentType: string;
+    contentLength: number | null;
+}
+
+// ============================================
+// STORAGE
+// ============================================
+
+function extensionFor(contentType: string): string {
+    if (contentType.includes('jpeg') || contentType.includes('jpg')) return 'jpg';
+    if (contentType.includes('webp')) return 'webp';
+    if (contentType.includes('gif')) return 'gif';
+    return 'png';
+}
+
+/**
+ * Copy a remote image (e.g. fal CDN output) into Supabase Storage, streaming
+ * the body straight through. Returns the public URL and storage path.
+ */
+export async function persistPostImage(
+    supabase: SupabaseClient,
+    sourceUrl: string,
+    accountId: string,
+    postId: string
+): Promise<{ publicUrl: string; path: string }> {
+    const response = await fetch(sourceUrl);
+    if (!response.ok || !response.body) {
+        throw new Error(`Failed to download generated image (${response.status})`);
+    }
+
+    const contentType = response.headers.get('content-type') || 'image/png';
+    const path = `${accountId}/${postId}/${Date.now()}.${extensionFor(contentType)}`;
+
+    const { error } = await supabase.storage
+        .from(POST_MEDIA_BUCKET)
+        .upload(path, response.body, {
+            contentType,
+            upsert: false,
+            duplex: 'half',
+        });
+
+    if (error) throw new Error(`Failed to store generated image: ${error.message}`);
+
+    const { data } = supabase.storage.from(POST_MEDIA_BUCKET).getPublicUrl(path);
+    return { publicUrl: data.publicUrl, path };
+}
+
+/** Open an image as a byte stream (storage public URL or any remote URL). */
+export async function openImageStream(url: string): Promise<ImageStream> {
+    const response = await fetch(url);
+    if (!response.ok || !response.body) {
+        const error: any = new Error(`Image download failed (${response.status})`);
+        error.code = response.status;
+        throw error;
+    }
+    const length = parseInt(response.headers.get('content-length') || '', 10);
+    return {
+        body: response.body,
+        contentType: response.headers.get('content-type') || 'image/png',
+        contentLength: isNaN(length) ? null : length,
+    };
+}
+
+/**
+ * Read an image of unknown length (chunked transfer) into memory, for uploads
+ * that need the size up front. Null if it turns out larger than maxBytes.
+ */
+export async function bufferImageStream(image: ImageStream, maxBytes: number): Promise<ImageStream | null> {
+    const chunks: Uint8Array[] = [];
+    let size = 0;
+    const reader = image.body.getReader();
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        size += value.byteLength;
+        if (size > maxBytes) {
+            await reader.cancel();
+            return null;
+        }
+        chunks.push(value);
+    }
+    return {
+        body: new Blob(chunks as BlobPart[]).stream(),
+        contentType: image.contentType,
+        contentLength: size,
+    };
+}
+
+// ============================================
+// CHUNKING
+// ============================================
+
+/**
+ * Re-chunk a byte stream into fixed-size segments (last one may be short).
+ * Only one segment is held in memory at a time.
+ */
+export async function* segmentStream(body: ReadableStream<Uint8Array>, segmentBytes: number): AsyncGenerator<Buffer> {
+    let pending: Buffer[] = [];
+    let pendingBytes = 0;
+
+    for await (const chunk of Readable.fromWeb(body as any)) {
+        let buf = Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk);
+        while (pendingBytes + buf.length >= segmentBytes) {
+            const take = segmentBytes - pendingBytes;
+            pending.push(buf.subarray(0, take));
+            yield Buffer.concat(pending, segmentBytes);
+            pending = [];
+            pendingBytes = 0;
+            buf = buf.subarray(take);
+        }
+        if (buf.length > 0) {
+            pending.push(buf);
+            pendingBytes += buf.length;
+        }
+    }
+
+    if (pendingBytes > 0) yield Buffer.concat(pending, pendingBytes);
+}
+
+// ============================================
+// CACHE HELPERS
+// ============================================
+
+export function cachedMediaId(media: PlatformMedia | null | undefined, platform: 'x' | 'linkedin', source: string): string | null {
+    const entry = media?.[platform];
+    if (!entry || entry.source !== source) return null;
+    if (entry.expires_at && new Date(entry.expires_at).getTime() <= Date.now()) return null;
+    return entry.id;
+}
+
+export function xMediaEntry(source: string, id: string): PlatformMediaEntry {
+    return { source, id, expires_at: new Date(Date.now() + X_MEDIA_TTL_MS).toISOString() };
+}
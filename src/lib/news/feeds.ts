@@ -0,0 +1,198 @@
+/**
+ * RSS / Atom feed fetching for the news ingestion pipeline.
+ *
+ * - Conditional GET (If-None-Match / If-Modified-Since) so unchanged feeds cost a 304
+ * - `file:` URLs (or bare paths) read local fixtures, with a content-derived ETag,
+ *   so the whole pipeline can run offline against testsprite_tests/fixtures/feeds
+ */
+
+import * as cheerio from 'cheerio';
+import { createHash } from 'crypto';
+import { readFile } from 'fs/promises';
+import { fileURLToPath } from 'url';
+import { normalizeUrl } from '@/lib/utils';
+
+const FETCH_TIMEOUT_MS = 10_000;
+const MAX_FEED_BYTES = 5 * 1024 * 1024;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface FeedSource {
+    id?: string;
+    url: string;
+    name: string;
+    default_category?: string[];
+    etag?: string | null;
+    last_modified?: string | null;
+}
+
+export interface FeedItem {
+    title: string;
+    url: string;
+    summary: string;
+    published_at: string;
+    category: string[];
+    source_name: string;
+    feed_id?: string;
+    content_hash: string;
+}
+
+export interface FeedFetchResult {
+    feed: FeedSource;
+    status: number;           // 200, 304, or the failing HTTP status (0 = network error)
+    notModified: boolean;
+    etag: string | null;
+    lastModified: string | null;
+    items: FeedItem[];
+    error?: string;
+}
+
+// ============================================
+// NORMALIZATION
+// ============================================
+
+/** Hash of normalized title + summary — catches the same story syndicated under different URLs. */
+export function contentHash(title: string, summary: string): string {
+    const normalized = `${title} ${summary.slice(0, 280)}`
+        .toLowerCase()
+        .replace(/[^a-z0-9]+/g, ' ')
+        .trim();
+    return createHash('sha256').update(normalized).digest('hex');
+}
+
+function stripHtml(value: string): string {
+    if (!value) return '';
+    return cheerio.load(value).text().replace(/\s+/g, ' ').trim();
+}
+
+function toIsoDate(value: string | undefined): string {
+    const date = value ? new Date(value) : null;
+    return date && !isNaN(date.getTime()) ? date.toISOString() : new Date().toISOString();
+}
+
+// ============================================
+// PARSING
+// ============================================
+
+/** Parse RSS 2.0 (<item>) and Atom (<entry>) documents into vault-shaped items. */
+export function parseFeed(xml: string, feed: FeedSource): FeedItem[] {
+    const $ = cheerio.load(xml, { xmlMode: true });
+    const items: FeedItem[] = [];
+    const defaults = feed.default_category || [];
+
+    const push = (title: string, link: string, summary: string, published: string | undefined, categories: string[]) => {
+        title = stripHtml(title);
+        link = link.trim();
+        if (!title || !/^https?:\/\//i.test(link)) return;
+        const cleanSummary = stripHtml(summary).slice(0, 2000);
+        const category = Array.from(new Set([...categories.map(c => c.trim()).filter(Boolean), ...defaults])).slice(0, 6);
+        items.push({
+            title,
+            url: normalizeUrl(link),
+            summary: cleanSummary,
+            published_at: toIsoDate(published),
+            category,
+            source_name: feed.name,
+            feed_id: feed.id,
+            content_hash: contentHash(title, cleanSummary),
+        });
+    };
+
+    $('item').each((_, el) => {
+        const item = $(el);
+        push(
+            item.children('title').first().text(),
+            item.children('link').first().text() || item.children('guid').first().text(),
+            item.children('description').first().text() || item.children('content\\:encoded').first().text(),
+            item.children('pubDate').first().text() || item.children('dc\\:date').first().text(),
+            item.children('category').map((_, c) => $(c).text()).get()
+        );
+    });
+
+    $('entry').each((_, el) => {
+        const entry = $(el);
+        const alternate = entry.children('link[rel="alternate"]').first();
+        const link = (alternate.length ? alternate : entry.children('link').first()).attr('href') || '';
+        push(
+            entry.children('title').first().text(),
+            link,
+            entry.children('summary').first().text() || entry.children('content').first().text(),
+            entry.children('published').first().text() || entry.children('updated').first().text(),
+            entry.children('category').map((_, c) => $(c).attr('term') || $(c).text()).get()
+        );
+    });
+
+    return items;
+}
+
+// ============================================
+// FETCHING
+// ============================================
+
+function isLocalFeed(url: string): boolean {
+    return url.startsWith('file:') || url.startsWith('/') || url.startsWith('.');
+}
+
+async function fetchLocalFeed(feed: FeedSource): Promise<FeedFetchResult> {
+    const path = feed.url.startsWith('file:') ? fileURLToPath(feed.url) : feed.url;
+    const xml = await readFile(path, 'utf-8');
+    const etag = `"${createHash('sha1').update(xml).digest('hex')}"`;
+
+    if (feed.etag && feed.etag === etag) {
+        return { feed, status: 304, notModified: true, etag, lastModified: feed.last_modified || null, items: [] };
+    }
+    return { feed, status: 200, notModified: false, etag, lastModified: null, items: parseFeed(xml, feed) };
+}
+
+/** Fetch one feed with conditional GET. Never throws — failures come back as a result with `error`. */
+export async function fetchFeed(feed: FeedSource): Promise<FeedFetchResult> {
+    try {
+        if (isLocalFeed(feed.url)) return await fetchLocalFeed(feed);
+
+        const headers: Record<string, string> = {
+            'User-Agent': 'Mozilla/5.0 (compatible; InfluucNewsBot/1.0)',
+            'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8',
+        };
+        if (feed.etag) headers['If-None-Match'] = feed.etag;
+        if (feed.last_modified) headers['If-Modified-Since'] = feed.last_modified;
+
+        const response = await fetch(feed.url, { headers, signal: AbortSignal.timeout(FETCH_TIMEOUT_MS) });
+        const etag = response.headers.get('etag') || feed.etag || null;
+        const lastModified = response.headers.get('last-modified') || feed.last_modified || null;
+
+        if (response.status === 304) {
+            return { feed, status: 304, notModified: true, etag, lastModified, items: [] };
+        }
+        if (!response.ok) {
+            return { feed, status: response.status, notModified: false, etag: feed.etag || null, lastModified: feed.last_modified || null, items: [], error: `HTTP ${response.status}` };
+        }
+
+        const declaredLength = parseInt(response.headers.get('content-length') || '0', 10);
+        if (declaredLength > MAX_FEED_BYTES) {
+            return { feed, status: 413, notModified: false, etag: null, lastModified: null, items: [], error: `Feed too large (${declaredLength} bytes)` };
+        }
+
+        const xml = await response.text();
+        return { feed, status: 200, notModified: false, etag, lastModified, items: parseFeed(xml.slice(0, MAX_FEED_BYTES), feed) };
+    } catch (error: any) {
+        return { feed, status: 0, notModified: false, etag: feed.etag || null, lastModified: feed.last_modified || null, items: [], error: error.message || String(error) };
+    }
+}
+
+/** Fetch many feeds with bounded concurrency. */
+export async function fetchFeeds(feeds: FeedSource[], concurrency: number = 6): Promise<FeedFetchResult[]> {
+    const results: FeedFetchResult[] = new Array(feeds.length);
+    let next = 0;
+
+    const worker = async () => {
+        while (next < feeds.length) {
+            const index = next++;
+            results[index] = await fetchFeed(feeds[index]);
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(concurrency, feeds.length) }, worker));
+    return results;
+}
@@ -0,0 +1,437 @@
+/**
+ * News Ingestion Pipeline
+ * Keeps news_vault populated for the newsjacking feature.
+ *
+ * One run (see /api/cron/ingest-news):
+ *   1. Collect Anthropic enrichment batches submitted by earlier runs
+ *   2. Fetch enabled feeds concurrently with conditional GET
+ *   3. Dedup by canonical URL + content hash (within the run and against the vault)
+ *   4. Bulk upsert new rows (un-enriched)
+ *   5. Enrich pending rows: Anthropic Message Batches when configured,
+ *      otherwise the active provider inline (mock/replay for local runs)
+ *   6. Invalidate + recompute the newsjacking topic feeds the new rows affect
+ */
+
+import { createClient, SupabaseClient } from '@supabase/supabase-js';
+import { robustJsonParse } from '@/lib/generation';
+import { getActiveProvider, getProvider } from '@/lib/ai/providers';
+import {
+    BatchRequestItem,
+    createBatch,
+    extractResultContent,
+    getBatchResults,
+    getBatchStatus,
+} from '@/lib/ai/providers/batch';
+import { FeedFetchResult, FeedItem, FeedSource, fetchFeeds } from './feeds';
+import { refreshTopicFeeds } from './topic-feeds';
+
+const UPSERT_CHUNK = 200;
+const LOOKUP_CHUNK = 200;
+const ENRICH_LIMIT = 100;
+const INLINE_ENRICH_CONCURRENCY = 4;
+
+export const NEWS_CATEGORIES = [
+    'AI', 'SaaS', 'Startup', 'Software Development', 'Open Source', 'Marketing',
+    'Finance', 'Fintech', 'Web3', 'Healthcare', 'Energy', 'Compliance', 'Security',
+    'Hardware', 'Entertainment', 'E-commerce', 'Leadership', 'Productivity',
+];
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface IngestOptions {
+    /** Override the news_feeds table (e.g. local fixture paths) */
+    feeds?: FeedSource[];
+    /** Skip LLM enrichment (rows stay pending for the next run) */
+    skipEnrichment?: boolean;
+    concurrency?: number;
+}
+
+export interface IngestReport {
+    feedsFetched: number;
+    feedsNotModified: number;
+    feedsFailed: number;
+    itemsSeen: number;
+    duplicates: number;
+    inserted: number;
+    enriched: number;
+    batchesSubmitted: number;
+    batchesCollected: number;
+    topicFeedsInvalidated: number;
+    topicFeedsRefreshed: number;
+    topicFeedsPruned: number;
+}
+
+interface Enrichment {
+    tldr: string;
+    spiky_take: string;
+    category: string[];
+    relevance_score: number;
+}
+
+interface PendingArticle {
+    id: string;
+    title: string;
+    summary: string | null;
+    category: string[] | null;
+    source_name: string | null;
+}
+
+// Create admin client (bypasses RLS)
+function createAdminClient(): SupabaseClient {
+    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+    const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+    return createClient(supabaseUrl, supabaseServiceKey);
+}
+
+function chunk<T>(items: T[], size: number): T[][] {
+    const chunks: T[][] = [];
+    for (let i = 0; i < items.length; i += size) chunks.push(items.slice(i, i + size));
+    return chunks;
+}
+
+// ============================================
+// FEEDS
+// ============================================
+
+/** NEWS_FEEDS (comma-separated URLs or fixture paths) overrides the table for local runs. */
+function feedsFromEnv(): FeedSource[] | null {
+    const raw = process.env.NEWS_FEEDS;
+    if (!raw) return null;
+    return raw.split(',').map(s => s.trim()).filter(Boolean).map(url => ({
+        url,
+        name: url.split('/').pop()?.replace(/\.(xml|rss|atom)$/, '') || 'Feed',
+    }));
+}
+
+async function loadFeeds(supabase: SupabaseClient): Promise<FeedSource[]> {
+    const { data, error } = await supabase
+        .from('news_feeds')
+        .select('id, url, name, default_category, etag, last_modified')
+        .eq('enabled', true);
+
+    if (error) throw new Error(`Failed to load news feeds: ${error.message}`);
+    return data || [];
+}
+
+async function recordFeedResults(supabase: SupabaseClient, results: FeedFetchResult[]): Promise<void> {
+    const now = new Date().toISOString();
+    await Promise.all(results.filter(r => r.feed.id).map(r =>
+        supabase
+            .from('news_feeds')
+            .update({
+                etag: r.etag,
+                last_modified: r.lastModified,
+                last_fetched_at: now,
+                last_status: r.status,
+                last_error: r.error || null,
+            })
+            .eq('id', r.feed.id!)
+    ));
+}
+
+// ============================================
+// DEDUP + UPSERT
+// ============================================
+
+/** Drop items already seen in this run or already in the vault (by URL or content hash). */
+export async function dedupItems(supabase: SupabaseClient, items: FeedItem[]): Promise<FeedItem[]> {
+    const seenUrls = new Set<string>();
+    const seenHashes = new Set<string>();
+    const unique: FeedItem[] = [];
+
+    for (const item of items) {
+        if (seenUrls.has(item.url) || seenHashes.has(item.content_hash)) continue;
+        seenUrls.add(item.url);
+        seenHashes.add(item.content_hash);
+        unique.push(item);
+    }
+
+    const existingUrls = new Set<string>();
+    const existingHashes = new Set<string>();
+    for (const group of chunk(unique, LOOKUP_CHUNK)) {
+        const [byUrl, byHash] = await Promise.all([
+            supabase.from('news_vault').select('url').in('url', group.map(i => i.url)),
+            supabase.from('news_vault').select('content_hash').in('content_hash', group.map(i => i.content_hash)),
+        ]);
+        (byUrl.data || []).forEach((row: any) => existingUrls.add(row.url));
+        (byHash.data || []).forEach((row: any) => existingHashes.add(row.content_hash));
+    }
+
+    return unique.filter(i => !existingUrls.has(i.url) && !existingHashes.has(i.content_hash));
+}
+
+async function upsertItems(supabase: SupabaseClient, items: FeedItem[]): Promise<number> {
+    let inserted = 0;
+    for (const group of chunk(items, UPSERT_CHUNK)) {
+        const { data, error } = await supabase
+            .from('news_vault')
+            .upsert(group.map(item => ({
+                title: item.title,
+                url: item.url,
+                summary: item.summary,
+                category: item.category,
+                source_name: item.source_name,
+                published_at: item.published_at,
+                content_hash: item.content_hash,
+                feed_id: item.feed_id || null,
+            })), { onConflict: 'url', ignoreDuplicates: true })
+            .select('id');
+
+        if (error) {
+            console.error('[News Ingest] Upsert failed:', error.message);
+            continue;
+        }
+        inserted += data?.length || 0;
+    }
+    return inserted;
+}
+
+// ============================================
+// ENRICHMENT
+// ============================================
+
+const ENRICHMENT_SYSTEM = `You are a news curator for B2B founders who post on LinkedIn and X.
+For the article you are given, return ONLY valid JSON:
+{"tldr": "2 sentences, plain facts", "spiky_take": "1 contrarian sentence a founder could post", "category": ["1-3 of the allowed categories"], "relevance_score": 1-10}
+
+Allowed categories: ${NEWS_CATEGORIES.join(', ')}.
+relevance_score: how useful this is as a newsjacking hook for founders (10 = must-post, 1 = noise).`;
+
+function buildEnrichmentPrompt(article: PendingArticle): string {
+    return `Title: ${article.title}
+Source: ${article.source_name || 'Unknown'}
+Feed categories: ${(article.category || []).join(', ') || 'none'}
+Summary: ${(article.summary || '').slice(0, 1500) || 'none'}`;
+}
+
+export function parseEnrichment(raw: string | null): Enrichment | null {
+    if (!raw) return null;
+    try {
+        const parsed = robustJsonParse(raw);
+        if (!parsed?.tldr) return null;
+        const allowed = new Map(NEWS_CATEGORIES.map(c => [c.toLowerCase(), c]));
+        const category = (Array.isArray(parsed.category) ? parsed.category : [parsed.category])
+            .map((c: unknown) => allowed.get(String(c).toLowerCase()))
+            .filter(Boolean)
+            .slice(0, 3);
+        const score = Math.round(Number(parsed.relevance_score));
+        return {
+            tldr: String(parsed.tldr).trim(),
+            spiky_take: String(parsed.spiky_take || '').trim(),
+            category,
+            relevance_score: isNaN(score) ? 5 : Math.min(10, Math.max(1, score)),
+        };
+    } catch {
+        return null;
+    }
+}
+
+async function applyEnrichments(
+    supabase: SupabaseClient,
+    enrichments: Array<{ id: string; enrichment: Enrichment | null }>
+): Promise<number> {
+    const now = new Date().toISOString();
+    let applied = 0;
+    // Different values per row, so these are individual updates run in parallel chunks
+    for (const group of chunk(enrichments, 25)) {
+        const results = await Promise.all(group.map(({ id, enrichment }) =>
+            supabase
+                .from('news_vault')
+                .update(enrichment
+                    ? { ...enrichment, category: enrichment.category.length ? enrichment.category : undefined, enriched_at: now, enrichment_batch_id: null }
+                    // Unparseable: mark as enriched with defaults so it isn't retried forever
+                    : { enriched_at: now, enrichment_batch_id: null })
+                .eq('id', id)
+        ));
+        applied += results.filter(r => !r.error).length;
+    }
+    return applied;
+}
+
+async function loadPendingArticles(supabase: SupabaseClient): Promise<PendingArticle[]> {
+    const { data, error } = await supabase
+        .from('news_vault')
+        .select('id, title, summary, category, source_name')
+        .is('enriched_at', null)
+        .is('enrichment_batch_id', null)
+        .order('created_at', { ascending: true })
+        .limit(ENRICH_LIMIT);
+
+    if (error) throw new Error(`Failed to load pending articles: ${error.message}`);
+    return data || [];
+}
+
+/** Submit pending rows as one Anthropic batch; results are collected by a later run. */
+async function submitEnrichmentBatch(supabase: SupabaseClient, articles: PendingArticle[]): Promise<string> {
+    const requests: BatchRequestItem[] = articles.map(article => ({
+        custom_id: article.id,
+        params: {
+            max_tokens: 400,
+            temperature: 0.4,
+            system: ENRICHMENT_SYSTEM,
+            messages: [{ role: 'user', content: buildEnrichmentPrompt(article) }],
+        },
+    }));
+
+    const batch = await createBatch(requests);
+    await supabase.from('news_enrichment_batches').insert({ id: batch.id, article_count: articles.length });
+    await supabase.from('news_vault').update({ enrichment_batch_id: batch.id }).in('id', articles.map(a => a.id));
+    return batch.id;
+}
+
+/** Apply results of any batch that has ended since the last run. */
+export async function collectEnrichmentBatches(supabase: SupabaseClient): Promise<{ collected: number; enriched: number }> {
+    const { data: pending } = await supabase
+        .from('news_enrichment_batches')
+        .select('id')
+        .eq('status', 'in_progress');
+
+    let collected = 0;
+    let enriched = 0;
+
+    for (const { id } of pending || []) {
+        try {
+            const batch = await getBatchStatus(id);
+            if (batch.processing_status !== 'ended') continue;
+            if (!batch.results_url) throw new Error('Batch ended without results_url');
+
+            // Only model output that doesn't parse counts as done. Errored or
+            // expired requests (and any the results file omits) stay pending
+            const results = await getBatchResults(batch.results_url);
+            enriched += await applyEnrichments(supabase, results
+                .filter(item => item.result.type === 'succeeded')
+                .map(item => ({
+                    id: item.custom_id,
+                    enrichment: parseEnrichment(extractResultContent(item)),
+                })));
+
+            const { data: released } = await supabase
+                .from('news_vault')
+                .update({ enrichment_batch_id: null })
+                .eq('enrichment_batch_id', id)
+                .is('enriched_at', null)
+                .select('id');
+            if (released?.length) {
+                console.warn(`[News Ingest] Batch ${id}: ${released.length} requests errored or expired, requeued`);
+            }
+
+            await supabase
+                .from('news_enrichment_batches')
+                .update({ status: 'completed', completed_at: new Date().toISOString() })
+                .eq('id', id);
+            collected++;
+        } catch (error: any) {
+            console.error(`[News Ingest] Failed to collect batch ${id}:`, error.message);
+            // Release the rows so the next run resubmits them
+            await supabase.from('news_vault').update({ enrichment_batch_id: null }).eq('enrichment_batch_id', id);
+            await supabase
+                .from('news_enrichment_batches')
+                .update({ status: 'failed', error_message: error.message, completed_at: new Date().toISOString() })
+                .eq('id', id);
+        }
+    }
+
+    return { collected, enriched };
+}
+
+/** Enrich with the active provider in-process (mock / replay / non-Anthropic setups). */
+async function enrichInline(supabase: SupabaseClient, articles: PendingArticle[]): Promise<number> {
+    const provider = await getProvider();
+    const enrichments: Array<{ id: string; enrichment: Enrichment | null }> = [];
+    let next = 0;
+
+    const worker = async () => {
+        while (next < articles.length) {
+            const article = articles[next++];
+            try {
+                const result = await provider.complete({
+                    messages: [
+                        { role: 'system', content: ENRICHMENT_SYSTEM },
+                        { role: 'user', content: buildEnrichmentPrompt(article) },
+                    ],
+                    temperature: 0.4,
+                    maxTokens: 400,
+                    responseFormat: { type: 'json_object' },
+                });
+                enrichments.push({ id: article.id, enrichment: parseEnrichment(result.content) });
+            } catch (error: any) {
+                console.warn(`[News Ingest] Inline enrichment failed for ${article.id}:`, error.message);
+            }
+        }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(INLINE_ENRICH_CONCURRENCY, articles.length) }, worker));
+    return applyEnrichments(supabase, enrichments);
+}
+
+// ============================================
+// PIPELINE
+// ============================================
+
+export async function ingestNews(options: IngestOptions = {}, supabase: SupabaseClient = createAdminClient()): Promise<IngestReport> {
+    const report: IngestReport = {
+        feedsFetched: 0, feedsNotModified: 0, feedsFailed: 0,
+        itemsSeen: 0, duplicates: 0, inserted: 0,
+        enriched: 0, batchesSubmitted: 0, batchesCollected: 0,
+        topicFeedsInvalidated: 0, topicFeedsRefreshed: 0, topicFeedsPruned: 0,
+    };
+    const startedAt = new Date();
+    const useBatches = getActiveProvider() === 'anthropic' && !!process.env.ANTHROPIC_API_KEY;
+
+    // 1. Collect finished batches first so their rows are searchable ASAP
+    if (useBatches && !options.skipEnrichment) {
+        const { collected, enriched } = await collectEnrichmentBatches(supabase);
+        report.batchesCollected = collected;
+        report.enriched += enriched;
+    }
+
+    // 2. Fetch
+    const feeds = options.feeds || feedsFromEnv() || await loadFeeds(supabase);
+    const results = await fetchFeeds(feeds, options.concurrency);
+    await recordFeedResults(supabase, results);
+
+    const items: FeedItem[] = [];
+    for (const result of results) {
+        if (result.error) {
+            report.feedsFailed++;
+            console.warn(`[News Ingest] ${result.feed.name}: ${result.error}`);
+        } else if (result.notModified) {
+            report.feedsNotModified++;
+        } else {
+            report.feedsFetched++;
+            items.push(...result.items);
+        }
+    }
+    report.itemsSeen = items.length;
+
+    // 3-4. Dedup + upsert
+    const fresh = await dedupItems(supabase, items);
+    report.duplicates = items.length - fresh.length;
+    report.inserted = await upsertItems(supabase, fresh);
+
+    // 5. Enrich
+    if (!options.skipEnrichment) {
+        const pending = await loadPendingArticles(supabase);
+        if (pending.length > 0) {
+            if (useBatches) {
+                await submitEnrichmentBatch(supabase, pending);
+                report.batchesSubmitted = 1;
+            } else {
+                report.enriched += await enrichInline(supabase, pending);
+            }
+        }
+    }
+
+    // 6. Topic feeds (only when the vault actually changed)
+    if (report.inserted > 0 || report.enriched > 0) {
+        const { invalidated, refreshed, pruned } = await refreshTopicFeeds(supabase, startedAt);
+        report.topicFeedsInvalidated = invalidated;
+        report.topicFeedsRefreshed = refreshed;
+        report.topicFeedsPruned = pruned;
+    }
+
+    console.log('[News Ingest] Run complete:', JSON.stringify(report));
+    return report;
+}
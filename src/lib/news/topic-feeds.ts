@@ -0,0 +1,263 @@
+/**
+ * Newsjacking Topic Feeds
+ * Stale-while-revalidate cache over search_news_vault().
+ *
+ *   memory (per instance, 60s)  ->  news_topic_feeds row  ->  search_news_vault() RPC
+ *
+ * A feed row holds the first FEED_SIZE ranked articles for a topic key.
+ * Ingestion marks matching rows stale (invalidate_news_topic_feeds) and
+ * recomputes the ones users actually read; a stale row is still served
+ * while a background refresh runs.
+ */
+
+import { createClient, SupabaseClient } from '@supabase/supabase-js';
+import { buildProfileNewsQuery, extractKeywords, topicKey } from './topics';
+
+export const FEED_SIZE = 48;
+const MEMORY_TTL_MS = 60 * 1000;
+const FEED_MAX_AGE_MS = 30 * 60 * 1000;   // recompute even when nothing invalidated it
+const REFRESH_LIMIT = 50;                   // feeds recomputed per ingestion run
+const ACTIVE_WINDOW_MS = 14 * 24 * 60 * 60 * 1000;
+const PRUNE_LIMIT = 500;                    // unread feeds deleted per ingestion run
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface NewsResult {
+    title: string;
+    url: string;
+    content: string;
+    publishedDate: string;
+    image: null;
+    score: number;
+    source: string;
+    spiky_take: string | null;
+    category: string[];
+}
+
+export interface TopicFeed {
+    key: string;
+    results: NewsResult[];
+    hasMore: boolean;
+    computedAt: number;
+}
+
+export type CacheStatus = 'HIT' | 'STALE' | 'MISS';
+
+// In-memory store (per serverless instance)
+const memory = new Map<string, TopicFeed>();
+const inflight = new Map<string, Promise<TopicFeed>>();
+
+// Create admin client (bypasses RLS)
+function createAdminClient(): SupabaseClient {
+    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+    const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+    return createClient(supabaseUrl, supabaseServiceKey);
+}
+
+// ============================================
+// RANKING
+// ============================================
+
+/** Map a search_news_vault() row to the shape the dashboard renders. */
+export function mapArticle(article: any): NewsResult {
+    return {
+        title: article.title,
+        url: article.url,
+        // Fallback to summary if tldr is missing (e.g. before AI processed it)
+        content: article.tldr || article.summary || 'Click the link to read the full article.',
+        publishedDate: article.published_at,
+        image: null, // RSS doesn't reliably provide images, skip for cleaner UI
+        score: article.relevance_score,
+        source: article.source_name || 'News Vault',
+        spiky_take: article.spiky_take,
+        category: article.category,
+    };
+}
+
+/** One ranked page straight from Postgres. Fetches one extra row to report hasMore. */
+export async function searchVault(
+    supabase: SupabaseClient,
+    keywords: string[],
+    pageSize: number,
+    offset: number
+): Promise<{ results: NewsResult[]; hasMore: boolean }> {
+    const { data, error } = await supabase.rpc('search_news_vault', {
+        keywords,
+        page_size: pageSize + 1,
+        page_offset: offset,
+    });
+
+    if (error) {
+        console.error('[Topic Feeds] search_news_vault error:', error);
+        throw new Error('Failed to fetch from news vault');
+    }
+
+    const rows = data || [];
+    return { results: rows.slice(0, pageSize).map(mapArticle), hasMore: rows.length > pageSize };
+}
+
+// ============================================
+// FEED CACHE
+// ============================================
+
+/** Recompute a feed and persist it. Concurrent callers for the same key share one query. */
+export function revalidateTopicFeed(keywords: string[], admin: SupabaseClient = createAdminClient()): Promise<TopicFeed> {
+    const key = topicKey(keywords);
+    const existing = inflight.get(key);
+    if (existing) return existing;
+
+    const job = (async () => {
+        const { results, hasMore } = await searchVault(admin, keywords, FEED_SIZE, 0);
+        const feed: TopicFeed = { key, results, hasMore, computedAt: Date.now() };
+
+        const { error } = await admin.from('news_topic_feeds').upsert({
+            topic_key: key,
+            keywords,
+            results,
+            has_more: hasMore,
+            stale: false,
+            computed_at: new Date(feed.computedAt).toISOString(),
+        }, { onConflict: 'topic_key' });
+        if (error) console.warn('[Topic Feeds] Failed to persist feed:', error.message);
+
+        memory.set(key, feed);
+        return feed;
+    })().finally(() => inflight.delete(key));
+
+    inflight.set(key, job);
+    return job;
+}
+
+/**
+ * Serve a topic feed: memory, then the persisted row, then a fresh computation.
+ * `revalidate` is returned when the served copy is stale — the caller schedules it
+ * after responding so the user never waits on a recompute.
+ */
+export async function getTopicFeed(
+    keywords: string[],
+    admin: SupabaseClient = createAdminClient()
+): Promise<{ feed: TopicFeed; status: CacheStatus; revalidate?: () => Promise<unknown> }> {
+    const key = topicKey(keywords);
+    const now = Date.now();
+
+    const cached = memory.get(key);
+    if (cached && now - cached.computedAt < MEMORY_TTL_MS) {
+        return { feed: cached, status: 'HIT' };
+    }
+
+    const { data: row } = await admin
+        .from('news_topic_feeds')
+        .select('results, has_more, stale, computed_at')
+        .eq('topic_key', key)
+        .maybeSingle();
+
+    if (row?.computed_at) {
+        const feed: TopicFeed = {
+            key,
+            results: row.results || [],
+            hasMore: !!row.has_more,
+            computedAt: new Date(row.computed_at).getTime(),
+        };
+        const isStale = row.stale || now - feed.computedAt > FEED_MAX_AGE_MS;
+
+        // Touch so ingestion keeps refreshing feeds people read
+        const touch = () => admin.from('news_topic_feeds').update({ last_accessed_at: new Date().toISOString() }).eq('topic_key', key);
+
+        if (!isStale) {
+            memory.set(key, feed);
+            return { feed, status: 'HIT', revalidate: touch };
+        }
+        return {
+            feed,
+            status: 'STALE',
+            revalidate: () => Promise.all([touch(), revalidateTopicFeed(keywords, admin)]),
+        };
+    }
+
+    return { feed: await revalidateTopicFeed(keywords, admin), status: 'MISS' };
+}
+
+// ============================================
+// MATERIALIZATION (called after ingestion)
+// ============================================
+
+/**
+ * After new articles land: mark affected feeds stale, make sure every Authority
+ * profile's topic has a feed, drop feeds nobody reads any more, then recompute
+ * stale feeds that were read recently.
+ */
+export async function refreshTopicFeeds(admin: SupabaseClient, since: Date): Promise<{ invalidated: number; refreshed: number; pruned: number }> {
+    const { data: invalidated, error } = await admin.rpc('invalidate_news_topic_feeds', { since: since.toISOString() });
+    if (error) console.warn('[Topic Feeds] Invalidation failed:', error.message);
+
+    // Precompute profile topics so the first visit is already a HIT
+    const { data: profiles } = await admin
+        .from('founder_profiles')
+        .select('industry, business_description, context_data, topics')
+        .eq('subscription_tier', 'authority');
+
+    const profileKeys = new Map<string, string[]>();
+    for (const profile of profiles || []) {
+        const keywords = extractKeywords(buildProfileNewsQuery(profile));
+        profileKeys.set(topicKey(keywords), keywords);
+    }
+    if (profileKeys.size > 0) {
+        await admin.from('news_topic_feeds').upsert(
+            Array.from(profileKeys, ([key, keywords]) => ({ topic_key: key, keywords })),
+            { onConflict: 'topic_key', ignoreDuplicates: true }
+        );
+    }
+
+    const pruned = await pruneTopicFeeds(admin, new Set(profileKeys.keys()));
+
+    const { data: stale } = await admin
+        .from('news_topic_feeds')
+        .select('keywords')
+        .eq('stale', true)
+        .gte('last_accessed_at', new Date(Date.now() - ACTIVE_WINDOW_MS).toISOString())
+        .order('last_accessed_at', { ascending: false })
+        .limit(REFRESH_LIMIT);
+
+    let refreshed = 0;
+    for (const row of stale || []) {
+        try {
+            await revalidateTopicFeed(row.keywords || [], admin);
+            refreshed++;
+        } catch (err: any) {
+            console.warn('[Topic Feeds] Refresh failed:', err.message);
+        }
+    }
+
+    console.log(`[Topic Feeds] Invalidated ${invalidated ?? 0}, refreshed ${refreshed}, pruned ${pruned}`);
+    return { invalidated: invalidated ?? 0, refreshed, pruned };
+}
+
+/**
+ * Every distinct search creates a feed row; delete the ones nobody has read
+ * within ACTIVE_WINDOW_MS so the table stays bounded. Profile topics are kept.
+ */
+async function pruneTopicFeeds(admin: SupabaseClient, keep: Set<string>): Promise<number> {
+    const { data: unread, error } = await admin
+        .from('news_topic_feeds')
+        .select('topic_key')
+        .lt('last_accessed_at', new Date(Date.now() - ACTIVE_WINDOW_MS).toISOString())
+        .limit(PRUNE_LIMIT);
+
+    if (error) {
+        console.warn('[Topic Feeds] Prune lookup failed:', error.message);
+        return 0;
+    }
+
+    const keys = (unread || []).map(row => row.topic_key as string).filter(key => !keep.has(key));
+    let pruned = 0;
+    for (let i = 0; i < keys.length; i += 100) {
+        const group = keys.slice(i, i + 100);
+        const { error: deleteError } = await admin.from('news_topic_feeds').delete().in('topic_key', group);
+        if (deleteError) console.warn('[Topic Feeds] Prune failed:', deleteError.message);
+        else pruned += group.length;
+    }
+    for (const key of keys) memory.delete(key);
+    return pruned;
+}
@@ -0,0 +1,72 @@
+/**
+ * Newsjacking topic derivation.
+ * Shared by the dashboard (client) and the topic feed precomputation (server),
+ * so both land on the same cache key for a profile.
+ */
+
+export interface NewsTopicProfile {
+    industry?: string | null;
+    business_description?: string | null;
+    context_data?: { aboutYou?: string } | null;
+    topics?: string[] | null;
+}
+
+/**
+ * Build the search query for a profile: the industry, expanded with
+ * high-signal keywords from the description when the industry is too broad.
+ */
+export function buildProfileNewsQuery(profile: NewsTopicProfile): string {
+    const industry = profile.industry || '';
+    const description = (profile.business_description || profile.context_data?.aboutYou || '').toLowerCase();
+    const topics = profile.topics || [];
+
+    // 1. Start with the core industry
+    let searchQuery = industry;
+
+    // 2. Smart Expansion: If industry is too broad (Agency/Services/Consulting) or generic,
+    // scan the context for high-signal keywords.
+    const needsExpansion = !industry ||
+        industry.toLowerCase().includes('agency') ||
+        industry.toLowerCase().includes('services') ||
+        industry.toLowerCase().includes('consulting') ||
+        industry === 'Modern Operator';
+
+    if (needsExpansion) {
+        const signals = [];
+        if (description.includes('saas')) signals.push('SaaS');
+        if (description.includes(' ai ') || description.includes('artificial intelligence') || description.includes('generative ai')) signals.push('AI');
+        if (description.includes('software')) signals.push('Software');
+        if (description.includes('startup')) signals.push('Startup');
+        if (description.includes('marketing')) signals.push('Marketing');
+
+        if (signals.length > 0) {
+            searchQuery = (searchQuery ? `${searchQuery} ` : '') + signals.join(' ');
+        }
+    }
+
+    // 3. Fallback to first topic if still empty
+    if (!searchQuery && topics.length > 0) {
+        searchQuery = topics[0];
+    }
+
+    // 4. Final Failsafe
+    return searchQuery || 'Tech';
+}
+
+/** Sanitize a free-text topic into the keywords search_news_vault() matches on. */
+export function extractKeywords(topic: string | null): string[] {
+    if (!topic) return [];
+    const keywords = topic
+        .replace(/newly launched /gi, '')
+        .replace(/ tool or startup on Hacker News or Product Hunt/gi, '')
+        .replace(/\//g, ' ')
+        .split(' ')
+        .map(w => w.trim().toLowerCase().replace(/[^a-z0-9]+/g, ''))
+        .filter(w => w.length > 1); // Allow 2-letter words like 'AI'
+    return Array.from(new Set(keywords)).sort();
+}
+
+/** Cache key for a keyword set — order and case insensitive. */
+export function topicKey(keywords: string[]): string {
+    return keywords.join(' ');
+}
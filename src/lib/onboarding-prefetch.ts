@@ -0,0 +1,228 @@
+/**
+ * Onboarding Prefetch
+ * Speculative work while the user is still filling in the onboarding wizard.
+ * As soon as a context link, competitor link or voice sample is entered, the
+ * page posts it to /api/onboarding/prefetch. The link is scraped and
+ * summarized, or the samples are voice-analysed, in the background. Results
+ * are cached in `onboarding_prefetch` under the wizard's draft id.
+ *
+ * The onboarding job's scrape stage (src/lib/onboarding.ts) then only
+ * assembles cached results. Anything that wasn't prefetched, or failed, is
+ * done inline exactly as before.
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { createHash } from 'crypto';
+import { getProvider } from '@/lib/ai/providers';
+import { buildVoiceAnalysisPrompt, VoiceSample } from '@/lib/ai/strategy-brief';
+import { robustJsonParse } from '@/lib/ai/json';
+import { scrapeWebsite, extractBusinessSummary } from '@/lib/scraper';
+
+export const MAX_PREFETCH_URLS = 12;
+export const MAX_PREFETCH_VOICE_SAMPLES = 10;
+// How long the submit waits on prefetches that are still running before doing the work itself
+const PENDING_WAIT_MS = 15 * 1000;
+const PENDING_POLL_MS = 1000;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type PrefetchKind = 'url' | 'voice';
+
+/** Same shape compileStrategyBrief reads from profile.voice_analysis */
+export interface VoiceAnalysis {
+    descriptors: string[];
+    positives: string[];
+    negatives: string[];
+    sentence_pattern?: string;
+    vocabulary?: string[];
+}
+
+export interface PrefetchedContext {
+    /** Normalized URL -> business summary */
+    summaries: Map<string, string>;
+    /** voiceSamplesKey() -> analysis */
+    voice: Map<string, VoiceAnalysis>;
+}
+
+interface PrefetchRow {
+    kind: PrefetchKind;
+    cache_key: string;
+    status: 'pending' | 'ready' | 'failed';
+    result: any;
+}
+
+// ============================================
+// KEYS
+// ============================================
+
+/** The URL a context entry points at, or null when it is plain text. */
+export function contextUrl(value: string): string | null {
+    if (value.includes('.') && (value.startsWith('http') || value.startsWith('www'))) {
+        return value.startsWith('http') ? value : `https://${value}`;
+    }
+    return null;
+}
+
+/** Cache key for a set of voice samples; any edit to any sample is a new key. */
+export function voiceSamplesKey(samples: Array<{ content: string }>): string {
+    return createHash('sha256')
+        .update(JSON.stringify(samples.map(sample => sample.content.trim())))
+        .digest('hex')
+        .slice(0, 32);
+}
+
+// ============================================
+// WORK
+// ============================================
+
+export async function summarizeUrl(url: string): Promise<string> {
+    const scraped = await scrapeWebsite(url);
+    return extractBusinessSummary(scraped);
+}
+
+export async function analyzeVoice(samples: VoiceSample[]): Promise<VoiceAnalysis> {
+    const provider = await getProvider();
+    if (!provider.isConfigured()) {
+        throw new Error('AI provider not configured');
+    }
+
+    const result = await provider.complete({
+        messages: [
+            { role: 'system', content: buildVoiceAnalysisPrompt(samples) },
+            { role: 'user', content: 'Analyze my writing voice.' },
+        ],
+        temperature: 0.3,
+        responseFormat: { type: 'json_object' },
+        maxTokens: 1024,
+    });
+    return robustJsonParse(result.content);
+}
+
+async function settle(
+    supabase: SupabaseClient,
+    draftId: string,
+    kind: PrefetchKind,
+    cacheKey: string,
+    work: () => Promise<unknown>
+): Promise<void> {
+    const started = Date.now();
+    let update: Record<string, unknown>;
+    try {
+        update = { status: 'ready', result: await work(), error: null };
+    } catch (error) {
+        update = { status: 'failed', error: error instanceof Error ? error.message : 'Prefetch failed' };
+    }
+
+    await supabase
+        .from('onboarding_prefetch')
+        .update({ ...update, updated_at: new Date().toISOString() })
+        .eq('draft_id', draftId)
+        .eq('kind', kind)
+        .eq('cache_key', cacheKey);
+
+    console.log(`[Onboarding Prefetch] ${kind} ${update.status} in ${Date.now() - started}ms`);
+}
+
+/**
+ * Register and run prefetch work for a draft. Entries already registered for
+ * the draft are skipped, so the page can resend its full state on each change.
+ * Failed entries are retried.
+ */
+export async function prefetchOnboardingContext(
+    supabase: SupabaseClient,
+    accountId: string,
+    draftId: string,
+    urls: string[],
+    voiceSamples: VoiceSample[]
+): Promise<{ queued: number }> {
+    const entries: Array<{ kind: PrefetchKind; cache_key: string; run: () => Promise<unknown> }> = [];
+
+    for (const url of new Set(urls)) {
+        entries.push({ kind: 'url', cache_key: url, run: async () => ({ summary: await summarizeUrl(url) }) });
+    }
+    if (voiceSamples.length > 0) {
+        entries.push({ kind: 'voice', cache_key: voiceSamplesKey(voiceSamples), run: () => analyzeVoice(voiceSamples) });
+    }
+    if (entries.length === 0) return { queued: 0 };
+
+    // Clear earlier failures so they are picked up again below
+    await supabase
+        .from('onboarding_prefetch')
+        .delete()
+        .eq('draft_id', draftId)
+        .eq('account_id', accountId)
+        .eq('status', 'failed')
+        .in('cache_key', entries.map(entry => entry.cache_key));
+
+    // ON CONFLICT DO NOTHING: only rows this call inserted come back, which
+    // makes concurrent requests for the same link do the work once
+    const { data: inserted, error } = await supabase
+        .from('onboarding_prefetch')
+        .upsert(
+            entries.map(({ kind, cache_key }) => ({ draft_id: draftId, account_id: accountId, kind, cache_key })),
+            { onConflict: 'draft_id,kind,cache_key', ignoreDuplicates: true }
+        )
+        .select('kind, cache_key');
+
+    if (error) {
+        throw new Error(`Failed to register prefetch: ${error.message}`);
+    }
+
+    const claimed = new Set((inserted || []).map((row: { kind: string; cache_key: string }) => `${row.kind}:${row.cache_key}`));
+    const work = entries.filter(entry => claimed.has(`${entry.kind}:${entry.cache_key}`));
+
+    await Promise.all(work.map(entry => settle(supabase, draftId, entry.kind, entry.cache_key, entry.run)));
+    return { queued: work.length };
+}
+
+// ============================================
+// ASSEMBLY
+// ============================================
+
+/**
+ * Collect a draft's prefetched results. Entries still running are waited on
+ * for a short while; whatever isn't ready after that is left to the caller.
+ */
+export async function loadPrefetchedContext(
+    supabase: SupabaseClient,
+    accountId: string,
+    draftId: string
+): Promise<PrefetchedContext> {
+    const deadline = Date.now() + PENDING_WAIT_MS;
+    let rows: PrefetchRow[] = [];
+
+    while (true) {
+        const { data, error } = await supabase
+            .from('onboarding_prefetch')
+            .select('kind, cache_key, status, result')
+            .eq('draft_id', draftId)
+            .eq('account_id', accountId);
+
+        if (error) {
+            console.warn('[Onboarding Prefetch] Failed to load prefetched context:', error.message);
+            break;
+        }
+        rows = (data || []) as PrefetchRow[];
+
+        if (!rows.some(row => row.status === 'pending') || Date.now() >= deadline) break;
+        await new Promise(resolve => setTimeout(resolve, PENDING_POLL_MS));
+    }
+
+    const context: PrefetchedContext = { summaries: new Map(), voice: new Map() };
+    for (const row of rows) {
+        if (row.status !== 'ready' || !row.result) continue;
+        if (row.kind === 'url') context.summaries.set(row.cache_key, row.result.summary);
+        else context.voice.set(row.cache_key, row.result);
+    }
+    return context;
+}
+
+export async function clearPrefetchedContext(supabase: SupabaseClient, accountId: string, draftId: string): Promise<void> {
+    await supabase
+        .from('onboarding_prefetch')
+        .delete()
+        .eq('draft_id', draftId)
+        .eq('account_id', accountId);
+}
@@ -0,0 +1,1097 @@
+/**
+ * Onboarding Pipeline
+ * Turns the onboarding questionnaire into a founder profile, strategy brief
+ * and first week of posts, as a staged job persisted in `onboarding_jobs`:
+ *
+ *   scrape -> strategy -> brief -> posts -> save
+ *
+ * - each stage's output is checkpointed before the next stage starts, so a
+ *   failure or function timeout resumes at the stage that broke instead of
+ *   re-running the 16k-token master strategy prompt
+ * - claim_onboarding_job() leases a job to one runner at a time; an expired
+ *   lease (crashed or timed-out invocation) can be taken over by a resume
+ * - the save stage checkpoints the profile and text posts separately, so a
+ *   resumed save never inserts the same posts twice
+ * - the scrape stage mostly assembles work the wizard already prefetched
+ *   (src/lib/onboarding-prefetch.ts)
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { randomUUID } from 'crypto';
+import { getProvider } from '@/lib/ai/providers';
+import { compileStrategyBrief, detectArchetypeFromDiscovery, buildMasterOnboardingPrompt } from '@/lib/ai/strategy-brief';
+import { generateAllContentBatch, robustJsonParse, UserProfile, GeneratedCarouselPost, carouselPostFields } from '@/lib/generation';
+import { stripe } from '@/lib/stripe';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+import {
+    MAX_PREFETCH_VOICE_SAMPLES,
+    VoiceAnalysis,
+    clearPrefetchedContext,
+    contextUrl,
+    loadPrefetchedContext,
+    summarizeUrl,
+    voiceSamplesKey,
+} from '@/lib/onboarding-prefetch';
+
+// Outlives the onboarding routes' maxDuration, so a live lease always means a live runner
+const LEASE_SECONDS = 360;
+// A queued job nobody picked up within this window is treated as stalled
+const QUEUED_STALL_MS = 30 * 1000;
+
+export const ONBOARDING_STAGES = ['scrape', 'strategy', 'brief', 'posts', 'save'] as const;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type OnboardingStage = typeof ONBOARDING_STAGES[number] | 'done';
+export type OnboardingJobStatus = 'queued' | 'running' | 'failed' | 'complete';
+
+export interface OnboardingData {
+    // Basics
+    name: string;
+    role: string;
+    companyName: string;
+    companyWebsite: string;
+
+    // Strategy
+    platforms: {
+        x: boolean;
+        linkedin: boolean;
+    };
+    connections: {
+        x: boolean;
+        linkedin: boolean;
+    };
+    industry: string;
+    targetAudience: string;
+
+    // Context Fields
+    aboutYou: string;
+    personalContext: Array<{ type: string; label: string; value: string }>;
+    productContext: Array<{ type: string; label: string; value: string }>;
+
+    // Legacy support
+    businessDescription?: string;
+    expertise: string;
+
+    contentGoal: string;
+    topics: string[];
+
+    // Strategic Foundation (NEW)
+    archetypeDiscovery: {
+        q1: string;
+        q2: string;
+        q3: string;
+    };
+    positioningStatement: string;
+    povStatement: string;
+    identityGap: string;
+    limitingBelief?: string;
+    weeklyThroughline?: string;
+    competitors: string[];
+    contentPillars: {
+        name: string;
+        description: string;
+        job: 'authority' | 'relatability' | 'proof';
+    }[];
+
+    // Style
+    archetype: 'builder' | 'teacher' | 'contrarian' | 'executive' | 'custom';
+    tone: {
+        formality: 'professional' | 'casual';
+        boldness: 'bold' | 'measured';
+        style: 'educational' | 'conversational';
+        approach: 'story-driven' | 'data-driven';
+    };
+    voiceSamples: {
+        content: string;
+        type: 'paste' | 'upload' | 'voicenote' | 'url';
+    }[];
+
+    autoPublish?: boolean;
+    stripeSessionId?: string | null;
+    /** Wizard draft the prefetched scrapes / voice analysis are stored under */
+    draftId?: string | null;
+    /** Summaries of competitor links, when the wizard prefetched them */
+    competitorScrapedData?: string;
+
+    // Subscription & Visuals
+    subscriptionTier?: 'starter' | 'creator' | 'authority';
+    visualMode?: 'none' | 'faceless' | 'clone';
+    style_faceless?: string;
+    style_carousel?: string;
+    style_face?: string;
+    avatar_urls?: string[];
+
+    // Brand Kit
+    brandColors?: {
+        primary: string;
+        background: string;
+        accent: string;
+    };
+}
+
+export interface ScheduledPost {
+    day: string;
+    platform: 'x' | 'linkedin';
+    format: 'single' | 'long_form' | 'video_script' | 'long' | 'short';
+    topic: string;
+    time: string;
+    pillar?: string;
+    hook_type?: string;
+}
+
+export interface CarouselIdea {
+    day: string;
+    topic: string;
+    pillar?: string;
+    hook_type?: string;
+    slide_count?: number;
+}
+
+export interface GeneratedPost {
+    content: string;
+    hooks?: string[];
+    cta?: string | null;
+}
+
+type ArchetypeResult = { primary: string; secondary: string; flavor: string };
+
+export interface OnboardingCheckpoints {
+    scrape?: {
+        businessDescription: string;
+        competitorScrapedData?: string;
+        /** Prefetched analysis of exactly these voice samples */
+        voiceAnalysis?: VoiceAnalysis;
+    };
+    strategy?: {
+        archetypeResult: ArchetypeResult;
+        /** Set when the discovery answers picked the archetype */
+        archetype?: OnboardingData['archetype'];
+        subscriptionTier?: OnboardingData['subscriptionTier'];
+        masterResult: any;
+    };
+    brief?: {
+        positioningStatement?: string;
+        povStatement?: string;
+        identityGap?: string;
+        limitingBelief?: string;
+        weeklyThroughline?: string;
+        contentPillars?: OnboardingData['contentPillars'];
+        strategyBrief: string;
+        voiceAnalysis: any;
+        competitorAnalysis: any;
+    };
+    posts?: {
+        posts: Array<ScheduledPost & GeneratedPost>;
+        carousels: GeneratedCarouselPost[];
+    };
+    save?: {
+        profileId: string;
+        textPostsSaved?: boolean;
+    };
+}
+
+export interface OnboardingResult {
+    profileId: string;
+    postsCount: number;
+    carouselsCount: number;
+}
+
+export interface OnboardingJob {
+    id: string;
+    account_id: string;
+    stage: OnboardingStage;
+    status: OnboardingJobStatus;
+    input: OnboardingData;
+    checkpoints: OnboardingCheckpoints;
+    result: OnboardingResult | null;
+    error: string | null;
+    attempts: number;
+    lease_owner: string | null;
+    lease_until: string | null;
+    created_at: string;
+    updated_at: string;
+}
+
+/** Returns an error message, or null when the questionnaire can be processed. */
+export function validateOnboardingInput(body: OnboardingData): string | null {
+    if (!body.industry || !body.contentGoal || !body.aboutYou) {
+        return 'Missing required onboarding data';
+    }
+    if (selectedPlatforms(body).length === 0) {
+        return 'At least one platform must be selected';
+    }
+    return null;
+}
+
+function selectedPlatforms(data: OnboardingData): Array<'x' | 'linkedin'> {
+    return Object.entries(data.platforms || {})
+        .filter(([_, enabled]) => enabled)
+        .map(([platform]) => platform as 'x' | 'linkedin');
+}
+
+/** Queued jobs nobody picked up, or running jobs whose runner's lease ran out. */
+export function isJobStalled(job: Pick<OnboardingJob, 'status' | 'lease_until' | 'updated_at'>): boolean {
+    if (job.status === 'running') {
+        return !job.lease_until || new Date(job.lease_until).getTime() < Date.now();
+    }
+    if (job.status === 'queued') {
+        return Date.now() - new Date(job.updated_at).getTime() > QUEUED_STALL_MS;
+    }
+    return false;
+}
+
+/**
+ * Rebuild the working questionnaire from the raw input plus every completed
+ * stage, the same shape the single-request flow used to build up in place.
+ */
+function hydrate(input: OnboardingData, checkpoints: OnboardingCheckpoints): OnboardingData {
+    const data: OnboardingData = { ...input };
+
+    if (checkpoints.scrape) {
+        data.businessDescription = checkpoints.scrape.businessDescription;
+        data.competitorScrapedData = checkpoints.scrape.competitorScrapedData;
+    }
+    if (checkpoints.strategy) {
+        if (checkpoints.strategy.archetype) data.archetype = checkpoints.strategy.archetype;
+        if (checkpoints.strategy.subscriptionTier) data.subscriptionTier = checkpoints.strategy.subscriptionTier;
+        (data as any)._archetypeResult = checkpoints.strategy.archetypeResult;
+    }
+    if (checkpoints.brief) {
+        const brief = checkpoints.brief;
+        data.positioningStatement = brief.positioningStatement as string;
+        data.povStatement = brief.povStatement as string;
+        data.identityGap = brief.identityGap as string;
+        data.limitingBelief = brief.limitingBelief;
+        data.weeklyThroughline = brief.weeklyThroughline;
+        data.contentPillars = brief.contentPillars as OnboardingData['contentPillars'];
+        (data as any)._voiceAnalysis = brief.voiceAnalysis;
+        (data as any)._competitorAnalysis = brief.competitorAnalysis;
+        (data as any)._strategyBrief = brief.strategyBrief;
+    }
+    return data;
+}
+
+// ============================================
+// STAGES
+// ============================================
+
+/**
+ * Stage 1: fold the free-text and linked context into one description.
+ * Links the wizard already prefetched are read from cache; the rest are scraped now.
+ */
+async function scrapeStage(
+    supabase: SupabaseClient | null,
+    accountId: string | null,
+    data: OnboardingData
+): Promise<NonNullable<OnboardingCheckpoints['scrape']>> {
+    const prefetched = supabase && accountId && data.draftId
+        ? await loadPrefetchedContext(supabase, accountId, data.draftId)
+        : null;
+    let fullContext = data.aboutYou;
+
+    // Helper to scrape if it's a URL
+    const processContextItem = async (label: string, value: string) => {
+        const url = contextUrl(value);
+        if (url) {
+            const cached = prefetched?.summaries.get(url);
+            if (cached) {
+                return `${label}: ${url}\n[Analyzed Content]: ${cached}`;
+            }
+            try {
+                console.log(`[Onboarding] Scraping context URL: ${url}`);
+                const summary = await summarizeUrl(url);
+                return `${label}: ${url}\n[Analyzed Content]: ${summary}`;
+            } catch (e) {
+                console.warn(`[Onboarding] Failed to scrape ${value}:`, e);
+                return `${label}: ${value} (Scraping Failed)`;
+            }
+        }
+        return `${label}: ${value}`;
+    };
+
+    // Both sections scrape concurrently
+    const [personalDetails, productDetails] = await Promise.all([
+        Promise.all((data.personalContext || []).map(i => processContextItem(i.label || 'Link', i.value))),
+        Promise.all((data.productContext || []).map(i => processContextItem(i.label || 'Link', i.value))),
+    ]);
+
+    if (personalDetails.length > 0) {
+        fullContext += '\n\n-- PERSONAL CONTEXT --\n' + personalDetails.join('\n\n');
+    }
+    if (productDetails.length > 0) {
+        fullContext += '\n\n-- PRODUCT CONTEXT --\n' + productDetails.join('\n\n');
+    }
+
+    // Competitors are only enriched when prefetched; they never held up submit before
+    const competitorSummaries = (data.competitors || [])
+        .map(value => contextUrl(value.trim()))
+        .filter((url): url is string => !!url && !!prefetched?.summaries.has(url))
+        .map(url => `${url}\n${prefetched!.summaries.get(url)}`);
+
+    // Keyed on the same samples the prefetch route accepted
+    const samples = (data.voiceSamples || [])
+        .filter(sample => sample.content.trim() !== '')
+        .slice(0, MAX_PREFETCH_VOICE_SAMPLES);
+    const voiceAnalysis = samples.length
+        ? prefetched?.voice.get(voiceSamplesKey(samples))
+        : undefined;
+
+    if (prefetched) {
+        console.log(`[Onboarding] Prefetch hits: ${prefetched.summaries.size} links, voice ${voiceAnalysis ? 'yes' : 'no'}`);
+    }
+
+    return {
+        businessDescription: fullContext,
+        competitorScrapedData: competitorSummaries.length > 0
+            ? `SCRAPED COMPETITOR PAGES:\n${competitorSummaries.join('\n\n')}`
+            : undefined,
+        voiceAnalysis,
+    };
+}
+
+/**
+ * Stripe safety sync: if onboarding came back from checkout, provision the
+ * subscription now (same logic as the webhook) so generation uses the paid tier.
+ */
+async function syncCheckoutTier(accountId: string, data: OnboardingData): Promise<OnboardingData['subscriptionTier']> {
+    if (!data.stripeSessionId) return data.subscriptionTier;
+
+    try {
+        const sessionId = data.stripeSessionId;
+        console.log(`[Onboarding] Safety Sync (PRE-GEN): Verifying session ${sessionId}`);
+        const session = await stripe.checkout.sessions.retrieve(sessionId);
+
+        if (session.payment_status === 'paid' && session.subscription) {
+            const subscriptionId = session.subscription as string;
+            const subscription = await stripe.subscriptions.retrieve(subscriptionId);
+            const tier = ((subscription as any).metadata?.tier || data.subscriptionTier || 'starter') as string;
+
+            console.log(`[Onboarding] Safety Sync: Payment verified for tier ${tier}. Provisioning...`);
+
+            const adminClient = createAdminSupabaseClient();
+            await adminClient.from('subscriptions').upsert({
+                account_id: accountId,
+                stripe_customer_id: session.customer as string,
+                stripe_subscription_id: subscriptionId,
+                plan: tier,
+                status: 'active',
+                current_period_start: new Date((subscription as any).current_period_start * 1000).toISOString(),
+                current_period_end: new Date((subscription as any).current_period_end * 1000).toISOString(),
+            }, { onConflict: 'account_id' });
+
+            console.log(`[Onboarding] Safety Sync: Database updated and tier set to ${tier}`);
+            return tier as OnboardingData['subscriptionTier'];
+        }
+    } catch (syncError) {
+        console.warn('[Onboarding] Safety Sync failed (non-critical):', syncError);
+    }
+    return data.subscriptionTier;
+}
+
+/** Stage 2: the master strategy & calendar prompt. The expensive one; never re-run once checkpointed. */
+async function strategyStage(accountId: string | null, data: OnboardingData): Promise<NonNullable<OnboardingCheckpoints['strategy']>> {
+    // The tier MUST be settled before generation so the AI plans the right volume
+    const subscriptionTier = accountId ? await syncCheckoutTier(accountId, data) : data.subscriptionTier;
+
+    let archetypeResult: ArchetypeResult = { primary: data.archetype || 'builder', secondary: 'teacher', flavor: '' };
+    let archetype: OnboardingData['archetype'] | undefined;
+    if (data.archetypeDiscovery?.q1 && data.archetypeDiscovery?.q2 && data.archetypeDiscovery?.q3) {
+        archetypeResult = detectArchetypeFromDiscovery(
+            data.archetypeDiscovery.q1,
+            data.archetypeDiscovery.q2,
+            data.archetypeDiscovery.q3
+        );
+        archetype = archetypeResult.primary as OnboardingData['archetype'];
+        console.log(`[Onboarding] Detected archetype: ${archetypeResult.primary} / ${archetypeResult.secondary}`);
+    }
+
+    const provider = await getProvider();
+    if (!provider.isConfigured()) {
+        throw new Error('AI provider is not configured. Please add your ANTHROPIC_API_KEY.');
+    }
+
+    console.log('[Onboarding] Triggering Master Strategy & Content Generation...');
+    const masterPrompt = buildMasterOnboardingPrompt(
+        { ...data, subscriptionTier, archetype: archetype || data.archetype },
+        archetypeResult,
+        selectedPlatforms(data)
+    );
+
+    let masterResult: any;
+    try {
+        const aiResponse = await provider.complete({
+            messages: [
+                {
+                    role: 'system',
+                    content: masterPrompt,
+                    cache_control: { type: 'ephemeral' }
+                },
+                { role: 'user', content: 'Generate my brand strategy and weekly content plan. Do NOT write the actual post content yet—just the topics, hooks, and day-by-day calendar.' }
+            ],
+            temperature: 0.7,
+            responseFormat: { type: 'json_object' },
+            maxTokens: 16384 // Increased from 8192 to prevent truncation
+        });
+        const cleanContent = aiResponse.content;
+        console.log('[Onboarding] Master generation response length:', cleanContent.length);
+
+        try {
+            masterResult = robustJsonParse(cleanContent);
+        } catch (parseError: any) {
+            console.error('[Onboarding] JSON Parsing failed. Error:', parseError.message);
+            console.error('[Onboarding] Content suspected to be problematic:', cleanContent);
+            throw new Error(`Failed to parse strategy. The AI response was ${cleanContent.length} characters long and may have been truncated or misformatted.`);
+        }
+        console.log('[Onboarding] Master generation complete');
+    } catch (e: any) {
+        console.error('[Onboarding] Master generation failed:', e);
+        throw new Error(`Failed to generate brand strategy: ${e.message}`);
+    }
+
+    return { archetypeResult, archetype, subscriptionTier, masterResult };
+}
+
+/** Stage 3: back-fill the foundation from the strategy and compile the Strategy Brief. */
+function briefStage(
+    data: OnboardingData,
+    strategy: NonNullable<OnboardingCheckpoints['strategy']>,
+    prefetchedVoice?: VoiceAnalysis
+): NonNullable<OnboardingCheckpoints['brief']> {
+    const { masterResult, archetypeResult } = strategy;
+    // The dedicated analysis matches the brief's voice fields; the master prompt's is the fallback
+    const voiceAnalysis = prefetchedVoice || masterResult.voice_analysis || {};
+    const competitorAnalysis = masterResult.competitor_analysis || {};
+    const foundation = masterResult.foundation || {};
+    const validCompetitors = (data.competitors || []).filter((c: string) => c.trim() !== '');
+
+    const positioningStatement = data.positioningStatement || foundation.positioning_statement;
+    const povStatement = data.povStatement || foundation.pov_statement;
+    const identityGap = data.identityGap || foundation.identity_gap;
+    const limitingBelief = data.limitingBelief || foundation.limiting_belief;
+    const weeklyThroughline = masterResult.weekly_throughline;
+    const contentPillars = (data.contentPillars && data.contentPillars.length > 0) ? data.contentPillars : foundation.content_pillars;
+
+    const strategyBrief = compileStrategyBrief(
+        {
+            name: data.name,
+            role: data.role,
+            company_name: data.companyName,
+            business_description: data.businessDescription || data.aboutYou,
+            industry: data.industry,
+            content_goal: data.contentGoal,
+            target_audience: data.targetAudience,
+            archetype_primary: archetypeResult.primary,
+            archetype_secondary: archetypeResult.secondary,
+            archetype_flavor: archetypeResult.flavor,
+            positioning_statement: positioningStatement,
+            pov_statement: povStatement,
+            identity_gap: identityGap,
+            competitor_context: {
+                names: validCompetitors,
+                shared_patterns: competitorAnalysis.shared_patterns,
+                whitespace: competitorAnalysis.whitespace,
+            },
+            content_pillars: contentPillars,
+            voice_analysis: voiceAnalysis,
+            personal_context: data.personalContext,
+            product_context: data.productContext,
+            topics: data.topics,
+            tone: data.tone,
+            limiting_belief: limitingBelief,
+            weekly_throughline: weeklyThroughline,
+        },
+        data.voiceSamples
+    );
+
+    return {
+        positioningStatement,
+        povStatement,
+        identityGap,
+        limitingBelief,
+        weeklyThroughline,
+        contentPillars,
+        strategyBrief,
+        voiceAnalysis,
+        competitorAnalysis,
+    };
+}
+
+/** Stage 4: write the week's text posts and carousels from the calendar. */
+async function postsStage(accountId: string | null, data: OnboardingData, masterResult: any): Promise<NonNullable<OnboardingCheckpoints['posts']>> {
+    const strategy = masterResult.calendar || { posts: [], carousels: [] };
+    const archetypeResult: ArchetypeResult = (data as any)._archetypeResult;
+
+    // Map onboarding data to UserProfile for the shared generator
+    const profileForGen: UserProfile = {
+        id: 'onboarding-tmp-' + Date.now(),
+        account_id: accountId || 'anonymous',
+        platforms: data.platforms,
+        industry: data.industry,
+        target_audience: data.targetAudience,
+        content_goal: data.contentGoal,
+        topics: data.topics,
+        tone: {
+            formality: data.tone.formality,
+            boldness: data.tone.boldness,
+            style: data.tone.style,
+            approach: data.tone.approach
+        },
+        role: data.role,
+        company_name: data.companyName,
+        company_website: data.companyWebsite,
+        business_description: data.businessDescription || '',
+        expertise: data.expertise,
+        auto_publish: data.autoPublish || false,
+        timezone: 'UTC',
+        strategy_brief: (data as any)._strategyBrief,
+        content_pillars: data.contentPillars,
+        positioning_statement: data.positioningStatement,
+        pov_statement: data.povStatement,
+        identity_gap: data.identityGap,
+        archetype_primary: archetypeResult.primary,
+        archetype_secondary: archetypeResult.secondary,
+        archetype_flavor: archetypeResult.flavor,
+        brand_colors: data.brandColors || { primary: '#10B981', background: '#09090B', accent: '#F59E0B' },
+        style_carousel: data.style_carousel,
+        voice_samples: data.voiceSamples,
+        name: data.name,
+        weekly_throughline: data.weeklyThroughline,
+    };
+
+    console.log('[Onboarding] Generating all content (text + carousels) using proven single-call batching...');
+    const genResult = await generateAllContentBatch(
+        strategy.posts || [],
+        strategy.carousels || [],
+        profileForGen
+    );
+    console.log(`[Onboarding] Result: ${genResult.textPosts.length} text posts, ${genResult.carouselPosts.length} carousels`);
+
+    return { posts: genResult.textPosts, carousels: genResult.carouselPosts };
+}
+
+/** Stage 5: persist profile, voice samples and posts, checkpointing between writes. */
+async function saveStage(
+    supabase: SupabaseClient,
+    accountId: string,
+    data: OnboardingData,
+    checkpoints: OnboardingCheckpoints,
+    persist: () => Promise<void>
+): Promise<NonNullable<OnboardingCheckpoints['save']>> {
+    const { posts, carousels } = checkpoints.posts || { posts: [], carousels: [] };
+
+    if (!checkpoints.save) {
+        checkpoints.save = { profileId: await saveProfile(supabase, accountId, data) };
+        await persist();
+    }
+    const progress = checkpoints.save;
+
+    if (!progress.textPostsSaved) {
+        await saveTextPosts(supabase, progress.profileId, posts);
+        progress.textPostsSaved = true;
+        await persist();
+    }
+
+    await saveCarouselPosts(supabase, progress.profileId, carousels);
+    return progress;
+}
+
+// ============================================
+// RUNNER
+// ============================================
+
+function nextStage(stage: OnboardingStage): OnboardingStage {
+    const index = ONBOARDING_STAGES.indexOf(stage as typeof ONBOARDING_STAGES[number]);
+    return index === -1 || index === ONBOARDING_STAGES.length - 1 ? 'done' : ONBOARDING_STAGES[index + 1];
+}
+
+/**
+ * Run stages from `stage` to the end. `persist` is called after every
+ * checkpoint; `supabase` is null in mock mode (nothing is saved).
+ */
+async function runStages(
+    supabase: SupabaseClient | null,
+    accountId: string | null,
+    input: OnboardingData,
+    checkpoints: OnboardingCheckpoints,
+    stage: OnboardingStage,
+    persist: (stage: OnboardingStage) => Promise<void>
+): Promise<OnboardingResult> {
+    while (stage !== 'done') {
+        const started = Date.now();
+        const data = hydrate(input, checkpoints);
+
+        switch (stage) {
+            case 'scrape':
+                checkpoints.scrape = await scrapeStage(supabase, accountId, data);
+                break;
+            case 'strategy':
+                checkpoints.strategy = await strategyStage(accountId, data);
+                break;
+            case 'brief':
+                checkpoints.brief = briefStage(data, checkpoints.strategy!, checkpoints.scrape?.voiceAnalysis);
+                break;
+            case 'posts':
+                checkpoints.posts = await postsStage(accountId, data, checkpoints.strategy!.masterResult);
+                break;
+            case 'save':
+                if (supabase && accountId) {
+                    checkpoints.save = await saveStage(supabase, accountId, data, checkpoints, () => persist(stage));
+                } else {
+                    console.log('[Onboarding] Supabase not configured or no user (mock mode), skipping save');
+                    checkpoints.save = { profileId: 'mock-profile-id', textPostsSaved: true };
+                }
+                break;
+        }
+
+        const next = nextStage(stage);
+        console.log(`[Onboarding] Stage ${stage} complete in ${Date.now() - started}ms`);
+        stage = next;
+        await persist(stage);
+    }
+
+    return {
+        profileId: checkpoints.save!.profileId,
+        postsCount: checkpoints.posts?.posts.length || 0,
+        carouselsCount: checkpoints.posts?.carousels.length || 0,
+    };
+}
+
+class LeaseLostError extends Error {
+    constructor(jobId: string) {
+        super(`Lost the lease on onboarding job ${jobId}`);
+        this.name = 'LeaseLostError';
+    }
+}
+
+/** Create a queued job; the caller starts it with runOnboardingJob (e.g. via after()). */
+export async function createOnboardingJob(
+    supabase: SupabaseClient,
+    accountId: string,
+    input: OnboardingData
+): Promise<OnboardingJob> {
+    const { data, error } = await supabase
+        .from('onboarding_jobs')
+        .insert({ account_id: accountId, input })
+        .select()
+        .single();
+
+    if (error || !data) {
+        throw new Error(`Failed to create onboarding job: ${error?.message}`);
+    }
+    return data as OnboardingJob;
+}
+
+/**
+ * Claim a job and run it from its saved stage. Returns null when another
+ * runner holds the lease (or takes it over mid-run) or the job is already
+ * complete.
+ */
+export async function runOnboardingJob(
+    jobId: string,
+    supabase: SupabaseClient = createAdminSupabaseClient()
+): Promise<OnboardingJob | null> {
+    const workerId = `onboarding:${randomUUID()}`;
+    const { data: claimed, error } = await supabase.rpc('claim_onboarding_job', {
+        job_id: jobId,
+        worker_id: workerId,
+        lease_seconds: LEASE_SECONDS,
+    });
+
+    if (error) {
+        throw new Error(`Failed to claim onboarding job: ${error.message}`);
+    }
+
+    const job = (claimed as OnboardingJob[] | null)?.[0];
+    if (!job) {
+        console.log(`[Onboarding] Job ${jobId} is already running or complete`);
+        return null;
+    }
+
+    console.log(`[Onboarding] Job ${jobId} starting at ${job.stage} (attempt ${job.attempts})`);
+    const checkpoints: OnboardingCheckpoints = job.checkpoints || {};
+    let stage = job.stage;
+
+    // Every checkpoint also renews the lease; a runner that lost it stops writing
+    const persist = async (reached: OnboardingStage) => {
+        stage = reached;
+        const { data: renewed, error: updateError } = await supabase
+            .from('onboarding_jobs')
+            .update({
+                stage,
+                checkpoints,
+                lease_until: new Date(Date.now() + LEASE_SECONDS * 1000).toISOString(),
+                updated_at: new Date().toISOString(),
+            })
+            .eq('id', jobId)
+            .eq('lease_owner', workerId)
+            .select('id');
+
+        if (updateError) {
+            throw new Error(`Failed to checkpoint onboarding job: ${updateError.message}`);
+        }
+        // No row: the lease expired and another runner took the job over
+        if (!renewed || renewed.length === 0) {
+            throw new LeaseLostError(jobId);
+        }
+    };
+
+    try {
+        const result = await runStages(supabase, job.account_id, job.input, checkpoints, stage, persist);
+
+        await supabase
+            .from('onboarding_jobs')
+            .update({
+                status: 'complete',
+                result,
+                lease_owner: null,
+                lease_until: null,
+                updated_at: new Date().toISOString(),
+            })
+            .eq('id', jobId)
+            .eq('lease_owner', workerId);
+
+        if (job.input.draftId) {
+            await clearPrefetchedContext(supabase, job.account_id, job.input.draftId).catch(() => {});
+        }
+
+        console.log(`[Onboarding] Job ${jobId} complete: ${result.postsCount} posts, ${result.carouselsCount} carousels`);
+        return { ...job, stage: 'done', status: 'complete', checkpoints, result };
+    } catch (err) {
+        if (err instanceof LeaseLostError) {
+            console.warn(`[Onboarding] Job ${jobId} lease lost at ${stage}; leaving it to the new runner`);
+            return null;
+        }
+        const message = err instanceof Error ? err.message : 'An unexpected error occurred';
+        console.error(`[Onboarding] Job ${jobId} failed at ${stage}:`, err);
+
+        await supabase
+            .from('onboarding_jobs')
+            .update({
+                status: 'failed',
+                error: message,
+                lease_owner: null,
+                lease_until: null,
+                updated_at: new Date().toISOString(),
+            })
+            .eq('id', jobId)
+            .eq('lease_owner', workerId);
+
+        return { ...job, stage, status: 'failed', checkpoints, error: message };
+    }
+}
+
+/** Mock mode (no Supabase): run every stage in memory within the request. */
+export async function runOnboardingInline(input: OnboardingData): Promise<OnboardingResult> {
+    return runStages(null, null, input, {}, 'scrape', async () => {});
+}
+
+// ============================================
+// PERSISTENCE
+// ============================================
+
+async function saveProfile(
+    supabase: SupabaseClient,
+    userId: string,
+    data: OnboardingData
+): Promise<string> {
+    // Check if profile exists
+    const { data: existingProfiles } = await supabase
+        .from('founder_profiles')
+        .select('id')
+        .eq('account_id', userId)
+        .limit(1);
+
+    let profile: any;
+
+    if (existingProfiles && existingProfiles.length > 0) {
+        // Update existing
+        const { data: updated, error } = await supabase
+            .from('founder_profiles')
+            .update({
+                name: data.name, // Now using actual name
+                platforms: data.platforms,
+                connections: data.connections, // Save connection state
+                industry: data.industry,
+                target_audience: data.targetAudience,
+                content_goal: data.contentGoal,
+                weekly_goal: data.contentGoal,
+                topics: data.topics,
+                // cadence: 'moderate', // Removed from frontend, default
+                tone: data.tone, // Mapping tone object (maybe update this later to include archetype)
+                // We should probably save archetype in metadata or repurpose a column, but for now let's stick to existing
+                role: data.role,
+                company_name: data.companyName,
+                brand_colors: data.brandColors || {
+                    primary: '#000000',
+                    background: '#ffffff',
+                    accent: '#000000'
+                },
+                // we'd probably save these too if we had columns for them, but legacy DB might not have them.
+                // assuming migration was run to add brand_colors
+                company_website: data.companyWebsite,
+                business_description: data.businessDescription,
+                expertise: data.expertise,
+                auto_publish: data.autoPublish ?? false,
+                context_data: {
+                    aboutYou: data.aboutYou,
+                    personalContext: data.personalContext,
+                    productContext: data.productContext
+                },
+                updated_at: new Date().toISOString(),
+
+                // Strategy Fields (NEW)
+                archetype_primary: (data as any)._archetypeResult?.primary || data.archetype,
+                archetype_secondary: (data as any)._archetypeResult?.secondary || null,
+                archetype_flavor: (data as any)._archetypeResult?.flavor || null,
+                archetype_discovery: data.archetypeDiscovery || null,
+                positioning_statement: data.positioningStatement || null,
+                pov_statement: data.povStatement || null,
+                identity_gap: data.identityGap || null,
+                competitor_context: {
+                    names: (data.competitors || []).filter((c: string) => c.trim() !== ''),
+                    analysis: (data as any)._competitorAnalysis || null,
+                },
+                content_pillars: data.contentPillars || null,
+                voice_analysis: (data as any)._voiceAnalysis || null,
+                strategy_brief: (data as any)._strategyBrief || null,
+
+                // Pricing & Visuals
+                subscription_tier: data.subscriptionTier || 'starter',
+                visual_mode: data.visualMode || 'none',
+                style_faceless: data.style_faceless,
+                style_carousel: data.style_carousel,
+                style_face: data.style_face,
+                avatar_urls: data.avatar_urls,
+                visual_training_status: data.avatar_urls && data.avatar_urls.length > 0 ? 'completed' : 'not_started',
+                visual_lora_id: data.avatar_urls && data.avatar_urls.length > 0 ? data.avatar_urls[0] : null,
+                onboarding_status: 'complete',
+                onboarding_step: 10,
+            })
+            .eq('id', existingProfiles[0].id)
+            .select()
+            .single();
+
+        if (error) {
+            console.error('Failed to update profile:', error);
+            throw error;
+        }
+        profile = updated;
+    } else {
+        // Create new profile
+        // Calculate next generation date (7 days from now for rolling schedule)
+        const nextGenerationDate = new Date();
+        nextGenerationDate.setDate(nextGenerationDate.getDate() + 7);
+        const generationDayOfWeek = new Date().getDay(); // Today's day becomes their generation day
+
+        const { data: created, error } = await supabase
+            .from('founder_profiles')
+            .insert({
+                account_id: userId,
+                name: data.name,
+                platforms: data.platforms,
+                connections: data.connections,
+                industry: data.industry,
+                target_audience: data.targetAudience,
+                content_goal: data.contentGoal,
+                weekly_goal: data.contentGoal,
+                topics: data.topics,
+                // cadence: 'moderate',
+                tone: data.tone,
+                role: data.role,
+                company_name: data.companyName,
+                company_website: data.companyWebsite,
+                business_description: data.businessDescription,
+                expertise: data.expertise,
+                auto_publish: data.autoPublish ?? false,
+                context_data: {
+                    aboutYou: data.aboutYou,
+                    personalContext: data.personalContext,
+                    productContext: data.productContext
+                },
+                // Rolling schedule fields
+                next_generation_date: nextGenerationDate.toISOString(),
+                generation_day_of_week: generationDayOfWeek,
+                generation_count: 1,
+                timezone: 'UTC',
+
+                // Strategy Fields (NEW)
+                archetype_primary: (data as any)._archetypeResult?.primary || data.archetype,
+                archetype_secondary: (data as any)._archetypeResult?.secondary || null,
+                archetype_flavor: (data as any)._archetypeResult?.flavor || null,
+                archetype_discovery: data.archetypeDiscovery || null,
+                positioning_statement: data.positioningStatement || null,
+                pov_statement: data.povStatement || null,
+                identity_gap: data.identityGap || null,
+                competitor_context: {
+                    names: (data.competitors || []).filter((c: string) => c.trim() !== ''),
+                    analysis: (data as any)._competitorAnalysis || null,
+                },
+                content_pillars: data.contentPillars || null,
+                voice_analysis: (data as any)._voiceAnalysis || null,
+                strategy_brief: (data as any)._strategyBrief || null,
+
+                // Pricing & Visuals
+                subscription_tier: data.subscriptionTier || 'starter',
+                visual_mode: data.visualMode || 'none',
+                style_faceless: data.style_faceless,
+                style_carousel: data.style_carousel,
+                style_face: data.style_face,
+                avatar_urls: data.avatar_urls,
+                visual_training_status: data.avatar_urls && data.avatar_urls.length > 0 ? 'completed' : 'not_started',
+                visual_lora_id: data.avatar_urls && data.avatar_urls.length > 0 ? data.avatar_urls[0] : null,
+                onboarding_status: 'complete',
+                onboarding_step: 10,
+            })
+            .select()
+            .single();
+
+        if (error) {
+            console.error('Failed to create profile:', error);
+            throw error;
+        }
+        profile = created;
+    }
+
+    // Save voice samples
+    if (data.voiceSamples.length > 0) {
+        // Delete old (simplest way to update)
+        await supabase.from('voice_samples').delete().eq('profile_id', profile.id);
+
+        const voiceSamplesData = data.voiceSamples.map(sample => ({
+            profile_id: profile.id,
+            content: sample.content,
+            source_type: sample.type,
+        }));
+
+        await supabase.from('voice_samples').insert(voiceSamplesData);
+    }
+
+    return profile.id;
+}
+
+async function saveTextPosts(
+    supabase: SupabaseClient,
+    profileId: string,
+    posts: Array<ScheduledPost & GeneratedPost>
+): Promise<void> {
+    // Save posts
+    // Note: In a real app we might want to smarter diffing, but for now we won't delete old posts
+    // to preserve history, just add new ones.
+
+    const today = new Date();
+    const dayMapping: Record<string, number> = {
+        'Sunday': 0, 'Monday': 1, 'Tuesday': 2, 'Wednesday': 3,
+        'Thursday': 4, 'Friday': 5, 'Saturday': 6,
+    };
+
+    const validFormats = ['single', 'thread', 'long_form', 'video_script', 'long', 'short'];
+    const validPlatforms = ['x', 'linkedin'];
+
+    const postsData = posts.map(post => {
+        // Calculate the next occurrence of this day
+        const targetDay = dayMapping[post.day] ?? 1;
+        const currentDay = today.getDay();
+        let daysUntil = (targetDay - currentDay + 7) % 7;
+        if (daysUntil === 0) daysUntil = 7; // If today, schedule for next week
+
+        const scheduledDate = new Date(today);
+        scheduledDate.setDate(today.getDate() + daysUntil);
+
+        // Parse time safely - HARDCODED to 8:30 PM per user request
+        // const timeParts = post.time?.split(' ') || ['10:00', 'AM'];
+        // const [time, period] = timeParts;
+        // const [hours, minutes] = (time || '10:00').split(':').map(Number);
+        // let hour24 = hours || 10;
+        // if (period === 'PM' && hours !== 12) hour24 += 12;
+        // if (period === 'AM' && hours === 12) hour24 = 0;
+
+        // Force 8:30 PM (20:30)
+        scheduledDate.setHours(20, 30, 0, 0);
+
+        // Normalize format
+        let format = post.format?.toLowerCase().replace('-', '_').replace(' ', '_') || 'single';
+        if (format === 'long') format = 'long_form';
+        if (format === 'short') format = 'single';
+        if (!validFormats.includes(format)) format = 'single';
+
+        // Normalize platform
+        let platform = post.platform?.toLowerCase() || 'linkedin';
+        if (!validPlatforms.includes(platform)) platform = 'linkedin';
+
+        return {
+            profile_id: profileId,
+            platform,
+            scheduled_date: scheduledDate.toISOString(),
+            content: post.content || 'Generated post content',
+            format,
+            status: 'scheduled',
+        };
+    });
+
+    // Batch insert text posts
+    if (postsData.length > 0) {
+        console.log(`[Onboarding] Inserting ${postsData.length} text posts to Supabase...`);
+        const { error: postsError } = await supabase
+            .from('posts')
+            .insert(postsData);
+
+        if (postsError) {
+            console.error('[Onboarding] Failed to save posts:', postsError);
+            throw new Error(`Failed to save posts: ${postsError.message}`);
+        }
+        console.log('[Onboarding] Text posts saved successfully.');
+    } else {
+        console.warn('[Onboarding] No text posts generated to save.');
+    }
+}
+
+async function saveCarouselPosts(
+    supabase: SupabaseClient,
+    profileId: string,
+    carousels: GeneratedCarouselPost[]
+): Promise<void> {
+    // Save carousels
+    if (carousels.length > 0) {
+        const today = new Date();
+        const dayMapping: Record<string, number> = {
+            'Sunday': 0, 'Monday': 1, 'Tuesday': 2, 'Wednesday': 3,
+            'Thursday': 4, 'Friday': 5, 'Saturday': 6,
+        };
+
+        const carouselPostsData = carousels.map(carousel => {
+            const targetDay = dayMapping[carousel.day] ?? 3; // Default to Wednesday
+            const currentDay = today.getDay();
+            let daysUntil = (targetDay - currentDay + 7) % 7;
+            if (daysUntil === 0) daysUntil = 7;
+
+            const scheduledDate = new Date(today);
+            scheduledDate.setDate(today.getDate() + daysUntil);
+            scheduledDate.setHours(20, 30, 0, 0);
+
+            return {
+                profile_id: profileId,
+                platform: 'linkedin',
+                scheduled_date: scheduledDate.toISOString(),
+                topic: carousel.topic,
+                format: 'carousel',
+                status: 'scheduled',
+                ...carouselPostFields(carousel),
+            };
+        });
+
+        console.log(`[Onboarding] Inserting ${carouselPostsData.length} carousel posts to Supabase...`);
+        const { error: carouselError } = await supabase
+            .from('posts')
+            .insert(carouselPostsData);
+
+        if (carouselError) {
+            console.error('[Onboarding] Failed to save carousels:', carouselError);
+            // Non-fatal — text posts are already saved
+        } else {
+            console.log('[Onboarding] Carousel posts saved successfully.');
+        }
+    }
+}
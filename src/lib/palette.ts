@@ -0,0 +1,399 @@
+/**
+ * Brand palette extraction
+ * Replaces the vision-LLM call behind /api/ai/extract-colors:
+ *
+ * - the logo is decoded and downsampled to SAMPLE_SIZE px with sharp and read
+ *   as raw RGBA; transparent pixels are ignored
+ * - opaque pixels are clustered in OKLab (median-cut boxes as seeds, then a
+ *   few k-means passes) so "distinct" means perceptually distinct
+ * - background / primary / accent are picked from the swatches by edge
+ *   coverage, chroma, share and WCAG contrast; anything the image can't supply
+ *   (a transparent logo has no background) is synthesised
+ *
+ * pickPalette() reports close calls for the primary as `primaryCandidates`,
+ * so a caller can break the tie some other way and pick again.
+ */
+
+import sharp from 'sharp';
+
+const SAMPLE_SIZE = 64;
+const CLUSTERS = 8;
+const KMEANS_PASSES = 8;
+const MIN_OPAQUE_PIXELS = 16;
+// Swatches under this share are anti-aliasing / noise; accents (a logo's dot
+// or underline) may be much smaller than the main mark
+const MIN_SHARE = 0.02;
+const MIN_ACCENT_SHARE = 0.005;
+// Minimum contrast for an image colour to be used as accent on the background
+const MIN_ACCENT_CONTRAST = 1.5;
+// OKLab chroma below this reads as grey
+const NEUTRAL_CHROMA = 0.04;
+// Primary scores within this ratio of the best count as a tie
+const TIE_RATIO = 0.85;
+
+const LIGHT_BACKGROUND = '#FFFFFF';
+const DARK_BACKGROUND = '#09090B';
+// Amber, in OKLCh degrees: accent hue for monochrome logos
+const FALLBACK_ACCENT_HUE = 70;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface BrandPalette {
+    primary: string;
+    background: string;
+    accent: string;
+}
+
+export interface Swatch {
+    hex: string;
+    /** Fraction of opaque pixels in this cluster */
+    share: number;
+    /** Fraction of the opaque border pixels in this cluster */
+    edgeShare: number;
+    /** OKLab */
+    lab: [number, number, number];
+    chroma: number;
+    luminance: number;
+}
+
+export interface PaletteSample {
+    swatches: Swatch[];
+    /** Fraction of pixels that were transparent */
+    transparentShare: number;
+}
+
+export interface PaletteResult {
+    palette: BrandPalette;
+    /** Hex swatches that scored close to the chosen primary (empty when clear-cut) */
+    primaryCandidates: string[];
+}
+
+export class PaletteError extends Error {
+    constructor(message: string, public status: number = 400) {
+        super(message);
+        this.name = 'PaletteError';
+    }
+}
+
+// ============================================
+// COLOUR MATH
+// ============================================
+
+function srgbToLinear(value: number): number {
+    const v = value / 255;
+    return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+}
+
+function linearToSrgb(value: number): number {
+    const v = value <= 0.0031308 ? value * 12.92 : 1.055 * Math.pow(value, 1 / 2.4) - 0.055;
+    return Math.round(v * 255);
+}
+
+function linearToOklab(r: number, g: number, b: number): [number, number, number] {
+    const l = Math.cbrt(0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b);
+    const m = Math.cbrt(0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b);
+    const s = Math.cbrt(0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b);
+    return [
+        0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+        1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+        0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s,
+    ];
+}
+
+/** Linear sRGB, possibly out of [0, 1] when the colour is out of gamut */
+function oklabToLinear(L: number, a: number, b: number): [number, number, number] {
+    const l = Math.pow(L + 0.3963377774 * a + 0.2158037573 * b, 3);
+    const m = Math.pow(L - 0.1055613458 * a - 0.0638541728 * b, 3);
+    const s = Math.pow(L - 0.0894841775 * a - 1.2914855480 * b, 3);
+    return [
+        4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s,
+        -1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s,
+        -0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s,
+    ];
+}
+
+function toHex(r: number, g: number, b: number): string {
+    return '#' + [r, g, b].map(v => Math.max(0, Math.min(255, Math.round(v))).toString(16).padStart(2, '0')).join('').toUpperCase();
+}
+
+function hexToLinear(hex: string): [number, number, number] {
+    const n = parseInt(hex.slice(1), 16);
+    return [srgbToLinear((n >> 16) & 255), srgbToLinear((n >> 8) & 255), srgbToLinear(n & 255)];
+}
+
+function relativeLuminance([r, g, b]: [number, number, number]): number {
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b;
+}
+
+/** WCAG contrast ratio, 1-21 */
+function contrastRatio(a: number, b: number): number {
+    return (Math.max(a, b) + 0.05) / (Math.min(a, b) + 0.05);
+}
+
+function labDistance(a: [number, number, number], b: [number, number, number]): number {
+    return Math.hypot(a[0] - b[0], a[1] - b[1], a[2] - b[2]);
+}
+
+/** In-gamut hex for an OKLCh colour, reducing chroma until it fits */
+function oklchToHex(L: number, C: number, hueDegrees: number): string {
+    const h = (hueDegrees * Math.PI) / 180;
+    for (let chroma = C; chroma >= 0; chroma -= 0.01) {
+        const rgb = oklabToLinear(L, chroma * Math.cos(h), chroma * Math.sin(h));
+        if (rgb.every(v => v >= -1e-4 && v <= 1 + 1e-4)) {
+            return toHex(...rgb.map(v => linearToSrgb(Math.max(0, Math.min(1, v)))) as [number, number, number]);
+        }
+    }
+    const grey = linearToSrgb(Math.max(0, Math.min(1, Math.pow(L, 3))));
+    return toHex(grey, grey, grey);
+}
+
+// ============================================
+// SAMPLING + CLUSTERING
+// ============================================
+
+/**
+ * Median-cut seeds: repeatedly split the box with the widest OKLab spread
+ * (weighted by pixel count) at the median of that axis.
+ */
+function medianCutSeeds(lab: Float32Array, count: number, k: number): Float32Array {
+    let boxes: Uint32Array[] = [Uint32Array.from({ length: count }, (_, i) => i)];
+
+    const spread = (box: Uint32Array) => {
+        let best = { axis: 0, range: 0 };
+        for (let axis = 0; axis < 3; axis++) {
+            let min = Infinity, max = -Infinity;
+            for (const i of box) {
+                const v = lab[i * 3 + axis];
+                if (v < min) min = v;
+                if (v > max) max = v;
+            }
+            if (max - min > best.range) best = { axis, range: max - min };
+        }
+        return best;
+    };
+
+    while (boxes.length < k) {
+        let target = -1, axis = 0, bestScore = 0;
+        boxes.forEach((box, index) => {
+            if (box.length < 2) return;
+            const s = spread(box);
+            const score = s.range * Math.sqrt(box.length);
+            if (score > bestScore) {
+                bestScore = score;
+                target = index;
+                axis = s.axis;
+            }
+        });
+        if (target === -1) break;
+
+        const sorted = boxes[target].slice().sort((a, b) => lab[a * 3 + axis] - lab[b * 3 + axis]);
+        const mid = sorted.length >> 1;
+        boxes = [...boxes.slice(0, target), sorted.subarray(0, mid), sorted.subarray(mid), ...boxes.slice(target + 1)];
+    }
+
+    const seeds = new Float32Array(boxes.length * 3);
+    boxes.forEach((box, c) => {
+        for (const i of box) {
+            seeds[c * 3] += lab[i * 3];
+            seeds[c * 3 + 1] += lab[i * 3 + 1];
+            seeds[c * 3 + 2] += lab[i * 3 + 2];
+        }
+        for (let axis = 0; axis < 3; axis++) seeds[c * 3 + axis] /= box.length;
+    });
+    return seeds;
+}
+
+/** Decode, downsample and cluster an image into swatches (largest first). */
+export async function samplePalette(image: Buffer): Promise<PaletteSample> {
+    let raw: { data: Buffer; info: sharp.OutputInfo };
+    try {
+        raw = await sharp(image, { failOn: 'error' })
+            .rotate()
+            .resize(SAMPLE_SIZE, SAMPLE_SIZE, { fit: 'inside' })
+            .ensureAlpha()
+            .raw()
+            .toBuffer({ resolveWithObject: true });
+    } catch {
+        throw new PaletteError('Could not read that image. Please upload a PNG, JPEG, WebP or SVG logo.');
+    }
+
+    const { data, info } = raw;
+    const total = info.width * info.height;
+
+    // Opaque pixels only: OKLab for clustering, sRGB for the final swatch colour
+    const lab = new Float32Array(total * 3);
+    const rgb = new Uint8Array(total * 3);
+    const edge = new Uint8Array(total);
+    let count = 0;
+    for (let p = 0; p < total; p++) {
+        if (data[p * 4 + 3] < 128) continue;
+        const r = data[p * 4], g = data[p * 4 + 1], b = data[p * 4 + 2];
+        const [L, A, B] = linearToOklab(srgbToLinear(r), srgbToLinear(g), srgbToLinear(b));
+        lab[count * 3] = L;
+        lab[count * 3 + 1] = A;
+        lab[count * 3 + 2] = B;
+        rgb[count * 3] = r;
+        rgb[count * 3 + 1] = g;
+        rgb[count * 3 + 2] = b;
+        const x = p % info.width, y = Math.floor(p / info.width);
+        edge[count] = x === 0 || y === 0 || x === info.width - 1 || y === info.height - 1 ? 1 : 0;
+        count++;
+    }
+
+    if (count < MIN_OPAQUE_PIXELS) {
+        throw new PaletteError('That image has no visible colours to extract.');
+    }
+
+    const centroids = medianCutSeeds(lab, count, CLUSTERS);
+    const k = centroids.length / 3;
+    const assignment = new Uint8Array(count);
+
+    for (let pass = 0; pass < KMEANS_PASSES; pass++) {
+        let changed = 0;
+        for (let i = 0; i < count; i++) {
+            let best = 0, bestDistance = Infinity;
+            for (let c = 0; c < k; c++) {
+                const dL = lab[i * 3] - centroids[c * 3];
+                const dA = lab[i * 3 + 1] - centroids[c * 3 + 1];
+                const dB = lab[i * 3 + 2] - centroids[c * 3 + 2];
+                const distance = dL * dL + dA * dA + dB * dB;
+                if (distance < bestDistance) {
+                    bestDistance = distance;
+                    best = c;
+                }
+            }
+            if (assignment[i] !== best || pass === 0) changed++;
+            assignment[i] = best;
+        }
+
+        const sums = new Float64Array(k * 3);
+        const sizes = new Uint32Array(k);
+        for (let i = 0; i < count; i++) {
+            const c = assignment[i];
+            sums[c * 3] += lab[i * 3];
+            sums[c * 3 + 1] += lab[i * 3 + 1];
+            sums[c * 3 + 2] += lab[i * 3 + 2];
+            sizes[c]++;
+        }
+        for (let c = 0; c < k; c++) {
+            if (sizes[c] === 0) continue;
+            for (let axis = 0; axis < 3; axis++) centroids[c * 3 + axis] = sums[c * 3 + axis] / sizes[c];
+        }
+        if (changed === 0) break;
+    }
+
+    const rgbSums = new Float64Array(k * 3);
+    const sizes = new Uint32Array(k);
+    const edgeSizes = new Uint32Array(k);
+    let edgeTotal = 0;
+    for (let i = 0; i < count; i++) {
+        const c = assignment[i];
+        rgbSums[c * 3] += rgb[i * 3];
+        rgbSums[c * 3 + 1] += rgb[i * 3 + 1];
+        rgbSums[c * 3 + 2] += rgb[i * 3 + 2];
+        sizes[c]++;
+        edgeSizes[c] += edge[i];
+        edgeTotal += edge[i];
+    }
+
+    const swatches: Swatch[] = [];
+    for (let c = 0; c < k; c++) {
+        if (sizes[c] === 0) continue;
+        const hex = toHex(rgbSums[c * 3] / sizes[c], rgbSums[c * 3 + 1] / sizes[c], rgbSums[c * 3 + 2] / sizes[c]);
+        const clusterLab: [number, number, number] = [centroids[c * 3], centroids[c * 3 + 1], centroids[c * 3 + 2]];
+        swatches.push({
+            hex,
+            share: sizes[c] / count,
+            edgeShare: edgeTotal ? edgeSizes[c] / edgeTotal : 0,
+            lab: clusterLab,
+            chroma: Math.hypot(clusterLab[1], clusterLab[2]),
+            luminance: relativeLuminance(hexToLinear(hex)),
+        });
+    }
+
+    swatches.sort((a, b) => b.share - a.share);
+    return { swatches, transparentShare: 1 - count / total };
+}
+
+// ============================================
+// ROLE SELECTION
+// ============================================
+
+function primaryScore(swatch: Swatch): number {
+    return (swatch.chroma + 0.02) * Math.sqrt(swatch.share);
+}
+
+/** Light or dark neutral, whichever gives the primary more contrast */
+function neutralBackgroundFor(primary: Swatch): string {
+    const light = contrastRatio(primary.luminance, 1);
+    const dark = contrastRatio(primary.luminance, relativeLuminance(hexToLinear(DARK_BACKGROUND)));
+    return light >= dark ? LIGHT_BACKGROUND : DARK_BACKGROUND;
+}
+
+/** Split-complement of the primary, at a lightness that reads on the background */
+function synthesizeAccent(primary: Swatch, backgroundLuminance: number): string {
+    const hue = primary.chroma < NEUTRAL_CHROMA
+        ? FALLBACK_ACCENT_HUE
+        : (Math.atan2(primary.lab[2], primary.lab[1]) * 180) / Math.PI + 150;
+    const lightness = backgroundLuminance > 0.4 ? 0.6 : 0.8;
+    return oklchToHex(lightness, Math.max(primary.chroma, 0.14), hue);
+}
+
+/**
+ * Assign brand roles to sampled swatches. `preferredPrimary` (one of the
+ * swatch hexes) overrides the scored primary, e.g. after a tie-break.
+ */
+export function pickPalette(sample: PaletteSample, preferredPrimary?: string): PaletteResult {
+    const swatches = sample.swatches.filter(s => s.share >= MIN_SHARE);
+    if (swatches.length === 0) swatches.push(sample.swatches[0]);
+
+    // Background: a neutral that owns most of the border. Transparent logos
+    // and full-bleed colour get a synthesised neutral instead.
+    const edgeSwatch = swatches.reduce((a, b) => (b.edgeShare > a.edgeShare ? b : a));
+    const backgroundSwatch = sample.transparentShare < 0.1
+        && edgeSwatch.edgeShare >= 0.5
+        && edgeSwatch.chroma < NEUTRAL_CHROMA * 1.5
+        && swatches.length > 1
+        ? edgeSwatch
+        : null;
+
+    // Primary: chroma weighted by coverage, so a dominant navy beats a small orange dot
+    const candidates = swatches
+        .filter(s => s !== backgroundSwatch)
+        .map(s => ({ swatch: s, score: primaryScore(s) }))
+        .sort((a, b) => b.score - a.score);
+    const preferred = preferredPrimary && candidates.find(c => c.swatch.hex === preferredPrimary.toUpperCase());
+    const primary = (preferred || candidates[0]).swatch;
+    const primaryCandidates = candidates
+        .filter(c => c.score >= candidates[0].score * TIE_RATIO)
+        .map(c => c.swatch.hex);
+
+    const background = backgroundSwatch?.hex ?? neutralBackgroundFor(primary);
+    const backgroundLuminance = backgroundSwatch?.luminance ?? relativeLuminance(hexToLinear(background));
+
+    // Accent: the most distinct, colourful swatch that still reads on the background
+    let accent: string | null = null;
+    let bestAccentScore = 0;
+    for (const swatch of sample.swatches) {
+        if (swatch === primary || swatch === backgroundSwatch || swatch.share < MIN_ACCENT_SHARE) continue;
+        const distance = labDistance(swatch.lab, primary.lab);
+        const contrast = contrastRatio(swatch.luminance, backgroundLuminance);
+        if (distance < 0.08 || contrast < MIN_ACCENT_CONTRAST) continue;
+        const score = distance * (swatch.chroma + 0.05) * Math.min(contrast / 3, 1) * Math.pow(swatch.share, 0.25);
+        if (score > bestAccentScore) {
+            bestAccentScore = score;
+            accent = swatch.hex;
+        }
+    }
+
+    return {
+        palette: {
+            primary: primary.hex,
+            background,
+            accent: accent ?? synthesizeAccent(primary, backgroundLuminance),
+        },
+        primaryCandidates: primaryCandidates.length > 1 ? primaryCandidates : [],
+    };
+}
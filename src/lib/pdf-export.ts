@@ -39,35 +39,18 @@ export async function generatePDF(
     pdf.save(`${data.slides[0].title.replace(/[^a-z0-9]/gi, '_').toLowerCase()}.pdf`);
 }
 
-export async function generatePDFFromContainer(
-    containerId: string,
-    filename: string
-) {
-    const container = document.getElementById(containerId);
-    if (!container) throw new Error('Preview container not found');
-
-    const slides = container.children;
-    if (!slides || slides.length === 0) throw new Error('No slides found to export');
-
-    const pdf = new jsPDF({
-        orientation: 'portrait',
-        unit: 'px',
-        format: [1080, 1350]
-    });
-
-    for (let i = 0; i < slides.length; i++) {
-        const slide = slides[i] as HTMLElement;
-
-        const imgData = await toJpeg(slide, {
-            quality: 0.95,
-            width: 1080,
-            height: 1350,
-            pixelRatio: 2
-        });
-
-        if (i > 0) pdf.addPage([1080, 1350]);
-        pdf.addImage(imgData, 'JPEG', 0, 0, 1080, 1350);
+/**
+ * Export a saved carousel (`carousel_slides`) via the server renderer and
+ * start the download. Rendering happens in /api/posts/[id]/export, so the tab
+ * never holds the slide images.
+ */
+export async function downloadCarouselPDF(postId: string) {
+    const res = await fetch(`/api/posts/${postId}/export?format=pdf`);
+    const data = await res.json().catch(() => ({}));
+    if (!res.ok || !data.urls?.[0]) {
+        throw new Error(data.error || 'Failed to export carousel');
     }
 
-    pdf.save(`${filename.replace(/[^a-z0-9]/gi, '_').toLowerCase()}.pdf`);
+    // Signed URL is served with Content-Disposition: attachment
+    window.location.assign(data.urls[0]);
 }
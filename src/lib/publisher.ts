@@ -0,0 +1,192 @@
+/**
+ * Auto-Publish Worker
+ * Publishes due `scheduled` posts for profiles with auto_publish enabled.
+ *
+ * - claim_due_posts() leases a batch with SKIP LOCKED, so overlapping cron
+ *   invocations never pick the same post
+ * - per-platform concurrency caps keep us under X / LinkedIn rate limits
+ * - transient failures (429, 5xx, network) back off exponentially;
+ *   permanent ones (revoked token, rejected content) fail the post and notify
+ */
+
+import { createClient, SupabaseClient } from '@supabase/supabase-js';
+import { randomUUID } from 'crypto';
+import { PlatformMedia } from '@/lib/media';
+import { publishPost, PublishError, SocialConnection } from '@/lib/publishing';
+
+const LEASE_SECONDS = 300;
+const BATCH_SIZE = 50;
+const MAX_ATTEMPTS = 5;
+const BASE_BACKOFF_MS = 60 * 1000;
+const MAX_BACKOFF_MS = 6 * 60 * 60 * 1000;
+
+export const PLATFORM_CONCURRENCY: Record<string, number> = {
+    x: 2,
+    linkedin: 2,
+};
+
+// ============================================
+// TYPES
+// ============================================
+
+interface ClaimedPost {
+    id: string;
+    profile_id: string;
+    account_id: string;
+    platform: string;
+    content: string;
+    format: string | null;
+    image_url: string | null;
+    platform_media: PlatformMedia | null;
+    publish_attempts: number;
+}
+
+export interface PublisherReport {
+    workerId: string;
+    claimed: number;
+    published: number;
+    retried: number;
+    failed: number;
+}
+
+// Create admin client (bypasses RLS)
+function createAdminClient(): SupabaseClient {
+    const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
+    const supabaseServiceKey = process.env.SUPABASE_SERVICE_ROLE_KEY!;
+    return createClient(supabaseUrl, supabaseServiceKey);
+}
+
+/** Exponential backoff with ±20% jitter: 1m, 2m, 4m, 8m ... capped at 6h. */
+export function backoffDelayMs(attempt: number): number {
+    const delay = Math.min(MAX_BACKOFF_MS, BASE_BACKOFF_MS * 2 ** Math.max(0, attempt - 1));
+    return Math.round(delay * (0.8 + Math.random() * 0.4));
+}
+
+async function runWithConcurrency<T>(items: T[], limit: number, task: (item: T) => Promise<void>): Promise<void> {
+    let next = 0;
+    const worker = async () => {
+        while (next < items.length) {
+            await task(items[next++]);
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(limit, items.length) }, worker));
+}
+
+// ============================================
+// WORKER
+// ============================================
+
+export async function runPublisher(supabase: SupabaseClient = createAdminClient()): Promise<PublisherReport> {
+    const workerId = `publisher:${randomUUID()}`;
+    const report: PublisherReport = { workerId, claimed: 0, published: 0, retried: 0, failed: 0 };
+
+    const { data: claimed, error } = await supabase.rpc('claim_due_posts', {
+        worker_id: workerId,
+        lease_seconds: LEASE_SECONDS,
+        batch_size: BATCH_SIZE,
+        max_attempts: MAX_ATTEMPTS,
+    });
+
+    if (error) throw new Error(`Failed to claim due posts: ${error.message}`);
+
+    const posts: ClaimedPost[] = claimed || [];
+    report.claimed = posts.length;
+    if (posts.length === 0) return report;
+
+    console.log(`[Publisher] ${workerId} claimed ${posts.length} posts`);
+
+    // One connection lookup per account/platform, shared across that account's posts
+    const connections = new Map<string, Promise<SocialConnection | null>>();
+    const getConnection = (accountId: string, platform: string) => {
+        const key = `${accountId}:${platform}`;
+        if (!connections.has(key)) {
+            connections.set(key, Promise.resolve(
+                supabase
+                    .from('social_connections')
+                    .select('id, access_token, profile_id')
+                    .eq('user_id', accountId)
+                    .eq('platform', platform)
+                    .maybeSingle()
+            ).then(({ data }) => data));
+        }
+        return connections.get(key)!;
+    };
+
+    // Only touch rows we still hold the lease on
+    const finish = (postId: string, values: Record<string, unknown>) =>
+        supabase
+            .from('posts')
+            .update({ ...values, publish_lease_owner: null, publish_lease_until: null, updated_at: new Date().toISOString() })
+            .eq('id', postId)
+            .eq('publish_lease_owner', workerId);
+
+    const fail = async (post: ClaimedPost, message: string, media: PlatformMedia = {}) => {
+        report.failed++;
+        await finish(post.id, {
+            status: 'failed',
+            // Keep uploads / posted thread ids so a republish resumes instead of duplicating
+            platform_media: { ...post.platform_media, ...media },
+            publish_attempts: post.publish_attempts + 1,
+            last_publish_error: message,
+        });
+        await supabase.from('notifications').insert({
+            account_id: post.account_id,
+            type: 'post_failed',
+            title: `Your ${post.platform === 'x' ? 'X' : 'LinkedIn'} post couldn't be published`,
+            message,
+            action_url: '/dashboard',
+        });
+    };
+
+    const publishOne = async (post: ClaimedPost) => {
+        const connection = await getConnection(post.account_id, post.platform);
+        if (!connection) {
+            await fail(post, `Not connected to ${post.platform}. Please connect in settings.`);
+            return;
+        }
+
+        try {
+            const { externalId, media } = await publishPost(post, connection, post.platform_media || {});
+            report.published++;
+            await finish(post.id, {
+                status: 'posted',
+                posted_at: new Date().toISOString(),
+                external_id: externalId,
+                platform_media: { ...post.platform_media, ...media },
+                publish_attempts: post.publish_attempts + 1,
+                last_publish_error: null,
+            });
+        } catch (err) {
+            const error = err instanceof PublishError ? err : new PublishError(String(err), null, true);
+            const attempts = post.publish_attempts + 1;
+            console.warn(`[Publisher] Post ${post.id} attempt ${attempts} failed (${error.status ?? 'network'}): ${error.message}`);
+
+            if (!error.retryable || attempts >= MAX_ATTEMPTS) {
+                await fail(post, error.message, error.media);
+                return;
+            }
+
+            report.retried++;
+            await finish(post.id, {
+                // Keep uploads that made it so the retry doesn't re-send the image
+                platform_media: { ...post.platform_media, ...error.media },
+                publish_attempts: attempts,
+                next_publish_attempt_at: new Date(Date.now() + backoffDelayMs(attempts)).toISOString(),
+                last_publish_error: error.message,
+            });
+        }
+    };
+
+    const byPlatform = new Map<string, ClaimedPost[]>();
+    for (const post of posts) {
+        const platform = post.platform.toLowerCase();
+        byPlatform.set(platform, [...(byPlatform.get(platform) || []), post]);
+    }
+
+    await Promise.all(Array.from(byPlatform, ([platform, platformPosts]) =>
+        runWithConcurrency(platformPosts, PLATFORM_CONCURRENCY[platform] || 1, publishOne)
+    ));
+
+    console.log(`[Publisher] ${workerId} done: ${report.published} published, ${report.retried} retrying, ${report.failed} failed`);
+    return report;
+}
@@ -0,0 +1,342 @@
+/**
+ * Platform publishing (X + LinkedIn)
+ * Shared by the manual publish route and the auto-publish worker.
+ *
+ * Images are streamed to both platforms (see src/lib/media.ts) and the
+ * resulting X media id / LinkedIn asset URN is returned for caching, so a
+ * retry reuses the upload instead of repeating it. A thread that fails
+ * part-way returns the tweets already posted the same way, and the retry
+ * continues the thread from there.
+ *
+ * X_API_BASE_URL / LINKEDIN_API_BASE_URL point both platforms at local
+ * HTTP stand-ins (testsprite_tests/api_standins.py) for tests.
+ */
+
+import { createHash } from 'crypto';
+import { TwitterApi } from 'twitter-api-v2';
+import { bufferImageStream, cachedMediaId, openImageStream, PlatformMedia, segmentStream, xMediaEntry } from '@/lib/media';
+
+const X_API_V2_PREFIX = 'https://api.x.com/2/';
+const X_UPLOAD_PREFIX = 'https://upload.twitter.com/1.1/';
+const LINKEDIN_API_PREFIX = 'https://api.linkedin.com/v2/';
+const X_UPLOAD_SEGMENT_BYTES = 1024 * 1024;
+// X's largest media upload (GIFs); stills are capped lower on X's side
+const X_MAX_UPLOAD_BYTES = 15 * 1024 * 1024;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface PublishablePost {
+    id: string;
+    platform: string;
+    content: string;
+    format?: string | null;
+    image_url?: string | null;
+}
+
+export interface SocialConnection {
+    id: string;
+    access_token: string;
+    profile_id: string | null;
+}
+
+export interface PublishResult {
+    externalId: string;
+    /** Media uploads to persist on the post (posts.platform_media) */
+    media: PlatformMedia;
+}
+
+/**
+ * `retryable` separates transient failures (rate limits, 5xx, network) from
+ * ones a retry can't fix (revoked token, rejected content).
+ */
+export class PublishError extends Error {
+    /** Uploads that succeeded before the failure; worth caching for the retry */
+    media: PlatformMedia = {};
+
+    constructor(message: string, public status: number | null, public retryable: boolean) {
+        super(message);
+        this.name = 'PublishError';
+    }
+}
+
+function isRetryableStatus(status: number | null): boolean {
+    return status === null || status === 408 || status === 429 || status >= 500;
+}
+
+function toPublishError(error: unknown, fallback: string): PublishError {
+    if (error instanceof PublishError) return error;
+    const anyError = error as any;
+    // twitter-api-v2 ApiResponseError carries `code` = HTTP status; fetch failures have none
+    const status: number | null = typeof anyError?.code === 'number' ? anyError.code : null;
+    const message = anyError?.data?.detail || anyError?.message || fallback;
+    return new PublishError(message, status, isRetryableStatus(status));
+}
+
+function withUploads(error: unknown, uploads: PlatformMedia): PublishError {
+    const wrapped = toPublishError(error, 'Failed to publish post');
+    wrapped.media = { ...wrapped.media, ...uploads };
+    return wrapped;
+}
+
+function xApiPrefix(): string {
+    const base = process.env.X_API_BASE_URL;
+    return base ? `${base.replace(/\/$/, '')}/2/` : X_API_V2_PREFIX;
+}
+
+function xUploadPrefix(): string {
+    const base = process.env.X_API_BASE_URL;
+    return base ? `${base.replace(/\/$/, '')}/1.1/` : X_UPLOAD_PREFIX;
+}
+
+function linkedInApi(path: string): string {
+    const base = process.env.LINKEDIN_API_BASE_URL;
+    return `${base ? `${base.replace(/\/$/, '')}/v2/` : LINKEDIN_API_PREFIX}${path}`;
+}
+
+// ============================================
+// X
+// ============================================
+
+/**
+ * Chunked media upload (INIT / APPEND / FINALIZE) fed from a stream, so only
+ * one 1MB segment is in memory at a time (the whole image, when the source
+ * sends no Content-Length).
+ */
+async function uploadXMedia(client: TwitterApi, imageUrl: string): Promise<string> {
+    const prefix = xUploadPrefix();
+    let image = await openImageStream(imageUrl);
+    // INIT needs total_bytes: without a Content-Length, read the (bounded) image first
+    if (image.contentLength === null) {
+        const buffered = await bufferImageStream(image, X_MAX_UPLOAD_BYTES);
+        if (!buffered) {
+            throw new PublishError(`Image is larger than X allows (${X_MAX_UPLOAD_BYTES / (1024 * 1024)}MB)`, null, false);
+        }
+        image = buffered;
+    }
+
+    const init = await client.v1.post<{ media_id_string: string }>('media/upload.json', {
+        command: 'INIT',
+        total_bytes: image.contentLength,
+        media_type: image.contentType,
+    }, { prefix, forceBodyMode: 'url' });
+    const mediaId = init.media_id_string;
+
+    let segmentIndex = 0;
+    for await (const segment of segmentStream(image.body, X_UPLOAD_SEGMENT_BYTES)) {
+        await client.v1.post('media/upload.json', {
+            command: 'APPEND',
+            media_id: mediaId,
+            segment_index: segmentIndex++,
+            media: segment,
+        }, { prefix, forceBodyMode: 'form-data' });
+    }
+
+    await client.v1.post('media/upload.json', {
+        command: 'FINALIZE',
+        media_id: mediaId,
+    }, { prefix, forceBodyMode: 'url' });
+
+    return mediaId;
+}
+
+async function publishToX(post: PublishablePost, connection: SocialConnection, media: PlatformMedia): Promise<PublishResult> {
+    // Refresh Token if needed (Twitter V2)
+    // For MVP we assume token is valid or long-lived enough for the session.
+    const client = new TwitterApi(connection.access_token);
+    const prefix = xApiPrefix();
+    const uploads: PlatformMedia = {};
+
+    // Split by double newlines for thread format
+    const tweets = post.format === 'thread'
+        ? post.content.split('\n\n').filter(t => t.trim().length > 0)
+        : [post.content];
+
+    // A thread that failed part-way resumes after the last tweet that made it
+    const threadSource = createHash('sha256').update(post.content).digest('hex');
+    const posted = media.x_thread?.source === threadSource ? [...media.x_thread.ids] : [];
+    const progress = (): PlatformMedia => posted.length > 0
+        ? { ...uploads, x_thread: { source: threadSource, ids: [...posted] } }
+        : uploads;
+
+    // Upload media if post has an image (reusing a previous attempt's upload)
+    const mediaIds: string[] = [];
+    if (post.image_url && posted.length === 0) {
+        try {
+            let mediaId = cachedMediaId(media, 'x', post.image_url);
+            if (!mediaId) {
+                console.log('[Publish] Streaming image to X:', post.image_url);
+                mediaId = await uploadXMedia(client, post.image_url);
+                uploads.x = xMediaEntry(post.image_url, mediaId);
+                console.log('[Publish] Uploaded media to X, Media ID:', mediaId);
+            }
+            mediaIds.push(mediaId);
+        } catch (imgError) {
+            console.error('[Publish] Failed to upload media to X:', imgError);
+            const wrapped = toPublishError(imgError, 'Failed to attach image to X post.');
+            throw new PublishError('Failed to attach image to X post.', wrapped.status, wrapped.retryable);
+        }
+    }
+
+    const tweet = async (payload: Record<string, any>): Promise<string> => {
+        const res = await client.v2.post<{ data: { id: string } }>('tweets', payload, { prefix });
+        return res.data.id;
+    };
+    const mediaPayload = mediaIds.length > 0 ? { media: { media_ids: mediaIds } } : {};
+
+    // First tweet carries the media; each following one replies to the previous.
+    // Every posted id goes on the error, so a retry never posts a tweet twice
+    try {
+        if (posted.length > 0) console.log(`[Publish] Resuming X thread after tweet ${posted.length}/${tweets.length}`);
+        for (let i = posted.length; i < tweets.length; i++) {
+            posted.push(await tweet(i === 0
+                ? { text: tweets[0], ...mediaPayload }
+                : { text: tweets[i], reply: { in_reply_to_tweet_id: posted[i - 1] } }));
+        }
+    } catch (error) {
+        throw withUploads(error, progress());
+    }
+    return { externalId: posted[0], media: progress() };
+}
+
+// ============================================
+// LINKEDIN
+// ============================================
+
+async function linkedInFetch(path: string, accessToken: string, init: RequestInit, label: string): Promise<Response> {
+    const response = await fetch(path.startsWith('http') ? path : linkedInApi(path), {
+        ...init,
+        headers: {
+            'Authorization': `Bearer ${accessToken}`,
+            'X-Restli-Protocol-Version': '2.0.0',
+            ...(init.headers || {}),
+        },
+    });
+    if (!response.ok) {
+        const errText = await response.text();
+        throw new PublishError(`${label}: ${errText}`, response.status, isRetryableStatus(response.status));
+    }
+    return response;
+}
+
+async function uploadLinkedInImage(imageUrl: string, author: string, accessToken: string): Promise<string> {
+    console.log('[Publish] Registering image upload with LinkedIn...');
+    // 1. Register Upload
+    const registerRes = await linkedInFetch('assets?action=registerUpload', accessToken, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            registerUploadRequest: {
+                recipes: ['urn:li:digitalmediaRecipe:feedshare-image'],
+                owner: author,
+                serviceRelationships: [{
+                    relationshipType: 'OWNER',
+                    identifier: 'urn:li:userGeneratedContent'
+                }]
+            }
+        })
+    }, 'LinkedIn register upload failed');
+
+    const registerData = await registerRes.json();
+    const uploadUrl = registerData.value.uploadMechanism['com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest'].uploadUrl;
+    const assetUrn: string = registerData.value.asset;
+
+    console.log('[Publish] LinkedIn asset registered:', assetUrn, 'Streaming image bytes...');
+
+    // 2. Pipe the image straight from storage into LinkedIn's upload URL
+    const image = await openImageStream(imageUrl);
+    await linkedInFetch(uploadUrl, accessToken, {
+        method: 'PUT',
+        headers: {
+            'Content-Type': 'application/octet-stream',
+            ...(image.contentLength !== null ? { 'Content-Length': String(image.contentLength) } : {}),
+        },
+        body: image.body,
+        duplex: 'half',
+    } as RequestInit, 'LinkedIn media upload failed');
+
+    return assetUrn;
+}
+
+async function publishToLinkedIn(post: PublishablePost, connection: SocialConnection, media: PlatformMedia): Promise<PublishResult> {
+    const author = `urn:li:person:${connection.profile_id}`;
+    const uploads: PlatformMedia = {};
+    const specificContent: any = {
+        'com.linkedin.ugc.ShareContent': {
+            shareCommentary: { text: post.content },
+            shareMediaCategory: 'NONE'
+        }
+    };
+
+    // Handle Image Attachment for LinkedIn (reusing a previous attempt's asset)
+    if (post.image_url) {
+        try {
+            let assetUrn = cachedMediaId(media, 'linkedin', post.image_url);
+            if (!assetUrn) {
+                assetUrn = await uploadLinkedInImage(post.image_url, author, connection.access_token);
+                uploads.linkedin = { source: post.image_url, id: assetUrn };
+                console.log('[Publish] LinkedIn media upload successful.');
+            }
+
+            specificContent['com.linkedin.ugc.ShareContent'].shareMediaCategory = 'IMAGE';
+            specificContent['com.linkedin.ugc.ShareContent'].media = [{
+                status: 'READY',
+                description: { text: 'Post Image' },
+                media: assetUrn,
+                title: { text: 'Post Image' }
+            }];
+        } catch (imgError) {
+            console.error('[Publish] Failed to attach image to LinkedIn post:', imgError);
+            const wrapped = toPublishError(imgError, 'Failed to attach image to LinkedIn post.');
+            throw new PublishError('Failed to attach image to LinkedIn post.', wrapped.status, wrapped.retryable);
+        }
+    }
+
+    let response: Response;
+    try {
+        response = await linkedInFetch('ugcPosts', connection.access_token, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                author,
+                lifecycleState: 'PUBLISHED',
+                specificContent,
+                visibility: { 'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC' }
+            })
+        }, 'LinkedIn API Error');
+    } catch (error) {
+        throw withUploads(error, uploads);
+    }
+
+    const data = await response.json();
+    return { externalId: data.id, media: uploads }; // urn:li:share:123
+}
+
+// ============================================
+// PUBLIC API
+// ============================================
+
+/**
+ * Publish one post to its platform. `media` is the post's cached uploads
+ * (posts.platform_media); new uploads come back in the result — or on the
+ * thrown PublishError — so the caller can persist them for the next attempt.
+ */
+export async function publishPost(
+    post: PublishablePost,
+    connection: SocialConnection,
+    media: PlatformMedia = {}
+): Promise<PublishResult> {
+    try {
+        switch (post.platform.toLowerCase()) {
+            case 'x':
+                return await publishToX(post, connection, media);
+            case 'linkedin':
+                return await publishToLinkedIn(post, connection, media);
+            default:
+                throw new PublishError(`Publishing to ${post.platform} is not supported`, null, false);
+        }
+    } catch (error) {
+        throw toPublishError(error, 'Failed to publish post');
+    }
+}
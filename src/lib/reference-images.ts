@@ -0,0 +1,193 @@
+/**
+ * Digital Twin reference images
+ * Selfies sent to /api/visuals/generate and /api/visuals/train are uploaded to
+ * fal storage once per account and photo:
+ *
+ * - uploads arrive as a raw image body or multipart file and are read as a
+ *   bounded stream (base64 JSON is still accepted from older clients);
+ *   multipart and JSON bodies are capped before they are parsed
+ * - the original bytes are hashed while reading; a hash already in
+ *   `reference_images` reuses its fal CDN URL with no processing at all
+ * - new photos are EXIF-rotated, downscaled to MAX_EDGE_PX and re-encoded as
+ *   JPEG with sharp before upload, so fal receives a few hundred KB instead
+ *   of a multi-MB phone photo
+ */
+
+import { createHash } from 'crypto';
+import sharp from 'sharp';
+import { fal } from '@fal-ai/client';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+
+const MAX_UPLOAD_BYTES = 12 * 1024 * 1024;
+// Whole multipart / JSON body: a base64-encoded max-size image plus form fields
+const MAX_BODY_BYTES = Math.ceil(MAX_UPLOAD_BYTES * 4 / 3) + 64 * 1024;
+// Plenty for Gemini image edit references
+const MAX_EDGE_PX = 1024;
+const JPEG_QUALITY = 88;
+// fal storage URLs aren't guaranteed to live forever; upload again after this
+const REUSE_WINDOW_MS = 7 * 24 * 60 * 60 * 1000;
+
+// ============================================
+// TYPES
+// ============================================
+
+export type ReferenceInput = ReadableStream<Uint8Array> | Buffer;
+
+export interface ReferenceUpload {
+    image: ReferenceInput | null;
+    /** Non-file fields (multipart fields, JSON body, or query string for raw uploads) */
+    fields: Record<string, any>;
+}
+
+export class ReferenceImageError extends Error {
+    constructor(message: string, public status: number = 400) {
+        super(message);
+        this.name = 'ReferenceImageError';
+    }
+}
+
+// ============================================
+// REQUEST PARSING
+// ============================================
+
+const tooLarge = () => new ReferenceImageError('Image is too large. Max 12MB.', 413);
+
+/**
+ * Parse a buffered body (multipart or JSON) without reading more than
+ * MAX_BODY_BYTES: an oversized Content-Length is rejected up front, and a
+ * chunked body is cut off once it passes the limit.
+ */
+async function parseBoundedBody<T>(req: Request, parse: (body: Response) => Promise<T>): Promise<T> {
+    if (Number(req.headers.get('content-length')) > MAX_BODY_BYTES) throw tooLarge();
+
+    let size = 0;
+    const limit = new TransformStream<Uint8Array, Uint8Array>({
+        transform(chunk, controller) {
+            size += chunk.byteLength;
+            if (size > MAX_BODY_BYTES) controller.error(tooLarge());
+            else controller.enqueue(chunk);
+        },
+    });
+
+    const body = new Response(req.body ? req.body.pipeThrough(limit) : null, {
+        headers: { 'content-type': req.headers.get('content-type') || '' },
+    });
+    try {
+        return await parse(body);
+    } catch (error) {
+        // formData()/json() may rewrap the stream error
+        if (size > MAX_BODY_BYTES) throw tooLarge();
+        throw error;
+    }
+}
+
+/**
+ * Accepts `image/*` bodies (fields from the query string), multipart with an
+ * `image` file, or the legacy JSON `{ imageBase64, ... }`.
+ */
+export async function readReferenceUpload(req: Request): Promise<ReferenceUpload> {
+    const contentType = req.headers.get('content-type') || '';
+
+    if (contentType.startsWith('image/')) {
+        return {
+            image: req.body,
+            fields: Object.fromEntries(new URL(req.url).searchParams),
+        };
+    }
+
+    if (contentType.startsWith('multipart/form-data')) {
+        const form = await parseBoundedBody(req, body => body.formData());
+        const fields: Record<string, any> = {};
+        let image: ReferenceInput | null = null;
+        for (const [key, value] of form.entries()) {
+            if (typeof value === 'string') fields[key] = value;
+            else if (key === 'image') image = value.stream();
+        }
+        return { image, fields };
+    }
+
+    const { imageBase64, ...fields } = await parseBoundedBody(req, body => body.json());
+    const image = typeof imageBase64 === 'string' && imageBase64
+        ? Buffer.from(imageBase64.replace(/^data:image\/\w+;base64,/, ''), 'base64')
+        : null;
+    return { image, fields };
+}
+
+async function readBounded(input: ReferenceInput): Promise<{ buffer: Buffer; hash: string }> {
+    const hash = createHash('sha256');
+
+    if (Buffer.isBuffer(input)) {
+        if (input.length > MAX_UPLOAD_BYTES) throw tooLarge();
+        return { buffer: input, hash: hash.update(input).digest('hex') };
+    }
+
+    const chunks: Buffer[] = [];
+    let size = 0;
+    const reader = input.getReader();
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        size += value.byteLength;
+        if (size > MAX_UPLOAD_BYTES) {
+            await reader.cancel();
+            throw tooLarge();
+        }
+        hash.update(value);
+        chunks.push(Buffer.from(value.buffer, value.byteOffset, value.byteLength));
+    }
+    return { buffer: Buffer.concat(chunks, size), hash: hash.digest('hex') };
+}
+
+// ============================================
+// STORE
+// ============================================
+
+async function normalize(buffer: Buffer) {
+    try {
+        return await sharp(buffer, { failOn: 'error' })
+            .rotate()
+            .resize({ width: MAX_EDGE_PX, height: MAX_EDGE_PX, fit: 'inside', withoutEnlargement: true })
+            .jpeg({ quality: JPEG_QUALITY, mozjpeg: true })
+            .toBuffer({ resolveWithObject: true });
+    } catch {
+        throw new ReferenceImageError('Could not read that image. Please upload a JPEG, PNG or WebP photo.');
+    }
+}
+
+/** fal CDN URL for a reference photo, uploading it only if this account hasn't already. */
+export async function storeReferenceImage(accountId: string, input: ReferenceInput): Promise<string> {
+    const { buffer, hash } = await readBounded(input);
+    if (buffer.length === 0) throw new ReferenceImageError('Image is empty.');
+
+    const supabase = createAdminSupabaseClient();
+    const { data: existing } = await supabase
+        .from('reference_images')
+        .select('fal_url, created_at')
+        .eq('account_id', accountId)
+        .eq('content_hash', hash)
+        .maybeSingle();
+
+    if (existing && Date.now() - new Date(existing.created_at).getTime() < REUSE_WINDOW_MS) {
+        return existing.fal_url;
+    }
+
+    const { data, info } = await normalize(buffer);
+    const falUrl = await fal.storage.upload(new Blob([new Uint8Array(data)], { type: 'image/jpeg' }));
+
+    const { error } = await supabase
+        .from('reference_images')
+        .upsert({
+            account_id: accountId,
+            content_hash: hash,
+            fal_url: falUrl,
+            width: info.width,
+            height: info.height,
+            bytes: info.size,
+            created_at: new Date().toISOString(),
+        }, { onConflict: 'account_id,content_hash' });
+
+    if (error) console.warn('[Reference Images] Failed to cache upload:', error.message);
+
+    console.log(`[Reference Images] Uploaded ${hash.slice(0, 12)} (${buffer.length} -> ${info.size} bytes, ${info.width}x${info.height})`);
+    return falUrl;
+}
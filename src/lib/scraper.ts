@@ -1,4 +1,5 @@
-import * as cheerio from 'cheerio';
+import { Parser } from 'htmlparser2';
+import { normalizeUrl } from '@/lib/utils';
 
 export interface ScrapedWebsiteData {
     title: string;
@@ -8,96 +9,408 @@ export interface ScrapedWebsiteData {
     links: { text: string; href: string }[];
 }
 
-/**
- * Scrape a website URL and extract relevant business information
- */
-export async function scrapeWebsite(url: string): Promise<ScrapedWebsiteData> {
+const USER_AGENT = 'Mozilla/5.0 (compatible; Influuc/1.0; +https://influuc.com)';
+const ROBOTS_AGENT = 'influuc';
+const FETCH_TIMEOUT_MS = 10_000;
+
+// Streaming limits
+const MAX_HTML_BYTES = 2 * 1024 * 1024;   // stop reading after 2MB regardless
+const ENOUGH_MAIN_BLOCKS = 20;            // p/li blocks inside <main>/<article> — what we keep
+const ENOUGH_BODY_BLOCKS = 60;            // p/li blocks anywhere — enough for the body fallback
+
+// Concurrency
+const MAX_PER_HOST = 2;
+const MAX_GLOBAL = 6;
+
+// Caches (per serverless instance)
+const CACHE_TTL_MS = 6 * 60 * 60 * 1000;
+const CACHE_MAX_ENTRIES = 200;
+const ROBOTS_TTL_MS = 24 * 60 * 60 * 1000;
+
+// ============================================
+// CACHE
+// ============================================
+
+interface CacheEntry {
+    data: ScrapedWebsiteData;
+    etag: string | null;
+    lastModified: string | null;
+    expiresAt: number;
+}
+
+// In-memory store, insertion-ordered so the oldest entry is evicted first
+const pageCache = new Map<string, CacheEntry>();
+const inflight = new Map<string, Promise<ScrapedWebsiteData>>();
+
+function cacheSet(key: string, entry: CacheEntry) {
+    pageCache.delete(key);
+    pageCache.set(key, entry);
+    if (pageCache.size > CACHE_MAX_ENTRIES) {
+        pageCache.delete(pageCache.keys().next().value!);
+    }
+}
+
+// ============================================
+// CONCURRENCY LIMITS
+// ============================================
+
+const hostActive = new Map<string, number>();
+let globalActive = 0;
+const waiting: Array<{ host: string; start: () => void }> = [];
+
+function canStart(host: string): boolean {
+    return globalActive < MAX_GLOBAL && (hostActive.get(host) || 0) < MAX_PER_HOST;
+}
+
+function acquire(host: string): Promise<void> {
+    return new Promise(resolve => {
+        const start = () => {
+            globalActive++;
+            hostActive.set(host, (hostActive.get(host) || 0) + 1);
+            resolve();
+        };
+        if (canStart(host)) start();
+        else waiting.push({ host, start });
+    });
+}
+
+function release(host: string) {
+    globalActive--;
+    const remaining = (hostActive.get(host) || 1) - 1;
+    if (remaining > 0) hostActive.set(host, remaining);
+    else hostActive.delete(host);
+
+    // Wake the first waiter whose host has room (FIFO per host)
+    const index = waiting.findIndex(w => canStart(w.host));
+    if (index !== -1) waiting.splice(index, 1)[0].start();
+}
+
+async function withHostLimit<T>(host: string, task: () => Promise<T>): Promise<T> {
+    await acquire(host);
     try {
-        // Validate URL
-        const validUrl = new URL(url);
+        return await task();
+    } finally {
+        release(host);
+    }
+}
 
-        // Fetch the page
-        const response = await fetch(validUrl.toString(), {
-            headers: {
-                'User-Agent': 'Mozilla/5.0 (compatible; Influuc/1.0; +https://influuc.com)',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            },
-            signal: AbortSignal.timeout(10000), // 10 second timeout
-        });
+// ============================================
+// ROBOTS.TXT
+// ============================================
 
-        if (!response.ok) {
-            throw new Error(`Failed to fetch: ${response.status} ${response.statusText}`);
+interface RobotsRules {
+    allow: string[];
+    disallow: string[];
+    expiresAt: number;
+}
+
+const robotsCache = new Map<string, RobotsRules>();
+
+/** Rules for our agent, falling back to the `*` group. */
+export function parseRobots(text: string, agent: string = ROBOTS_AGENT): { allow: string[]; disallow: string[] } {
+    const groups = new Map<string, { allow: string[]; disallow: string[] }>();
+    let currentAgents: string[] = [];
+    let lastWasAgent = false;
+
+    for (const rawLine of text.split(/\r?\n/)) {
+        const line = rawLine.replace(/#.*$/, '').trim();
+        const separator = line.indexOf(':');
+        if (separator === -1) continue;
+        const field = line.slice(0, separator).trim().toLowerCase();
+        const value = line.slice(separator + 1).trim();
+
+        if (field === 'user-agent') {
+            if (!lastWasAgent) currentAgents = [];
+            currentAgents.push(value.toLowerCase());
+            if (!groups.has(value.toLowerCase())) groups.set(value.toLowerCase(), { allow: [], disallow: [] });
+            lastWasAgent = true;
+            continue;
+        }
+        lastWasAgent = false;
+        if ((field === 'allow' || field === 'disallow') && value) {
+            for (const name of currentAgents) groups.get(name)![field].push(value);
         }
+    }
 
-        const html = await response.text();
-        const $ = cheerio.load(html);
+    return groups.get(agent) || groups.get('*') || { allow: [], disallow: [] };
+}
 
-        // Remove script and style elements
-        $('script, style, nav, footer, header, iframe, noscript').remove();
+function ruleMatches(rule: string, path: string): boolean {
+    const anchored = rule.endsWith('$');
+    const pattern = rule
+        .replace(/\$$/, '')
+        .replace(/[.+?^{}()|[\]\\]/g, '\\$&')
+        .replace(/\*/g, '.*');
+    return new RegExp(`^${pattern}${anchored ? '$' : ''}`).test(path);
+}
 
-        // Extract title
-        const title = $('title').text().trim() ||
-            $('h1').first().text().trim() ||
-            '';
+/** Longest matching rule wins; Allow wins ties (RFC 9309). */
+export function isPathAllowed(rules: { allow: string[]; disallow: string[] }, path: string): boolean {
+    const longest = (list: string[]) => Math.max(-1, ...list.filter(r => ruleMatches(r, path)).map(r => r.length));
+    return longest(rules.allow) >= longest(rules.disallow);
+}
 
-        // Extract meta description
-        const description = $('meta[name="description"]').attr('content') ||
-            $('meta[property="og:description"]').attr('content') ||
-            '';
+async function getRobots(origin: string): Promise<RobotsRules> {
+    const cached = robotsCache.get(origin);
+    if (cached && cached.expiresAt > Date.now()) return cached;
 
-        // Extract headings
-        const headings: string[] = [];
-        $('h1, h2, h3').each((_, el) => {
-            const text = $(el).text().trim();
-            if (text && text.length < 200) {
-                headings.push(text);
-            }
+    let rules = { allow: [] as string[], disallow: [] as string[] };
+    try {
+        const response = await fetch(`${origin}/robots.txt`, {
+            headers: { 'User-Agent': USER_AGENT },
+            signal: AbortSignal.timeout(5000),
         });
+        // Missing or broken robots.txt = no restrictions; we only fetch pages users hand us
+        if (response.ok) rules = parseRobots((await response.text()).slice(0, 500_000));
+    } catch {
+        // Network error on robots.txt shouldn't block scraping the page itself
+    }
+
+    const entry = { ...rules, expiresAt: Date.now() + ROBOTS_TTL_MS };
+    robotsCache.set(origin, entry);
+    return entry;
+}
 
-        // Extract main content
-        const mainContent: string[] = [];
+// ============================================
+// STREAMING EXTRACTION
+// ============================================
 
-        // Try to find main content areas
-        const contentSelectors = ['main', 'article', '[role="main"]', '.content', '#content', '.main'];
-        let contentArea = $('body');
+const SKIP_TAGS = new Set(['script', 'style', 'nav', 'footer', 'header', 'iframe', 'noscript', 'svg']);
+const BLOCK_TAGS = new Set(['p', 'li', 'h1', 'h2', 'h3']);
 
-        for (const selector of contentSelectors) {
-            if ($(selector).length > 0) {
-                contentArea = $(selector).first();
-                break;
-            }
+/**
+ * Incremental extractor: feed it HTML chunks, it collects title/meta/headings/
+ * paragraphs and reports `done` once it has enough content to stop reading.
+ */
+class ContentExtractor {
+    title = '';
+    h1 = '';
+    description = '';
+    headings: string[] = [];
+    mainBlocks: string[] = [];
+    bodyBlocks: string[] = [];
+    mainLinks: { text: string; href: string }[] = [];
+    bodyLinks: { text: string; href: string }[] = [];
+    done = false;
+
+    private skipDepth = 0;
+    private mainDepth = 0;
+    private inTitle = false;
+    private block: { tag: string; text: string } | null = null;
+    private link: { href: string; text: string } | null = null;
+    private tagStack: string[] = [];
+    private parser: Parser;
+
+    constructor() {
+        this.parser = new Parser({
+            onopentag: (name, attrs) => this.open(name, attrs),
+            ontext: text => this.text(text),
+            onclosetag: name => this.close(name),
+        }, { decodeEntities: true, lowerCaseTags: true });
+    }
+
+    write(chunk: string) {
+        if (!this.done) this.parser.write(chunk);
+    }
+
+    end() {
+        this.parser.end();
+    }
+
+    private isMainOpen(name: string, attrs: Record<string, string>): boolean {
+        if (name === 'main' || name === 'article' || attrs.role === 'main') return true;
+        const classes = (attrs.class || '').split(/\s+/);
+        return attrs.id === 'content' || classes.includes('content') || classes.includes('main');
+    }
+
+    private open(name: string, attrs: Record<string, string>) {
+        this.tagStack.push(name);
+        if (SKIP_TAGS.has(name)) this.skipDepth++;
+        if (this.mainDepth > 0 || this.isMainOpen(name, attrs)) this.mainDepth++;
+
+        if (name === 'title') this.inTitle = true;
+        if (name === 'meta' && !this.description) {
+            const key = attrs.name || attrs.property;
+            if (key === 'description' || key === 'og:description') this.description = (attrs.content || '').trim();
         }
+        if (this.skipDepth > 0) return;
 
-        contentArea.find('p, li').each((_, el) => {
-            const text = $(el).text().trim();
-            if (text && text.length > 20 && text.length < 500) {
-                mainContent.push(text);
-            }
-        });
+        if (BLOCK_TAGS.has(name) && !this.block) this.block = { tag: name, text: '' };
+        if (name === 'a' && attrs.href) this.link = { href: attrs.href, text: '' };
+    }
+
+    private text(text: string) {
+        if (this.inTitle) this.title += text;
+        if (this.skipDepth > 0) return;
+        if (this.block) this.block.text += text;
+        if (this.link) this.link.text += text;
+    }
+
+    private close(name: string) {
+        // Tolerate unbalanced HTML: pop back to the matching open tag
+        const index = this.tagStack.lastIndexOf(name);
+        if (index === -1) return;
+        const closed = this.tagStack.splice(index);
+
+        for (const tag of closed.reverse()) {
+            if (tag === 'title') this.inTitle = false;
 
-        // Extract important links (avoid navigation)
-        const links: { text: string; href: string }[] = [];
-        contentArea.find('a').each((_, el) => {
-            const text = $(el).text().trim();
-            const href = $(el).attr('href');
-            if (text && href && text.length > 2 && text.length < 100) {
-                // Only include internal and relevant links
-                if (!href.startsWith('#') && !href.includes('javascript:')) {
-                    links.push({ text, href });
-                }
+            if (this.skipDepth === 0) {
+                if (this.block && this.block.tag === tag) this.finishBlock();
+                if (tag === 'a' && this.link) this.finishLink();
             }
-        });
 
-        // Combine and clean content
-        const content = mainContent.slice(0, 20).join('\n\n');
+            if (SKIP_TAGS.has(tag)) this.skipDepth = Math.max(0, this.skipDepth - 1);
+            if (this.mainDepth > 0) this.mainDepth--;
+        }
+
+        if (this.mainBlocks.length >= ENOUGH_MAIN_BLOCKS || this.bodyBlocks.length >= ENOUGH_BODY_BLOCKS) {
+            this.done = true;
+        }
+    }
+
+    private finishBlock() {
+        const { tag, text: raw } = this.block!;
+        this.block = null;
+        const text = raw.replace(/\s+/g, ' ').trim();
+
+        if (tag.startsWith('h')) {
+            if (tag === 'h1' && !this.h1) this.h1 = text;
+            if (text && text.length < 200 && this.headings.length < 10) this.headings.push(text);
+            return;
+        }
+        if (text.length > 20 && text.length < 500) {
+            this.bodyBlocks.push(text);
+            if (this.mainDepth > 0) this.mainBlocks.push(text);
+        }
+    }
+
+    private finishLink() {
+        const { href, text: raw } = this.link!;
+        this.link = null;
+        const text = raw.replace(/\s+/g, ' ').trim();
+        // Only include internal and relevant links
+        if (text.length > 2 && text.length < 100 && !href.startsWith('#') && !href.includes('javascript:')) {
+            if (this.bodyLinks.length < 10) this.bodyLinks.push({ text, href });
+            if (this.mainDepth > 0 && this.mainLinks.length < 10) this.mainLinks.push({ text, href });
+        }
+    }
+
+    result(): ScrapedWebsiteData {
+        // Prefer the main content area when the page has one (same as the old DOM walk)
+        const blocks = this.mainBlocks.length > 0 ? this.mainBlocks : this.bodyBlocks;
+        const links = this.mainBlocks.length > 0 ? this.mainLinks : this.bodyLinks;
+        const content = blocks.slice(0, 20).join('\n\n');
 
         return {
-            title,
-            description,
+            title: this.title.replace(/\s+/g, ' ').trim() || this.h1 || '',
+            description: this.description,
             content: content.slice(0, 5000), // Limit to ~5000 chars
-            headings: headings.slice(0, 10),
+            headings: this.headings.slice(0, 10),
             links: links.slice(0, 10),
         };
+    }
+}
+
+/** Stream the body through the extractor, stopping at the byte cap or once enough content is found. */
+async function extractFromResponse(response: Response): Promise<ScrapedWebsiteData> {
+    const extractor = new ContentExtractor();
+
+    if (!response.body) {
+        extractor.write((await response.text()).slice(0, MAX_HTML_BYTES));
+        extractor.end();
+        return extractor.result();
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let bytes = 0;
+
+    try {
+        while (!extractor.done && bytes < MAX_HTML_BYTES) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            bytes += value.byteLength;
+            extractor.write(decoder.decode(value, { stream: true }));
+        }
+    } finally {
+        // Abandon the rest of the download
+        reader.cancel().catch(() => { });
+    }
+
+    extractor.end();
+    return extractor.result();
+}
+
+// ============================================
+// PUBLIC API
+// ============================================
+
+async function fetchAndExtract(url: URL, cacheKey: string): Promise<ScrapedWebsiteData> {
+    const robots = await getRobots(url.origin);
+    if (!isPathAllowed(robots, url.pathname + url.search)) {
+        throw new Error(`Blocked by robots.txt (${url.origin})`);
+    }
+
+    const cached = pageCache.get(cacheKey);
+    const headers: Record<string, string> = {
+        'User-Agent': USER_AGENT,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    };
+    if (cached?.etag) headers['If-None-Match'] = cached.etag;
+    if (cached?.lastModified) headers['If-Modified-Since'] = cached.lastModified;
+
+    const response = await withHostLimit(url.hostname, async () => {
+        const res = await fetch(url.toString(), {
+            headers,
+            signal: AbortSignal.timeout(FETCH_TIMEOUT_MS),
+        });
+        if (res.status === 304 || !res.ok) return { res, data: null };
+        return { res, data: await extractFromResponse(res) };
+    });
+
+    // Revalidated: the page hasn't changed since we cached it
+    if (response.res.status === 304 && cached) {
+        cacheSet(cacheKey, { ...cached, expiresAt: Date.now() + CACHE_TTL_MS });
+        return cached.data;
+    }
+
+    if (!response.data) {
+        throw new Error(`Failed to fetch: ${response.res.status} ${response.res.statusText}`);
+    }
+
+    cacheSet(cacheKey, {
+        data: response.data,
+        etag: response.res.headers.get('etag'),
+        lastModified: response.res.headers.get('last-modified'),
+        expiresAt: Date.now() + CACHE_TTL_MS,
+    });
+    return response.data;
+}
+
+/**
+ * Scrape a website URL and extract relevant business information.
+ * Cached per normalized URL (6h, revalidated with ETag/Last-Modified), limited to
+ * 2 concurrent fetches per host, robots.txt-aware, and reads at most 2MB of HTML.
+ */
+export async function scrapeWebsite(url: string): Promise<ScrapedWebsiteData> {
+    try {
+        // Validate URL
+        const validUrl = new URL(url);
+        const cacheKey = normalizeUrl(validUrl.toString());
+
+        const cached = pageCache.get(cacheKey);
+        if (cached && cached.expiresAt > Date.now()) {
+            return cached.data;
+        }
+
+        // Onboarding often submits the same link twice (personal + product context)
+        const pending = inflight.get(cacheKey);
+        if (pending) return await pending;
+
+        const job = fetchAndExtract(validUrl, cacheKey).finally(() => inflight.delete(cacheKey));
+        inflight.set(cacheKey, job);
+        return await job;
     } catch (error) {
         console.error('Error scraping website:', error);
         throw new Error(`Failed to scrape website: ${error instanceof Error ? error.message : 'Unknown error'}`);
@@ -0,0 +1,266 @@
+/**
+ * Stripe Webhook Queue
+ * The webhook route only verifies and records events (recordStripeEvent) and
+ * then acknowledges. processStripeEvents() applies them:
+ *
+ * - the event id is the primary key, so Stripe retries are dropped at insert
+ * - claim_stripe_events() hands out only the oldest pending event of each
+ *   customer, so a customer's events apply in Stripe's `created` order even
+ *   when they arrive out of order or several workers drain at once
+ * - subscriptions + founder_profiles tier/features are written in one
+ *   transaction by apply_stripe_subscription()
+ * - failures back off and retry; after MAX_ATTEMPTS the event is parked as
+ *   'dead' and the customer's later events proceed
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { randomUUID } from 'crypto';
+import Stripe from 'stripe';
+import { stripe } from '@/lib/stripe';
+import { TIER_DB_FEATURES, TIER_ORDER, createAdminSupabaseClient } from '@/lib/subscription';
+import { backoffDelayMs } from '@/lib/publisher';
+import { invalidateEntitlements } from '@/lib/entitlements';
+
+const LEASE_SECONDS = 120;
+const BATCH_SIZE = 25;
+const MAX_ATTEMPTS = 8;
+// Keep draining while there's budget left in the invocation
+const DRAIN_BUDGET_MS = 45 * 1000;
+// A subscription update this close to the period start is the billing cycle flipping
+const PERIOD_RESET_WINDOW_SECONDS = 600;
+
+// ============================================
+// TYPES
+// ============================================
+
+interface ClaimedEvent {
+    id: string;
+    type: string;
+    customer_id: string | null;
+    payload: Stripe.Event;
+    attempts: number;
+}
+
+export interface StripeQueueReport {
+    workerId: string;
+    claimed: number;
+    processed: number;
+    retried: number;
+    dead: number;
+}
+
+// ============================================
+// INGESTION
+// ============================================
+
+function eventCustomerId(event: Stripe.Event): string | null {
+    const customer = (event.data.object as { customer?: string | { id: string } | null }).customer;
+    if (!customer) return null;
+    return typeof customer === 'string' ? customer : customer.id;
+}
+
+/** Store a verified event. Returns false when it was already recorded (a Stripe retry). */
+export async function recordStripeEvent(supabase: SupabaseClient, event: Stripe.Event): Promise<boolean> {
+    const { data, error } = await supabase
+        .from('stripe_events')
+        .upsert({
+            id: event.id,
+            type: event.type,
+            customer_id: eventCustomerId(event),
+            stripe_created: new Date(event.created * 1000).toISOString(),
+            payload: event,
+        }, { onConflict: 'id', ignoreDuplicates: true })
+        .select('id');
+
+    if (error) throw new Error(`Failed to record Stripe event: ${error.message}`);
+    return (data || []).length > 0;
+}
+
+// ============================================
+// HANDLERS
+// ============================================
+
+function tierFeatures(tier: string) {
+    return TIER_DB_FEATURES[tier as keyof typeof TIER_DB_FEATURES] || TIER_DB_FEATURES.starter;
+}
+
+// Helper to get tier from subscription metadata
+function getTierFromSubscription(subscription: Stripe.Subscription): string {
+    return subscription.metadata?.tier || 'starter';
+}
+
+function toIso(seconds: number | null | undefined): string | null {
+    return seconds ? new Date(seconds * 1000).toISOString() : null;
+}
+
+async function applySubscription(supabase: SupabaseClient, params: Record<string, unknown>): Promise<void> {
+    const { error } = await supabase.rpc('apply_stripe_subscription', params);
+    if (error) throw new Error(`apply_stripe_subscription failed: ${error.message}`);
+    invalidateEntitlements(params.p_account_id as string);
+}
+
+async function handleCheckoutCompleted(supabase: SupabaseClient, session: Stripe.Checkout.Session): Promise<void> {
+    const userId = session.client_reference_id;
+    const subscriptionId = session.subscription as string;
+    if (!userId || !subscriptionId) return;
+
+    const subscription = await stripe.subscriptions.retrieve(subscriptionId);
+    const tier = getTierFromSubscription(subscription);
+
+    console.log(`[Stripe Queue] Checkout completed. User: ${userId}, Tier: ${tier}`);
+
+    await applySubscription(supabase, {
+        p_account_id: userId,
+        p_plan: tier,
+        p_status: 'active',
+        p_customer_id: session.customer as string,
+        p_subscription_id: subscriptionId,
+        p_period_start: toIso((subscription as any).current_period_start),
+        p_period_end: toIso((subscription as any).current_period_end),
+        p_cancel_at_period_end: subscription.cancel_at_period_end || false,
+        p_tier: tier,
+        p_features: tierFeatures(tier),
+    });
+}
+
+async function handleSubscriptionUpdated(supabase: SupabaseClient, subscription: Stripe.Subscription, eventCreated: number): Promise<void> {
+    const newTier = getTierFromSubscription(subscription);
+
+    const { data: sub } = await supabase
+        .from('subscriptions')
+        .select('account_id')
+        .eq('stripe_customer_id', subscription.customer as string)
+        .maybeSingle();
+    if (!sub) return;
+
+    const { data: profile } = await supabase
+        .from('founder_profiles')
+        .select('subscription_tier')
+        .eq('account_id', sub.account_id)
+        .limit(1)
+        .maybeSingle();
+    if (!profile) return;
+
+    const currentTier = profile.subscription_tier;
+    const isUpgrade = (TIER_ORDER[newTier] || 0) > (TIER_ORDER[currentTier] || 0);
+    const isDowngrade = (TIER_ORDER[newTier] || 0) < (TIER_ORDER[currentTier] || 0);
+    // Measured from when Stripe emitted the event, not when the queue got to it
+    const isPeriodReset = Math.abs(eventCreated - (subscription as any).current_period_start) < PERIOD_RESET_WINDOW_SECONDS;
+    const isUnhealthy = !['active', 'trialing'].includes(subscription.status);
+
+    // Feature access:
+    // - Upgrade: immediately
+    // - Downgrade: only once the billing period has flipped
+    // - Unhealthy status (canceled/past_due): immediately
+    const applyTier = isUpgrade || (isDowngrade && isPeriodReset) || isUnhealthy;
+
+    console.log(`[Stripe Queue] Sub updated. User: ${sub.account_id}, New: ${newTier}, Current: ${currentTier}, Apply: ${applyTier}`);
+
+    await applySubscription(supabase, {
+        p_account_id: sub.account_id,
+        p_plan: newTier,
+        p_status: subscription.status,
+        p_period_end: toIso((subscription as any).current_period_end),
+        p_cancel_at_period_end: subscription.cancel_at_period_end || false,
+        p_tier: applyTier ? newTier : null,
+        p_features: applyTier ? tierFeatures(newTier) : null,
+    });
+}
+
+async function handleSubscriptionDeleted(supabase: SupabaseClient, subscription: Stripe.Subscription): Promise<void> {
+    const { data: sub } = await supabase
+        .from('subscriptions')
+        .select('account_id')
+        .eq('stripe_customer_id', subscription.customer as string)
+        .maybeSingle();
+    if (!sub) return;
+
+    console.log(`[Stripe Queue] Subscription deleted. User: ${sub.account_id}`);
+
+    await applySubscription(supabase, {
+        p_account_id: sub.account_id,
+        p_plan: 'starter',
+        p_status: 'canceled',
+        p_period_end: null,
+        p_tier: 'starter',
+        p_features: TIER_DB_FEATURES.starter,
+    });
+}
+
+export async function handleStripeEvent(supabase: SupabaseClient, event: Stripe.Event): Promise<void> {
+    switch (event.type) {
+        case 'checkout.session.completed':
+            return handleCheckoutCompleted(supabase, event.data.object as Stripe.Checkout.Session);
+        case 'customer.subscription.updated':
+            return handleSubscriptionUpdated(supabase, event.data.object as Stripe.Subscription, event.created);
+        case 'customer.subscription.deleted':
+            return handleSubscriptionDeleted(supabase, event.data.object as Stripe.Subscription);
+        default:
+            // Other event types are recorded but need no work
+            return;
+    }
+}
+
+// ============================================
+// WORKER
+// ============================================
+
+export async function processStripeEvents(supabase: SupabaseClient = createAdminSupabaseClient()): Promise<StripeQueueReport> {
+    const workerId = `stripe:${randomUUID()}`;
+    const report: StripeQueueReport = { workerId, claimed: 0, processed: 0, retried: 0, dead: 0 };
+    const deadline = Date.now() + DRAIN_BUDGET_MS;
+
+    // Only touch rows we still hold the lease on
+    const finish = (eventId: string, values: Record<string, unknown>) =>
+        supabase
+            .from('stripe_events')
+            .update({ ...values, lease_owner: null, lease_until: null })
+            .eq('id', eventId)
+            .eq('lease_owner', workerId);
+
+    const processOne = async (event: ClaimedEvent) => {
+        try {
+            await handleStripeEvent(supabase, event.payload);
+            report.processed++;
+            await finish(event.id, { status: 'processed', processed_at: new Date().toISOString(), last_error: null });
+        } catch (err) {
+            const message = err instanceof Error ? err.message : String(err);
+            console.warn(`[Stripe Queue] ${event.type} ${event.id} attempt ${event.attempts} failed: ${message}`);
+
+            if (event.attempts >= MAX_ATTEMPTS) {
+                report.dead++;
+                await finish(event.id, { status: 'dead', last_error: message });
+                return;
+            }
+
+            report.retried++;
+            await finish(event.id, {
+                last_error: message,
+                next_attempt_at: new Date(Date.now() + backoffDelayMs(event.attempts)).toISOString(),
+            });
+        }
+    };
+
+    // Each round takes one event per customer; the next round picks up their successors
+    while (Date.now() < deadline) {
+        const { data: claimed, error } = await supabase.rpc('claim_stripe_events', {
+            worker_id: workerId,
+            lease_seconds: LEASE_SECONDS,
+            batch_size: BATCH_SIZE,
+        });
+
+        if (error) throw new Error(`Failed to claim Stripe events: ${error.message}`);
+
+        const events: ClaimedEvent[] = claimed || [];
+        if (events.length === 0) break;
+        report.claimed += events.length;
+
+        // Different customers in parallel; one customer never appears twice in a batch
+        await Promise.all(events.map(processOne));
+    }
+
+    if (report.claimed > 0) {
+        console.log(`[Stripe Queue] ${workerId} done: ${report.processed} processed, ${report.retried} retrying, ${report.dead} dead`);
+    }
+    return report;
+}
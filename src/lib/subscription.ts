@@ -187,6 +187,56 @@ export function parseTier(tier: string | null | undefined): SubscriptionTier {
     return 'starter'; // Default fallback
 }
 
+/**
+ * Subscription as shown in the UI. Subscription row wins; the profile's
+ * subscription_tier covers accounts without one (e.g. pre-Stripe starters).
+ */
+export interface SubscriptionSummary {
+    tier: string;
+    plan: string;
+    status: string;
+    currentPeriodEnd: string | null;
+    stripeCustomerId: string | null;
+    stripeSubscriptionId: string | null;
+    cancelAtPeriodEnd: boolean;
+    cancelOfferClaimed: boolean;
+}
+
+/**
+ * Columns of `subscriptions` that resolveSubscription reads.
+ * cancel_offer_claimed isn't in every environment's schema, so it's left to
+ * callers that select('*') (the billing page).
+ */
+export const SUBSCRIPTION_SUMMARY_COLUMNS = 'status, plan, current_period_end, stripe_customer_id, stripe_subscription_id, cancel_at_period_end';
+
+export function resolveSubscription(subscription: any | null, profileTier?: string | null): SubscriptionSummary {
+    if (subscription) {
+        const plan = subscription.plan || 'starter';
+        return {
+            tier: plan,
+            plan,
+            status: subscription.status,
+            currentPeriodEnd: subscription.current_period_end,
+            stripeCustomerId: subscription.stripe_customer_id,
+            stripeSubscriptionId: subscription.stripe_subscription_id,
+            cancelAtPeriodEnd: subscription.cancel_at_period_end || false,
+            cancelOfferClaimed: subscription.cancel_offer_claimed || false,
+        };
+    }
+
+    const tier = profileTier || 'starter';
+    return {
+        tier,
+        plan: tier,
+        status: 'active',
+        currentPeriodEnd: null,
+        stripeCustomerId: null,
+        stripeSubscriptionId: null,
+        cancelAtPeriodEnd: false,
+        cancelOfferClaimed: false,
+    };
+}
+
 /**
  * Database feature flags per tier
  * Used by Stripe webhook/checkout to sync to founder_profiles
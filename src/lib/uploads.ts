@@ -0,0 +1,297 @@
+/**
+ * Image upload pipeline
+ *
+ * - the original is streamed straight into Supabase Storage (no
+ *   arrayBuffer()/Buffer copy), with the size limit enforced on the stream
+ * - each upload gets a `media_assets` row; processMediaAsset() runs after the
+ *   response and writes resized WebP variants (VARIANT_WIDTHS) and a blurhash
+ * - callers get a manifest up front; variant URLs are deterministic
+ *   (src/lib/media-variants.ts) and start resolving once the row is 'ready'
+ * - sweepMediaAssets() (cron) retries rows the after() run never finished
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { randomUUID } from 'crypto';
+import { Readable } from 'stream';
+import sharp from 'sharp';
+import { encodeBlurhash } from '@/lib/blurhash';
+import { MediaManifest, VARIANT_WIDTHS, variantPath } from '@/lib/media-variants';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+
+const WEBP_QUALITY = 80;
+const BLURHASH_SIZE = 32;
+const MAX_PROCESS_ATTEMPTS = 3;
+// An after() run is long done by then; a row 'processing' for longer
+// (since processing_started_at) was dropped
+const STALE_PROCESSING_MS = 10 * 60 * 1000;
+const SWEEP_BATCH = 20;
+const SWEEP_CONCURRENCY = 4;
+
+// ============================================
+// TYPES
+// ============================================
+
+export interface UploadSource {
+    body: ReadableStream<Uint8Array>;
+    contentType: string;
+    /** Declared size, when known: rejects oversized files before streaming */
+    size?: number | null;
+    filename?: string | null;
+}
+
+export class UploadError extends Error {
+    constructor(message: string, public status: number = 400) {
+        super(message);
+        this.name = 'UploadError';
+    }
+}
+
+interface MediaAssetRow {
+    id: string;
+    bucket: string;
+    original_path: string;
+    status: MediaManifest['status'];
+    blurhash: string | null;
+    width: number | null;
+    height: number | null;
+    attempts: number;
+}
+
+const ASSET_FIELDS = 'id, bucket, original_path, status, blurhash, width, height, attempts';
+
+// ============================================
+// HELPERS
+// ============================================
+
+function extensionFor(contentType: string, filename?: string | null): string {
+    const fromName = filename?.split('.').pop()?.toLowerCase();
+    if (fromName && /^[a-z0-9]{2,5}$/.test(fromName)) return fromName;
+    return contentType.split('/')[1]?.replace('jpeg', 'jpg').replace(/[^a-z0-9]/g, '') || 'jpg';
+}
+
+/**
+ * Passes bytes through, erroring the stream once it exceeds maxBytes.
+ * `exceeded()` tells the caller why the upload failed, since Storage reports
+ * an aborted body as a generic network error.
+ */
+function limitStream(maxBytes: number) {
+    let seen = 0;
+    const stream = new TransformStream<Uint8Array, Uint8Array>({
+        transform(chunk, controller) {
+            seen += chunk.byteLength;
+            if (seen > maxBytes) {
+                controller.error(new Error('Upload exceeded size limit'));
+                return;
+            }
+            controller.enqueue(chunk);
+        },
+    });
+    return { stream, exceeded: () => seen > maxBytes };
+}
+
+function tooLargeMessage(maxBytes: number, filename?: string | null): string {
+    return `${filename ? `File ${filename}` : 'File'} is too large. Max ${Math.round(maxBytes / (1024 * 1024))}MB.`;
+}
+
+function publicUrl(supabase: SupabaseClient, bucket: string, path: string): string {
+    return supabase.storage.from(bucket).getPublicUrl(path).data.publicUrl;
+}
+
+export function toManifest(supabase: SupabaseClient, asset: MediaAssetRow): MediaManifest {
+    const assetDir = asset.original_path.slice(0, asset.original_path.lastIndexOf('/'));
+    return {
+        id: asset.id,
+        status: asset.status,
+        original: publicUrl(supabase, asset.bucket, asset.original_path),
+        variants: VARIANT_WIDTHS.map(width => ({ width, url: publicUrl(supabase, asset.bucket, variantPath(assetDir, width)) })),
+        blurhash: asset.blurhash,
+        width: asset.width,
+        height: asset.height,
+    };
+}
+
+// ============================================
+// UPLOAD
+// ============================================
+
+/**
+ * Stream one image into `bucket` under the account's folder and register it
+ * for variant processing.
+ */
+export async function uploadImageAsset(
+    supabase: SupabaseClient,
+    accountId: string,
+    bucket: string,
+    source: UploadSource,
+    maxBytes: number
+): Promise<MediaManifest> {
+    if (!source.contentType.startsWith('image/')) {
+        throw new UploadError('Only image files can be uploaded.');
+    }
+    if (source.size && source.size > maxBytes) {
+        throw new UploadError(tooLargeMessage(maxBytes, source.filename));
+    }
+
+    const id = randomUUID();
+    const originalPath = `${accountId}/${id}/original.${extensionFor(source.contentType, source.filename)}`;
+
+    const limit = limitStream(maxBytes);
+    const { error: uploadError } = await supabase.storage
+        .from(bucket)
+        .upload(originalPath, source.body.pipeThrough(limit.stream), {
+            contentType: source.contentType,
+            upsert: false,
+            duplex: 'half',
+        });
+
+    if (uploadError) {
+        if (limit.exceeded()) throw new UploadError(tooLargeMessage(maxBytes, source.filename));
+        if (uploadError.message.includes('does not exist')) {
+            throw new UploadError(`Storage bucket "${bucket}" not configured. Please create it in Supabase.`, 500);
+        }
+        // Not the caller's fault: multi-file uploads skip this one and continue
+        throw new Error(`Upload failed: ${uploadError.message}`);
+    }
+
+    const { data: asset, error } = await createAdminSupabaseClient()
+        .from('media_assets')
+        .insert({ id, account_id: accountId, bucket, original_path: originalPath, content_type: source.contentType })
+        .select(ASSET_FIELDS)
+        .single();
+
+    if (error) throw new Error(`Failed to register upload: ${error.message}`);
+    return toManifest(supabase, asset as MediaAssetRow);
+}
+
+// ============================================
+// VARIANT WORKER
+// ============================================
+
+/**
+ * Build the WebP variants and blurhash for an uploaded image. One decode feeds
+ * every output (sharp clone); variants upload concurrently. Safe to re-run:
+ * the claim is a compare-and-set on (status, attempts), so a sweep and a late
+ * after() run never process the same row at once.
+ */
+export async function processMediaAsset(assetId: string): Promise<MediaManifest | null> {
+    const supabase = createAdminSupabaseClient();
+    const { data } = await supabase.from('media_assets').select(ASSET_FIELDS).eq('id', assetId).maybeSingle();
+    const asset = data as MediaAssetRow | null;
+    if (!asset || asset.status === 'ready') return asset ? toManifest(supabase, asset) : null;
+
+    const assetDir = asset.original_path.slice(0, asset.original_path.lastIndexOf('/'));
+    const attempt = asset.attempts + 1;
+    const { data: claimed } = await supabase
+        .from('media_assets')
+        .update({ status: 'processing', attempts: attempt, processing_started_at: new Date().toISOString() })
+        .eq('id', asset.id)
+        .eq('status', asset.status)
+        .eq('attempts', asset.attempts)
+        .select('id');
+
+    if (!claimed?.length) {
+        console.log(`[Uploads] ${asset.id} was claimed by another worker`);
+        return null;
+    }
+
+    // Results only land while this attempt still owns the row
+    const finish = (values: Record<string, unknown>) => supabase
+        .from('media_assets')
+        .update(values)
+        .eq('id', asset.id)
+        .eq('status', 'processing')
+        .eq('attempts', attempt);
+
+    try {
+        const response = await fetch(publicUrl(supabase, asset.bucket, asset.original_path));
+        if (!response.ok || !response.body) throw new Error(`Failed to read original (${response.status})`);
+
+        const input = sharp({ failOn: 'error' });
+        Readable.fromWeb(response.body as any).on('error', err => input.destroy(err)).pipe(input);
+
+        const [metadata, placeholder, variants] = await Promise.all([
+            input.clone().metadata(),
+            input.clone()
+                .rotate()
+                .resize(BLURHASH_SIZE, BLURHASH_SIZE, { fit: 'inside' })
+                .ensureAlpha()
+                .raw()
+                .toBuffer({ resolveWithObject: true }),
+            Promise.all(VARIANT_WIDTHS.map(width => input.clone()
+                .rotate()
+                .resize({ width, withoutEnlargement: true })
+                .webp({ quality: WEBP_QUALITY })
+                .toBuffer())),
+        ]);
+
+        await Promise.all(variants.map((buffer, i) => supabase.storage
+            .from(asset.bucket)
+            .upload(variantPath(assetDir, VARIANT_WIDTHS[i]), buffer, {
+                contentType: 'image/webp',
+                cacheControl: '31536000',
+                upsert: true,
+            })
+            .then(({ error }) => {
+                if (error) throw new Error(`Failed to store w${VARIANT_WIDTHS[i]} variant: ${error.message}`);
+            })));
+
+        // Orientation 5-8 means the stored pixels are rotated 90deg
+        const rotated = (metadata.orientation || 1) >= 5;
+        const { data: ready } = await finish({
+            status: 'ready',
+            blurhash: encodeBlurhash(placeholder.data, placeholder.info.width, placeholder.info.height),
+            width: rotated ? metadata.height : metadata.width,
+            height: rotated ? metadata.width : metadata.height,
+            variants: VARIANT_WIDTHS.map(width => ({ width, path: variantPath(assetDir, width) })),
+            error: null,
+            processed_at: new Date().toISOString(),
+        })
+            .select(ASSET_FIELDS)
+            .maybeSingle();
+
+        return ready ? toManifest(supabase, ready as MediaAssetRow) : null;
+    } catch (error) {
+        const message = error instanceof Error ? error.message : String(error);
+        console.error(`[Uploads] Variant processing failed for ${asset.id}:`, message);
+        await finish({ status: 'failed', error: message });
+        return null;
+    }
+}
+
+/**
+ * Retry variant processing for rows whose after() run crashed or timed out
+ * ('processing' past STALE_PROCESSING_MS) or failed, up to MAX_PROCESS_ATTEMPTS.
+ * Stale rows that are out of attempts are marked 'failed' (`abandoned`).
+ */
+export async function sweepMediaAssets(): Promise<{ processed: number; ready: number; abandoned: number }> {
+    const supabase = createAdminSupabaseClient();
+    const staleBefore = new Date(Date.now() - STALE_PROCESSING_MS).toISOString();
+
+    const { data: abandonedRows, error: abandonError } = await supabase
+        .from('media_assets')
+        .update({ status: 'failed', error: `Variant processing did not finish after ${MAX_PROCESS_ATTEMPTS} attempts` })
+        .eq('status', 'processing')
+        .lt('processing_started_at', staleBefore)
+        .gte('attempts', MAX_PROCESS_ATTEMPTS)
+        .select('id');
+
+    if (abandonError) throw new Error(`Failed to expire stuck media assets: ${abandonError.message}`);
+
+    const { data, error } = await supabase
+        .from('media_assets')
+        .select('id')
+        .or(`status.eq.failed,and(status.eq.processing,processing_started_at.lt.${staleBefore})`)
+        .lt('attempts', MAX_PROCESS_ATTEMPTS)
+        .order('created_at', { ascending: true })
+        .limit(SWEEP_BATCH);
+
+    if (error) throw new Error(`Failed to load pending media assets: ${error.message}`);
+
+    const ids = (data || []).map(row => row.id as string);
+    let ready = 0;
+    for (let i = 0; i < ids.length; i += SWEEP_CONCURRENCY) {
+        const results = await Promise.all(ids.slice(i, i + SWEEP_CONCURRENCY).map(id => processMediaAsset(id)));
+        ready += results.filter(manifest => manifest?.status === 'ready').length;
+    }
+    return { processed: ids.length, ready, abandoned: abandonedRows?.length || 0 };
+}
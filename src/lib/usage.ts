@@ -0,0 +1,42 @@
+/**
+ * Usage Metering
+ * Quota reads against usage_counters (20261101_usage_counters.sql) instead of
+ * COUNT(*) over the source tables. Database triggers keep the counters in
+ * step with every insert/delete; reconcileUsageCounters() rebuilds them
+ * from the source tables (nightly cron) in case anything drifted.
+ */
+
+import { SupabaseClient } from '@supabase/supabase-js';
+import { createAdminSupabaseClient } from '@/lib/subscription';
+
+export type UsageMetric = 'ideas' | 'generations';
+
+// 'ideas' resets monthly (UTC); 'generations' is lifetime
+const MONTHLY_METRICS: UsageMetric[] = ['ideas'];
+
+export function usagePeriod(metric: UsageMetric, at: Date = new Date()): string {
+    return MONTHLY_METRICS.includes(metric) ? at.toISOString().slice(0, 7) : 'all';
+}
+
+/** Current-period usage. One primary-key lookup; a missing row means zero. */
+export async function getUsage(supabase: SupabaseClient, accountId: string, metric: UsageMetric): Promise<number> {
+    const { data, error } = await supabase
+        .from('usage_counters')
+        .select('count')
+        .eq('account_id', accountId)
+        .eq('metric', metric)
+        .eq('period', usagePeriod(metric))
+        .maybeSingle();
+
+    if (error) throw new Error(`Failed to read ${metric} usage: ${error.message}`);
+    return data?.count || 0;
+}
+
+/** Rebuild counters from the source tables. Returns how many rows were corrected. */
+export async function reconcileUsageCounters(accountId?: string): Promise<number> {
+    const { data, error } = await createAdminSupabaseClient()
+        .rpc('reconcile_usage_counters', { p_account_id: accountId || null });
+
+    if (error) throw new Error(`Failed to reconcile usage counters: ${error.message}`);
+    return data || 0;
+}
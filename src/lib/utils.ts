@@ -5,3 +5,21 @@ import { twMerge } from 'tailwind-merge';
 export function cn(...inputs: ClassValue[]) {
     return twMerge(clsx(inputs));
 }
+
+const TRACKING_PARAMS = /^(utm_[a-z]+|ref|ref_src|fbclid|gclid|mc_cid|mc_eid)$/i;
+
+/** Canonical URL for dedup/cache keys (no tracking params, fragment, www. or trailing slash). */
+export function normalizeUrl(raw: string): string {
+    try {
+        const url = new URL(raw.trim());
+        url.hash = '';
+        for (const key of Array.from(url.searchParams.keys())) {
+            if (TRACKING_PARAMS.test(key)) url.searchParams.delete(key);
+        }
+        url.hostname = url.hostname.replace(/^www\./, '');
+        const normalized = url.toString();
+        return normalized.endsWith('/') && url.pathname !== '/' ? normalized.slice(0, -1) : normalized;
+    } catch {
+        return raw.trim();
+    }
+}
@@ -1,12 +1,9 @@
 import { createServerClient } from '@supabase/ssr'
 import { NextResponse, type NextRequest } from 'next/server'
+import { AUTH_USER_EMAIL_HEADER, AUTH_USER_ID_HEADER, verifyAccessToken } from '@/lib/auth-token'
 
 export async function middleware(request: NextRequest) {
-    let response = NextResponse.next({
-        request: {
-            headers: request.headers,
-        },
-    })
+    const cookiesToApply: { name: string; value: string; options?: any }[] = []
 
     // Create an authenticated Supabase Client
     const supabase = createServerClient(
@@ -18,32 +15,57 @@ export async function middleware(request: NextRequest) {
                     return request.cookies.getAll()
                 },
                 setAll(cookiesToSet) {
-                    cookiesToSet.forEach(({ name, value, options }) =>
+                    cookiesToSet.forEach(({ name, value, options }) => {
                         request.cookies.set(name, value)
-                    )
-                    response = NextResponse.next({
-                        request: {
-                            headers: request.headers,
-                        },
+                        cookiesToApply.push({ name, value, options })
                     })
-                    cookiesToSet.forEach(({ name, value, options }) =>
-                        response.cookies.set(name, value, options)
-                    )
                 },
             },
         }
     )
 
+    // Reads the session from cookies; only goes to the network when the
+    // access token is due for a refresh
     const {
         data: { session },
     } = await supabase.auth.getSession()
 
+    // Verify the access token locally (cached JWKS) instead of auth.getUser()
+    const check = session ? await verifyAccessToken(session.access_token) : null
+    const identity = check?.valid ? check.identity : null
+    // Tokens we can't check locally keep the previous cookie-presence behaviour;
+    // route handlers verify those with Supabase Auth
+    const isSignedIn = !!identity || (!!session && check?.valid === false && check.reason === 'unsupported')
+
+    // Per-request identity for route handlers (getAuthUser). Never trust these from the client.
+    const requestHeaders = new Headers(request.headers)
+    requestHeaders.delete(AUTH_USER_ID_HEADER)
+    requestHeaders.delete(AUTH_USER_EMAIL_HEADER)
+    if (identity) {
+        requestHeaders.set(AUTH_USER_ID_HEADER, identity.id)
+        if (identity.email) requestHeaders.set(AUTH_USER_EMAIL_HEADER, identity.email)
+    }
+
+    const response = NextResponse.next({
+        request: {
+            headers: requestHeaders,
+        },
+    })
+    cookiesToApply.forEach(({ name, value, options }) =>
+        response.cookies.set(name, value, options)
+    )
+
+    // API routes answer 401 themselves; only pages redirect
+    if (request.nextUrl.pathname.startsWith('/api/')) {
+        return response
+    }
+
     // Helper to check if the route is protected
     const isProtectedRoute = request.nextUrl.pathname.startsWith('/dashboard') ||
         request.nextUrl.pathname.startsWith('/onboarding')
 
     // If user is not signed in and tries to access a protected route
-    if (!session && isProtectedRoute) {
+    if (!isSignedIn && isProtectedRoute) {
         const redirectUrl = request.nextUrl.clone()
         redirectUrl.pathname = '/login'
         // Preserve where they were trying to go, including query params
@@ -53,7 +75,7 @@ export async function middleware(request: NextRequest) {
     }
 
     // If user IS signed in and tries to access login/signup
-    if (session && (request.nextUrl.pathname === '/login' || request.nextUrl.pathname === '/signup')) {
+    if (isSignedIn && (request.nextUrl.pathname === '/login' || request.nextUrl.pathname === '/signup')) {
         const redirectUrl = request.nextUrl.clone()
         redirectUrl.pathname = '/dashboard'
         return NextResponse.redirect(redirectUrl)
@@ -63,5 +85,6 @@ export async function middleware(request: NextRequest) {
 }
 
 export const config = {
-    matcher: ['/dashboard/:path*', '/onboarding/:path*', '/login', '/signup', '/auth/:path*'],
+    // /api is matched so every route handler gets the verified identity headers
+    matcher: ['/dashboard/:path*', '/onboarding/:path*', '/login', '/signup', '/auth/:path*', '/api/:path*'],
 }
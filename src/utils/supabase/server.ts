@@ -1,5 +1,7 @@
 import { createServerClient } from '@supabase/ssr'
-import { cookies } from 'next/headers'
+import type { SupabaseClient } from '@supabase/supabase-js'
+import { cookies, headers } from 'next/headers'
+import { AUTH_USER_EMAIL_HEADER, AUTH_USER_ID_HEADER } from '@/lib/auth-token'
 
 export async function createClient() {
     const cookieStore = await cookies()
@@ -27,3 +29,26 @@ export async function createClient() {
         }
     )
 }
+
+/**
+ * The signed-in user for this request.
+ *
+ * The middleware verifies the access token locally and forwards the identity
+ * as request headers (see lib/auth-token.ts), so this usually costs nothing.
+ * Without them (token not locally verifiable) it falls back to
+ * `auth.getUser()`, a round trip to Supabase Auth. Same return shape as
+ * `auth.getUser()`. Only valid on paths the middleware matches.
+ */
+export async function getAuthUser(supabase: SupabaseClient): Promise<{
+    data: { user: { id: string; email?: string } | null }
+    error: Error | null
+}> {
+    const headerStore = await headers()
+    const id = headerStore.get(AUTH_USER_ID_HEADER)
+    if (id) {
+        return { data: { user: { id, email: headerStore.get(AUTH_USER_EMAIL_HEADER) || undefined } }, error: null }
+    }
+
+    const { data: { user }, error } = await supabase.auth.getUser()
+    return { data: { user }, error }
+}
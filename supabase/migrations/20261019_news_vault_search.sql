@@ -0,0 +1,164 @@
+-- ============================================
+-- NEWS VAULT FULL-TEXT SEARCH
+-- Indexed replacement for scoring the newest 100 rows in the
+-- newsjacking search route. Ranking keeps the route's hybrid weights:
+--   +10 per keyword matching a category
+--   +3  per keyword matching title/summary/category text
+--   + relevance_score (default 5)
+--   -20 when no keyword matched, -2 for unrequested web3/healthcare
+-- ============================================
+
+-- ============================================
+-- 1. TABLE (already exists in hosted projects)
+-- ============================================
+CREATE TABLE IF NOT EXISTS news_vault (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT UNIQUE NOT NULL,
+    summary TEXT,
+    tldr TEXT,
+    spiky_take TEXT,
+    category TEXT[] DEFAULT '{}',
+    source_name TEXT,
+    relevance_score INT DEFAULT 5,
+    published_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- ============================================
+-- 2. SEARCH COLUMNS
+-- search_tsv:     'simple' config so short tokens like "ai" survive
+-- category_terms: lower-cased category words ("Artificial Intelligence"
+--                 -> {artificial, intelligence}) for GIN array overlap
+-- ============================================
+ALTER TABLE news_vault
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR,
+    ADD COLUMN IF NOT EXISTS category_terms TEXT[] DEFAULT '{}';
+
+CREATE OR REPLACE FUNCTION news_vault_search_fields()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_tsv :=
+        setweight(to_tsvector('simple', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', COALESCE(array_to_string(NEW.category, ' '), '')), 'A') ||
+        setweight(to_tsvector('simple', COALESCE(NEW.summary, '')), 'B');
+    NEW.category_terms := ARRAY(
+        SELECT DISTINCT term
+        FROM unnest(COALESCE(NEW.category, '{}')) AS c,
+             regexp_split_to_table(lower(c), '[^a-z0-9]+') AS term
+        WHERE term <> ''
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS news_vault_search_fields ON news_vault;
+CREATE TRIGGER news_vault_search_fields
+    BEFORE INSERT OR UPDATE OF title, summary, category ON news_vault
+    FOR EACH ROW EXECUTE FUNCTION news_vault_search_fields();
+
+-- Backfill existing rows through the trigger
+UPDATE news_vault SET title = title WHERE search_tsv IS NULL;
+
+-- ============================================
+-- 3. INDEXES
+-- ============================================
+CREATE INDEX IF NOT EXISTS idx_news_vault_search_tsv ON news_vault USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_news_vault_category_terms ON news_vault USING GIN (category_terms);
+CREATE INDEX IF NOT EXISTS idx_news_vault_published_at ON news_vault (published_at DESC);
+
+-- ============================================
+-- 4. SEARCH FUNCTION
+-- Keywords <= 3 chars match whole words (the route's \b regex);
+-- longer keywords match as prefixes (the route's substring check).
+-- When nothing matches, falls back to the whole vault ranked by
+-- the penalised score, as the route did.
+-- ============================================
+CREATE OR REPLACE FUNCTION search_news_vault(
+    keywords TEXT[],
+    page_size INT DEFAULT 12,
+    page_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    url TEXT,
+    summary TEXT,
+    tldr TEXT,
+    spiky_take TEXT,
+    category TEXT[],
+    source_name TEXT,
+    relevance_score INT,
+    published_at TIMESTAMPTZ,
+    hybrid_score INT
+) AS $$
+#variable_conflict use_column
+DECLARE
+    terms TEXT[];
+    any_query TSQUERY;
+    has_matches BOOLEAN;
+BEGIN
+    SELECT COALESCE(array_agg(DISTINCT t), '{}')
+    INTO terms
+    FROM unnest(COALESCE(keywords, '{}')) AS k,
+         LATERAL regexp_replace(lower(k), '[^a-z0-9]+', '', 'g') AS t
+    WHERE length(t) > 1;
+
+    -- No keywords: newest first
+    IF cardinality(terms) = 0 THEN
+        RETURN QUERY
+        SELECT v.id, v.title, v.url, v.summary, v.tldr, v.spiky_take, v.category, v.source_name,
+               COALESCE(v.relevance_score, 5)::INT, v.published_at, COALESCE(v.relevance_score, 5)::INT
+        FROM news_vault v
+        ORDER BY v.published_at DESC NULLS LAST
+        LIMIT page_size OFFSET page_offset;
+        RETURN;
+    END IF;
+
+    SELECT to_tsquery('simple', string_agg(CASE WHEN length(t) <= 3 THEN t ELSE t || ':*' END, ' | '))
+    INTO any_query
+    FROM unnest(terms) AS t;
+
+    SELECT EXISTS (
+        SELECT 1 FROM news_vault v
+        WHERE v.search_tsv @@ any_query OR v.category_terms && terms
+    ) INTO has_matches;
+
+    RETURN QUERY
+    WITH candidates AS (
+        SELECT v.*,
+               (SELECT COALESCE(SUM(
+                    CASE WHEN EXISTS (SELECT 1 FROM unnest(v.category_terms) ct WHERE ct LIKE t || '%')
+                         THEN 10 ELSE 0 END +
+                    CASE WHEN v.search_tsv @@ to_tsquery('simple', CASE WHEN length(t) <= 3 THEN t ELSE t || ':*' END)
+                         THEN 3 ELSE 0 END
+                ), 0)
+                FROM unnest(terms) AS t)::INT AS match_score,
+               ARRAY(SELECT lower(c) FROM unnest(COALESCE(v.category, '{}')) c) AS category_lc
+        FROM news_vault v
+        WHERE NOT has_matches
+           OR v.search_tsv @@ any_query
+           OR v.category_terms && terms
+    ),
+    scored AS (
+        SELECT c.*,
+               (c.match_score
+                + COALESCE(c.relevance_score, 5)
+                - CASE WHEN c.match_score = 0 THEN 20 ELSE 0 END
+                - CASE WHEN 'web3' = ANY(c.category_lc) AND NOT 'web3' = ANY(terms) THEN 2 ELSE 0 END
+                - CASE WHEN 'healthcare' = ANY(c.category_lc) AND NOT 'healthcare' = ANY(terms) THEN 2 ELSE 0 END
+               )::INT AS score
+        FROM candidates c
+    )
+    SELECT s.id, s.title, s.url, s.summary, s.tldr, s.spiky_take, s.category, s.source_name,
+           COALESCE(s.relevance_score, 5)::INT, s.published_at, s.score
+    FROM scored s
+    ORDER BY s.score DESC, s.published_at DESC NULLS LAST
+    LIMIT page_size OFFSET page_offset;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'News vault search migration complete!' as message;
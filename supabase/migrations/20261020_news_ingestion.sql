@@ -0,0 +1,78 @@
+-- ============================================
+-- NEWS INGESTION PIPELINE
+-- Feed registry + dedup/enrichment columns for news_vault.
+-- Populated by /api/cron/ingest-news (src/lib/news/ingest.ts).
+-- ============================================
+
+-- ============================================
+-- 1. FEED REGISTRY
+-- etag / last_modified drive conditional GETs
+-- ============================================
+CREATE TABLE IF NOT EXISTS news_feeds (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    default_category TEXT[] DEFAULT '{}',
+    enabled BOOLEAN DEFAULT true,
+    etag TEXT,
+    last_modified TEXT,
+    last_fetched_at TIMESTAMPTZ,
+    last_status INT,
+    last_error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO news_feeds (url, name, default_category) VALUES
+    ('https://hnrss.org/frontpage?points=100', 'Hacker News', '{Tech}'),
+    ('https://www.producthunt.com/feed', 'Product Hunt', '{Startup}'),
+    ('https://techcrunch.com/feed/', 'TechCrunch', '{Startup}'),
+    ('https://www.theverge.com/rss/index.xml', 'The Verge', '{Tech}')
+ON CONFLICT (url) DO NOTHING;
+
+-- ============================================
+-- 2. NEWS VAULT: dedup + enrichment tracking
+-- ============================================
+ALTER TABLE news_vault
+    ADD COLUMN IF NOT EXISTS content_hash TEXT,
+    ADD COLUMN IF NOT EXISTS feed_id UUID REFERENCES news_feeds(id) ON DELETE SET NULL,
+    ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS enrichment_batch_id TEXT;
+
+-- Rows from the earlier out-of-band curation are already enriched; without
+-- this the pipeline would re-enrich (and overwrite) the whole vault
+UPDATE news_vault
+SET enriched_at = COALESCE(created_at, NOW())
+WHERE tldr IS NOT NULL AND enriched_at IS NULL;
+
+-- Same normalization as contentHash() in src/lib/news/feeds.ts, so new items
+-- syndicated under another URL dedup against existing rows too
+UPDATE news_vault
+SET content_hash = encode(sha256(convert_to(btrim(regexp_replace(
+        lower(COALESCE(title, '') || ' ' || left(COALESCE(summary, ''), 280)),
+        '[^a-z0-9]+', ' ', 'g')), 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_vault_url ON news_vault(url);
+CREATE INDEX IF NOT EXISTS idx_news_vault_content_hash ON news_vault(content_hash);
+CREATE INDEX IF NOT EXISTS idx_news_vault_unenriched ON news_vault(created_at) WHERE enriched_at IS NULL;
+
+-- ============================================
+-- 3. ENRICHMENT BATCHES
+-- Anthropic batches outlive a single cron invocation;
+-- the next run collects whatever has ended.
+-- ============================================
+CREATE TABLE IF NOT EXISTS news_enrichment_batches (
+    id TEXT PRIMARY KEY,  -- Anthropic batch id
+    article_count INT NOT NULL DEFAULT 0,
+    status TEXT CHECK (status IN ('in_progress', 'completed', 'failed')) DEFAULT 'in_progress',
+    error_message TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_news_enrichment_batches_status ON news_enrichment_batches(status);
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'News ingestion migration complete!' as message;
@@ -0,0 +1,60 @@
+-- ============================================
+-- NEWSJACKING TOPIC FEEDS
+-- Precomputed first pages of search_news_vault() per topic key
+-- (sorted, sanitized keywords). Written by the service role only:
+-- on ingestion (src/lib/news/ingest.ts) and on cache miss/stale read
+-- in /api/newsjacking/search.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS news_topic_feeds (
+    topic_key TEXT PRIMARY KEY,
+    keywords TEXT[] NOT NULL DEFAULT '{}',
+    results JSONB NOT NULL DEFAULT '[]',
+    has_more BOOLEAN DEFAULT false,
+    stale BOOLEAN DEFAULT true,
+    computed_at TIMESTAMPTZ,
+    last_accessed_at TIMESTAMPTZ DEFAULT NOW(),
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE news_topic_feeds ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_news_topic_feeds_stale ON news_topic_feeds(last_accessed_at DESC) WHERE stale;
+-- Ingestion prunes feeds nobody has read in a while
+CREATE INDEX IF NOT EXISTS idx_news_topic_feeds_accessed ON news_topic_feeds(last_accessed_at);
+
+-- ============================================
+-- INCREMENTAL INVALIDATION
+-- Marks only the feeds whose keywords match articles inserted or
+-- enriched since `since`. Same matching rules as search_news_vault().
+-- ============================================
+CREATE OR REPLACE FUNCTION invalidate_news_topic_feeds(since TIMESTAMPTZ)
+RETURNS INT AS $$
+DECLARE
+    affected INT;
+BEGIN
+    UPDATE news_topic_feeds f
+    SET stale = true
+    WHERE NOT f.stale
+      AND EXISTS (
+          SELECT 1 FROM news_vault v
+          WHERE (v.created_at >= since OR v.enriched_at >= since)
+            AND (
+                cardinality(f.keywords) = 0
+                OR v.category_terms && f.keywords
+                OR v.search_tsv @@ to_tsquery('simple', array_to_string(ARRAY(
+                    SELECT CASE WHEN length(k) <= 3 THEN k ELSE k || ':*' END
+                    FROM unnest(f.keywords) AS k
+                ), ' | '))
+            )
+      );
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'News topic feeds migration complete!' as message;
@@ -0,0 +1,76 @@
+-- ============================================
+-- AUTO-PUBLISH WORKER
+-- Lease/claim + retry columns on posts for /api/cron/publish-scheduled
+-- (src/lib/publisher.ts). The manual publish route takes the same lease.
+-- ============================================
+
+ALTER TABLE founder_profiles
+    ADD COLUMN IF NOT EXISTS auto_publish BOOLEAN DEFAULT false;
+
+ALTER TABLE posts
+    ADD COLUMN IF NOT EXISTS external_id TEXT,
+    ADD COLUMN IF NOT EXISTS publish_lease_owner TEXT,
+    ADD COLUMN IF NOT EXISTS publish_lease_until TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS publish_attempts INT DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_publish_attempt_at TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS last_publish_error TEXT;
+
+-- Scanner index: only scheduled, un-archived posts are ever due
+CREATE INDEX IF NOT EXISTS idx_posts_publish_due
+    ON posts(scheduled_date)
+    WHERE status = 'scheduled' AND archived_at IS NULL;
+
+-- ============================================
+-- CLAIM FUNCTION
+-- Atomically leases up to batch_size due posts for one worker.
+-- FOR UPDATE SKIP LOCKED lets parallel workers claim disjoint sets;
+-- the lease expiry hands a crashed worker's posts to the next run.
+-- ============================================
+CREATE OR REPLACE FUNCTION claim_due_posts(
+    worker_id TEXT,
+    lease_seconds INT DEFAULT 300,
+    batch_size INT DEFAULT 50,
+    max_attempts INT DEFAULT 5
+)
+RETURNS TABLE (
+    id UUID,
+    profile_id UUID,
+    account_id UUID,
+    platform TEXT,
+    content TEXT,
+    format TEXT,
+    image_url TEXT,
+    publish_attempts INT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT p.id
+        FROM posts p
+        JOIN founder_profiles fp ON fp.id = p.profile_id
+        WHERE p.status = 'scheduled'
+          AND p.archived_at IS NULL
+          AND p.scheduled_date <= NOW()
+          AND fp.auto_publish = true
+          AND (p.publish_lease_until IS NULL OR p.publish_lease_until < NOW())
+          AND (p.next_publish_attempt_at IS NULL OR p.next_publish_attempt_at <= NOW())
+          AND COALESCE(p.publish_attempts, 0) < max_attempts
+        ORDER BY p.scheduled_date
+        LIMIT batch_size
+        FOR UPDATE OF p SKIP LOCKED
+    )
+    UPDATE posts p
+    SET publish_lease_owner = worker_id,
+        publish_lease_until = NOW() + make_interval(secs => lease_seconds)
+    FROM due, founder_profiles fp
+    WHERE p.id = due.id AND fp.id = p.profile_id
+    RETURNING p.id, p.profile_id, fp.account_id, p.platform, p.content, p.format, p.image_url,
+              COALESCE(p.publish_attempts, 0);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Post publisher migration complete!' as message;
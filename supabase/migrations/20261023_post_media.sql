@@ -0,0 +1,86 @@
+-- ============================================
+-- POST MEDIA
+-- Generated images live in Supabase Storage (post-media bucket) and the
+-- per-platform uploads (X media id, LinkedIn asset URN) are cached on the
+-- post so publish retries don't re-upload. See src/lib/media.ts.
+-- ============================================
+
+ALTER TABLE posts
+    ADD COLUMN IF NOT EXISTS image_storage_path TEXT,
+    ADD COLUMN IF NOT EXISTS platform_media JSONB DEFAULT '{}'::jsonb;
+
+-- ============================================
+-- STORAGE BUCKET
+-- Guarded so the migration also applies to plain Postgres (local fixtures)
+-- ============================================
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.schemata WHERE schema_name = 'storage') THEN
+        INSERT INTO storage.buckets (id, name, public)
+        VALUES ('post-media', 'post-media', true)
+        ON CONFLICT (id) DO NOTHING;
+
+        DROP POLICY IF EXISTS "Users can upload their own post media" ON storage.objects;
+        CREATE POLICY "Users can upload their own post media"
+        ON storage.objects FOR INSERT
+        TO authenticated
+        WITH CHECK ( bucket_id = 'post-media' AND auth.uid()::text = (storage.foldername(name))[1] );
+    END IF;
+END $$;
+
+-- ============================================
+-- CLAIM FUNCTION
+-- Same as 20261022, plus platform_media so the worker can reuse uploads.
+-- The return type changes, so the old signature has to be dropped first.
+-- ============================================
+DROP FUNCTION IF EXISTS claim_due_posts(TEXT, INT, INT, INT);
+
+CREATE OR REPLACE FUNCTION claim_due_posts(
+    worker_id TEXT,
+    lease_seconds INT DEFAULT 300,
+    batch_size INT DEFAULT 50,
+    max_attempts INT DEFAULT 5
+)
+RETURNS TABLE (
+    id UUID,
+    profile_id UUID,
+    account_id UUID,
+    platform TEXT,
+    content TEXT,
+    format TEXT,
+    image_url TEXT,
+    platform_media JSONB,
+    publish_attempts INT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT p.id
+        FROM posts p
+        JOIN founder_profiles fp ON fp.id = p.profile_id
+        WHERE p.status = 'scheduled'
+          AND p.archived_at IS NULL
+          AND p.scheduled_date <= NOW()
+          AND fp.auto_publish = true
+          AND (p.publish_lease_until IS NULL OR p.publish_lease_until < NOW())
+          AND (p.next_publish_attempt_at IS NULL OR p.next_publish_attempt_at <= NOW())
+          AND COALESCE(p.publish_attempts, 0) < max_attempts
+        ORDER BY p.scheduled_date
+        LIMIT batch_size
+        FOR UPDATE OF p SKIP LOCKED
+    )
+    UPDATE posts p
+    SET publish_lease_owner = worker_id,
+        publish_lease_until = NOW() + make_interval(secs => lease_seconds)
+    FROM due, founder_profiles fp
+    WHERE p.id = due.id AND fp.id = p.profile_id
+    RETURNING p.id, p.profile_id, fp.account_id, p.platform, p.content, p.format, p.image_url,
+              COALESCE(p.platform_media, '{}'::jsonb), COALESCE(p.publish_attempts, 0);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Post media migration complete!' as message;
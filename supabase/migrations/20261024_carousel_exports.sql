@@ -0,0 +1,21 @@
+-- ============================================
+-- CAROUSEL EXPORTS
+-- Private bucket for server-rendered carousel PDFs / slide PNGs
+-- (src/lib/carousel-render.ts). Objects are keyed by a hash of the slide
+-- HTML and served through short-lived signed URLs; only the service role
+-- writes here, so no user policies are needed.
+-- ============================================
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.schemata WHERE schema_name = 'storage') THEN
+        INSERT INTO storage.buckets (id, name, public)
+        VALUES ('carousel-exports', 'carousel-exports', false)
+        ON CONFLICT (id) DO NOTHING;
+    END IF;
+END $$;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Carousel exports migration complete!' as message;
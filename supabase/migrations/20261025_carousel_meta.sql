@@ -0,0 +1,15 @@
+-- ============================================
+-- CAROUSEL GENERATION METADATA
+-- Per-carousel generation stats written by src/lib/ai/carousel-generator.ts:
+-- requested vs received slides, per-slide stream latency, which slides
+-- failed validation and which were regenerated. `complete = false` marks a
+-- partial carousel that was saved anyway.
+-- ============================================
+
+ALTER TABLE posts
+    ADD COLUMN IF NOT EXISTS carousel_meta JSONB;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Carousel meta migration complete!' as message;
@@ -0,0 +1,81 @@
+-- ============================================
+-- LIBRARY QUERIES
+-- Server-side filtering, sorting, paging and counts for
+-- /dashboard/library and the carousel gallery (/api/posts/library).
+-- Slide HTML never leaves the database here; only slide_count does.
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_posts_profile_created
+    ON posts(profile_id, created_at DESC);
+
+-- ============================================
+-- PAGE OF POSTS
+-- total_count is the number of matching rows (same on every row).
+-- ============================================
+CREATE OR REPLACE FUNCTION library_posts(
+    p_profile_id UUID,
+    p_platform TEXT DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_format TEXT DEFAULT NULL,
+    p_query TEXT DEFAULT NULL,
+    p_sort TEXT DEFAULT 'newest',
+    p_limit INT DEFAULT 50,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE (
+    id UUID,
+    platform TEXT,
+    content TEXT,
+    topic TEXT,
+    scheduled_date TIMESTAMPTZ,
+    status TEXT,
+    format TEXT,
+    carousel_style TEXT,
+    posted_at TIMESTAMPTZ,
+    archived_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ,
+    slide_count INT,
+    total_count BIGINT
+) AS $$
+    SELECT p.id, p.platform, p.content, p.topic, p.scheduled_date, p.status, p.format,
+           p.carousel_style, p.posted_at, p.archived_at, p.created_at,
+           CASE WHEN jsonb_typeof(p.carousel_slides) = 'array'
+                THEN jsonb_array_length(p.carousel_slides) ELSE 0 END,
+           COUNT(*) OVER ()
+    FROM posts p
+    WHERE p.profile_id = p_profile_id
+      AND (p_platform IS NULL OR p.platform = p_platform)
+      AND (p_status IS NULL OR p.status = p_status)
+      AND (p_format IS NULL OR p.format = p_format)
+      AND (p_query IS NULL
+           OR p.content ILIKE '%' || p_query || '%'
+           OR p.topic ILIKE '%' || p_query || '%')
+    ORDER BY
+        CASE WHEN p_sort = 'status' THEN p.status END,
+        CASE WHEN p_sort = 'oldest' THEN p.created_at END ASC,
+        p.created_at DESC
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- STATUS COUNTS (one pass instead of one query per status)
+-- ============================================
+CREATE OR REPLACE FUNCTION library_post_counts(p_profile_id UUID)
+RETURNS TABLE (
+    total BIGINT,
+    posted BIGINT,
+    scheduled BIGINT,
+    archived BIGINT
+) AS $$
+    SELECT COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'posted'),
+           COUNT(*) FILTER (WHERE status = 'scheduled'),
+           COUNT(*) FILTER (WHERE status = 'archived')
+    FROM posts
+    WHERE profile_id = p_profile_id;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Library queries migration complete!' as message;
@@ -0,0 +1,62 @@
+-- ============================================
+-- ONBOARDING JOBS
+-- Staged, resumable onboarding (src/lib/onboarding.ts):
+-- scrape -> strategy -> brief -> posts -> save, with each stage's output
+-- checkpointed so a failed or timed-out run resumes where it stopped.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS onboarding_jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    stage TEXT CHECK (stage IN ('scrape', 'strategy', 'brief', 'posts', 'save', 'done')) DEFAULT 'scrape' NOT NULL,
+    status TEXT CHECK (status IN ('queued', 'running', 'failed', 'complete')) DEFAULT 'queued' NOT NULL,
+    input JSONB NOT NULL,
+    checkpoints JSONB DEFAULT '{}'::jsonb NOT NULL,
+    result JSONB,
+    error TEXT,
+    attempts INT DEFAULT 0 NOT NULL,
+    lease_owner TEXT,
+    lease_until TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_onboarding_jobs_account
+    ON onboarding_jobs(account_id, created_at DESC);
+
+-- RLS: users can watch their own jobs; all writes go through the service role
+ALTER TABLE onboarding_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own onboarding jobs" ON onboarding_jobs;
+CREATE POLICY "Users can view own onboarding jobs" ON onboarding_jobs
+    FOR SELECT USING (auth.uid() = account_id);
+
+-- ============================================
+-- CLAIM FUNCTION
+-- Leases one unfinished job to a runner. A live lease means another
+-- invocation is already working on it; an expired one (function timeout,
+-- crash) can be taken over, and the run resumes from the saved stage.
+-- ============================================
+CREATE OR REPLACE FUNCTION claim_onboarding_job(
+    job_id UUID,
+    worker_id TEXT,
+    lease_seconds INT DEFAULT 360
+)
+RETURNS SETOF onboarding_jobs AS $$
+    UPDATE onboarding_jobs
+    SET status = 'running',
+        lease_owner = worker_id,
+        lease_until = NOW() + make_interval(secs => lease_seconds),
+        attempts = attempts + 1,
+        error = NULL,
+        updated_at = NOW()
+    WHERE id = job_id
+      AND status <> 'complete'
+      AND (lease_until IS NULL OR lease_until < NOW())
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Onboarding jobs migration complete!' as message;
@@ -0,0 +1,31 @@
+-- ============================================
+-- ONBOARDING PREFETCH
+-- Scrape summaries and voice analyses computed while the user is still in
+-- the onboarding wizard (/api/onboarding/prefetch), keyed to a client-side
+-- draft id. The onboarding job's scrape stage reads these instead of doing
+-- the work at submit time (src/lib/onboarding-prefetch.ts).
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS onboarding_prefetch (
+    draft_id UUID NOT NULL,
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    kind TEXT CHECK (kind IN ('url', 'voice')) NOT NULL,
+    cache_key TEXT NOT NULL,
+    status TEXT CHECK (status IN ('pending', 'ready', 'failed')) DEFAULT 'pending' NOT NULL,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (draft_id, kind, cache_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_onboarding_prefetch_account
+    ON onboarding_prefetch(account_id);
+
+-- Service role only: rows are written and read by the API, never the browser
+ALTER TABLE onboarding_prefetch ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Onboarding prefetch migration complete!' as message;
@@ -0,0 +1,32 @@
+-- ============================================
+-- REALTIME: DASHBOARD TABLES
+-- The dashboard applies row-level changes to posts, notifications and
+-- content_generations from Supabase Realtime instead of refetching
+-- everything after each mutation (src/contexts/PostContext.tsx).
+-- Delivery is still gated by each table's SELECT policies.
+-- ============================================
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    -- Plain Postgres (local test databases) has no realtime publication
+    IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+        RAISE NOTICE 'supabase_realtime publication not found, skipping';
+        RETURN;
+    END IF;
+
+    FOREACH t IN ARRAY ARRAY['posts', 'notifications', 'content_generations'] LOOP
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_publication_tables
+            WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = t
+        ) THEN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE public.%I', t);
+        END IF;
+    END LOOP;
+END $$;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Realtime dashboard migration complete!' as message;
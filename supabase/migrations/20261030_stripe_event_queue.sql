@@ -0,0 +1,141 @@
+-- ============================================
+-- STRIPE WEBHOOK EVENT QUEUE
+-- /api/stripe/webhook verifies and stores each event, then acknowledges.
+-- src/lib/stripe-events.ts processes the queue: the event id primary key
+-- dedups Stripe retries, and events are applied per customer in Stripe's
+-- `created` order.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS stripe_events (
+    id TEXT PRIMARY KEY,                        -- Stripe event id (evt_...)
+    type TEXT NOT NULL,
+    customer_id TEXT,                           -- Ordering key; NULL = no ordering constraint
+    stripe_created TIMESTAMPTZ NOT NULL,        -- event.created
+    payload JSONB NOT NULL,
+    status TEXT CHECK (status IN ('pending', 'processed', 'dead')) DEFAULT 'pending' NOT NULL,
+    attempts INT DEFAULT 0 NOT NULL,
+    next_attempt_at TIMESTAMPTZ,
+    lease_owner TEXT,
+    lease_until TIMESTAMPTZ,
+    last_error TEXT,
+    received_at TIMESTAMPTZ DEFAULT NOW(),
+    processed_at TIMESTAMPTZ
+);
+
+-- Queue scan: unfinished events per customer, oldest first
+CREATE INDEX IF NOT EXISTS idx_stripe_events_pending
+    ON stripe_events(customer_id, stripe_created, id)
+    WHERE status = 'pending';
+
+-- Service role only
+ALTER TABLE stripe_events ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- CLAIM FUNCTION
+-- Leases the oldest pending event of each customer. A customer whose head
+-- event is leased or backing off contributes nothing, so a later
+-- customer.subscription.updated can never overtake an earlier one.
+-- ============================================
+CREATE OR REPLACE FUNCTION claim_stripe_events(
+    worker_id TEXT,
+    lease_seconds INT DEFAULT 120,
+    batch_size INT DEFAULT 25
+)
+RETURNS TABLE (
+    id TEXT,
+    type TEXT,
+    customer_id TEXT,
+    payload JSONB,
+    attempts INT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH heads AS (
+        SELECT DISTINCT ON (COALESCE(e.customer_id, e.id)) e.id
+        FROM stripe_events e
+        WHERE e.status = 'pending'
+        ORDER BY COALESCE(e.customer_id, e.id), e.stripe_created, e.id
+    ),
+    due AS (
+        SELECT e.id
+        FROM stripe_events e
+        JOIN heads h ON h.id = e.id
+        WHERE (e.lease_until IS NULL OR e.lease_until < NOW())
+          AND (e.next_attempt_at IS NULL OR e.next_attempt_at <= NOW())
+        ORDER BY e.stripe_created
+        LIMIT batch_size
+        FOR UPDATE OF e SKIP LOCKED
+    )
+    UPDATE stripe_events e
+    SET lease_owner = worker_id,
+        lease_until = NOW() + make_interval(secs => lease_seconds),
+        attempts = e.attempts + 1
+    FROM due
+    WHERE e.id = due.id
+    RETURNING e.id, e.type, e.customer_id, e.payload, e.attempts;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- APPLY SUBSCRIPTION
+-- Writes the subscriptions row and (optionally) the profile's tier and
+-- feature flags in one transaction. p_tier NULL leaves founder_profiles
+-- untouched (e.g. a downgrade deferred to the period end).
+-- ============================================
+CREATE OR REPLACE FUNCTION apply_stripe_subscription(
+    p_account_id UUID,
+    p_plan TEXT,
+    p_status TEXT,
+    p_customer_id TEXT DEFAULT NULL,
+    p_subscription_id TEXT DEFAULT NULL,
+    p_period_start TIMESTAMPTZ DEFAULT NULL,
+    p_period_end TIMESTAMPTZ DEFAULT NULL,
+    p_cancel_at_period_end BOOLEAN DEFAULT FALSE,
+    p_tier TEXT DEFAULT NULL,
+    p_features JSONB DEFAULT NULL
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO subscriptions (
+        account_id, stripe_customer_id, stripe_subscription_id, plan, status,
+        current_period_start, current_period_end, cancel_at_period_end
+    )
+    VALUES (
+        p_account_id, p_customer_id, p_subscription_id, p_plan, p_status,
+        p_period_start, p_period_end, p_cancel_at_period_end
+    )
+    ON CONFLICT (account_id) DO UPDATE SET
+        stripe_customer_id = COALESCE(EXCLUDED.stripe_customer_id, subscriptions.stripe_customer_id),
+        stripe_subscription_id = COALESCE(EXCLUDED.stripe_subscription_id, subscriptions.stripe_subscription_id),
+        plan = EXCLUDED.plan,
+        status = EXCLUDED.status,
+        current_period_start = COALESCE(EXCLUDED.current_period_start, subscriptions.current_period_start),
+        current_period_end = EXCLUDED.current_period_end,
+        cancel_at_period_end = EXCLUDED.cancel_at_period_end,
+        updated_at = NOW();
+
+    IF p_tier IS NOT NULL THEN
+        -- Literal tier so it coerces to whatever type subscription_tier is
+        -- in this environment (TEXT, or the enum from 20260127)
+        EXECUTE format(
+            'UPDATE founder_profiles
+             SET subscription_tier = %L,
+                 ideas_limit_monthly = $1,
+                 carousels_limit_weekly = $2,
+                 news_feature_enabled = $3
+             WHERE account_id = $4',
+            p_tier
+        )
+        USING (p_features->>'ideas_limit_monthly')::INT,
+              (p_features->>'carousels_limit_weekly')::INT,
+              (p_features->>'news_feature_enabled')::BOOLEAN,
+              p_account_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Stripe event queue migration complete!' as message;
@@ -0,0 +1,33 @@
+-- ============================================
+-- ENTITLEMENTS LOOKUP
+-- Everything the tier gate (src/lib/entitlements.ts) needs in one round
+-- trip: the newest profile's tier plus the subscription's billing state.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION get_entitlements(p_account_id UUID)
+RETURNS TABLE (
+    tier TEXT,
+    subscription_status TEXT,
+    current_period_end TIMESTAMPTZ,
+    cancel_at_period_end BOOLEAN
+) AS $$
+    SELECT
+        fp.subscription_tier::TEXT,   -- TEXT or the 20260127 enum, depending on environment
+        s.status,
+        s.current_period_end,
+        COALESCE(s.cancel_at_period_end, FALSE)
+    FROM (SELECT 1) AS one
+    LEFT JOIN LATERAL (
+        SELECT subscription_tier
+        FROM founder_profiles
+        WHERE account_id = p_account_id
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) fp ON TRUE
+    LEFT JOIN subscriptions s ON s.account_id = p_account_id;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Entitlements migration complete!' as message;
@@ -0,0 +1,165 @@
+-- ============================================
+-- USAGE COUNTERS
+-- Per-account, per-period usage so quota checks are a primary-key lookup
+-- instead of COUNT(*) over the source tables (src/lib/usage.ts).
+--
+--   ideas        spontaneous_ideas rows, period 'YYYY-MM' (UTC)
+--   generations  completed content_generations, period 'all'
+--
+-- Triggers keep the counters in the same transaction as the source write;
+-- reconcile_usage_counters() rebuilds them from the source tables.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS usage_counters (
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    count INT DEFAULT 0 NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (account_id, metric, period)
+);
+
+-- RLS: users can read their own usage; writes come from the triggers below
+ALTER TABLE usage_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own usage" ON usage_counters;
+CREATE POLICY "Users can view own usage" ON usage_counters
+    FOR SELECT USING (auth.uid() = account_id);
+
+CREATE OR REPLACE FUNCTION bump_usage_counter(p_account_id UUID, p_metric TEXT, p_period TEXT, p_delta INT)
+RETURNS VOID AS $$
+    INSERT INTO usage_counters (account_id, metric, period, count, updated_at)
+    VALUES (p_account_id, p_metric, p_period, GREATEST(p_delta, 0), NOW())
+    ON CONFLICT (account_id, metric, period) DO UPDATE
+        SET count = GREATEST(usage_counters.count + p_delta, 0),
+            updated_at = NOW();
+$$ LANGUAGE sql;
+
+-- ============================================
+-- TRIGGERS
+-- SECURITY DEFINER: ideas are inserted with the user's client, which can't
+-- write usage_counters directly.
+-- ============================================
+
+CREATE OR REPLACE FUNCTION count_spontaneous_idea()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_row spontaneous_ideas%ROWTYPE;
+    v_account_id UUID;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    SELECT account_id INTO v_account_id FROM founder_profiles WHERE id = v_row.profile_id;
+    IF v_account_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM bump_usage_counter(
+        v_account_id,
+        'ideas',
+        to_char(COALESCE(v_row.created_at, NOW()) AT TIME ZONE 'UTC', 'YYYY-MM'),
+        CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS count_spontaneous_idea ON spontaneous_ideas;
+CREATE TRIGGER count_spontaneous_idea
+    AFTER INSERT OR DELETE ON spontaneous_ideas
+    FOR EACH ROW EXECUTE FUNCTION count_spontaneous_idea();
+
+CREATE OR REPLACE FUNCTION count_completed_generation()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_was BOOLEAN := FALSE;
+    v_is BOOLEAN := FALSE;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        v_was := OLD.status IS NOT DISTINCT FROM 'completed';
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_is := NEW.status IS NOT DISTINCT FROM 'completed';
+    END IF;
+
+    IF v_was AND NOT v_is THEN
+        PERFORM bump_usage_counter(OLD.account_id, 'generations', 'all', -1);
+    ELSIF v_is AND NOT v_was THEN
+        PERFORM bump_usage_counter(NEW.account_id, 'generations', 'all', 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS count_completed_generation ON content_generations;
+CREATE TRIGGER count_completed_generation
+    AFTER INSERT OR UPDATE OF status OR DELETE ON content_generations
+    FOR EACH ROW EXECUTE FUNCTION count_completed_generation();
+
+-- ============================================
+-- RECONCILIATION
+-- Rebuilds counters from the source tables (one account, or all when
+-- p_account_id is NULL). Run nightly by /api/cron/reconcile-usage, and
+-- once below to backfill.
+-- ============================================
+CREATE OR REPLACE FUNCTION reconcile_usage_counters(p_account_id UUID DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    v_changed INT;
+BEGIN
+    WITH actual AS (
+        SELECT fp.account_id, 'ideas'::TEXT AS metric,
+               to_char(si.created_at AT TIME ZONE 'UTC', 'YYYY-MM') AS period,
+               COUNT(*)::INT AS count
+        FROM spontaneous_ideas si
+        JOIN founder_profiles fp ON fp.id = si.profile_id
+        WHERE p_account_id IS NULL OR fp.account_id = p_account_id
+        GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT account_id, 'generations', 'all', COUNT(*)::INT
+        FROM content_generations
+        WHERE status = 'completed'
+          AND (p_account_id IS NULL OR account_id = p_account_id)
+        GROUP BY account_id
+    ),
+    stored AS (
+        SELECT account_id, metric, period, count
+        FROM usage_counters
+        WHERE metric IN ('ideas', 'generations')
+          AND (p_account_id IS NULL OR account_id = p_account_id)
+    ),
+    drift AS (
+        SELECT COALESCE(a.account_id, s.account_id) AS account_id,
+               COALESCE(a.metric, s.metric) AS metric,
+               COALESCE(a.period, s.period) AS period,
+               COALESCE(a.count, 0) AS count
+        FROM actual a
+        FULL OUTER JOIN stored s
+            ON s.account_id = a.account_id AND s.metric = a.metric AND s.period = a.period
+        WHERE COALESCE(a.count, 0) IS DISTINCT FROM s.count
+    ),
+    fixed AS (
+        INSERT INTO usage_counters (account_id, metric, period, count, updated_at)
+        SELECT account_id, metric, period, count, NOW() FROM drift
+        ON CONFLICT (account_id, metric, period) DO UPDATE
+            SET count = EXCLUDED.count,
+                updated_at = NOW()
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO v_changed FROM fixed;
+
+    RETURN v_changed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill
+SELECT reconcile_usage_counters();
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Usage counters migration complete!' as message;
@@ -0,0 +1,46 @@
+-- ============================================
+-- IMAGE GENERATION JOBS
+-- fal.ai renders run on fal's queue (src/lib/image-jobs.ts): the API route
+-- submits and returns a job id, fal calls /api/visuals/webhook when the
+-- render finishes, and the result is written to the job (and its post).
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS image_jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    profile_id UUID REFERENCES founder_profiles(id) ON DELETE CASCADE NOT NULL,
+    post_id UUID REFERENCES posts(id) ON DELETE CASCADE,   -- NULL = Visuals Studio render
+    mode TEXT CHECK (mode IN ('faceless', 'digital_twin')) NOT NULL,
+    model TEXT NOT NULL,
+    input JSONB NOT NULL,
+    idempotency_key TEXT NOT NULL,                          -- hash of profile, post, model, prompt, aspect ratio, references
+    status TEXT CHECK (status IN ('queued', 'completed', 'failed')) DEFAULT 'queued' NOT NULL,
+    fal_request_id TEXT,
+    status_url TEXT,
+    response_url TEXT,
+    image_url TEXT,
+    image_storage_path TEXT,
+    error TEXT,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+-- One in-flight render per idempotency key: a double click gets the same job
+CREATE UNIQUE INDEX IF NOT EXISTS idx_image_jobs_inflight
+    ON image_jobs(idempotency_key)
+    WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_image_jobs_account
+    ON image_jobs(account_id, created_at DESC);
+
+-- RLS: users can watch their own jobs; all writes go through the service role
+ALTER TABLE image_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own image jobs" ON image_jobs;
+CREATE POLICY "Users can view own image jobs" ON image_jobs
+    FOR SELECT USING (auth.uid() = account_id);
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Image jobs migration complete!' as message;
@@ -0,0 +1,25 @@
+-- ============================================
+-- REFERENCE IMAGE STORE
+-- Digital Twin selfies uploaded to fal storage, keyed by the hash of the
+-- uploaded bytes (src/lib/reference-images.ts). The same photo sent again
+-- reuses the fal CDN URL instead of being normalized and re-uploaded.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS reference_images (
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    content_hash TEXT NOT NULL,                 -- sha256 of the original upload
+    fal_url TEXT NOT NULL,
+    width INT,
+    height INT,
+    bytes INT,                                  -- size after normalization
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (account_id, content_hash)
+);
+
+-- Service role only
+ALTER TABLE reference_images ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Reference images migration complete!' as message;
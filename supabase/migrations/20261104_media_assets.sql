@@ -0,0 +1,46 @@
+-- ============================================
+-- MEDIA ASSETS
+-- One row per uploaded image (src/lib/uploads.ts). The original is stored as
+-- uploaded; a worker adds resized WebP variants and a blurhash placeholder
+-- and marks the row 'ready'. /api/cron/process-media retries rows left
+-- 'processing' (timed from processing_started_at) or 'failed', and fails
+-- rows that ran out of attempts.
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS media_assets (
+    id UUID PRIMARY KEY,                        -- also the storage folder: <account>/<id>/
+    account_id UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    bucket TEXT NOT NULL,
+    original_path TEXT NOT NULL,
+    content_type TEXT,
+    status TEXT CHECK (status IN ('processing', 'ready', 'failed')) DEFAULT 'processing' NOT NULL,
+    variants JSONB DEFAULT '[]'::jsonb NOT NULL, -- [{ width, path }]
+    blurhash TEXT,
+    width INT,                                  -- original, orientation applied
+    height INT,
+    error TEXT,
+    attempts INT DEFAULT 0 NOT NULL,
+    processing_started_at TIMESTAMPTZ DEFAULT NOW(), -- last claim; the insert counts as one
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_media_assets_account
+    ON media_assets(account_id, created_at DESC);
+
+-- Sweep: rows that still need variants
+CREATE INDEX IF NOT EXISTS idx_media_assets_pending
+    ON media_assets(created_at)
+    WHERE status <> 'ready';
+
+-- RLS: users can read their own manifests; all writes go through the service role
+ALTER TABLE media_assets ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own media assets" ON media_assets;
+CREATE POLICY "Users can view own media assets" ON media_assets
+    FOR SELECT USING (auth.uid() = account_id);
+
+-- ============================================
+-- SUCCESS
+-- ============================================
+SELECT 'Media assets migration complete!' as message;
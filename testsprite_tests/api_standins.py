@@ -0,0 +1,318 @@
+"""
+Local HTTP stand-ins for the X and LinkedIn publishing APIs and fal's queue.
+
+Point the app at it and run the auto-publish worker without touching real
+accounts:
+
+    python testsprite_tests/api_standins.py --port 8787 --fail /2/tweets:429:2
+    X_API_BASE_URL=http://localhost:8787 LINKEDIN_API_BASE_URL=http://localhost:8787 npm run dev
+    curl -H "Authorization: Bearer $CRON_SECRET" localhost:3000/api/cron/publish-scheduled
+
+Image generation (src/lib/image-jobs.ts) runs against it with
+FAL_QUEUE_BASE_URL=http://localhost:8787: submissions complete after
+--fal-delay seconds and the stand-in calls the job's fal_webhook with a 1x1
+PNG hosted on itself.
+
+Endpoints (the subset src/lib/publishing.ts uses):
+    POST /1.1/media/upload.json                 X chunked media upload (INIT / APPEND / FINALIZE)
+    POST /2/tweets                              X create tweet (text, media, reply)
+    POST /v2/assets?action=registerUpload       LinkedIn image upload registration
+    PUT  /upload/<n>                            LinkedIn image bytes
+    POST /v2/ugcPosts                           LinkedIn create post
+    POST /fal-ai/<model>?fal_webhook=<url>      fal queue submit (webhook fired on completion)
+    GET  /fal-ai/<app>/requests/<id>/status     fal request status
+    GET  /fal-ai/<app>/requests/<id>            fal request result
+    GET  /fal-media/<id>.png                    rendered image (no auth)
+
+Control:
+    GET  /_requests                             everything received, in order
+    POST /_fail   {"path", "status", "count", "skip"}
+                                                after `skip` more successful calls (default 0),
+                                                the next `count` calls to `path` return `status`
+    POST /_reset                                clear requests and failure rules
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Smallest valid PNG (1x1 transparent) served as every fal render
+STANDIN_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+
+class StandinState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: List[dict] = []
+        self.failures: Dict[str, List[int]] = {}  # path -> [status, remaining, skip]
+        self.ids = itertools.count(1)
+        self.fal_requests: Dict[str, dict] = {}  # request_id -> {"status", "payload"}
+        self.fal_delay = 0.5
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests.clear()
+            self.failures.clear()
+            self.fal_requests.clear()
+
+    def add_failure(self, path: str, status: int, count: int, skip: int = 0) -> None:
+        with self.lock:
+            self.failures[path] = [status, count, skip]
+
+    def take_failure(self, path: str) -> Optional[int]:
+        with self.lock:
+            rule = self.failures.get(path)
+            if not rule or rule[1] <= 0:
+                return None
+            if rule[2] > 0:  # let the first `skip` calls through, e.g. fail reply 3 of a thread
+                rule[2] -= 1
+                return None
+            rule[1] -= 1
+            return rule[0]
+
+    def record(self, method: str, path: str, headers, body: Optional[object]) -> None:
+        with self.lock:
+            self.requests.append({
+                "method": method,
+                "path": path,
+                "authorization": headers.get("Authorization"),
+                "body": body,
+            })
+
+    def next_id(self) -> int:
+        with self.lock:
+            return next(self.ids)
+
+
+STATE = StandinState()
+
+
+def _fire_fal_webhook(url: str, request_id: str, payload: dict) -> None:
+    """Deliver fal's completion callback; failures are recorded, not retried."""
+    body = json.dumps({
+        "request_id": request_id,
+        "gateway_request_id": request_id,
+        "status": "OK",
+        "payload": payload,
+    }).encode()
+    webhook = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(webhook, timeout=30) as response:
+            status = response.status
+    except Exception as exc:  # app not running, 4xx/5xx, ...
+        status = getattr(exc, "code", None) or str(exc)
+    with STATE.lock:
+        STATE.requests.append({"method": "WEBHOOK", "path": url, "authorization": None, "body": {"status": status}})
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "PublishStandin/1.0"
+
+    def log_message(self, fmt, *args):  # keep test output quiet
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    # ---------- helpers ----------
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if "json" in (self.headers.get("Content-Type") or ""):
+            try:
+                return json.loads(raw or b"null")
+            except ValueError:
+                return raw.decode("utf-8", "replace")
+        if "x-www-form-urlencoded" in (self.headers.get("Content-Type") or ""):
+            return {k: v[0] for k, v in parse_qs(raw.decode("utf-8", "replace")).items()}
+        if "multipart/form-data" in (self.headers.get("Content-Type") or ""):
+            return {"multipart": True, "bytes": len(raw)}
+        return {"bytes": len(raw)}
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send(self, status: int, payload: Optional[object] = None) -> None:
+        data = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    # ---------- routing ----------
+
+    def _handle(self, method: str) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        body = self._read_body() if method in ("POST", "PUT") else None
+
+        if path == "/_requests":
+            with STATE.lock:
+                return self._send(200, list(STATE.requests))
+        if path == "/_reset":
+            STATE.reset()
+            return self._send(204)
+        if path == "/_fail":
+            STATE.add_failure(body["path"], int(body.get("status", 500)), int(body.get("count", 1)),
+                              int(body.get("skip", 0)))
+            return self._send(204)
+
+        if method == "GET" and path.startswith("/fal-media/"):
+            return self._send_bytes(200, STANDIN_PNG, "image/png")
+
+        STATE.record(method, self.path, self.headers, body)
+
+        # X / LinkedIn use bearer tokens, fal uses "Key <FAL_KEY>"
+        if not (self.headers.get("Authorization") or "").startswith(("Bearer ", "Key ")):
+            return self._send(401, {"title": "Unauthorized", "detail": "Missing bearer token"})
+
+        status = STATE.take_failure(path)
+        if status is not None:
+            return self._send(status, {"title": "Injected failure", "detail": f"Stand-in returned {status}", "status": status})
+
+        if method == "POST" and path == "/1.1/media/upload.json":
+            command = (body or {}).get("command") if isinstance(body, dict) else None
+            query = parse_qs(parsed.query)
+            command = command or (query.get("command") or [None])[0]
+            if command == "INIT":
+                media_id = str(1_900_000_000_000_000_000 + STATE.next_id())
+                return self._send(202, {"media_id": int(media_id), "media_id_string": media_id, "expires_after_secs": 86400})
+            if command == "FINALIZE":
+                media_id = (body or {}).get("media_id") or (query.get("media_id") or [""])[0]
+                return self._send(201, {"media_id_string": str(media_id), "expires_after_secs": 86400})
+            # APPEND (multipart) carries no JSON response
+            return self._send(204)
+
+        if method == "POST" and path == "/2/tweets":
+            tweet_id = str(1_800_000_000_000_000_000 + STATE.next_id())
+            return self._send(201, {"data": {"id": tweet_id, "text": (body or {}).get("text", "")}})
+
+        if method == "POST" and path == "/v2/assets":
+            n = STATE.next_id()
+            return self._send(200, {"value": {
+                "asset": f"urn:li:digitalmediaAsset:standin{n}",
+                "uploadMechanism": {
+                    "com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                        "uploadUrl": f"{self._base_url()}/upload/{n}",
+                    },
+                },
+            }})
+
+        if method == "PUT" and path.startswith("/upload/"):
+            return self._send(201)
+
+        if method == "POST" and path == "/v2/ugcPosts":
+            return self._send(201, {"id": f"urn:li:share:{7_000_000_000 + STATE.next_id()}"})
+
+        if path.startswith("/fal-ai/"):
+            return self._handle_fal(method, parsed, body)
+
+        return self._send(404, {"error": f"No stand-in for {method} {path}"})
+
+    def _handle_fal(self, method: str, parsed, body) -> None:
+        path = parsed.path
+        if "/requests/" in path:
+            request_id = path.split("/requests/", 1)[1].split("/", 1)[0]
+            with STATE.lock:
+                request = STATE.fal_requests.get(request_id)
+            if not request:
+                return self._send(404, {"detail": f"Request {request_id} not found"})
+            if path.endswith("/status"):
+                return self._send(200, {"status": request["status"], "request_id": request_id})
+            if request["status"] != "COMPLETED":
+                return self._send(400, {"detail": "Request is still in progress"})
+            return self._send(200, request["payload"])
+
+        if method != "POST":
+            return self._send(405, {"detail": "Method not allowed"})
+
+        request_id = f"standin-{STATE.next_id()}"
+        # Status/result URLs use the app id (first two segments), like fal's queue
+        app = "/".join(path.strip("/").split("/")[:2])
+        base = self._base_url()
+        payload = {
+            "images": [{"url": f"{base}/fal-media/{request_id}.png", "content_type": "image/png", "width": 1, "height": 1}],
+            "description": "",
+            "input": body,
+        }
+        with STATE.lock:
+            STATE.fal_requests[request_id] = {"status": "IN_QUEUE", "payload": payload}
+
+        def complete() -> None:
+            with STATE.lock:
+                STATE.fal_requests[request_id]["status"] = "COMPLETED"
+            webhook_url = (parse_qs(parsed.query).get("fal_webhook") or [None])[0]
+            if webhook_url:
+                _fire_fal_webhook(webhook_url, request_id, payload)
+
+        threading.Timer(STATE.fal_delay, complete).start()
+
+        return self._send(200, {
+            "request_id": request_id,
+            "status_url": f"{base}/{app}/requests/{request_id}/status",
+            "response_url": f"{base}/{app}/requests/{request_id}",
+            "cancel_url": f"{base}/{app}/requests/{request_id}/cancel",
+        })
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+
+def serve(port: int = 8787, verbose: bool = False) -> ThreadingHTTPServer:
+    """Start the stand-in server on a background thread (for use from test code)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local X / LinkedIn / fal API stand-ins.")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fail", action="append", default=[],
+                        help="PATH:STATUS:COUNT[:SKIP], e.g. /2/tweets:429:2 (repeatable)")
+    parser.add_argument("--fal-delay", type=float, default=0.5,
+                        help="seconds before a fal submission completes and its webhook fires")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    STATE.fal_delay = args.fal_delay
+
+    for rule in args.fail:
+        path, *numbers = rule.split(":")
+        STATE.add_failure(path, *(int(n) for n in numbers))
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandinHandler)
+    server.verbose = args.verbose
+    print(f"X / LinkedIn / fal stand-ins on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+Step grammar and selector registry for testsprite_frontend_test_plan.json.
+
+Each plan step is a free-text sentence ("Click the \"Log in\" button",
+"Verify URL contains \"/dashboard\""). This module turns those sentences into
+structured Step objects and resolves their targets to role / test-id / label
+locator specs, so the executor never needs generated xpath scripts.
+
+Nothing here imports Playwright: parsing and prefix planning are pure, the
+executor in run_plan.py turns LocatorSpec objects into real locators.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PLAN_PATH = os.path.join(os.path.dirname(__file__), "testsprite_frontend_test_plan.json")
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "tmp", "config.json")
+
+
+# ============================================
+# TYPES
+# ============================================
+
+@dataclass(frozen=True)
+class LocatorSpec:
+    """
+    One way of finding an element. `strategy` maps 1:1 onto a Playwright
+    page.get_by_* call (role, test_id, label, placeholder, text) or a raw css
+    selector.
+    """
+    strategy: str
+    value: str
+    name: Optional[str] = None
+    exact: bool = False
+
+
+@dataclass(frozen=True)
+class Step:
+    kind: str  # navigate | type | click | scroll | wait | assert_url | assert_text | assert_element
+    description: str
+    target: Optional[str] = None
+    value: Optional[str] = None
+    locators: Tuple[LocatorSpec, ...] = ()
+
+    @property
+    def is_assertion(self) -> bool:
+        return self.kind.startswith("assert_")
+
+    @property
+    def key(self) -> Tuple[str, Optional[str], Optional[str]]:
+        """Identity used by the prefix cache — wording differences don't matter."""
+        return (self.kind, self.target, self.value)
+
+
+@dataclass
+class TestCase:
+    id: str
+    title: str
+    category: str
+    priority: str
+    steps: List[Step] = field(default_factory=list)
+
+
+class StepParseError(ValueError):
+    pass
+
+
+# ============================================
+# SELECTOR REGISTRY
+# ============================================
+
+# Targets are normalised (lower-case, quotes stripped) before lookup.
+# Order inside each tuple is the resolution order: the first locator that
+# matches a visible element wins. Test ids come first so that adding a
+# data-testid to a component immediately makes the plan more robust.
+SELECTOR_REGISTRY: Dict[str, Tuple[LocatorSpec, ...]] = {
+    # Auth
+    "email/username field": (
+        LocatorSpec("test_id", "login-email"),
+        LocatorSpec("css", "input[type=email]"),
+        LocatorSpec("placeholder", "name@company.com"),
+    ),
+    "password field": (
+        LocatorSpec("test_id", "login-password"),
+        LocatorSpec("css", "input[type=password]"),
+    ),
+    "log in": (
+        LocatorSpec("test_id", "login-submit"),
+        LocatorSpec("css", "form button[type=submit]"),
+        LocatorSpec("role", "button", name="Sign In"),
+    ),
+    # Onboarding
+    "x": (
+        LocatorSpec("test_id", "platform-x"),
+        LocatorSpec("role", "checkbox", name="X", exact=True),
+        LocatorSpec("role", "button", name="X", exact=True),
+    ),
+    "next": (
+        LocatorSpec("test_id", "onboarding-continue"),
+        LocatorSpec("role", "button", name="Continue", exact=True),
+        LocatorSpec("role", "button", name="Next", exact=True),
+    ),
+    "first writing sample text area": (
+        LocatorSpec("test_id", "voice-sample-0"),
+        LocatorSpec("css", "textarea >> nth=0"),
+    ),
+    "writing sample text area": (
+        LocatorSpec("test_id", "voice-sample-0"),
+        LocatorSpec("css", "textarea >> nth=0"),
+    ),
+    "samples text area": (
+        LocatorSpec("test_id", "voice-sample-0"),
+        LocatorSpec("css", "textarea >> nth=0"),
+    ),
+    "yes": (
+        LocatorSpec("test_id", "preview-accept"),
+        LocatorSpec("role", "button", name="Yes"),
+    ),
+    "no": (
+        LocatorSpec("test_id", "preview-discard"),
+        LocatorSpec("role", "button", name="No"),
+        LocatorSpec("role", "button", name="Discard"),
+    ),
+    "continue anyway": (
+        LocatorSpec("role", "button", name="Continue anyway"),
+    ),
+    "finalize setup to see your weekly plan": (
+        LocatorSpec("text", "Finalize setup to see your weekly plan"),
+    ),
+    # Dashboard navigation
+    "settings": (
+        LocatorSpec("test_id", "nav-settings"),
+        LocatorSpec("role", "link", name="Settings"),
+        LocatorSpec("role", "button", name="Settings"),
+    ),
+    "billing": (
+        LocatorSpec("test_id", "settings-tab-billing"),
+        LocatorSpec("role", "tab", name="Billing"),
+        LocatorSpec("role", "button", name="Billing"),
+        LocatorSpec("role", "link", name="Billing"),
+    ),
+    "profiles": (
+        LocatorSpec("test_id", "settings-tab-profiles"),
+        LocatorSpec("role", "tab", name="Profiles"),
+        LocatorSpec("role", "button", name="Profiles"),
+    ),
+    "profile selector": (
+        LocatorSpec("test_id", "profile-selector"),
+        LocatorSpec("role", "combobox"),
+    ),
+    # Posts
+    "post card": (
+        LocatorSpec("test_id", "post-card"),
+        LocatorSpec("css", "[data-post-id]"),
+    ),
+    "linkedin post card": (
+        LocatorSpec("test_id", "post-card-linkedin"),
+        LocatorSpec("css", "[data-platform=linkedin]"),
+    ),
+    "instagram script card": (
+        LocatorSpec("test_id", "post-card-instagram"),
+        LocatorSpec("css", "[data-platform=instagram]"),
+    ),
+    "alternate hook option": (
+        LocatorSpec("test_id", "hook-option"),
+        LocatorSpec("css", "[data-hook-index]:not([data-selected=true])"),
+    ),
+    # Ideas
+    "idea text field": (
+        LocatorSpec("test_id", "idea-input"),
+        LocatorSpec("css", "textarea >> nth=0"),
+    ),
+    "profile name field": (
+        LocatorSpec("test_id", "profile-name"),
+        LocatorSpec("label", "Name"),
+    ),
+    "weekly digest": (
+        LocatorSpec("test_id", "toggle-weekly-digest"),
+        LocatorSpec("role", "switch", name="Weekly digest"),
+        LocatorSpec("label", "Weekly digest"),
+    ),
+}
+
+
+def normalize_target(raw: str) -> str:
+    text = raw.strip().strip('"').strip()
+    text = re.sub(r"^(the|a|an|on|to)\s+", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s+(button|link|item|tab|checkbox|toggle|prompt)$", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s+in the (app|dashboard) navigation$", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"\s+navigation$", "", text, flags=re.IGNORECASE)
+    return text.strip().strip('"').lower()
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def resolve_locators(target: str, interactive: bool = True) -> Tuple[LocatorSpec, ...]:
+    """
+    Registry lookup with a generic fallback: a data-testid derived from the
+    target, then a role/text locator with the target's display text.
+    """
+    key = normalize_target(target)
+    if key in SELECTOR_REGISTRY:
+        return SELECTOR_REGISTRY[key]
+
+    display = target.strip().strip('"')
+    fallback: List[LocatorSpec] = [LocatorSpec("test_id", slugify(display))]
+    if interactive:
+        fallback.append(LocatorSpec("role", "button", name=display))
+        fallback.append(LocatorSpec("role", "link", name=display))
+    fallback.append(LocatorSpec("text", display))
+    return tuple(fallback)
+
+
+# ============================================
+# STEP GRAMMAR
+# ============================================
+
+_QUOTED = r'"([^"]*)"'
+
+_PATTERNS: Sequence[Tuple[str, "re.Pattern[str]"]] = (
+    ("navigate", re.compile(r"^Navigate to (\S+)$", re.IGNORECASE)),
+    ("type", re.compile(r"^Type " + _QUOTED + r" into (?:the )?(.+)$", re.IGNORECASE)),
+    ("click_either", re.compile(r"^Click " + _QUOTED + r" or " + _QUOTED + r"(?:\s.*)?$", re.IGNORECASE)),
+    ("click_quoted", re.compile(r"^Click (?:on |to select )?(?:the )?" + _QUOTED + r"(.*)$", re.IGNORECASE)),
+    ("click", re.compile(r"^Click (?:on )?(?:the |a |an )?(.+)$", re.IGNORECASE)),
+    ("scroll", re.compile(r"^Scroll to " + _QUOTED + r"$", re.IGNORECASE)),
+    ("wait", re.compile(r"^Wait for (.+)$", re.IGNORECASE)),
+    ("assert_url", re.compile(r"^Verify URL contains " + _QUOTED + r"$", re.IGNORECASE)),
+    ("assert_text", re.compile(r"^Verify text " + _QUOTED + r" is visible(?:\s.*)?$", re.IGNORECASE)),
+    ("assert_element", re.compile(r"^Verify element " + _QUOTED + r" is visible(?:\s.*)?$", re.IGNORECASE)),
+)
+
+# Clicks that name a thing rather than quote it ("Click a LinkedIn post card").
+_CLICK_NOUNS = (
+    ("linkedin post card", "linkedin post card"),
+    ("instagram script card", "instagram script card"),
+    ("post card", "post card"),
+    ("alternate hook option", "alternate hook option"),
+    ("profile selector", "profile selector"),
+    ("profiles", "profiles"),
+)
+
+
+def substitute(text: str, variables: Dict[str, str]) -> str:
+    return re.sub(r"\{\{(\w+)\}\}", lambda m: variables.get(m.group(1), m.group(0)), text)
+
+
+def parse_step(raw: Dict[str, str], variables: Optional[Dict[str, str]] = None) -> Step:
+    description = raw["description"].strip()
+    text = substitute(description, variables or {})
+
+    for name, pattern in _PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+
+        if name == "navigate":
+            return Step("navigate", description, value=match.group(1))
+        if name == "type":
+            target = match.group(2)
+            return Step("type", description, target=normalize_target(target), value=match.group(1),
+                        locators=resolve_locators(target))
+        if name == "click_either":
+            # 'Click "Next" or "Continue"' — try both names in registry order
+            first, second = match.group(1), match.group(2)
+            locators = resolve_locators(first) + tuple(
+                spec for spec in resolve_locators(second) if spec not in resolve_locators(first)
+            )
+            return Step("click", description, target=normalize_target(first), locators=locators)
+        if name == "click_quoted":
+            # Trailing words ('button', 'on that idea card') only describe the label
+            label = match.group(1)
+            return Step("click", description, target=normalize_target(label), locators=resolve_locators(label))
+        if name == "click":
+            phrase = match.group(1).lower()
+            for needle, key in _CLICK_NOUNS:
+                if needle in phrase:
+                    return Step("click", description, target=key, locators=resolve_locators(key))
+            return Step("click", description, target=normalize_target(phrase),
+                        locators=resolve_locators(phrase))
+        if name == "scroll":
+            return Step("scroll", description, target=match.group(1).lower(),
+                        locators=(LocatorSpec("text", match.group(1)),))
+        if name == "wait":
+            return Step("wait", description, value=match.group(1))
+        if name == "assert_url":
+            return Step("assert_url", description, value=match.group(1))
+        if name == "assert_text":
+            return Step("assert_text", description, value=match.group(1),
+                        locators=(LocatorSpec("text", match.group(1)),))
+        if name == "assert_element":
+            element = match.group(1)
+            return Step("assert_element", description, target=element.lower(),
+                        locators=resolve_locators(element, interactive=False))
+
+    raise StepParseError(f"Unrecognised step: {description!r}")
+
+
+# ============================================
+# PLAN LOADING
+# ============================================
+
+def load_variables(config_path: str = CONFIG_PATH) -> Dict[str, str]:
+    """Credentials come from tmp/config.json, overridable via the environment."""
+    variables: Dict[str, str] = {}
+    if os.path.exists(config_path):
+        with open(config_path, encoding="utf-8") as fh:
+            config = json.load(fh)
+        variables["LOGIN_USER"] = config.get("loginUser", "")
+        variables["LOGIN_PASSWORD"] = config.get("loginPassword", "")
+    for name in ("LOGIN_USER", "LOGIN_PASSWORD"):
+        if os.environ.get(name):
+            variables[name] = os.environ[name]
+    return variables
+
+
+def load_plan(
+    path: str = PLAN_PATH,
+    variables: Optional[Dict[str, str]] = None,
+    ids: Optional[Sequence[str]] = None,
+) -> List[TestCase]:
+    with open(path, encoding="utf-8") as fh:
+        raw_cases = json.load(fh)
+
+    wanted = {i.upper() for i in ids} if ids else None
+    cases: List[TestCase] = []
+    for raw in raw_cases:
+        if wanted and raw["id"].upper() not in wanted:
+            continue
+        cases.append(TestCase(
+            id=raw["id"],
+            title=raw.get("title", ""),
+            category=raw.get("category", ""),
+            priority=raw.get("priority", ""),
+            steps=[parse_step(step, variables) for step in raw.get("steps", [])],
+        ))
+    return cases
+
+
+# ============================================
+# PREFIX CACHE PLANNING
+# ============================================
+
+def shared_prefixes(cases: Sequence[TestCase], min_cases: int = 2) -> Dict[Tuple, int]:
+    """
+    Count how many cases start with each action-only prefix. Assertions end a
+    cacheable prefix: we only snapshot state reached purely by actions, so a
+    case that asserts mid-way still runs its own assertions.
+    """
+    counts: Dict[Tuple, int] = {}
+    for case in cases:
+        prefix: List[Tuple] = []
+        for step in case.steps:
+            if step.is_assertion:
+                break
+            prefix.append(step.key)
+            key = tuple(prefix)
+            counts[key] = counts.get(key, 0) + 1
+    return {key: n for key, n in counts.items() if n >= min_cases}
+
+
+def cacheable_prefix_length(case: TestCase, shared: Dict[Tuple, int]) -> int:
+    """Longest prefix of `case` that at least one other case also starts with."""
+    best = 0
+    prefix: List[Tuple] = []
+    for index, step in enumerate(case.steps):
+        if step.is_assertion:
+            break
+        prefix.append(step.key)
+        if tuple(prefix) in shared:
+            best = index + 1
+    return best
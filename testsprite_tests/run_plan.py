@@ -0,0 +1,351 @@
+"""
+Data-driven executor for testsprite_frontend_test_plan.json.
+
+Interprets the plan's typed steps directly (see plan_steps.py) instead of
+running one generated xpath script per case:
+
+  - targets resolve through the selector registry (test id -> role -> text)
+  - cases run concurrently, one browser context each, on a shared browser
+  - action-only prefixes shared by several cases (e.g. "log in") are run once;
+    the resulting cookies/localStorage + URL are snapshotted and every other
+    case sharing that prefix starts from the snapshot
+
+Usage:
+    python testsprite_tests/run_plan.py                       # whole plan
+    python testsprite_tests/run_plan.py --ids TC001 TC007     # subset
+    python testsprite_tests/run_plan.py --workers 8 --report tmp/plan_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+from playwright import async_api
+from playwright.async_api import expect
+
+from plan_steps import (
+    PLAN_PATH,
+    LocatorSpec,
+    Step,
+    TestCase,
+    cacheable_prefix_length,
+    load_plan,
+    load_variables,
+    shared_prefixes,
+)
+
+DEFAULT_BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:3000")
+
+
+# ============================================
+# TYPES
+# ============================================
+
+@dataclass
+class Snapshot:
+    storage_state: dict
+    url: str
+
+
+@dataclass
+class CaseResult:
+    id: str
+    title: str
+    passed: bool
+    duration_ms: int
+    steps_run: int
+    steps_from_cache: int
+    failed_step: Optional[str] = None
+    error: Optional[str] = None
+
+
+class StepFailure(Exception):
+    def __init__(self, step: Step, message: str):
+        super().__init__(message)
+        self.step = step
+
+
+# ============================================
+# PREFIX CACHE
+# ============================================
+
+class PrefixCache:
+    """
+    Snapshots keyed by step-prefix identity. `lock_for` gives single-flight
+    semantics per boundary: when several cases need the same prefix, the
+    first builds it and the rest wait for the snapshot instead of logging in
+    N times, even if their longer prefixes then diverge.
+    """
+
+    def __init__(self, shared: Dict[Tuple, int]):
+        self.shared = shared
+        self.snapshots: Dict[Tuple, Snapshot] = {}
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+
+    def lock_for(self, key: Tuple) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def boundaries(self, steps: Sequence[Step], limit: int) -> List[int]:
+        """Lengths (ascending, up to `limit`) at which `steps` reaches a shared prefix."""
+        return [length for length in range(1, limit + 1) if self.is_boundary(steps, length)]
+
+    def is_boundary(self, steps: Sequence[Step], length: int) -> bool:
+        return tuple(step.key for step in steps[:length]) in self.shared
+
+    async def store(self, context, page, steps: Sequence[Step], length: int) -> None:
+        key = tuple(step.key for step in steps[:length])
+        if key not in self.snapshots:
+            self.snapshots[key] = Snapshot(storage_state=await context.storage_state(), url=page.url)
+
+
+# ============================================
+# LOCATOR RESOLUTION
+# ============================================
+
+def build_locator(page, spec: LocatorSpec):
+    if spec.strategy == "role":
+        if spec.name is None:
+            return page.get_by_role(spec.value)
+        return page.get_by_role(spec.value, name=spec.name, exact=spec.exact)
+    if spec.strategy == "test_id":
+        return page.get_by_test_id(spec.value)
+    if spec.strategy == "label":
+        return page.get_by_label(spec.value, exact=spec.exact)
+    if spec.strategy == "placeholder":
+        return page.get_by_placeholder(spec.value, exact=spec.exact)
+    if spec.strategy == "text":
+        return page.get_by_text(spec.value, exact=spec.exact)
+    return page.locator(spec.value)
+
+
+async def resolve(page, step: Step, timeout_ms: int):
+    """First registry locator with a visible match wins; poll until timeout."""
+    deadline = time.monotonic() + timeout_ms / 1000
+    while True:
+        for spec in step.locators:
+            locator = build_locator(page, spec).first
+            try:
+                if await locator.is_visible():
+                    return locator
+            except async_api.Error:
+                continue
+        if time.monotonic() >= deadline:
+            tried = ", ".join(f"{s.strategy}={s.name or s.value}" for s in step.locators)
+            raise StepFailure(step, f"No visible element for {step.target!r} (tried {tried})")
+        await asyncio.sleep(0.1)
+
+
+# ============================================
+# STEP EXECUTION
+# ============================================
+
+async def run_step(page, step: Step, base_url: str, timeout_ms: int) -> None:
+    try:
+        if step.kind == "navigate":
+            await page.goto(urljoin(base_url, step.value), wait_until="domcontentloaded", timeout=timeout_ms * 2)
+        elif step.kind == "type":
+            locator = await resolve(page, step, timeout_ms)
+            if step.value.startswith(" "):
+                # Leading whitespace means "append to what's there"
+                await locator.press("End")
+                await locator.press_sequentially(step.value)
+            else:
+                await locator.fill(step.value)
+        elif step.kind == "click":
+            locator = await resolve(page, step, timeout_ms)
+            await locator.click(timeout=timeout_ms)
+        elif step.kind == "scroll":
+            locator = await resolve(page, step, timeout_ms)
+            await locator.scroll_into_view_if_needed(timeout=timeout_ms)
+        elif step.kind == "wait":
+            await page.wait_for_load_state("networkidle", timeout=timeout_ms * 2)
+        elif step.kind == "assert_url":
+            await expect(page).to_have_url(re.compile(re.escape(step.value)), timeout=timeout_ms)
+        elif step.kind == "assert_text":
+            await expect(page.get_by_text(step.value).first).to_be_visible(timeout=timeout_ms)
+        elif step.kind == "assert_element":
+            await resolve(page, step, timeout_ms)
+        else:
+            raise StepFailure(step, f"Unsupported step kind {step.kind!r}")
+    except StepFailure:
+        raise
+    except (AssertionError, async_api.Error) as error:
+        raise StepFailure(step, str(error).splitlines()[0]) from error
+
+
+async def settle(page, timeout_ms: int) -> bool:
+    """
+    Wait for whatever the last prefix step started (login redirect, auth
+    cookie, client-side navigation) to finish before it is snapshotted.
+    False if the page never went idle; the boundary is then not cached.
+    """
+    try:
+        await page.wait_for_load_state("load", timeout=timeout_ms * 2)
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms * 2)
+        return True
+    except async_api.TimeoutError:
+        return False
+
+
+async def open_page(browser, timeout_ms: int, snapshot: Optional[Snapshot] = None):
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 720},
+        storage_state=snapshot.storage_state if snapshot else None,
+    )
+    context.set_default_timeout(timeout_ms)
+    page = await context.new_page()
+    if snapshot:
+        await page.goto(snapshot.url, wait_until="domcontentloaded", timeout=timeout_ms * 2)
+    return context, page
+
+
+async def run_case(
+    browser,
+    case: TestCase,
+    cache: PrefixCache,
+    base_url: str,
+    timeout_ms: int,
+) -> CaseResult:
+    started = time.monotonic()
+    steps = case.steps
+    prefix_len = cacheable_prefix_length(case, cache.shared)
+    context = None
+    page = None
+    cursor = 0
+    restored = 0
+    ran = 0
+    # Snapshot to start from, not opened yet (a later boundary may supersede it)
+    pending: Optional[Snapshot] = None
+
+    async def ensure_page() -> None:
+        nonlocal context, page, pending
+        if context is not None and pending is None:
+            return
+        if context is not None:
+            await context.close()
+        context, page = await open_page(browser, timeout_ms, pending)
+        pending = None
+
+    try:
+        # Walk the shared boundaries shortest first, locking each one: cases
+        # that only share the login prefix still wait for a single login
+        for boundary in cache.boundaries(steps, prefix_len):
+            key = tuple(step.key for step in steps[:boundary])
+            async with cache.lock_for(key):
+                if key in cache.snapshots:
+                    pending = cache.snapshots[key]
+                    cursor = restored = boundary
+                    continue
+                await ensure_page()
+                while cursor < boundary:
+                    await run_step(page, steps[cursor], base_url, timeout_ms)
+                    cursor += 1
+                    ran += 1
+                if await settle(page, timeout_ms):
+                    await cache.store(context, page, steps, cursor)
+
+        await ensure_page()
+        while cursor < len(steps):
+            await run_step(page, steps[cursor], base_url, timeout_ms)
+            cursor += 1
+            ran += 1
+
+        return CaseResult(case.id, case.title, True, _elapsed(started), ran, restored)
+
+    except StepFailure as failure:
+        return CaseResult(case.id, case.title, False, _elapsed(started), ran, restored,
+                          failed_step=failure.step.description, error=str(failure))
+    except Exception as error:  # browser crash, navigation timeout before first step, ...
+        return CaseResult(case.id, case.title, False, _elapsed(started), ran, restored,
+                          error=f"{type(error).__name__}: {error}")
+    finally:
+        if context:
+            await context.close()
+
+
+def _elapsed(started: float) -> int:
+    return round((time.monotonic() - started) * 1000)
+
+
+async def run_plan(
+    cases: Sequence[TestCase],
+    base_url: str = DEFAULT_BASE_URL,
+    workers: int = 4,
+    timeout_ms: int = 5000,
+    headless: bool = True,
+) -> List[CaseResult]:
+    cache = PrefixCache(shared_prefixes(cases))
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    pw = await async_api.async_playwright().start()
+    browser = await pw.chromium.launch(
+        headless=headless,
+        args=["--window-size=1280,720", "--disable-dev-shm-usage"],
+    )
+
+    async def bounded(case: TestCase) -> CaseResult:
+        async with semaphore:
+            result = await run_case(browser, case, cache, base_url, timeout_ms)
+            status = "PASS" if result.passed else "FAIL"
+            print(f"[{status}] {case.id} {case.title} ({result.duration_ms}ms, "
+                  f"{result.steps_from_cache} cached)", flush=True)
+            if not result.passed:
+                print(f"       {result.failed_step or ''} -> {result.error}", flush=True)
+            return result
+
+    try:
+        return list(await asyncio.gather(*(bounded(case) for case in cases)))
+    finally:
+        await browser.close()
+        await pw.stop()
+
+
+# ============================================
+# CLI
+# ============================================
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the TestSprite frontend plan without generated scripts.")
+    parser.add_argument("--plan", default=PLAN_PATH)
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--ids", nargs="*", help="Only run these test ids (e.g. TC001 TC007)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--timeout", type=int, default=5000, help="Per-step timeout in ms")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--report", help="Write JSON results to this path")
+    parser.add_argument("--list", action="store_true", help="Print parsed steps and exit")
+    args = parser.parse_args(argv)
+
+    cases = load_plan(args.plan, load_variables(), args.ids)
+
+    if args.list:
+        shared = shared_prefixes(cases)
+        for case in cases:
+            print(f"{case.id} {case.title} (cached prefix: {cacheable_prefix_length(case, shared)})")
+            for step in case.steps:
+                print(f"    {step.kind:<15} {step.target or '':<32} {step.value or ''}")
+        return 0
+
+    started = time.monotonic()
+    results = asyncio.run(run_plan(cases, args.base_url, args.workers, args.timeout, not args.headed))
+    passed = sum(1 for r in results if r.passed)
+    print(f"\n{passed}/{len(results)} passed in {time.monotonic() - started:.1f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump([asdict(r) for r in results], fh, indent=2)
+
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+-- ============================================
+-- COLUMNS THE APP USES THAT LIVE OUTSIDE schema.sql /
+-- weekly_generation_schema.sql / stripe_schema.sql
+-- Applied after those files and before the migrations when bootstrapping a
+-- local test database: LANGUAGE sql functions in the migrations (library
+-- queries, entitlements) are checked against these columns at CREATE time.
+-- ============================================
+
+-- Accounts (read by AuthContext; production table predates the schema files)
+CREATE TABLE IF NOT EXISTS accounts (
+    id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    email TEXT,
+    plan_tier TEXT DEFAULT 'starter',
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE founder_profiles
+    ADD COLUMN IF NOT EXISTS role TEXT,
+    ADD COLUMN IF NOT EXISTS company_name TEXT,
+    ADD COLUMN IF NOT EXISTS company_website TEXT,
+    ADD COLUMN IF NOT EXISTS business_description TEXT,
+    ADD COLUMN IF NOT EXISTS expertise TEXT,
+    ADD COLUMN IF NOT EXISTS auto_publish BOOLEAN DEFAULT false,
+    ADD COLUMN IF NOT EXISTS connections JSONB DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS context_data JSONB DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS brand_colors JSONB,
+    ADD COLUMN IF NOT EXISTS onboarding_status TEXT DEFAULT 'incomplete',
+    ADD COLUMN IF NOT EXISTS onboarding_step INT DEFAULT 0,
+    -- 20260127 creates an enum with 'growth'; the app writes 'creator', so TEXT locally
+    ADD COLUMN IF NOT EXISTS subscription_tier TEXT DEFAULT 'starter',
+    ADD COLUMN IF NOT EXISTS visual_mode TEXT DEFAULT 'none',
+    ADD COLUMN IF NOT EXISTS ideas_limit_monthly INT DEFAULT 30,
+    ADD COLUMN IF NOT EXISTS carousels_limit_weekly INT DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS news_feature_enabled BOOLEAN DEFAULT false,
+    ADD COLUMN IF NOT EXISTS style_faceless TEXT,
+    ADD COLUMN IF NOT EXISTS style_carousel TEXT,
+    ADD COLUMN IF NOT EXISTS style_face TEXT,
+    ADD COLUMN IF NOT EXISTS avatar_urls TEXT[] DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS visual_lora_id TEXT,
+    ADD COLUMN IF NOT EXISTS visual_training_status TEXT DEFAULT 'not_started',
+    ADD COLUMN IF NOT EXISTS weekly_goal TEXT DEFAULT 'balanced',
+    ADD COLUMN IF NOT EXISTS goal_context TEXT,
+    ADD COLUMN IF NOT EXISTS goal_set_at TIMESTAMPTZ;
+
+ALTER TABLE posts
+    ADD COLUMN IF NOT EXISTS topic TEXT,
+    ADD COLUMN IF NOT EXISTS is_liked BOOLEAN DEFAULT false,
+    ADD COLUMN IF NOT EXISTS image_url TEXT;
+
+-- Checkout/webhook write tier names into subscriptions.plan
+ALTER TABLE subscriptions DROP CONSTRAINT IF EXISTS subscriptions_plan_check;
+ALTER TABLE subscriptions ADD CONSTRAINT subscriptions_plan_check
+    CHECK (plan IN ('free', 'pro', 'agency', 'starter', 'creator', 'authority'));
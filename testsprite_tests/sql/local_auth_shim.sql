@@ -0,0 +1,28 @@
+-- ============================================
+-- LOCAL POSTGRES SHIM FOR SUPABASE-ONLY OBJECTS
+-- Lets supabase/*.sql run against a plain local Postgres.
+-- Every statement is a no-op on a real Supabase (local or hosted) database.
+-- ============================================
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+    id UUID PRIMARY KEY,
+    instance_id UUID,
+    aud TEXT DEFAULT 'authenticated',
+    role TEXT DEFAULT 'authenticated',
+    email TEXT UNIQUE,
+    encrypted_password TEXT,
+    email_confirmed_at TIMESTAMPTZ,
+    raw_app_meta_data JSONB DEFAULT '{}',
+    raw_user_meta_data JSONB DEFAULT '{}',
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS policies reference auth.uid(); on plain Postgres read it from a GUC
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID AS $$
+    SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::UUID;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,111 @@
+"""
+Auto-publish: an X thread that fails permanently part-way keeps the ids of
+the tweets that made it, and republishing continues from the next reply
+instead of posting the thread again.
+
+Needs the app running against the test database with the X stand-in:
+
+    X_API_BASE_URL=http://localhost:8787 CRON_SECRET=... npm run dev
+    CRON_SECRET=... pytest testsprite_tests/test_publisher_thread_resume.py
+"""
+
+import json
+import os
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api_standins import STATE, serve
+from db_fixtures import scenario_id, test_database, week3_creator  # noqa: F401 (fixtures)
+
+APP_URL = os.environ.get("APP_URL", "http://localhost:3000")
+CRON_SECRET = os.environ.get("CRON_SECRET", "")
+STANDIN_PORT = int(os.environ.get("STANDIN_PORT", "8787"))
+
+THREAD = [f"Tweet {n}: what we learned shipping week {n}." for n in range(1, 6)]
+
+
+@pytest.fixture(scope="module")
+def standins():
+    server = serve(STANDIN_PORT)
+    yield STATE
+    server.shutdown()
+
+
+def run_publisher() -> dict:
+    request = urllib.request.Request(
+        f"{APP_URL}/api/cron/publish-scheduled",
+        headers={"Authorization": f"Bearer {CRON_SECRET}"},
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.load(response)
+
+
+def tweet_requests(state) -> list:
+    with state.lock:
+        return [r for r in state.requests if r["path"].startswith("/2/tweets")]
+
+
+def test_thread_resumes_after_permanent_failure(test_database, week3_creator, standins):
+    user = week3_creator
+    post_id = scenario_id(user.scenario, "thread")
+
+    with test_database.connect() as conn:
+        conn.execute("UPDATE founder_profiles SET auto_publish = true WHERE id = %s", (user.profile_id,))
+        # Only the thread is due
+        conn.execute(
+            "UPDATE posts SET scheduled_date = NOW() + interval '30 days' "
+            "WHERE profile_id = %s AND status = 'scheduled'",
+            (user.profile_id,),
+        )
+        conn.execute(
+            "INSERT INTO social_connections (user_id, platform, access_token, profile_id) "
+            "VALUES (%s, 'x', 'standin-token', 'standin-x-user')",
+            (user.account_id,),
+        )
+        conn.execute(
+            """
+            INSERT INTO posts (id, profile_id, generation_id, platform, scheduled_date, content, topic,
+                               format, status)
+            VALUES (%s, %s, %s, 'x', %s, %s, 'Shipping lessons', 'thread', 'scheduled')
+            """,
+            (post_id, user.profile_id, user.generation_ids[-1],
+             datetime.now(timezone.utc) - timedelta(minutes=1), "\n\n".join(THREAD)),
+        )
+
+    # Tweet 1 and replies 1-2 go out, reply 3 is rejected (403 is not retried)
+    standins.reset()
+    standins.add_failure("/2/tweets", 403, 1, skip=3)
+    report = run_publisher()
+    assert report["failed"] == 1, report
+
+    with test_database.connect() as conn:
+        status, media = conn.execute(
+            "SELECT status, platform_media FROM posts WHERE id = %s", (post_id,)
+        ).fetchone()
+    assert status == "failed"
+    posted = media["x_thread"]["ids"]
+    assert len(posted) == 3, media
+
+    # Republish: the failed post goes back on the schedule untouched
+    with test_database.connect() as conn:
+        conn.execute(
+            "UPDATE posts SET status = 'scheduled', publish_attempts = 0, next_publish_attempt_at = NULL "
+            "WHERE id = %s",
+            (post_id,),
+        )
+    standins.reset()
+    report = run_publisher()
+    assert report["published"] == 1, report
+
+    resumed = tweet_requests(standins)
+    assert [r["body"]["text"] for r in resumed] == THREAD[3:]
+    assert resumed[0]["body"]["reply"]["in_reply_to_tweet_id"] == posted[2]
+
+    with test_database.connect() as conn:
+        status, external_id = conn.execute(
+            "SELECT status, external_id FROM posts WHERE id = %s", (post_id,)
+        ).fetchone()
+    assert status == "posted"
+    assert external_id == posted[0]